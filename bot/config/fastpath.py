@@ -0,0 +1,118 @@
+"""
+Fast-Path - optional uvloop (Event Loop) und orjson (JSON)
+
+Standard: asyncio-Loop und das stdlib-json von aiohttp. getTransaction-Antworten
+(jsonParsed) sind gross – das Dekodieren kostet auf dem Polling-Pfad spuerbar CPU.
+
+Aktivieren: python main.py --fast <modus>   (oder Umgebungsvariable COPYBOT_FAST=1)
+  --fast nur direkt vor dem Modus – dahinter ist es ein Runner-Argument
+  - uvloop als Event-Loop-Policy (gilt fuer jedes asyncio.run der Runner)
+  - orjson fuer Request-Bodies (json_serialize der ClientSession) und
+    Antworten (read_json: Bytes direkt an orjson, ohne Text-Dekodierung)
+
+Fehlt eine Bibliothek, bleibt der jeweilige Teil beim Standard – enable()
+meldet, was aktiv ist. Installation: pip install uvloop orjson
+(uvloop gibt es nicht fuer Windows).
+
+Genutzt von: SolanaPollingSource (+ MissedSellReconciler), SolanaWebSocketSource,
+SolanaParallelSource, PriceOracle.
+Messung: python main.py bench --fastpath
+"""
+import asyncio
+import json
+import os
+from typing import Any, Dict
+
+import aiohttp
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+ENV_FLAG = "COPYBOT_FAST"
+
+_uvloop_active = False
+_orjson_active = False
+
+
+def requested(argv: list) -> bool:
+    """
+    --fast VOR dem Modus (argv[0]) oder COPYBOT_FAST=1. Nach dem Modus gehoert
+    --fast dem Runner (python main.py offline --fast 500).
+    """
+    return argv[:1] == ["--fast"] or os.environ.get(ENV_FLAG, "").lower() in ("1", "true", "yes")
+
+
+def enable(loop: bool = True, fast_json: bool = True) -> Dict[str, bool]:
+    """Aktiviert, was installiert ist. Rueckgabe: {"uvloop": bool, "orjson": bool}"""
+    global _uvloop_active, _orjson_active
+    if loop and uvloop is not None and not _uvloop_active:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        _uvloop_active = True
+    if fast_json and orjson is not None:
+        _orjson_active = True
+    return status()
+
+
+def disable():
+    """Zurueck zu asyncio-Loop und stdlib-json (Benchmark-Vergleich)"""
+    global _uvloop_active, _orjson_active
+    if _uvloop_active:
+        asyncio.set_event_loop_policy(None)
+    _uvloop_active = False
+    _orjson_active = False
+
+
+def status() -> Dict[str, bool]:
+    return {"uvloop": _uvloop_active, "orjson": _orjson_active}
+
+
+def describe() -> str:
+    """Einzeiler fuer den Start-Banner"""
+    parts = []
+    for name, module, active in (("uvloop", uvloop, _uvloop_active), ("orjson", orjson, _orjson_active)):
+        if active:
+            parts.append(f"{name}: aktiv")
+        elif module is None:
+            parts.append(f"{name}: nicht installiert (Standard)")
+        else:
+            parts.append(f"{name}: aus")
+    return " | ".join(parts)
+
+
+def dumps(obj: Any) -> str:
+    if _orjson_active:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def loads(data):
+    if _orjson_active:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def client_session(**kwargs) -> aiohttp.ClientSession:
+    """aiohttp.ClientSession, deren json= Bodies ueber dumps laufen"""
+    kwargs.setdefault("json_serialize", dumps)
+    return aiohttp.ClientSession(**kwargs)
+
+
+async def read_json(response: aiohttp.ClientResponse, content_type: str = "application/json"):
+    """
+    Wie response.json(content_type=...). Mit orjson werden die Bytes direkt
+    dekodiert (kein Umweg ueber str). Falscher Content-Type -> wie bisher
+    aiohttp.ContentTypeError, leerer Body -> None.
+    """
+    if not _orjson_active or (content_type is not None and "json" not in response.content_type):
+        return await response.json(content_type=content_type)
+    body = await response.read()
+    if not body.strip():
+        return None
+    return orjson.loads(body)
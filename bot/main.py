@@ -1,6 +1,15 @@
 import sys
 
 def main():
+    from config import fastpath
+    if fastpath.requested(sys.argv[1:]):
+        # Optional: uvloop + orjson (config/fastpath.py) – fehlende Pakete -> Standard.
+        # Nur das fuehrende --fast ist global (offline --fast N bleibt beim Runner)
+        if sys.argv[1:2] == ["--fast"]:
+            del sys.argv[1]
+        fastpath.enable()
+        print(f"[FastPath] {fastpath.describe()}")
+
     if len(sys.argv) < 2 or sys.argv[1] in ("help", "--help", "-h"):
         from runners import help
         help.run()
@@ -21,7 +30,7 @@ def main():
 
     elif mode == "offline":
         from runners import offline
-        offline.run()
+        offline.run(sys.argv[2:])
 
     elif mode == "live":
         from runners import live
@@ -58,6 +67,26 @@ def main():
         from runners import tune_observer
         tune_observer.run(sys.argv[2:])
 
+    elif mode == "replay":
+        from runners import replay
+        replay.run(sys.argv[2:])
+
+    elif mode == "sweep":
+        from runners import sweep
+        sweep.run(sys.argv[2:])
+
+    elif mode == "costs":
+        from runners import costs
+        costs.run(sys.argv[2:])
+
+    elif mode == "latency":
+        from runners import latency
+        latency.run(sys.argv[2:])
+
+    elif mode == "bench":
+        from runners import bench
+        sys.exit(bench.run(sys.argv[2:]))
+
     elif mode == "show_db":
         from runners import show_db
         show_db.run(sys.argv[2:])
@@ -66,6 +95,10 @@ def main():
         from runners import logs
         logs.run(sys.argv[2:])
 
+    elif mode == "paper_logs":
+        from runners import paper_logs
+        paper_logs.run(sys.argv[2:])
+
     elif mode == "list":
         from runners import wallet_list
         wallet_list.run(sys.argv[2:])
@@ -1,14 +1,39 @@
 # observation/models.py
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Optional
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
 class TradeEvent:
+    """
+    Ein beobachteter Swap. Kompakt (slots, kein Instanz-Dict) – der Observer
+    haelt bei hunderten Wallets sehr viele davon gleichzeitig. Bewusst nicht
+    frozen: das __init__ einer frozen Dataclass setzt jedes Feld ueber
+    object.__setattr__ und kostet auf dem Parse-Pfad ein Mehrfaches.
+
+    Die rohe Transaktion wird NICHT gehalten: extract_trade liest beim Parsen
+    alles, was spaeter gebraucht wird (Signatur, Slot, Block-Zeit, Decimals),
+    danach kann die Tx-Meta freigegeben werden.
+    """
     wallet: str
     token: str
     side: str
     amount: float
     source: str = "solana_rpc"
     timestamp: float = field(default_factory=lambda: datetime.now().timestamp())
-    raw_tx: Any = None
+    signature: Optional[str] = None
+    slot: Optional[int] = None
+    block_time: Optional[float] = None
+    decimals: Optional[int] = None      # Token-Decimals aus der Tx-Meta (TokenRegistry)
+
+
+def token_decimals(meta: Optional[dict], mint: str) -> Optional[int]:
+    """Decimals eines Mints aus pre/postTokenBalances einer Tx-Meta"""
+    if not meta:
+        return None
+    for balances in (meta.get("postTokenBalances"), meta.get("preTokenBalances")):
+        for balance in balances or ():
+            if balance.get("mint") == mint:
+                decimals = (balance.get("uiTokenAmount") or {}).get("decimals")
+                return int(decimals) if decimals is not None else None
+    return None
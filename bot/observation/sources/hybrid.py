@@ -184,8 +184,7 @@ class HybridTradeSource:
                 token=token,
                 side="BUY",
                 amount=amount,
-                source="hybrid_fake",
-                raw_tx={"fake": True}
+                source="hybrid_fake"
             )
             
             # Track BUY
@@ -278,8 +277,7 @@ class HybridTradeSource:
                 token=token,
                 side="SELL",
                 amount=sell_info["amount"],
-                source="hybrid_fake",
-                raw_tx={"fake": True}
+                source="hybrid_fake"
             )
             
             # Emit Trade
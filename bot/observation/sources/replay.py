@@ -0,0 +1,98 @@
+"""
+Replay Trade Source - Spielt eine Recorder-Aufzeichnung als TradeSource ab
+
+Drop-in fuer SolanaPollingSource & Co: gleiche callback/connect()/stop()
+Schnittstelle, nur kommen die TradeEvents aus data/recordings/*.jsonl.gz
+(Format: siehe trading/replay.py).
+
+  speed=0     so schnell wie moeglich (Default)
+  speed=1.0   Echtzeit – Abstaende wie in der Aufzeichnung
+  speed=10.0  10x schneller
+
+Mit price_bus werden die aufgezeichneten Oracle-Preise ebenfalls wieder
+publiziert. Fuer deterministische Backtests (virtuelle Uhr, fester Seed)
+siehe ReplayBacktest in trading/replay.py.
+"""
+import asyncio
+import logging
+from typing import Iterable, Iterator, List, Optional, Union
+
+from observation.models import TradeEvent
+from observation.sources.base import TradeSource
+from trading.price_bus import PriceTick
+from trading.replay import load_events, trade_from_event
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayTradeSource(TradeSource):
+
+    def __init__(
+        self,
+        paths: Union[str, Iterable[str]],
+        callback=None,
+        speed: float = 0.0,
+        wallets: Optional[List[str]] = None,
+        price_bus=None,
+    ):
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.on_trade = callback
+        self.speed = speed
+        self.wallets = set(wallets) if wallets else None
+        self.price_bus = price_bus
+        self.running = False
+        self.events = load_events(self.paths)
+        self.emitted = 0
+
+        trades = sum(1 for e in self.events if e["type"] == "trade")
+        logger.info(f"[Replay] Loaded {trades} trades, {len(self.events) - trades} prices "
+                    f"from {len(self.paths)} file(s)")
+
+    def _wanted(self, event: dict) -> bool:
+        return self.wallets is None or event.get("wallet") in self.wallets
+
+    async def connect(self):
+        """Spielt alle Events ab und kehrt danach zurueck"""
+        self.running = True
+        previous_t = None
+
+        for event in self.events:
+            if not self.running:
+                break
+
+            if self.speed > 0 and previous_t is not None:
+                gap = (event["t"] - previous_t) / self.speed
+                if gap > 0:
+                    await asyncio.sleep(gap)
+            previous_t = event["t"]
+
+            if event["type"] == "price":
+                if self.price_bus is not None and float(event.get("price_eur") or 0) > 0:
+                    await self.price_bus.publish(PriceTick(
+                        event["token"], float(event["price_eur"]), source=event.get("source") or "replay"
+                    ))
+                continue
+
+            if not self._wanted(event):
+                continue
+            await self.emit_trade(trade_from_event(event))
+
+        self.running = False
+        logger.info(f"[Replay] Finished - {self.emitted} trades emitted")
+
+    async def emit_trade(self, trade_event: TradeEvent):
+        self.emitted += 1
+        if self.on_trade:
+            if asyncio.iscoroutinefunction(self.on_trade):
+                await self.on_trade(trade_event)
+            else:
+                self.on_trade(trade_event)
+
+    def stop(self):
+        self.running = False
+
+    def listen(self) -> Iterator[TradeEvent]:
+        """Pull-Modell (TradeObserver): liefert die Trades ohne Pausen"""
+        for event in self.events:
+            if event["type"] == "trade" and self._wanted(event):
+                yield trade_from_event(event)
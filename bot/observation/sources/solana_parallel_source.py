@@ -22,8 +22,9 @@ from typing import Dict, List, Optional, Set
 
 import aiohttp
 
+from config import fastpath
 from config.network import HELIUS_API_KEYS, HELIUS_HTTP_ENDPOINTS, PUBLIC_FALLBACK_ENDPOINTS
-from observation.models import TradeEvent
+from observation.models import TradeEvent, token_decimals
 from .base import TradeSource
 
 logger = logging.getLogger(__name__)
@@ -272,7 +273,7 @@ class SolanaParallelSource(TradeSource):
         if self.connection_monitor:
             await self.connection_monitor.start()
 
-        async with aiohttp.ClientSession() as session:
+        async with fastpath.client_session() as session:
             self._session = session
             try:
                 # Einen Task pro Key + optionaler Fallback-Task
@@ -376,7 +377,7 @@ class SolanaParallelSource(TradeSource):
                 slot.url, json=payload,
                 timeout=aiohttp.ClientTimeout(total=5)
             ) as response:
-                data    = await response.json(content_type=None)
+                data    = await fastpath.read_json(response, content_type=None)
                 headers = response.headers
 
             slot.record_success(cost=1, headers=headers)
@@ -409,7 +410,7 @@ class SolanaParallelSource(TradeSource):
                 url, json=payload,
                 timeout=aiohttp.ClientTimeout(total=6)
             ) as response:
-                data = await response.json(content_type=None)
+                data = await fastpath.read_json(response, content_type=None)
 
             self._public_failures[url] = 0
             if not isinstance(data, dict) or "error" in data:
@@ -456,7 +457,7 @@ class SolanaParallelSource(TradeSource):
                 url, json=payload,
                 timeout=aiohttp.ClientTimeout(total=5)
             ) as response:
-                data = await response.json(content_type=None)
+                data = await fastpath.read_json(response, content_type=None)
 
             if slot:
                 slot.record_success(cost=1)
@@ -534,7 +535,8 @@ class SolanaParallelSource(TradeSource):
                     wallet=wallet, token=asset_mint,
                     side="BUY" if asset_delta > 0 else "SELL",
                     amount=abs(asset_delta), source="helius_parallel",
-                    raw_tx={"signature": signature, "meta": meta}
+                    signature=signature, slot=tx.get("slot"), block_time=tx.get("blockTime"),
+                    decimals=token_decimals(meta, asset_mint)
                 )
             elif asset_deltas:
                 token, delta = max(asset_deltas.items(), key=lambda x: abs(x[1]))
@@ -542,7 +544,8 @@ class SolanaParallelSource(TradeSource):
                     wallet=wallet, token=token,
                     side="BUY" if delta > 0 else "SELL",
                     amount=abs(delta), source="helius_parallel",
-                    raw_tx={"signature": signature, "meta": meta}
+                    signature=signature, slot=tx.get("slot"), block_time=tx.get("blockTime"),
+                    decimals=token_decimals(meta, token)
                 )
         except Exception as e:
             logger.error(f"[Parallel] extract_trade Fehler: {e}", exc_info=True)
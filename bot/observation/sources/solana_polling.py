@@ -10,7 +10,8 @@ from typing import Optional, Dict, Set
 from datetime import datetime
 import aiohttp
 
-from observation.models import TradeEvent
+from config import fastpath
+from observation.models import TradeEvent, token_decimals
 from .base import TradeSource
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,9 @@ CURRENCY_MINTS = {
     "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB",  # USDT
 }
 
+# Signaturen pro Poll (getSignaturesForAddress limit)
+POLL_LIMIT = 5
+
 
 class SolanaPollingSource(TradeSource):
     """
@@ -54,6 +58,14 @@ class SolanaPollingSource(TradeSource):
         self.running = False
         self.ignore_initial_txs = ignore_initial_txs
         self.initial_load_done = False
+        self.session: Optional[aiohttp.ClientSession] = None
+        
+        # Signatur-Cursor pro Wallet (neueste gesehene Signatur). Liegt der alte
+        # Cursor nicht in einer vollen Poll-Seite, fehlen dazwischen Transaktionen
+        # (Ausfall, Burst) -> signature_gaps merkt sich den Cursor vor der Luecke
+        # fuer den Missed-Sell-Abgleich (trading/reconciler.py).
+        self.signature_cursor: Dict[str, str] = {}
+        self.signature_gaps: Dict[str, str] = {}
         
         # Dynamisches Polling
         self.watch_wallets: Set[str] = set()
@@ -83,7 +95,7 @@ class SolanaPollingSource(TradeSource):
         if self.connection_monitor:
             await self.connection_monitor.start()
         
-        async with aiohttp.ClientSession() as session:
+        async with fastpath.client_session() as session:
             self.session = session
             
             try:
@@ -101,6 +113,7 @@ class SolanaPollingSource(TradeSource):
                 self.running = False
                 raise
             finally:
+                self.session = None
                 #  Stoppe Connection Monitor
                 if self.connection_monitor:
                     self.connection_monitor.stop()
@@ -157,7 +170,7 @@ class SolanaPollingSource(TradeSource):
                 "method": "getSignaturesForAddress",
                 "params": [
                     wallet,
-                    {"limit": 5}
+                    {"limit": POLL_LIMIT}
                 ]
             }
             
@@ -166,7 +179,7 @@ class SolanaPollingSource(TradeSource):
                 json=payload,
                 timeout=aiohttp.ClientTimeout(total=5)
             ) as response:
-                data = await response.json()
+                data = await fastpath.read_json(response)
                 
                 #  SUCCESS  Melde an Monitor
                 if self.connection_monitor:
@@ -177,6 +190,7 @@ class SolanaPollingSource(TradeSource):
                     return
                 
                 signatures = data.get("result", [])
+                self._advance_cursor(wallet, signatures)
                 
                 new_sigs = []
                 for sig_info in signatures:
@@ -206,40 +220,77 @@ class SolanaPollingSource(TradeSource):
             logger.error(f"[Polling] Unexpected error polling wallet {wallet[:8]}...: {e}")
 
 
+    def _advance_cursor(self, wallet: str, signatures: list):
+        """Setzt den Cursor auf die neueste Signatur, merkt Luecken (voller Poll ohne alten Cursor)"""
+        if not signatures or not signatures[0].get("signature"):
+            return
+        previous = self.signature_cursor.get(wallet)
+        if previous and len(signatures) >= POLL_LIMIT and \
+                all(s.get("signature") != previous for s in signatures):
+            self.signature_gaps.setdefault(wallet, previous)
+        self.signature_cursor[wallet] = signatures[0]["signature"]
+
+
+    async def fetch_signatures(self, wallet: str, until: Optional[str] = None, limit: int = 1000,
+                               session: Optional[aiohttp.ClientSession] = None) -> list:
+        """getSignaturesForAddress (neueste zuerst), optional nur Signaturen NACH until"""
+        options = {"limit": limit}
+        if until:
+            options["until"] = until
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getSignaturesForAddress",
+            "params": [wallet, options]
+        }
+        async with (session or self.session).post(
+            self.rpc_http_url,
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=5)
+        ) as response:
+            data = await fastpath.read_json(response)
+        if "error" in data:
+            raise RuntimeError(f"RPC Error: {data['error']}")
+        return data.get("result") or []
+
+
+    async def fetch_transaction(self, signature: str,
+                                session: Optional[aiohttp.ClientSession] = None) -> Optional[dict]:
+        """getTransaction (jsonParsed) – None wenn nicht verfuegbar"""
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getTransaction",
+            "params": [
+                signature,
+                {
+                    "encoding": "jsonParsed",
+                    "maxSupportedTransactionVersion": 0
+                }
+            ]
+        }
+        async with (session or self.session).post(
+            self.rpc_http_url,
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=5)
+        ) as response:
+            data = await fastpath.read_json(response)
+        if "error" in data:
+            logger.debug(f"[Polling] Could not fetch tx {signature[:8]}...")
+            return None
+        return data.get("result")
+
+
     async def fetch_and_process_transaction(self, signature: str, wallet: str):
         """Holt Transaction Details und verarbeitet sie"""
         try:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getTransaction",
-                "params": [
-                    signature,
-                    {
-                        "encoding": "jsonParsed",
-                        "maxSupportedTransactionVersion": 0
-                    }
-                ]
-            }
+            tx = await self.fetch_transaction(signature)
+            if not tx:
+                return
             
-            async with self.session.post(
-                self.rpc_http_url,
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=5)
-            ) as response:
-                data = await response.json()
-                
-                if "error" in data:
-                    logger.debug(f"[Polling] Could not fetch tx {signature[:8]}...")
-                    return
-                
-                tx = data.get("result")
-                if not tx:
-                    return
-                
-                trade_event = self.extract_trade(tx, wallet, signature)
-                if trade_event:
-                    await self.emit_trade(trade_event)
+            trade_event = self.extract_trade(tx, wallet, signature)
+            if trade_event:
+                await self.emit_trade(trade_event)
                     
         except Exception as e:
             logger.error(f"[Polling] Error fetching transaction {signature[:8]}...: {e}")
@@ -307,7 +358,8 @@ class SolanaPollingSource(TradeSource):
                     side=side,
                     amount=amount,
                     source="solana_polling",
-                    raw_tx={"signature": signature, "meta": meta}
+                    signature=signature, slot=tx.get("slot"), block_time=tx.get("blockTime"),
+                    decimals=token_decimals(meta, asset_mint)
                 )
             
             elif asset_deltas:
@@ -327,7 +379,8 @@ class SolanaPollingSource(TradeSource):
                     side=side,
                     amount=amount,
                     source="solana_polling",
-                    raw_tx={"signature": signature, "meta": meta}
+                    signature=signature, slot=tx.get("slot"), block_time=tx.get("blockTime"),
+                    decimals=token_decimals(meta, token)
                 )
             
         except Exception as e:
@@ -21,8 +21,9 @@ from typing import Dict, Optional, Set
 
 import aiohttp
 
+from config import fastpath
 from config.network import HELIUS_API_KEYS, HELIUS_HTTP_ENDPOINTS, PUBLIC_FALLBACK_ENDPOINTS
-from observation.models import TradeEvent
+from observation.models import TradeEvent, token_decimals
 from .base import TradeSource
 
 logger = logging.getLogger(__name__)
@@ -198,7 +199,7 @@ class SolanaWebSocketSource(TradeSource):
         if self.connection_monitor:
             await self.connection_monitor.start()
 
-        async with aiohttp.ClientSession() as session:
+        async with fastpath.client_session() as session:
             self._session = session
             try:
                 while self.running:
@@ -369,7 +370,7 @@ class SolanaWebSocketSource(TradeSource):
                 url, json=payload,
                 timeout=aiohttp.ClientTimeout(total=5)
             ) as response:
-                data    = await response.json(content_type=None)
+                data    = await fastpath.read_json(response, content_type=None)
                 headers = response.headers
 
             self._record_success(url, is_helius, headers=headers)
@@ -421,7 +422,7 @@ class SolanaWebSocketSource(TradeSource):
                 url, json=payload,
                 timeout=aiohttp.ClientTimeout(total=5)
             ) as response:
-                data = await response.json(content_type=None)
+                data = await fastpath.read_json(response, content_type=None)
 
             if is_helius:
                 slot = next((s for s in self._key_slots if s.url == url), None)
@@ -489,7 +490,8 @@ class SolanaWebSocketSource(TradeSource):
                     wallet=wallet, token=asset_mint,
                     side="BUY" if asset_delta > 0 else "SELL",
                     amount=abs(asset_delta), source="helius_multikey",
-                    raw_tx={"signature": signature, "meta": meta}
+                    signature=signature, slot=tx.get("slot"), block_time=tx.get("blockTime"),
+                    decimals=token_decimals(meta, asset_mint)
                 )
             elif asset_deltas:
                 token, delta = max(asset_deltas.items(), key=lambda x: abs(x[1]))
@@ -497,7 +499,8 @@ class SolanaWebSocketSource(TradeSource):
                     wallet=wallet, token=token,
                     side="BUY" if delta > 0 else "SELL",
                     amount=abs(delta), source="helius_multikey",
-                    raw_tx={"signature": signature, "meta": meta}
+                    signature=signature, slot=tx.get("slot"), block_time=tx.get("blockTime"),
+                    decimals=token_decimals(meta, token)
                 )
         except Exception as e:
             logger.error(f"[MultiKey] extract_trade Fehler: {e}", exc_info=True)
@@ -12,6 +12,8 @@ from collections import defaultdict
 import logging
 
 from observation.models import TradeEvent
+from trading.clock import get_clock
+from trading.simulation import SAME_BLOCK_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +31,8 @@ class TradeSignal:
     last_trade_time: datetime
     time_window_seconds: float
     confidence: float
+    same_block_amount: float = 0.0   # Volumen im Block des letzten Trades (fuellt vor uns)
+    block_time: Optional[float] = None   # Block-Zeit dieses Blocks (Unix-Sekunden, falls bekannt)
     
     def __str__(self):
         return (
@@ -49,11 +53,13 @@ class RedundancyEngine:
         min_wallets: int = 2,
         min_confidence: float = 0.5,
         wallet_tracker=None,  # Optional: WalletTracker Instanz für historische Confidence
+        clock=None,           # Default: Prozess-Uhr (VirtualClock im Replay)
     ):
         self.time_window = timedelta(seconds=time_window_seconds)
         self.min_wallets = min_wallets
         self.min_confidence = min_confidence
         self.wallet_tracker = wallet_tracker  # Kann None sein  kein DB-Lookup
+        self.clock = clock or get_clock()
         self.recent_trades: Dict[tuple, List[TradeEvent]] = defaultdict(list)
         self.on_signal = None
         
@@ -85,7 +91,7 @@ class RedundancyEngine:
     
     def _cleanup_old_trades(self):
         """Entfernt alte Trades"""
-        now = datetime.now()
+        now = self.clock.now()
         cutoff = now - self.time_window
         
         for key in list(self.recent_trades.keys()):
@@ -139,7 +145,9 @@ class RedundancyEngine:
             first_trade_time=first_time,
             last_trade_time=last_time,
             time_window_seconds=window_seconds,
-            confidence=confidence
+            confidence=confidence,
+            same_block_amount=self._same_block_amount(trades),
+            block_time=max(trades, key=lambda t: t.timestamp).block_time,
         )
     
     def _calculate_confidence(
@@ -274,9 +282,20 @@ class RedundancyEngine:
         
         return min(total, 1.0)
     
+    def _same_block_amount(self, trades: List[TradeEvent]) -> float:
+        """
+        Volumen der Trades im selben Block wie der letzte Trade – diese Kaeufe
+        der kopierten Wallets landen vor unserem Fill. Block = gleicher Slot,
+        ohne Slot: innerhalb SAME_BLOCK_SECONDS vor dem letzten Trade.
+        """
+        last = max(trades, key=lambda t: t.timestamp)
+        if last.slot is not None:
+            return sum(t.amount for t in trades if t.slot == last.slot)
+        return sum(t.amount for t in trades if last.timestamp - t.timestamp <= SAME_BLOCK_SECONDS)
+
     def _get_trade_time(self, trade: TradeEvent) -> datetime:
-        """Trade Timestamp"""
-        return datetime.now()
+        """Trade Timestamp (Erkennungszeit des Events – im Replay die aufgezeichnete)"""
+        return datetime.fromtimestamp(trade.timestamp)
     
     def get_recent_patterns(self) -> List[TradeSignal]:
         """Gibt aktive Patterns zurück"""
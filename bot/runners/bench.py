@@ -0,0 +1,723 @@
+"""
+bench.py - Benchmarks der Hot Paths auf festen, anonymisierten Datensaetzen
+
+Misst den Durchsatz von:
+  extract_trade        SolanaPollingSource.extract_trade auf getTransaction-Antworten
+  redundancy           RedundancyEngine.process_trade (Trade-Strom einer Session)
+  record_sell          WalletTracker.record_sell inkl. Stats-Neuberechnung
+  oracle_cache         PriceOracle Cache-Treffer (normal + skip_cache Mindest-Cache)
+  oracle_lookups       get_cached_liquidity_eur + get_cached_reserves
+  replay               kompletter ReplayBacktest der Fixture-Session (Events/s)
+
+Speicher (--memory): Bytes pro Objekt (tracemalloc) fuer TradeEvent, Trade,
+Position, WalletTrade und WalletPosition – "vorher" als Objekt mit Instanz-Dict
+(TradeEvent zusaetzlich mit der rohen Tx-Meta in raw_tx, wie bis zur
+Umstellung auf slots), "nachher" die aktuellen slots-Dataclasses.
+
+Fast-Path (--fastpath): Standard (asyncio + stdlib json) gegen uvloop + orjson
+(config/fastpath.py) auf den aufgezeichneten getTransaction-Antworten –
+Dekodieren der RPC-Bodies, Dekodieren + extract_trade, Request-Encoding und
+Request/Response ueber localhost-TCP (Event Loop). Fehlt eine Bibliothek, zeigt die
+Zeile "nicht installiert".
+
+Fixtures (eingecheckt, benchmarks/fixtures/):
+  session.jsonl.gz       Session im Replay-Format (trading/replay.py)
+  transactions.json.gz   getTransaction-Antworten zu den Trades der Session
+Adressen und Signaturen sind Pseudonyme (Hash), Zeiten auf 1.7e9 verschoben.
+Neu erzeugen: --make-fixtures [aufzeichnung.jsonl.gz] (ohne Datei: synthetisch).
+
+Messung: ein Aufwaermlauf, danach Median aus --repeat Laeufen (Default 5).
+Score = Ops/s geteilt durch einen reinen Python-Kalibrierungslauf – das
+gleicht Takt-Schwankungen innerhalb einer Maschine aus, macht Scores aber
+NICHT zwischen Maschinen vergleichbar (Cache-Pfade skalieren anders als die
+Kalibrierung).
+
+Regressionen: --check vergleicht mit einer Baseline und beendet mit Exit-Code 1,
+wenn ein Score mehr als die Schwelle unter der Baseline liegt. Die Schwelle
+gilt pro Benchmark (THRESHOLDS; die Sub-Mikrosekunden Cache-Pfade streuen
+staerker, record_sell haengt an Platten-I/O), --threshold setzt den Default. Ein Gate gibt es nur gegen eine
+Baseline von DERSELBEN Maschine – in CI im selben Job aufnehmen:
+  git checkout <basis> && python main.py bench --save-baseline --baseline /tmp/bench.json
+  git checkout <head>  && python main.py bench --check --baseline /tmp/bench.json
+benchmarks/baseline.json (eingecheckt) ist nur ein Richtwert; stammt eine
+Baseline von einer anderen Maschine, wird verglichen, aber nicht abgebrochen.
+
+Aufruf:
+  python main.py bench                        # messen + mit Baseline vergleichen
+  python main.py bench --check --baseline F   # Exit 1 bei Regression gegen F
+  python main.py bench --save-baseline        # aktuelle Scores als Baseline (--baseline F: nach F)
+  python main.py bench --only replay,redundancy --repeat 5
+  python main.py bench --memory               # Speicher pro Event/Objekt
+  python main.py bench --fastpath             # Standard vs. uvloop + orjson
+  python main.py bench --make-fixtures data/recordings/<datei>.jsonl.gz
+"""
+
+import asyncio
+import gzip
+import io
+import hashlib
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent.parent / "benchmarks"
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+SESSION_FIXTURE = FIXTURES_DIR / "session.jsonl.gz"
+TX_FIXTURE = FIXTURES_DIR / "transactions.json.gz"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+DEFAULT_THRESHOLD = 0.25
+# Sub-Mikrosekunden Pfade: wenige ns Jitter pro Aufruf sind schon zweistellige Prozent.
+# record_sell: SQLite-Commits – Platten-I/O, folgt der Kalibrierung nicht
+THRESHOLDS = {
+    "oracle_cache":   0.40,
+    "oracle_lookups": 0.40,
+    "record_sell":    0.45,
+}
+SOL_MINT = "So11111111111111111111111111111111111111112"
+FIXTURE_T0 = 1_700_000_000.0
+
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Fixtures
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _pseudonym(value: str, length: int = 44) -> str:
+    """Stabiles Base58-Pseudonym fuer Adressen / Signaturen"""
+    digest = int.from_bytes(hashlib.sha256(value.encode()).digest() * 2, "big")
+    chars = []
+    for _ in range(length):
+        digest, rem = divmod(digest, 58)
+        chars.append(B58_ALPHABET[rem])
+    return "".join(chars)
+
+
+def _anonymize(events: List[dict]) -> List[dict]:
+    t_shift = FIXTURE_T0 - events[0]["t"] if events else 0.0
+    out = []
+    for event in events:
+        e = dict(event)
+        e["t"] = round(e["t"] + t_shift, 3)
+        for key in ("wallet", "token"):
+            if key in e and e[key] != SOL_MINT:
+                e[key] = _pseudonym(e[key])
+        if e.get("signature"):
+            e["signature"] = _pseudonym(e["signature"], 88)
+        if e.get("block_time"):
+            e["block_time"] = int(e["block_time"] + t_shift)
+        out.append(e)
+    return out
+
+
+def _synthetic_session(seed: int = 7, wallets: int = 40, tokens: int = 30,
+                       hours: float = 2.0) -> List[dict]:
+    """Meme-Coin Session: Wallet-Cluster kaufen gemeinsam, Preise als Random Walk"""
+    rng = random.Random(seed)
+    wallet_ids = [_pseudonym(f"wallet{i}") for i in range(wallets)]
+    token_ids = [_pseudonym(f"token{i}") for i in range(tokens)]
+    end = FIXTURE_T0 + hours * 3600
+    events: List[dict] = []
+    slot = 250_000_000
+
+    for token in token_ids:
+        start = FIXTURE_T0 + rng.uniform(0, hours * 3600 * 0.8)
+        price = rng.uniform(1e-6, 1e-4)
+        t = start
+        while t < min(end, start + rng.uniform(900, 3600)):
+            price *= 1 + rng.gauss(0.002, 0.04)
+            events.append({"type": "price", "t": round(t, 3), "token": token,
+                           "price_eur": price, "source": "oracle",
+                           "liquidity_eur": round(rng.uniform(5_000, 200_000), 2)})
+            t += rng.uniform(1, 10)
+
+        # 2-6 Wallets kaufen kurz nach Start, verkaufen spaeter
+        buyers = rng.sample(wallet_ids, rng.randint(2, 6))
+        for wallet in buyers:
+            buy_t = start + rng.uniform(0, 40)
+            sell_t = buy_t + rng.uniform(60, 1800)
+            amount = rng.uniform(1e4, 5e6)
+            for side, at in (("BUY", buy_t), ("SELL", sell_t)):
+                slot += rng.randint(1, 50)
+                events.append({"type": "trade", "t": round(at, 3), "wallet": wallet, "token": token,
+                               "side": side, "amount": round(amount, 2), "source": "solana_polling",
+                               "signature": _pseudonym(f"{wallet}{token}{side}", 88),
+                               "slot": slot, "block_time": int(at - rng.uniform(0.5, 6))})
+
+    # Rauschen: Einzel-Trades ohne Cluster
+    for i in range(600):
+        at = FIXTURE_T0 + rng.uniform(0, hours * 3600)
+        slot += 1
+        events.append({"type": "trade", "t": round(at, 3), "wallet": rng.choice(wallet_ids),
+                       "token": rng.choice(token_ids), "side": rng.choice(("BUY", "SELL")),
+                       "amount": round(rng.uniform(1e3, 1e6), 2), "source": "solana_polling",
+                       "signature": _pseudonym(f"noise{i}", 88), "slot": slot, "block_time": int(at - 2)})
+
+    events.sort(key=lambda e: e["t"])
+    return events
+
+
+def _transactions(events: List[dict]) -> List[dict]:
+    """getTransaction-Antworten (jsonParsed) passend zu den Trade-Events"""
+    rng = random.Random(11)
+    txs = []
+    for event in events:
+        if event["type"] != "trade":
+            continue
+        sign = 1 if event["side"] == "BUY" else -1
+        token_pre = 0.0 if sign > 0 else event["amount"]
+        sol = rng.uniform(0.1, 5.0)
+
+        def balance(mint, amount, index):
+            return {"accountIndex": index, "mint": mint, "owner": event["wallet"],
+                    "uiTokenAmount": {"uiAmount": amount, "decimals": 6 if mint != SOL_MINT else 9}}
+
+        txs.append({
+            "wallet": event["wallet"],
+            "signature": event.get("signature") or "",
+            "tx": {
+                "slot": event.get("slot"),
+                "blockTime": event.get("block_time"),
+                "meta": {
+                    "err": None,
+                    "fee": 5000,
+                    "preTokenBalances": [balance(SOL_MINT, 10.0, 1), balance(event["token"], token_pre, 2)],
+                    "postTokenBalances": [balance(SOL_MINT, 10.0 - sign * sol, 1),
+                                          balance(event["token"], token_pre + sign * event["amount"], 2)],
+                },
+            },
+        })
+    return txs
+
+
+def make_fixtures(source: Optional[str] = None):
+    from trading.replay import load_events
+
+    events = _anonymize(load_events([source])) if source else _synthetic_session()
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    with gzip.open(SESSION_FIXTURE, "wt", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event, separators=(",", ":")) + "\n")
+    with gzip.open(TX_FIXTURE, "wt", encoding="utf-8") as f:
+        json.dump(_transactions(events), f, separators=(",", ":"))
+    trades = sum(1 for e in events if e["type"] == "trade")
+    print(f"\n  Fixtures geschrieben: {trades} Trades, {len(events) - trades} Preise -> {FIXTURES_DIR}\n")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Benchmarks – jede Funktion gibt (Operationen, Sekunden) zurueck
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _timed(fn: Callable[[], int]) -> tuple:
+    started = time.perf_counter()
+    ops = fn()
+    return ops, time.perf_counter() - started
+
+
+def bench_calibration() -> tuple:
+    """Reiner Python-Lauf (Dicts, Floats, Strings) als Massstab fuer die Maschine"""
+    def work():
+        d = {}
+        for i in range(200_000):
+            d[str(i % 1000)] = d.get(str(i % 1000), 0.0) + i * 1.5
+        return 200_000
+    return _timed(work)
+
+
+def bench_extract_trade(fixtures: dict) -> tuple:
+    from observation.sources.solana_polling import SolanaPollingSource
+
+    with redirect_stdout(io.StringIO()):
+        source = SolanaPollingSource(rpc_http_url="http://localhost", wallets=[])
+    txs = fixtures["transactions"]
+
+    def work():
+        for item in txs:
+            source.extract_trade(item["tx"], item["wallet"], item["signature"])
+        return len(txs)
+    return _timed(work)
+
+
+def bench_redundancy(fixtures: dict) -> tuple:
+    from pattern.redundancy import RedundancyEngine
+    from trading.clock import VirtualClock
+    from trading.replay import trade_from_event
+
+    trades = [trade_from_event(e) for e in fixtures["session"] if e["type"] == "trade"]
+    clock = VirtualClock(trades[0].timestamp if trades else 0.0)
+    engine = RedundancyEngine(time_window_seconds=30, min_wallets=2, min_confidence=0.5, clock=clock)
+
+    def work():
+        for trade in trades:
+            clock.jump_to(trade.timestamp)
+            engine.process_trade(trade)
+        return len(trades)
+    return _timed(work)
+
+
+def bench_record_sell(fixtures: dict) -> tuple:
+    from trading.wallet_tracker import WalletTracker
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = WalletTracker(db_path=str(Path(tmp) / "bench.db"))
+        wallets = [f"W{i:02d}" for i in range(10)]
+        for i in range(200):                       # Vorbestand: 20 Trades pro Wallet
+            wallet = wallets[i % len(wallets)]
+            tracker.record_buy("bench", wallet, f"T{i}", 100.0, 1.0)
+            tracker.record_sell("bench", wallet, f"T{i}", 100.0, 1.0 + (i % 7 - 3) / 10, 1.0)
+
+        def work():
+            for i in range(200):
+                tracker.record_sell("bench", wallets[i % len(wallets)], f"S{i}", 100.0,
+                                    1.0 + (i % 5 - 2) / 10, 1.0, max_price_pct=12.0, min_price_pct=-8.0,
+                                    reason="WALLET_SOLD")
+            return 200
+        return _timed(work)
+
+
+def bench_oracle_cache(fixtures: dict) -> tuple:
+    from trading.price_oracle import PriceOracle
+
+    oracle = PriceOracle()
+    tokens = list(dict.fromkeys(e["token"] for e in fixtures["session"] if e["type"] == "price"))
+    now = time.monotonic()
+    for i, token in enumerate(tokens):
+        oracle.cache[token] = 1e-5 * (i + 1)
+        oracle.cache_time[token] = now + 3600        # Mindest-Cache greift waehrend des Laufs
+    oracle.min_cache_seconds = 1.0
+
+    async def work():
+        n = 0
+        for _ in range(200):
+            for token in tokens:
+                await oracle.get_price_eur(token, caller="bench")
+                await oracle.get_price_eur(token, skip_cache=True, caller="bench")
+                n += 2
+        return n
+
+    started = time.perf_counter()
+    ops = asyncio.run(work())
+    return ops, time.perf_counter() - started
+
+
+def bench_oracle_lookups(fixtures: dict) -> tuple:
+    from trading.price_oracle import PriceOracle
+
+    oracle = PriceOracle()
+    tokens = []
+    for e in fixtures["session"]:
+        if e["type"] == "price" and e.get("liquidity_eur"):
+            oracle.liquidity_cache[e["token"]] = e["liquidity_eur"]
+            tokens.append(e["token"])
+    tokens = list(dict.fromkeys(tokens)) + [_pseudonym("unknown")]
+
+    def work():
+        for _ in range(500):
+            for token in tokens:
+                oracle.get_cached_liquidity_eur(token)
+                oracle.get_cached_reserves(token)
+        return 500 * len(tokens) * 2
+    return _timed(work)
+
+
+def bench_replay(fixtures: dict) -> tuple:
+    from trading.replay import ReplayBacktest, ReplayConfig
+
+    events = fixtures["session"]
+
+    def work():
+        asyncio.run(ReplayBacktest(events, ReplayConfig(seed=1)).run(quiet=True))
+        return len(events)
+    return _timed(work)
+
+
+BENCHMARKS: Dict[str, Callable[[dict], tuple]] = {
+    "extract_trade":  bench_extract_trade,
+    "redundancy":     bench_redundancy,
+    "record_sell":    bench_record_sell,
+    "oracle_cache":   bench_oracle_cache,
+    "oracle_lookups": bench_oracle_lookups,
+    "replay":         bench_replay,
+}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Speicher pro Objekt
+# ──────────────────────────────────────────────────────────────────────────────
+
+class _DictObject:
+    """Vergleichsobjekt mit Instanz-Dict (wie eine Dataclass ohne slots)"""
+
+    def __init__(self, **values):
+        for key, value in values.items():
+            setattr(self, key, value)
+
+
+def _bytes_per_object(build: Callable[[int], object], n: int) -> float:
+    """Zusaetzlicher Speicher pro Objekt, wenn n Objekte gleichzeitig leben"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [build(i) for i in range(n)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del objects
+    return (after - before) / n
+
+
+def _field_values(obj) -> dict:
+    from dataclasses import fields
+    return {f.name: getattr(obj, f.name) for f in fields(obj)}
+
+
+def measure_memory(fixtures: dict) -> Dict[str, tuple]:
+    """{Objekt: (Bytes vorher, Bytes nachher)}"""
+    from datetime import datetime
+    from observation.sources.solana_polling import SolanaPollingSource
+    from runners.wallet_analysis import WalletPosition
+    from trading.portfolio import Position, Trade
+    from trading.wallet_tracker import WalletTrade
+
+    with redirect_stdout(io.StringIO()):
+        source = SolanaPollingSource(rpc_http_url="http://localhost", wallets=[])
+    # Jede Tx frisch aus JSON – wie vom RPC, damit die Meta nicht geteilt wird
+    raw = [json.dumps(item) for item in fixtures["transactions"]]
+    n = len(raw)
+
+    legacy_event = type("TradeEvent", (_DictObject,), {})
+
+    def event_before(i):
+        item = json.loads(raw[i])
+        event = source.extract_trade(item["tx"], item["wallet"], item["signature"])
+        values = _field_values(event)
+        for key in ("signature", "slot", "block_time", "decimals"):
+            del values[key]
+        return legacy_event(**values, raw_tx={"signature": item["signature"], "slot": item["tx"]["slot"],
+                                             "block_time": item["tx"]["blockTime"], "meta": item["tx"]["meta"]})
+
+    def event_after(i):
+        item = json.loads(raw[i])
+        return source.extract_trade(item["tx"], item["wallet"], item["signature"])
+
+    now = datetime.now()
+    wallets = ["W" * 44]
+    samples = {
+        "Trade": lambda i: Trade(token="T" * 44, side="SELL", price_eur=1e-5 * (i + 1), amount=1000.0 + i,
+                                 value_eur=12.5 + i, timestamp=now, trigger_wallets=wallets,
+                                 pnl_eur=2.5 + i, pnl_percent=25.0, fees_eur=0.4, slippage_pct=1.2),
+        "Position": lambda i: Position(token="T" * 44, entry_price_eur=1e-5 * (i + 1), amount=1000.0 + i,
+                                       entry_time=now, cost_eur=200.0 + i, trigger_wallets=wallets,
+                                       entry_fees_eur=0.4 + i),
+        "WalletTrade": lambda i: WalletTrade(wallet="W" * 44, token="T" * 44, side="SELL", amount=1000.0 + i,
+                                             price_eur=1e-5 * (i + 1), value_eur=12.5 + i, pnl_eur=2.5 + i,
+                                             pnl_percent=25.0, timestamp=now, session_id="bench"),
+        "WalletPosition": lambda i: WalletPosition(wallet="W" * 44, token="T" * 44, entry_price_eur=1e-5 * (i + 1),
+                                                   amount=1000.0 + i, cost_eur=200.0 + i, entry_time=now),
+    }
+
+    results = {"TradeEvent": (_bytes_per_object(event_before, n), _bytes_per_object(event_after, n))}
+    for name, build in samples.items():
+        legacy = type(name, (_DictObject,), {})      # eigene Klasse: Key-Sharing wie bei der Dataclass
+        before = _bytes_per_object(lambda i, build=build, legacy=legacy: legacy(**_field_values(build(i))), n)
+        results[name] = (before, _bytes_per_object(build, n))
+    return results
+
+
+def print_memory(results: Dict[str, tuple], live: int = 100_000):
+    print()
+    print("=" * 90)
+    print(f" SPEICHER PRO OBJEKT (tracemalloc, Bytes; MB bei {live:,} gleichzeitig lebenden Objekten)")
+    print("=" * 90)
+    print(f"  {'Objekt':<16} {'vorher':>10} {'nachher':>10} {'Ersparnis':>10}  {'MB vorher':>10} {'MB nachher':>11}")
+    print("  " + "-" * 80)
+    for name, (before, after) in results.items():
+        saved = 1 - after / before if before else 0.0
+        print(f"  {name:<16} {before:>10,.0f} {after:>10,.0f} {saved*100:>9.0f}%  "
+              f"{before * live / 1e6:>10,.1f} {after * live / 1e6:>11,.1f}")
+    print("=" * 90)
+    print()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Fast-Path (uvloop + orjson) gegen Standard
+# ──────────────────────────────────────────────────────────────────────────────
+
+def measure_fastpath(fixtures: dict, repeat: int) -> Dict[str, tuple]:
+    """{Messung: (Ops/s Standard, Ops/s Fast-Path)} – Median aus repeat Laeufen"""
+    from config import fastpath
+    from observation.sources.solana_polling import SolanaPollingSource
+
+    with redirect_stdout(io.StringIO()):
+        source = SolanaPollingSource(rpc_http_url="http://localhost", wallets=[])
+    txs = fixtures["transactions"]
+    # RPC-Antworten wie sie ueber die Leitung kommen (Bytes, JSON-RPC Huelle)
+    bodies = [json.dumps({"jsonrpc": "2.0", "result": item["tx"], "id": 1}).encode() for item in txs]
+    payloads = [{"jsonrpc": "2.0", "id": 1, "method": "getTransaction",
+                 "params": [item["signature"], {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0}]}
+                for item in txs]
+
+    def decode():
+        for body in bodies:
+            fastpath.loads(body)
+        return len(bodies)
+
+    def decode_extract():
+        for item, body in zip(txs, bodies):
+            source.extract_trade(fastpath.loads(body)["result"], item["wallet"], item["signature"])
+        return len(bodies)
+
+    def encode():
+        for payload in payloads:
+            fastpath.dumps(payload)
+        return len(payloads)
+
+    def event_loop():
+        # Request/Response ueber localhost-TCP: Socket-I/O + Task-Wechsel wie beim RPC-Polling
+        request = bodies[0][:512] + b"\n"
+
+        async def echo(reader, writer):
+            while line := await reader.readline():
+                writer.write(line)
+                await writer.drain()
+            writer.close()
+
+        async def client(port: int, n: int):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for _ in range(n):
+                writer.write(request)
+                await writer.drain()
+                await reader.readline()
+            writer.close()
+            await writer.wait_closed()
+
+        async def work():
+            server = await asyncio.start_server(echo, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                await asyncio.gather(*(client(port, 200) for _ in range(20)))
+            return 20 * 200
+        return asyncio.run(work())
+
+    cases = {
+        "rpc_decode":     (decode, "orjson"),
+        "decode_extract": (decode_extract, "orjson"),
+        "rpc_encode":     (encode, "orjson"),
+        "event_loop":     (event_loop, "uvloop"),
+    }
+    results = {}
+    try:
+        for name, (fn, lib) in cases.items():
+            rates = []
+            for enabled in (False, True):
+                fastpath.disable()
+                if enabled:
+                    fastpath.enable(loop=lib == "uvloop", fast_json=lib == "orjson")
+                    if not fastpath.status()[lib]:
+                        rates.append(None)
+                        continue
+                rates.append(_median_rate(lambda: _timed(fn), repeat)[1])
+            results[name] = (rates[0], rates[1], lib)
+    finally:
+        fastpath.disable()
+    return results
+
+
+def print_fastpath(results: Dict[str, tuple], repeat: int):
+    print()
+    print("=" * 90)
+    print(f" FAST-PATH: Standard vs. uvloop + orjson (Median aus {repeat} Laeufen, Ops/s)")
+    print("=" * 90)
+    print(f"  {'Messung':<16} {'Standard':>12} {'Fast-Path':>12} {'Faktor':>8}  Bibliothek")
+    print("  " + "-" * 80)
+    for name, (standard, fast, lib) in results.items():
+        if fast is None:
+            print(f"  {name:<16} {standard:>12,.0f} {'-':>12} {'-':>8}  {lib} nicht installiert")
+        else:
+            print(f"  {name:<16} {standard:>12,.0f} {fast:>12,.0f} {fast / standard:>7.2f}x  {lib}")
+    print("=" * 90)
+    print()
+
+
+def load_fixtures() -> dict:
+    from trading.replay import load_events
+
+    with gzip.open(TX_FIXTURE, "rt", encoding="utf-8") as f:
+        transactions = json.load(f)
+    return {"session": load_events([str(SESSION_FIXTURE)]), "transactions": transactions}
+
+
+def _median_rate(fn: Callable[[], tuple], repeat: int) -> tuple:
+    """Ein Aufwaermlauf, dann Median der Ops/s aus repeat Laeufen -> (ops, Median Ops/s, Streuung)"""
+    fn()
+    runs = [fn() for _ in range(repeat)]
+    rates = [ops / seconds if seconds > 0 else float("inf") for ops, seconds in runs]
+    median = statistics.median(rates)
+    spread = (max(rates) - min(rates)) / median if median else 0.0
+    return runs[0][0], median, spread
+
+
+def machine_id() -> str:
+    """Maschine + Interpreter – Scores sind nur innerhalb derselben vergleichbar"""
+    return f"{platform.node()}/{platform.machine()}/{platform.python_implementation()}-{platform.python_version()}"
+
+
+def measure(names: List[str], repeat: int) -> Dict[str, dict]:
+    """
+    Je Benchmark: Aufwaermlauf, dann repeat Paare (Kalibrierung, Benchmark) direkt
+    hintereinander. Score = Median der Verhaeltnisse Ops/s / Kalibrierungs-Ops/s –
+    langsamere Phasen der Maschine (geteilte CPU, Takt) treffen beide Laeufe eines Paars.
+    """
+    fixtures = load_fixtures()
+    bench_calibration()
+
+    results = {}
+    for name in names:
+        BENCHMARKS[name](fixtures)
+        ratios, rates = [], []
+        for _ in range(repeat):
+            calib_ops, calib_s = bench_calibration()
+            ops, seconds = BENCHMARKS[name](fixtures)
+            rate = ops / seconds if seconds > 0 else float("inf")
+            rates.append(rate)
+            ratios.append(rate / (calib_ops / calib_s))
+        score = statistics.median(ratios)
+        spread = (max(ratios) - min(ratios)) / score if score else 0.0
+        results[name] = {"ops": ops, "ops_per_sec": statistics.median(rates), "spread": spread, "score": score}
+    return results
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Entry Point
+# ──────────────────────────────────────────────────────────────────────────────
+
+def run(args: list = None) -> int:
+    args = args or []
+
+    check = False
+    save_baseline = False
+    baseline_path = BASELINE_PATH
+    threshold = DEFAULT_THRESHOLD
+    repeat = 5
+    only: Optional[List[str]] = None
+    memory = False
+    fast = False
+
+    i = 0
+    while i < len(args):
+        if args[i] == "--check":
+            check = True
+            i += 1
+        elif args[i] == "--save-baseline":
+            save_baseline = True
+            i += 1
+        elif args[i] == "--baseline" and i + 1 < len(args):
+            baseline_path = Path(args[i+1])
+            i += 2
+        elif args[i] == "--threshold" and i + 1 < len(args):
+            try: threshold = float(args[i+1])
+            except ValueError: pass
+            i += 2
+        elif args[i] == "--repeat" and i + 1 < len(args):
+            try: repeat = max(1, int(args[i+1]))
+            except ValueError: pass
+            i += 2
+        elif args[i] == "--only" and i + 1 < len(args):
+            only = [n for n in args[i+1].split(",") if n in BENCHMARKS]
+            i += 2
+        elif args[i] == "--fastpath":
+            fast = True
+            i += 1
+        elif args[i] == "--memory":
+            memory = True
+            i += 1
+        elif args[i] == "--make-fixtures":
+            source = args[i+1] if i + 1 < len(args) and not args[i+1].startswith("--") else None
+            make_fixtures(source)
+            return 0
+        else:
+            i += 1
+
+    if not SESSION_FIXTURE.exists() or not TX_FIXTURE.exists():
+        print(f"\n[Fehler] Fixtures fehlen ({FIXTURES_DIR}) – python main.py bench --make-fixtures\n")
+        return 1
+
+    logging.disable(logging.CRITICAL)
+    if memory:
+        try:
+            print_memory(measure_memory(load_fixtures()))
+        finally:
+            logging.disable(logging.NOTSET)
+        return 0
+    if fast:
+        try:
+            print_fastpath(measure_fastpath(load_fixtures(), repeat), repeat)
+        finally:
+            logging.disable(logging.NOTSET)
+        return 0
+
+    try:
+        results = measure(only or list(BENCHMARKS), repeat)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    baseline_data = {}
+    if baseline_path.exists():
+        baseline_data = json.loads(baseline_path.read_text(encoding="utf-8"))
+    baseline = baseline_data.get("scores", {})
+    same_machine = baseline_data.get("machine") == machine_id()
+
+    print()
+    print("=" * 90)
+    print(f" BENCHMARKS (Median aus {repeat} Laeufen nach Aufwaermlauf, Schwelle Default -{threshold*100:.0f}%)")
+    print("=" * 90)
+    print(f"  {'Benchmark':<16} {'Ops':>7} {'Ops/s':>12} {'Streu.':>7} {'Score':>9} {'Baseline':>9} "
+          f"{'Delta':>8} {'Schw.':>6}  Status")
+    print("  " + "-" * 86)
+
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        limit = THRESHOLDS.get(name, threshold)
+        if base:
+            delta = r["score"] / base - 1
+            status = "REGRESSION" if delta < -limit else "ok"
+            if status == "REGRESSION":
+                regressions.append(name)
+            base_str, delta_str = f"{base:9.4g}", f"{delta*100:+7.1f}%"
+        else:
+            status, base_str, delta_str = "neu", f"{'-':>9}", f"{'-':>8}"
+        print(f"  {name:<16} {r['ops']:>7} {r['ops_per_sec']:>12,.0f} {r['spread']*100:>6.0f}% {r['score']:>9.4g} "
+              f"{base_str} {delta_str} {-limit*100:>5.0f}%  {status}")
+    print("=" * 90)
+    if baseline and not same_machine:
+        print(f"  Baseline {baseline_path.name} stammt von einer anderen Maschine "
+              f"({baseline_data.get('machine', 'unbekannt')}) – nur Richtwert, kein Gate.")
+        print("  Fuer --check die Baseline im selben Job aufnehmen (--save-baseline --baseline <datei>).")
+
+    if save_baseline:
+        scores = {**baseline, **{name: float(f"{r['score']:.6g}") for name, r in results.items()}} \
+            if same_machine else {name: float(f"{r['score']:.6g}") for name, r in results.items()}
+        baseline_path.write_text(json.dumps({"machine": machine_id(), "threshold": threshold,
+                                             "scores": scores}, indent=2) + "\n", encoding="utf-8")
+        print(f"  Baseline gespeichert: {baseline_path}")
+
+    gate = regressions and same_machine
+    if regressions:
+        print(f"  Regression: {', '.join(regressions)}" + ("" if same_machine else "  (ignoriert: andere Maschine)"))
+    print()
+    return 1 if check and gate else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv[1:]))
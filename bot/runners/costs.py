@@ -0,0 +1,163 @@
+"""
+costs.py - Monte-Carlo Ausfuehrungskosten auf geschlossenen Positionen
+
+Der PnL einer Paper-Session ist EIN Wurf von Delay, Drift und Tx-Failures.
+Hier laufen alle geschlossenen Positionen einer Performance-DB durch N
+Szenarien des Kostenmodells (trading/cost_model.py) – ohne eine Session neu
+abzuspielen. Ausgabe pro Session und pro Wallet:
+
+  Quote   PnL zu Quote-Preisen (ohne Kosten, wie in der DB)
+  Mittel  erwarteter PnL nach Kosten
+  p5/p95  Bandbreite ueber die Szenarien
+  P(<0)   Anteil der Szenarien mit Verlust
+
+Pool-Liquiditaet kommt aus data/token_registry.db (falls vorhanden), sonst
+gilt DEFAULT_LIQUIDITY_EUR.
+
+Aufruf:
+  python main.py costs                         # observer_performance.db
+  python main.py costs --db analysis           # wallet_performance.db
+  python main.py costs --n 5000 --seed 7       # Szenarien / Seed
+  python main.py costs --sessions 3 --top 15   # letzte 3 Sessions, 15 Zeilen je Tabelle
+"""
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DB_PATHS = {
+    "observer": Path("data/observer_performance.db"),
+    "analysis": Path("data/wallet_performance.db"),
+}
+REGISTRY_PATH = Path("data/token_registry.db")
+
+
+def load_liquidity(tokens: List[str]) -> Dict[str, float]:
+    """Letzte bekannte Pool-Liquiditaet in EUR je Token (ohne die Registry anzulegen)"""
+    if not REGISTRY_PATH.exists():
+        return {}
+    from trading.fx import get_fx_service
+    from trading.token_registry import TokenRegistry
+
+    registry = TokenRegistry(str(REGISTRY_PATH))
+    rate = get_fx_service().rate()
+    liquidity = {}
+    for token in set(tokens):
+        usd = registry.get_liquidity_usd(token)
+        if usd:
+            liquidity[token] = usd * rate
+    return liquidity
+
+
+def print_table(title: str, stats: Dict[str, dict], top_n: int):
+    rows = sorted(stats.items(), key=lambda kv: kv[1]["n"], reverse=True)[:top_n]
+    print()
+    print(f"  {title}")
+    print(f"  {'':<28} {'N':>4}  {'Quote':>9}  {'Mittel':>9}  {'p5':>9}  {'p95':>9}  {'P(<0)':>6}")
+    print("  " + "-" * 84)
+    for key, s in rows:
+        print(f"  {str(key)[:28]:<28} {s['n']:>4}  {s['actual']:>+9.2f}  {s['mean']:>+9.2f}"
+              f"  {s['p5']:>+9.2f}  {s['p95']:>+9.2f}  {s['p_loss']*100:>5.0f}%")
+    if len(stats) > top_n:
+        print(f"  ... {len(stats) - top_n} weitere")
+
+
+def run(args: list = None):
+    args = args or []
+
+    db_path = DB_PATHS["observer"]
+    n_scenarios = 2000
+    seed: Optional[int] = 42
+    session_limit = None
+    top_n = 10
+
+    i = 0
+    while i < len(args):
+        if args[i] == "--db" and i + 1 < len(args):
+            db_path = DB_PATHS.get(args[i+1], Path(args[i+1]))
+            i += 2
+        elif args[i] == "--n" and i + 1 < len(args):
+            try: n_scenarios = max(1, int(args[i+1]))
+            except ValueError: pass
+            i += 2
+        elif args[i] == "--seed" and i + 1 < len(args):
+            try: seed = int(args[i+1])
+            except ValueError: pass
+            i += 2
+        elif args[i] == "--sessions" and i + 1 < len(args):
+            try: session_limit = int(args[i+1])
+            except ValueError: pass
+            i += 2
+        elif args[i] == "--top" and i + 1 < len(args):
+            try: top_n = int(args[i+1])
+            except ValueError: pass
+            i += 2
+        else:
+            i += 1
+
+    if not db_path.exists():
+        print(f"\n[Fehler] Datenbank nicht gefunden: {db_path}\n")
+        return
+
+    from runners.tune_observer import load_positions
+    from trading.cost_model import simulate_pnl, summarize
+
+    conn = sqlite3.connect(str(db_path))
+    selected = None
+    if session_limit:
+        selected = [r[0] for r in conn.execute(
+            "SELECT session_id FROM wallet_trades GROUP BY session_id ORDER BY MIN(timestamp) DESC"
+        ).fetchall()][:session_limit]
+    positions = [p for p in load_positions(conn, session_filter=selected)
+                 if p["entry_price"] and p["cost_eur"]]
+    conn.close()
+
+    if not positions:
+        print("\n  Keine geschlossenen Positionen gefunden.\n")
+        return
+
+    liquidity = load_liquidity([p["token"] for p in positions])
+    quote_pnl = [(p["exit_price"] / p["entry_price"] - 1) * p["cost_eur"] for p in positions]
+
+    started = time.perf_counter()
+    pnl = simulate_pnl(
+        entry_prices=[p["entry_price"] for p in positions],
+        exit_prices=[p["exit_price"] for p in positions],
+        cost_eur=[p["cost_eur"] for p in positions],
+        liquidity_eur=[liquidity.get(p["token"]) for p in positions],
+        n_scenarios=n_scenarios,
+        seed=seed,
+    )
+    total = summarize(pnl, ["GESAMT"] * len(positions), quote_pnl)["GESAMT"]
+    by_session = summarize(pnl, [p["session_id"] for p in positions], quote_pnl)
+    by_wallet = summarize(pnl, [p["wallet"] for p in positions], quote_pnl)
+    elapsed = time.perf_counter() - started
+
+    print()
+    print("=" * 90)
+    print(" AUSFUEHRUNGSKOSTEN - MONTE CARLO")
+    print(f" {len(positions)} Positionen x {n_scenarios} Szenarien | {db_path.name} | "
+          f"Liquiditaet fuer {sum(1 for p in positions if p['token'] in liquidity)} Positionen bekannt "
+          f"| {elapsed:.2f}s")
+    print("=" * 90)
+    print()
+    print(f"  Quote-PnL (ohne Kosten):  {total['actual']:+.2f} EUR")
+    print(f"  Nach Kosten, Mittel:      {total['mean']:+.2f} EUR")
+    print(f"  Nach Kosten, p5 .. p95:   {total['p5']:+.2f} .. {total['p95']:+.2f} EUR")
+    print(f"  Kosten im Mittel:         {total['actual'] - total['mean']:.2f} EUR "
+          f"({(total['actual'] - total['mean']) / len(positions):.2f} EUR / Position)")
+    print(f"  P(Gesamt-PnL < 0):        {total['p_loss']*100:.1f}%")
+
+    print_table(f"PRO SESSION ({len(by_session)})", by_session, top_n)
+    print_table(f"PRO WALLET ({len(by_wallet)})", by_wallet, top_n)
+    print()
+    print("=" * 90)
+    print()
+
+    return {"total": total, "sessions": by_session, "wallets": by_wallet}
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
@@ -17,6 +17,11 @@ COMMANDS = [
                     "Öffnet/schließt virtuelle Positionen basierend auf Wallet-Signalen",
                     "Nutzt historische Confidence Scores aus der DB (falls vorhanden)",
                     "Live P&L Tracking + Stop-Loss / Take-Profit Automatik",
+                    "Portfolio-Modus: mehrere Positionen gleichzeitig mit Max-Exposure",
+                    "Optional Balance-Watch: Exit sobald der Token-Bestand eines Trigger-Wallets sinkt",
+                    "Optional Oracle-Metrics Endpoint: http://127.0.0.1:8091/metrics",
+                    "Zeichnet Trades + Preise auf (data/recordings/) -> replay",
+                    "Session-Journal (crash-sicher): abgebrochene Session beim Start fortsetzen",
                 ],
             },
             {
@@ -26,6 +31,7 @@ COMMANDS = [
                 "details": [
                     "Wie paper_mainnet, aber füllt ruhige Phasen mit simulierten Trades",
                     "Gut zum Testen der Engine ohne auf echte Trades zu warten",
+                    "Session-Journal (crash-sicher): abgebrochene Session beim Start fortsetzen",
                 ],
             },
         ],
@@ -45,6 +51,70 @@ COMMANDS = [
                     "Gibt Heatmap + Ranking der besten Konfiguration aus",
                     "--sessions 3   nur letzte 3 Sessions verwenden",
                     "--top 5        nur Top 5 Kombinationen anzeigen",
+                    "--rules \"trail=20@30,ladder=50:0.5\"   Exit-Regel-Kette bewerten",
+                ],
+            },
+            {
+                "cmd": "replay",
+                "args": "<events.jsonl[.gz]> [--seed N] [--sl P] [--tp P] ...",
+                "desc": "Deterministischer Backtest einer aufgezeichneten Session",
+                "details": [
+                    "Spielt TradeEvents + Preis-Ticks durch Redundancy + Trading Engine",
+                    "Aufzeichnungen: data/recordings/*.jsonl.gz (paper_mainnet, wallet_analysis)",
+                    "Virtuelle Uhr: keine Sleeps, ein Handelstag in Sekunden",
+                    "Fester Seed -> reproduzierbare Fills (Delay, Drift, Tx-Failures)",
+                    "--window / --min-wallets / --min-confidence   Signal-Parameter",
+                    "--tracker   Confidence + SL/TP aus wallet_performance.db (Kopie)",
+                    "--exit-rules \"trail=20@30,decay=-50:0:60\"   Trailing/Ladder/Time-Decay",
+                    "--verbose   Engine-Ausgabe anzeigen   --save   Portfolio speichern",
+                ],
+            },
+            {
+                "cmd": "sweep",
+                "args": "[files...] [--random N] [--sort ev|pnl|dd] [--top N]",
+                "desc": "Parameter-Sweep (Window/MinWallets/Confidence/SL/TP) auf Aufzeichnungen",
+                "details": [
+                    "Jede Kombination als deterministischer Replay ueber alle Sessions",
+                    "Default: Grid ueber data/recordings/*.jsonl.gz, alle CPU-Kerne",
+                    "--random 200   Zufallssuche statt Grid",
+                    "--workers N    Anzahl Prozesse   --seed N   Simulations-Seed",
+                    "Ranking nach EV, PnL oder Max-Drawdown, --save nach data/sweep_*.json",
+                ],
+            },
+            {
+                "cmd": "costs",
+                "args": "[--db observer|analysis] [--n N] [--seed N] [--sessions N]",
+                "desc": "Monte-Carlo Ausfuehrungskosten auf geschlossenen Positionen",
+                "details": [
+                    "N Szenarien Delay / Drift / Price Impact / Tx-Failures je Position (NumPy)",
+                    "PnL-Verteilung nach Kosten: Mittel, p5, p95, P(Verlust)",
+                    "Pro Session und pro Wallet, Vergleich mit Quote-PnL ohne Kosten",
+                    "Liquiditaet aus data/token_registry.db, sonst Default-Pool",
+                ],
+            },
+            {
+                "cmd": "latency",
+                "args": "[--db observer|analysis] [--sessions N] [--offsets 0,1,2,5]",
+                "desc": "PnL-Kosten pro Sekunde Pipeline-Latenz",
+                "details": [
+                    "Gemessene Latenz block_time -> Erkennung -> Entry aus data/recordings/",
+                    "Entry auf gespeicherten Preisverlaeufen um +N Sekunden verschoben",
+                    "Ergebnis: EUR und EV-Prozentpunkte pro Sekunde Latenz",
+                ],
+            },
+            {
+                "cmd": "bench",
+                "args": "[--check] [--save-baseline] [--baseline datei] [--threshold 0.25] [--only a,b] [--memory] [--fastpath]",
+                "desc": "Benchmarks der Hot Paths mit Regressions-Schwelle",
+                "details": [
+                    "extract_trade, RedundancyEngine, record_sell, Oracle-Cache, kompletter Replay",
+                    "Feste anonymisierte Fixtures in benchmarks/fixtures/",
+                    "Median aus --repeat Laeufen nach Aufwaermlauf, Score = Ops/s relativ zur Kalibrierung",
+                    "--check   Exit-Code 1 bei Regression – nur gegen eine Baseline derselben Maschine",
+                    "          CI: --save-baseline --baseline <datei> auf der Basis, dann --check --baseline <datei>",
+                    "--make-fixtures [aufzeichnung]   Fixtures neu erzeugen (anonymisiert)",
+                    "--memory  Bytes pro TradeEvent/Trade/Position vorher (Dict + raw_tx) vs. slots",
+                    "--fastpath  Standard vs. uvloop + orjson auf den aufgezeichneten RPC-Antworten",
                 ],
             },
             {
@@ -76,6 +146,7 @@ COMMANDS = [
                     "      Stagnation-Timeout: 30 Min kein Preischange -> schliessen",
                     "      Max-Haltedauer: 60 Min -> schliessen",
                     "      -> Speichert in data/observer_performance.db",
+                    "Optional Oracle-Metrics Endpoint: http://127.0.0.1:8091/metrics",
                 ],
             },
             {
@@ -117,6 +188,16 @@ COMMANDS = [
                     "show_db --observer sessions  Observer-Sessions anzeigen",
                 ],
             },
+            {
+                "cmd": "paper_logs",
+                "args": "[session]",
+                "desc": "Paper-Trading Sessions (Session-Journale + alte JSON-Dateien)",
+                "details": [
+                    "Liest data/*.journal.jsonl + *.trades.jsonl (paper_mainnet, paper)",
+                    "Status: offen (abgebrochen / laeuft) | beendet | JSON (alte Snapshots)",
+                    "paper_logs paper_mainnet_2026   Detail einer Session (Prefix reicht)",
+                ],
+            },
         ],
     },
     {
@@ -213,11 +294,12 @@ COMMANDS = [
         "commands": [
             {
                 "cmd": "offline",
-                "args": "",
+                "args": "[--fast N]",
                 "desc": "Offline Trade Simulator (kein Netzwerk nötig)",
                 "details": [
                     "Simuliert Trades komplett lokal ohne RPC-Verbindung",
                     "Ideal zum Testen der Engine-Logik",
+                    "--fast 500   500 Trades auf virtueller Uhr, ohne Wartezeit",
                 ],
             },
             {
@@ -255,7 +337,10 @@ def run():
     print("  COPYBOT    HELP")
     print("  " + "" * (W - 2))
     print()
-    print("  Usage:  python main.py <command> [options]")
+    print("  Usage:  python main.py [--fast] <command> [options]")
+    print("          --fast  uvloop + orjson, falls installiert (pip install uvloop orjson),")
+    print("                  sonst Standard – auch per COPYBOT_FAST=1. Nur vor <command>:")
+    print("                  dahinter gehoert es dem Runner (offline --fast N)")
     print()
 
     for section in COMMANDS:
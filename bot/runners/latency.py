@@ -0,0 +1,137 @@
+"""
+latency.py - PnL-Kosten pro Sekunde Pipeline-Latenz
+
+Misst die Latenz zwischen dem Kauf der kopierten Wallets (block_time) und
+unserem Entry aus den Session-Aufzeichnungen und verschiebt den Entry auf den
+gespeicherten Preisverlaeufen (position_prices, sonst Aufzeichnungen) um
++0 .. +60 Sekunden. Ergebnis: EUR und EV-Prozentpunkte pro Sekunde Latenz.
+
+Aufruf:
+  python main.py latency                      # observer_performance.db
+  python main.py latency --db analysis        # wallet_performance.db
+  python main.py latency --sessions 3         # nur letzte 3 Sessions
+  python main.py latency --offsets 0,1,2,5    # eigene Verschiebungen (Sekunden)
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from typing import List
+
+DB_PATHS = {
+    "observer": Path("data/observer_performance.db"),
+    "analysis": Path("data/wallet_performance.db"),
+}
+DEFAULT_OFFSETS = [0, 1, 2, 3, 5, 10, 20, 30, 60]
+
+# Buckets fuer die gemessene Pipeline-Latenz (Sekunden, obere Grenze)
+LATENCY_BUCKETS = [5, 10, 20, 60, float("inf")]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q / 100), len(ordered) - 1)]
+
+
+def print_measured(positions: List[dict], latencies: dict):
+    print()
+    if not latencies:
+        print("  Gemessene Latenz: keine BUY-Events mit block_time in den Aufzeichnungen")
+        return
+    detection = [d for d, _ in latencies.values()]
+    pipeline = [p for _, p in latencies.values()]
+    print(f"  Gemessene Latenz ({len(latencies)} Positionen mit Aufzeichnung):")
+    print(f"    Erkennung (block_time -> TradeEvent):  p50 {_percentile(detection, 50):5.1f}s  "
+          f"p90 {_percentile(detection, 90):5.1f}s")
+    print(f"    Pipeline  (block_time -> Entry):       p50 {_percentile(pipeline, 50):5.1f}s  "
+          f"p90 {_percentile(pipeline, 90):5.1f}s")
+    print()
+    print(f"  {'Pipeline':>10}  {'N':>5}  {'EV':>7}  {'WR':>5}")
+    lower = 0.0
+    for upper in LATENCY_BUCKETS:
+        pcts = [positions[i]["pnl_percent"] or 0.0 for i, (_, p) in latencies.items() if lower <= p < upper]
+        label = f"{lower:.0f}-{upper:.0f}s" if upper != float("inf") else f">{lower:.0f}s"
+        if pcts:
+            wr = sum(1 for p in pcts if p > 0) / len(pcts)
+            print(f"  {label:>10}  {len(pcts):>5}  {sum(pcts)/len(pcts):>+6.1f}%  {wr*100:>4.0f}%")
+        lower = upper
+
+
+def run(args: list = None):
+    args = args or []
+
+    db_path = DB_PATHS["observer"]
+    session_limit = None
+    offsets = DEFAULT_OFFSETS
+
+    i = 0
+    while i < len(args):
+        if args[i] == "--db" and i + 1 < len(args):
+            db_path = DB_PATHS.get(args[i+1], Path(args[i+1]))
+            i += 2
+        elif args[i] == "--sessions" and i + 1 < len(args):
+            try: session_limit = int(args[i+1])
+            except ValueError: pass
+            i += 2
+        elif args[i] == "--offsets" and i + 1 < len(args):
+            try: offsets = sorted({float(v) for v in args[i+1].split(",")})
+            except ValueError: pass
+            i += 2
+        else:
+            i += 1
+
+    if not db_path.exists():
+        print(f"\n[Fehler] Datenbank nicht gefunden: {db_path}\n")
+        return
+
+    from runners.tune_observer import load_positions
+    from trading.latency import cost_per_second, latency_curve, measured_latencies
+    from trading.price_paths import load_paths
+
+    conn = sqlite3.connect(str(db_path))
+    selected = None
+    if session_limit:
+        selected = [r[0] for r in conn.execute(
+            "SELECT session_id FROM wallet_trades GROUP BY session_id ORDER BY MIN(timestamp) DESC"
+        ).fetchall()][:session_limit]
+    positions = load_positions(conn, session_filter=selected)
+    paths, _ = load_paths(conn, positions)
+    conn.close()
+
+    if not paths:
+        print("\n  Keine Preisverlaeufe gefunden (position_prices / data/recordings/).\n")
+        return
+
+    latencies = measured_latencies(positions)
+    curve = latency_curve(paths, positions, offsets)
+    eur_per_s, ev_per_s = cost_per_second(curve)
+
+    print()
+    print("=" * 90)
+    print(" LATENZ-KOSTEN")
+    print(f" {len(paths)} Positionen mit Preisverlauf | {db_path.name}")
+    print("=" * 90)
+
+    print_measured(positions, latencies)
+
+    print()
+    print("  Entry verschoben um (Exit unveraendert):")
+    print(f"  {'+Sek':>6}  {'N':>5}  {'verpasst':>8}  {'EV':>7}  {'WR':>5}  {'PnL EUR':>10}")
+    print("  " + "-" * 52)
+    base = curve[0]["pnl"]
+    for c in curve:
+        print(f"  {c['offset']:>+6.0f}  {c['n']:>5}  {c['missed']:>8}  {c['ev']:>+6.1f}%  "
+              f"{c['wr']*100:>4.0f}%  {c['pnl']:>+10.2f}" + (f"  ({c['pnl'] - base:+.2f})" if c is not curve[0] else ""))
+
+    print()
+    print("=" * 90)
+    print(f"  PnL pro Sekunde Latenz:  {eur_per_s:+.2f} EUR  |  {ev_per_s:+.3f} Prozentpunkte EV"
+          f"  ({'Latenz kostet' if eur_per_s < 0 else 'kein messbarer Latenz-Nachteil'})")
+    print("=" * 90)
+    print()
+
+    return {"curve": curve, "eur_per_second": eur_per_s, "ev_per_second": ev_per_s}
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
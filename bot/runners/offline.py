@@ -1,12 +1,18 @@
 """
 Offline Mode - Simuliert Solana Trades ohne Netzwerkverbindung
 Nützlich für Testing wenn kein Netzwerk verfügbar ist
+
+  python main.py offline              Echtzeit (alle 2s ein Trade, CTRL+C beendet)
+  python main.py offline --fast 500   500 Trades auf virtueller Uhr, ohne Wartezeit
 """
 import asyncio
-import time
 import random
+import sys
+from typing import Optional
+
 from observation.observer import TradeObserver
 from observation.models import TradeEvent
+from trading.clock import VirtualClock, get_clock, set_clock
 from wallets.sync import sync_wallets
 
 # Bekannte Token Mints für Simulation
@@ -21,9 +27,12 @@ TOKENS = {
 class OfflineTradeSimulator:
     """Simuliert realistische Trades ohne Netzwerk"""
     
-    def __init__(self, wallets: list[str], interval: float = 2.0):
+    def __init__(self, wallets: list[str], interval: float = 2.0,
+                 clock=None, max_trades: Optional[int] = None):
         self.wallets = wallets
         self.interval = interval
+        self.clock = clock or get_clock()
+        self.max_trades = max_trades
         self.observer = TradeObserver()
     
     async def generate_trade(self) -> TradeEvent:
@@ -47,7 +56,7 @@ class OfflineTradeSimulator:
             side=side,
             amount=amount,
             source="offline_simulator",
-            timestamp=time.time()
+            timestamp=self.clock.time()
         )
     
     async def run(self):
@@ -56,14 +65,14 @@ class OfflineTradeSimulator:
         print("[OFFLINE] OFFLINE MODE - Trade Simulator")
         print("=" * 60)
         print(f"\n[Offline] Simulating trades for {len(self.wallets)} wallets")
-        print(f"[Offline] Interval: {self.interval}s")
+        print(f"[Offline] Interval: {self.interval}s{' (virtuelle Uhr)' if self.clock.virtual else ''}")
         print(f"[Offline] Tokens: {', '.join(TOKENS.keys())}")
         print("\nPress CTRL+C to stop\n")
         
         trade_count = 0
         
         try:
-            while True:
+            while self.max_trades is None or trade_count < self.max_trades:
                 trade = await self.generate_trade()
                 await self.observer.handle_event(trade)
                 
@@ -73,13 +82,21 @@ class OfflineTradeSimulator:
                 if trade_count % 10 == 0:
                     print(f"\n[Offline] [RESULTS] {trade_count} trades simulated")
                 
-                await asyncio.sleep(self.interval)
+                await self.clock.sleep(self.interval)
                 
         except KeyboardInterrupt:
             print(f"\n\n[Offline] Stopped after {trade_count} trades")
 
-def run():
+def run(args: list = None):
     """Entry point für Offline Mode"""
+    args = args or []
+    fast_trades = None
+    if "--fast" in args:
+        idx = args.index("--fast")
+        try:
+            fast_trades = int(args[idx + 1])
+        except (IndexError, ValueError):
+            fast_trades = 100
     
     # Versuche Wallets zu laden
     try:
@@ -102,8 +119,20 @@ def run():
             "Demo3333333333333333333333333333333333333",
         ]
     
-    simulator = OfflineTradeSimulator(wallet_addresses, interval=2.0)
-    asyncio.run(simulator.run())
+    if fast_trades is None:
+        simulator = OfflineTradeSimulator(wallet_addresses, interval=2.0)
+        asyncio.run(simulator.run())
+        return
+
+    # Virtuelle Uhr: gleiche Abstaende/Zeitstempel, aber ohne zu warten
+    clock = VirtualClock()
+    previous = set_clock(clock)
+    try:
+        simulator = OfflineTradeSimulator(wallet_addresses, interval=2.0,
+                                          clock=clock, max_trades=fast_trades)
+        asyncio.run(clock.run(simulator.run()))
+    finally:
+        set_clock(previous)
 
 if __name__ == "__main__":
-    run()
+    run(sys.argv[1:])
@@ -0,0 +1,165 @@
+"""
+Paper Logs Runner - Uebersicht der Paper-Trading Sessions
+Liest die Session-Journale (data/*.journal.jsonl + *.trades.jsonl, siehe
+trading/session_journal.py) und die alten Snapshot-Dateien (data/paper_*.json).
+
+Aufruf: python main.py paper_logs              (interaktive Liste)
+        python main.py paper_logs <name>       (Detail einer Session)
+"""
+import json
+import sys
+from pathlib import Path
+
+from runners.logs import fmt_pnl, fmt_pct
+
+DATA_DIR = Path("data")
+
+
+def load_sessions():
+    """Journale + alte JSON-Snapshots, neueste zuerst"""
+    from trading.session_journal import list_sessions, load_portfolio
+
+    sessions = []
+    for s in list_sessions(DATA_DIR):
+        portfolio = load_portfolio(s["base"], resume=False)
+        sessions.append({
+            "name": s["name"],
+            "started": s["header"].get("started", ""),
+            "status": "beendet" if s["ended"] else "offen",
+            "portfolio": portfolio,
+            "base": s["base"],
+        })
+    for path in DATA_DIR.glob("paper_*.json"):
+        portfolio = load_snapshot(path)
+        if portfolio is None:
+            continue
+        sessions.append({
+            "name": path.stem,
+            "started": "",
+            "status": "JSON",
+            "portfolio": portfolio,
+            "path": path,
+        })
+    return sorted(sessions, key=lambda s: s["name"].split("_", 2)[-1], reverse=True)
+
+
+def load_snapshot(path: Path):
+    """Alte Session-Datei (save_to_file) als PaperPortfolio"""
+    from trading.portfolio import PaperPortfolio, Trade
+    from trading.session_journal import position_from_dict
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        portfolio = PaperPortfolio(initial_capital_eur=data["initial_capital"])
+        portfolio.cash_eur = data["cash_eur"]
+        portfolio.positions = {p["token"]: position_from_dict(p) for p in data.get("positions", [])}
+        for t in data.get("trade_history", []):
+            trade = Trade.from_dict(t)
+            portfolio.stats.add(trade)
+            portfolio.trade_history.append(trade)
+        return portfolio
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def session_trades(session) -> list:
+    if "base" in session:
+        from trading.portfolio import Trade
+        from trading.session_journal import read_trades
+        return [Trade.from_dict(t) for t in read_trades(session["base"])]
+    return list(session["portfolio"].trade_history)
+
+
+def show_session_detail(session):
+    portfolio = session["portfolio"]
+    print()
+    print("=" * 90)
+    print(f"  SESSION  {session['name']}  [{session['status']}]")
+    print("=" * 90)
+    portfolio.print_summary({})
+
+    trades = session_trades(session)
+    if not trades:
+        print("  Keine Trades.")
+        print()
+        return
+
+    print(f"  {'Zeit':<19}  {'Seite':<5}  {'Token':<12}  {'Preis EUR':>14}  {'Wert EUR':>10}  "
+          f"{'P&L EUR':>10}  {'P&L %':>8}")
+    print("  " + "-" * 86)
+    for t in trades:
+        pnl = fmt_pnl(t.pnl_eur) if t.side == "SELL" else ""
+        pct = fmt_pct(t.pnl_percent) if t.side == "SELL" else ""
+        print(f"  {t.timestamp.strftime('%Y-%m-%d %H:%M:%S'):<19}  {t.side:<5}  {t.token[:10]+'..':<12}  "
+              f"{t.price_eur:>14.8f}  {t.value_eur:>10.2f}  {pnl:>10}  {pct:>8}")
+    print()
+
+
+def run(args=None):
+    if args is None:
+        args = sys.argv[2:]
+
+    sessions = load_sessions()
+    if not sessions:
+        print("\n  Keine Paper-Sessions in data/ gefunden.")
+        print("  Starte zuerst eine Session mit: python main.py paper_mainnet\n")
+        return
+
+    if args:
+        match = [s for s in sessions if s["name"].startswith(args[0])]
+        if not match:
+            print(f"\n  Session nicht gefunden: {args[0]}\n")
+            return
+        show_session_detail(match[0])
+        return
+
+    while True:
+        print()
+        print("=" * 90)
+        print("  PAPER SESSIONS")
+        print("=" * 90)
+        print(f"  {'Nr':>3}  {'Status':<7}  {'Trades':>6}  {'Offen':>5}  {'WR':>5}  {'P&L EUR':>12}  Session")
+        print("  " + "-" * 86)
+        for idx, s in enumerate(sessions, 1):
+            stats = s["portfolio"].stats
+            wr = stats.wins / stats.completed * 100 if stats.completed else 0.0
+            print(f"  {idx:>3}  {s['status']:<7}  {stats.completed:>6}  {len(s['portfolio'].positions):>5}  "
+                  f"{wr:>4.0f}%  {fmt_pnl(stats.realized_pnl):>12}  {s['name']}")
+
+        print()
+        print("  Eingabe: Nummer -> Session-Detail   |   q -> Beenden")
+        print()
+
+        try:
+            raw = input("  > ").strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            break
+
+        if raw.lower() in ("q", "quit", "exit", ""):
+            break
+
+        try:
+            nr = int(raw)
+        except ValueError:
+            print(f"\n  Ungueltige Eingabe: '{raw}'  (Zahl oder 'q' eingeben)\n")
+            continue
+
+        if nr < 1 or nr > len(sessions):
+            print(f"\n  Zahl muss zwischen 1 und {len(sessions)} liegen.\n")
+            continue
+
+        show_session_detail(sessions[nr - 1])
+
+        try:
+            input("  [ENTER] zurueck zur Liste   |   Ctrl+C zum Beenden")
+        except (EOFError, KeyboardInterrupt):
+            print()
+            break
+
+    print()
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
@@ -8,17 +8,22 @@ import signal
 import sys
 import logging
 from datetime import datetime
-import aiohttp
 
-from config.network import RPC_HTTP_ENDPOINTS, NETWORK_MAINNET
+from config.network import RPC_HTTP_ENDPOINTS, NETWORK_MAINNET, get_ws_url
 from wallets.sync import sync_wallets
 from observation.sources.solana_polling import SolanaPollingSource
 from observation.models import TradeEvent
 from pattern.redundancy import RedundancyEngine, TradeSignal
 from trading.portfolio import PaperPortfolio
+from trading.session_journal import find_unfinished, load_portfolio, mark_ended
 from trading.price_oracle import PriceOracle, MockPriceOracle
-from trading.engine import PaperTradingEngine
+from trading.oracle_metrics import METRICS_PORT
+from trading.token_registry import TokenRegistry
+from trading.recorder import SessionRecorder
+from trading.engine import ORDER_DRAIN_TIMEOUT, PaperTradingEngine
 from trading.connection_monitor import ConnectionHealthMonitor
+from trading.reconciler import MissedSellReconciler
+from trading.balance_watch import TokenBalanceWatcher
 from trading.wallet_tracker import WalletTracker
 
 # Logging
@@ -38,9 +43,12 @@ class PaperTradingMainnetRunner:
         self.source = None
         self.portfolio = None
         self.oracle = None
+        self.registry = None
+        self.recorder = None
         self.engine = None
         self.redundancy = None
         self.connection_monitor = None
+        self.balance_watch = None
         
         # Konfigurierbare Parameter
         self.config = {}
@@ -210,6 +218,50 @@ class PaperTradingMainnetRunner:
             except ValueError:
                 print("    Bitte eine Zahl eingeben (z.B. 50)!")
         
+        # 10. Portfolio-Modus: mehrere Positionen gleichzeitig
+        while True:
+            max_input = input(" Max. gleichzeitige Positionen [1]: ").strip()
+            if not max_input:
+                self.config['max_positions'] = 1
+                break
+            try:
+                max_positions = int(max_input)
+                if max_positions <= 0:
+                    print("    Muss größer als 0 sein!")
+                    continue
+                self.config['max_positions'] = max_positions
+                break
+            except ValueError:
+                print("    Bitte eine ganze Zahl eingeben!")
+
+        self.config['max_exposure'] = 100.0
+        while self.config['max_positions'] > 1:
+            exposure_input = input(" Max. Exposure (% des Kapitals in Positionen) [80]: ").strip()
+            if not exposure_input:
+                self.config['max_exposure'] = 80.0
+                break
+            try:
+                exposure = float(exposure_input)
+                if exposure <= 0 or exposure > 100:
+                    print("    Muss zwischen 0 und 100 sein!")
+                    continue
+                self.config['max_exposure'] = exposure
+                break
+            except ValueError:
+                print("    Bitte eine Zahl eingeben!")
+
+        # 11. Balance-Watch: Exit sobald der Token-Bestand eines Trigger-Wallets sinkt
+        watch_input = input(" Balance-Watch (Exit bei sinkendem Wallet-Bestand, WebSocket) (j/n) [n]: ").strip().lower()
+        self.config['balance_watch'] = watch_input in ("j", "ja", "y", "yes")
+
+        # 12. Oracle-Metrics als HTTP Endpoint (nur localhost)
+        metrics_input = input(f" Oracle-Metrics Endpoint (http://127.0.0.1:{METRICS_PORT}) (j/n) [n]: ").strip().lower()
+        self.config['metrics'] = metrics_input in ("j", "ja", "y", "yes")
+        
+        # 13. Session aufzeichnen (fuer Replay / Backtests)
+        record_input = input(" Session aufzeichnen (j/n) [j]: ").strip().lower()
+        self.config['record'] = record_input not in ("n", "nein", "no")
+        
         print()
         print("="*70)
         print(" Konfiguration abgeschlossen!")
@@ -238,14 +290,30 @@ class PaperTradingMainnetRunner:
         logger.info(f"[Wallets] Loaded {len(wallet_addresses)} wallets")
         print()
         
-        # 2. Portfolio initialisieren
-        self.portfolio = PaperPortfolio(
-            initial_capital_eur=self.config['initial_capital']
-        )
+        # 2. Portfolio: abgebrochene Session fortsetzen oder neue Session
+        # Zustand + Trades laufen crash-sicher ins Session-Journal (trading/session_journal.py)
+        self.portfolio = self._resume_session()
+        if self.portfolio is None:
+            self.session_name = f"paper_mainnet_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            self.portfolio = PaperPortfolio(
+                initial_capital_eur=self.config['initial_capital'],
+                journal_path=f"data/{self.session_name}",
+            )
         self.portfolio.position_size_percent = self.config['position_size']
+        self.portfolio.journal.start(self.portfolio)
         
-        # 3. Price Oracle
-        self.oracle = PriceOracle()
+        # 3. Price Oracle + persistente Token-Registry (Liquiditaet fuer Slippage)
+        self.registry = TokenRegistry()
+        self.registry.start()
+        self.oracle = PriceOracle(registry=self.registry)
+        if self.config['metrics']:
+            self.oracle.metrics.serve()
+        
+        # Rohdaten-Aufzeichnung: TradeEvents + Oracle-Preise (python main.py replay ...)
+        if self.config['record']:
+            self.recorder = SessionRecorder(prefix="paper_mainnet")
+            self.recorder.attach(self.oracle)
+            self.recorder.start()
         
         # 4.  Connection Health Monitor
         self.connection_monitor = ConnectionHealthMonitor(
@@ -272,6 +340,11 @@ class PaperTradingMainnetRunner:
         print(" [Trading Engine] Activated")
         print(f"   Initial Capital: {self.config['initial_capital']:.2f} EUR")
         print(f"   Position Size: {self.config['position_size']*100:.0f}%")
+        if self.config['max_positions'] > 1:
+            print(f"   Portfolio Mode: max {self.config['max_positions']} positions | "
+                  f"max exposure {self.config['max_exposure']:.0f}%")
+        else:
+            print(f"   Single Position Mode")
         print(f"   Strategy: Follow lead wallets")
         print()
         
@@ -294,6 +367,22 @@ class PaperTradingMainnetRunner:
         print(f"   Take-Profit:     +{self.config['take_profit']:.0f}%")
         print()
         
+        if self.config['balance_watch']:
+            print(" [Balance Watch] Activated")
+            print(f"   accountSubscribe auf Token-Accounts der Trigger-Wallets")
+            print(f"   Exit sofort bei sinkendem Bestand (ohne Polling + Parsing)")
+            print()
+        
+        if self.recorder:
+            print(" [Recorder] Activated")
+            print(f"   File: {self.recorder.path}")
+            print()
+        
+        if self.oracle.metrics.serving:
+            print(" [Oracle Metrics] Activated")
+            print(f"   http://127.0.0.1:{METRICS_PORT}/metrics")
+            print()
+        
         print(" [Mode] PURE MAINNET - No fake trades")
         print("   Watching real Solana transactions only")
         print()
@@ -308,7 +397,15 @@ class PaperTradingMainnetRunner:
             connection_monitor=self.connection_monitor
         )
         
-        # 7. Trading Engine
+        # 7. Balance-Watch (optional) + Trading Engine
+        if self.config['balance_watch']:
+            self.balance_watch = TokenBalanceWatcher(
+                ws_url=get_ws_url(NETWORK_MAINNET),
+                http_url=RPC_HTTP_ENDPOINTS[NETWORK_MAINNET],
+                on_drop=lambda wallet, token, amount: self.engine.on_balance_drop(wallet, token, amount),
+            )
+            self.balance_watch.start()
+        
         self.engine = PaperTradingEngine(
             portfolio=self.portfolio,
             price_oracle=self.oracle,
@@ -316,9 +413,18 @@ class PaperTradingMainnetRunner:
             price_update_interval=self.config['price_update_interval'],
             stop_loss_percent=self.config['stop_loss'],
             take_profit_percent=self.config['take_profit'],
-            wallet_tracker=tracker
+            wallet_tracker=tracker,
+            max_positions=self.config['max_positions'],
+            max_exposure_percent=self.config['max_exposure'],
+            balance_watch=self.balance_watch,
         )
         
+        # Wiederhergestellte Positionen wieder ueberwachen (SL/TP, Trigger-Wallets)
+        if self.portfolio.positions:
+            restored = self.engine.restore_positions()
+            print(f" [Resume] {restored} offene Position(en) aus {self.session_name} uebernommen")
+            print()
+        
         # Signal Handler
         signal.signal(signal.SIGINT, self._signal_handler)
         
@@ -336,6 +442,30 @@ class PaperTradingMainnetRunner:
         finally:
             await self._shutdown()
     
+    def _resume_session(self):
+        """Abgebrochene Session (Journal ohne End-Marker) fortsetzen?"""
+        unfinished = find_unfinished("paper_mainnet_")
+        if not unfinished:
+            return None
+        
+        session = unfinished[0]
+        print()
+        print("="*70)
+        print(f" ABGEBROCHENE SESSION: {session['name']}")
+        print(f"   Cash: {session['cash_eur']:.2f} EUR | Offene Positionen: {len(session['positions'])}")
+        print("="*70)
+        answer = input(" Fortsetzen (j/n) [j]: ").strip().lower()
+        
+        if answer in ("n", "nein", "no"):
+            # Abschliessen, damit sie nicht erneut angeboten wird
+            for s in unfinished:
+                mark_ended(s["base"])
+            return None
+        
+        portfolio = load_portfolio(session["base"])
+        self.session_name = session["name"]
+        return portfolio
+    
     async def _emergency_close_all_positions(self):
         """ EMERGENCY EXIT - Verbindung verloren"""
         print()
@@ -351,11 +481,14 @@ class PaperTradingMainnetRunner:
         for token in list(self.portfolio.positions.keys()):
             position = self.portfolio.positions[token]
             entry_price = position.entry_price_eur
-            self.portfolio.close_position(
+            closed = await self.engine.close_now(
                 token=token,
                 price_eur=entry_price,
-                reason="EMERGENCY_EXIT_CONNECTION_LOST"
+                reason="EMERGENCY_EXIT_CONNECTION_LOST",
+                simulate=False,
             )
+            if not closed:
+                continue
             print(f"    Force closed {token[:8]}... @ {entry_price:.4f} EUR (break-even)")
             positions_closed += 1
         
@@ -364,78 +497,14 @@ class PaperTradingMainnetRunner:
         print()
     
     async def _check_for_missed_sells(self):
-        """ RECONNECT CALLBACK - Prüft verpasste SELLs"""
+        """ RECONNECT CALLBACK - Prüft verpasste SELLs (trading/reconciler.py)"""
         if not self.portfolio or not self.portfolio.positions:
             logger.info("[MissedSells] No open positions to check")
             return
         
         logger.info("[MissedSells] Checking for missed SELLs during offline period...")
-        missed_sells_found = 0
-        
-        for token in list(self.portfolio.positions.keys()):
-            trigger_wallets = self.engine.position_trigger_wallets.get(token, set())
-            
-            if not trigger_wallets:
-                logger.warning(f"[MissedSells] No trigger wallets found for {token[:8]}...")
-                continue
-            
-            logger.info(f"[MissedSells] Checking {len(trigger_wallets)} wallets for {token[:8]}...")
-            
-            for wallet in trigger_wallets:
-                try:
-                    async with aiohttp.ClientSession() as session:
-                        payload = {
-                            "jsonrpc": "2.0", "id": 1,
-                            "method": "getSignaturesForAddress",
-                            "params": [wallet, {"limit": 10}]
-                        }
-                        async with session.post(
-                            self.source.rpc_http_url, json=payload,
-                            timeout=aiohttp.ClientTimeout(total=5)
-                        ) as response:
-                            data = await response.json()
-                            if "error" in data:
-                                continue
-                            
-                            for sig_info in data.get("result", [])[:5]:
-                                sig = sig_info.get("signature")
-                                tx_payload = {
-                                    "jsonrpc": "2.0", "id": 1,
-                                    "method": "getTransaction",
-                                    "params": [sig, {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0}]
-                                }
-                                async with session.post(
-                                    self.source.rpc_http_url, json=tx_payload,
-                                    timeout=aiohttp.ClientTimeout(total=5)
-                                ) as tx_response:
-                                    tx_data = await tx_response.json()
-                                    if "error" in tx_data:
-                                        continue
-                                    
-                                    tx = tx_data.get("result")
-                                    if not tx:
-                                        continue
-                                    
-                                    trade_event = self.source.extract_trade(tx, wallet, sig)
-                                    if trade_event and trade_event.token == token and trade_event.side == "SELL":
-                                        missed_sells_found += 1
-                                        current_price = await self.oracle.get_price_eur(token)
-                                        if current_price:
-                                            self.portfolio.close_position(
-                                                token=token,
-                                                price_eur=current_price,
-                                                reason="MISSED_SELL_DETECTED_ON_RECONNECT"
-                                            )
-                                            if token in self.engine.position_trigger_wallets:
-                                                del self.engine.position_trigger_wallets[token]
-                                            if not self.portfolio.positions:
-                                                if hasattr(self.source, 'stop_watching_wallets'):
-                                                    self.source.stop_watching_wallets()
-                                        break
-                
-                except Exception as e:
-                    logger.error(f"[MissedSells] Error checking wallet {wallet[:8]}: {e}")
-                    continue
+        reconciler = MissedSellReconciler(self.source, self.engine, self.oracle)
+        missed_sells_found = await reconciler.run()
         
         if missed_sells_found > 0:
             logger.info(f"[MissedSells]  Found and processed {missed_sells_found} missed SELL(s)")
@@ -450,6 +519,13 @@ class PaperTradingMainnetRunner:
         Der Fast-Mode-Filter betrifft nur den Log-Output, nie die Logik.
         """
 
+        #  0. Rohdaten-Aufzeichnung (vor allem anderen – Erkennungszeit bleibt exakt)
+        if self.recorder:
+            self.recorder.record_trade(trade)
+
+        #  0b. Token-Registry: Decimals/First-Seen, Pool-Liquiditaet im Hintergrund vorladen 
+        self.registry.observe_trade(trade)
+
         #  1. IMMER: Redundancy Engine verarbeitet jeden Trade 
         self.redundancy.process_trade(trade)
 
@@ -490,11 +566,12 @@ class PaperTradingMainnetRunner:
         self.total_signals += 1
         
         if signal_obj.side == "BUY":
-            #  SKIP: Irgendeine Position ist bereits offen
-            if self.portfolio.positions:
+            #  SKIP: Token schon offen, max. Positionen oder Exposure erreicht
+            #  (Single-Position-Modus: jede offene Position / jeder laufende BUY)
+            if self.portfolio.has_position(signal_obj.token) or not self.engine.has_capacity():
                 logger.debug(
                     f"[Runner] Ignoring BUY for {signal_obj.token[:8]}... "
-                    f"(position already open  waiting for SELL first)"
+                    f"({len(self.portfolio.positions)}/{self.config['max_positions']} positions open)"
                 )
                 return
             
@@ -565,15 +642,22 @@ class PaperTradingMainnetRunner:
             print(f"  Runtime: {hours}h {minutes}m {seconds}s")
             print()
         
+        # Laufende Orders zuerst abschliessen: ein BUY, der nach end_session()
+        # fertig wird, landete weder im Journal noch im Close-All
+        if self.engine:
+            await self.engine.stop(drain_timeout=ORDER_DRAIN_TIMEOUT)
+        
         if self.portfolio and self.portfolio.positions:
             print("\n Closing all open positions...\n")
             for token in list(self.portfolio.positions.keys()):
-                price = await self.oracle.get_price_eur(token)
+                price = await self.oracle.get_price_eur(token, caller="shutdown")
                 if price:
-                    self.portfolio.close_position(
+                    await self.engine.close_now(
                         token=token,
                         price_eur=price,
-                        reason="(Session ended)"
+                        reason="SESSION_ENDED",
+                        trigger_label="Session ended",
+                        simulate=False,
                     )
             print()
         
@@ -599,15 +683,23 @@ class PaperTradingMainnetRunner:
             self.oracle.print_all_stats()
         
         if self.portfolio:
-            filepath = f"data/paper_mainnet_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            self.portfolio.save_to_file(filepath)
-            print(f"\n Portfolio saved to: {filepath}\n")
+            self.portfolio.end_session()
+            print(f"\n Session saved: {self.portfolio.journal.state_path} "
+                  f"(Trades: {self.portfolio.journal.trades.path})\n")
         
         if self.oracle:
             await self.oracle.close()
+
+        if self.registry:
+            await self.registry.close()
         
-        if self.engine:
-            await self.engine.stop()
+        if self.balance_watch:
+            await self.balance_watch.close()
+            print(f" Balance-Watch: {self.balance_watch.notifications} updates | {self.balance_watch.drops} drops\n")
+        
+        if self.recorder:
+            await self.recorder.close()
+            print(f" Session recorded: {self.recorder.summary()}\n")
 
 
 async def main():
@@ -14,9 +14,11 @@ from observation.sources.hybrid import HybridTradeSource
 from observation.models import TradeEvent
 from pattern.redundancy import RedundancyEngine, TradeSignal
 from trading.portfolio import PaperPortfolio
+from trading.session_journal import find_unfinished, load_portfolio, mark_ended
 from trading.price_oracle import PriceOracle, MockPriceOracle
+from trading.token_registry import TokenRegistry
 from trading.realistic_oracle import RealisticMockOracle
-from trading.engine import PaperTradingEngine
+from trading.engine import ORDER_DRAIN_TIMEOUT, PaperTradingEngine
 from trading.connection_monitor import ConnectionHealthMonitor
 from trading.wallet_tracker import WalletTracker
 
@@ -37,6 +39,7 @@ class PaperTradingRunner:
         self.source = None
         self.portfolio = None
         self.oracle = None
+        self.registry = None
         self.engine = None
         self.redundancy = None
         self.connection_monitor: ConnectionHealthMonitor = None
@@ -65,12 +68,22 @@ class PaperTradingRunner:
         logger.info(f"[Wallets] Loaded {len(wallet_addresses)} wallets")
         print()
         
-        # 2. Portfolio initialisieren
+        # 2. Portfolio: abgebrochene Session fortsetzen oder neue Session
         initial_capital = 1000.0  # 1000 EUR Startkapital
-        self.portfolio = PaperPortfolio(initial_capital_eur=initial_capital)
+        self.portfolio = self._resume_session()
+        if self.portfolio is None:
+            self.session_name = f"paper_trading_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            self.portfolio = PaperPortfolio(
+                initial_capital_eur=initial_capital,
+                journal_path=f"data/{self.session_name}",
+            )
+        initial_capital = self.portfolio.initial_capital
+        self.portfolio.journal.start(self.portfolio)
         
-        # 3. Price Oracle
-        self.oracle = PriceOracle()
+        # 3. Price Oracle + persistente Token-Registry (Liquiditaet fuer Slippage)
+        self.registry = TokenRegistry()
+        self.registry.start()
+        self.oracle = PriceOracle(registry=self.registry)
 
         # 4. WalletTracker + ConnectionHealthMonitor
         self.tracker = WalletTracker()
@@ -124,6 +137,12 @@ class PaperTradingRunner:
             wallet_tracker=self.tracker
         )
 
+        # Wiederhergestellte Positionen wieder ueberwachen (SL/TP, Trigger-Wallets)
+        if self.portfolio.positions:
+            restored = self.engine.restore_positions()
+            print(f" [Resume] {restored} offene Position(en) aus {self.session_name} uebernommen")
+            print()
+
         await self.connection_monitor.start()
         
         # Signal Handler
@@ -139,6 +158,30 @@ class PaperTradingRunner:
         finally:
             await self._shutdown()
     
+    def _resume_session(self):
+        """Abgebrochene Session (Journal ohne End-Marker) fortsetzen?"""
+        unfinished = find_unfinished("paper_trading_")
+        if not unfinished:
+            return None
+
+        session = unfinished[0]
+        print()
+        print("="*70)
+        print(f" ABGEBROCHENE SESSION: {session['name']}")
+        print(f"   Cash: {session['cash_eur']:.2f} EUR | Offene Positionen: {len(session['positions'])}")
+        print("="*70)
+        answer = input(" Fortsetzen (j/n) [j]: ").strip().lower()
+
+        if answer in ("n", "nein", "no"):
+            # Abschliessen, damit sie nicht erneut angeboten wird
+            for s in unfinished:
+                mark_ended(s["base"])
+            return None
+
+        portfolio = load_portfolio(session["base"])
+        self.session_name = session["name"]
+        return portfolio
+    
     async def _handle_trade(self, trade: TradeEvent):
         """Handler für Trade Events"""
         # Log Trade
@@ -148,17 +191,20 @@ class PaperTradingRunner:
             f"{trade.side:4} {trade.amount:>8.2f} {trade.token[:8]}..."
         )
         
-        # 1. An Redundancy Engine weiterleiten
+        # 1. Token-Registry: Pool-Liquiditaet im Hintergrund vorladen
+        self.registry.observe_trade(trade)
+
+        # 2. An Redundancy Engine weiterleiten
         signal = self.redundancy.process_trade(trade)
         
         # DEBUG: Zeige ob Signal erkannt wurde
         if signal:
             logger.debug(f"[DEBUG] Signal detected: {signal}")
         
-        # 2. An Trading Engine weiterleiten (für SELL Detection)
+        # 3. An Trading Engine weiterleiten (für SELL Detection)
         await self.engine.on_trade_event(trade)
         
-        # 3. Stats
+        # 4. Stats
         if trade.side == "SELL":
             self.total_sells += 1
         elif trade.side == "BUY":
@@ -207,13 +253,16 @@ class PaperTradingRunner:
             return
 
         for token in list(self.portfolio.positions.keys()):
-            last_price = self.engine.last_prices.get(token, 0.0)
-            print(f"   ❌ Force closed {token[:8]}... @ {last_price:.8f} EUR (last known price)")
-            self.portfolio.close_position(
+            last_price = self.engine.last_price(token, 0.0)
+            closed = await self.engine.close_now(
                 token=token,
                 price_eur=last_price,
-                reason="(Emergency Exit – Connection lost)"
+                reason="EMERGENCY_EXIT",
+                trigger_label="Emergency Exit – Connection lost",
+                simulate=False,
             )
+            if closed:
+                print(f"   ❌ Force closed {token[:8]}... @ {last_price:.8f} EUR (last known price)")
 
         print("✅ Emergency exit completed")
         print("="*70)
@@ -247,15 +296,22 @@ class PaperTradingRunner:
         print("="*70)
         
         # Close all open positions
+        # Laufende Orders zuerst abschliessen: ein BUY, der nach end_session()
+        # fertig wird, landete weder im Journal noch im Close-All
+        if self.engine:
+            await self.engine.stop(drain_timeout=ORDER_DRAIN_TIMEOUT)
+        
         if self.portfolio and self.portfolio.positions:
             print("\n Closing all open positions...\n")
             for token in list(self.portfolio.positions.keys()):
-                price = await self.oracle.get_price_eur(token)
+                price = await self.oracle.get_price_eur(token, caller="shutdown")
                 if price:
-                    self.portfolio.close_position(
+                    await self.engine.close_now(
                         token=token,
                         price_eur=price,
-                        reason="(Session ended)"
+                        reason="SESSION_ENDED",
+                        trigger_label="Session ended",
+                        simulate=False,
                     )
             print()
         
@@ -286,14 +342,17 @@ class PaperTradingRunner:
         
         # Save Portfolio
         if self.portfolio:
-            filepath = f"data/paper_trading_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            self.portfolio.save_to_file(filepath)
-            print(f"\n Portfolio saved to: {filepath}\n")
+            self.portfolio.end_session()
+            print(f"\n Session saved: {self.portfolio.journal.state_path} "
+                  f"(Trades: {self.portfolio.journal.trades.path})\n")
         
         # Cleanup
         if self.oracle:
             await self.oracle.close()
 
+        if self.registry:
+            await self.registry.close()
+
 
 async def main():
     """Entry Point"""
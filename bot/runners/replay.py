@@ -0,0 +1,159 @@
+"""
+replay.py - Deterministischer Backtest einer aufgezeichneten Session
+
+Spielt aufgezeichnete TradeEvents + Preis-Ticks durch RedundancyEngine und
+PaperTradingEngine (virtuelle Uhr, keine Sleeps, fester Seed).
+Format der Event-Dateien: siehe trading/replay.py
+
+Aufruf:
+  python main.py replay data/recordings/session.jsonl.gz
+  python main.py replay a.jsonl.gz b.jsonl.gz --seed 7
+  python main.py replay session.jsonl.gz --window 20 --min-wallets 3 --min-confidence 0.6
+  python main.py replay session.jsonl.gz --sl -30 --tp 80 --capital 1000 --size 0.2
+  python main.py replay session.jsonl.gz --tracker      # Confidence + SL/TP aus wallet_performance.db (Kopie)
+  python main.py replay session.jsonl.gz --verbose      # Engine-Ausgabe anzeigen
+  python main.py replay session.jsonl.gz --save         # Portfolio nach data/replay_*.json
+  python main.py replay session.jsonl.gz --multi        # BUY auch wenn schon eine Position offen ist
+  python main.py replay session.jsonl.gz --exit-rules "trail=20@30,ladder=50:0.5,decay=-50:0:60"
+"""
+
+import asyncio
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from trading.replay import ReplayBacktest, ReplayConfig, load_events
+
+TRACKER_DB = Path("data/wallet_performance.db")
+
+
+def _parse_args(args: list):
+    files = []
+    cfg = ReplayConfig()
+    opts = {"verbose": False, "save": False, "tracker": False}
+
+    numeric = {
+        "--window":         ("time_window", int),
+        "--min-wallets":    ("min_wallets", int),
+        "--min-confidence": ("min_confidence", float),
+        "--sl":             ("stop_loss", float),
+        "--tp":             ("take_profit", float),
+        "--capital":        ("initial_capital", float),
+        "--size":           ("position_size", float),
+        "--seed":           ("seed", int),
+    }
+
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg in numeric and i + 1 < len(args):
+            field, cast = numeric[arg]
+            try:
+                setattr(cfg, field, cast(args[i + 1]))
+            except ValueError:
+                print(f"  [Warnung] Ungueltiger Wert fuer {arg}: {args[i + 1]}")
+            i += 2
+        elif arg == "--verbose":
+            opts["verbose"] = True
+            i += 1
+        elif arg == "--save":
+            opts["save"] = True
+            i += 1
+        elif arg == "--tracker":
+            opts["tracker"] = True
+            i += 1
+        elif arg == "--multi":
+            cfg.single_position = False
+            i += 1
+        elif arg == "--exit-rules" and i + 1 < len(args):
+            cfg.exit_rules = args[i + 1]
+            i += 2
+        else:
+            files.append(arg)
+            i += 1
+    return files, cfg, opts
+
+
+def _make_tracker(tmpdir: str):
+    """WalletTracker auf einer KOPIE der DB – der Replay schreibt Inaktivitaets-Tags"""
+    from trading.wallet_tracker import WalletTracker
+    if not TRACKER_DB.exists():
+        print(f"  [Warnung] {TRACKER_DB} nicht gefunden – Replay ohne Tracker")
+        return None
+    copy = Path(tmpdir) / TRACKER_DB.name
+    shutil.copy(TRACKER_DB, copy)
+    return WalletTracker(db_path=str(copy))
+
+
+def run(args: list = None):
+    args = args or []
+    files, cfg, opts = _parse_args(args)
+
+    if not files:
+        print(__doc__)
+        return
+
+    missing = [f for f in files if not Path(f).exists()]
+    if missing:
+        print(f"\n[Fehler] Datei(en) nicht gefunden: {', '.join(missing)}\n")
+        return
+
+    logging.basicConfig(level=logging.INFO if opts["verbose"] else logging.WARNING, format='%(message)s')
+
+    load_start = time.perf_counter()
+    events = load_events(files)
+    load_secs = time.perf_counter() - load_start
+    if not events:
+        print("\n[Fehler] Keine Events in den Dateien.\n")
+        return
+
+    if cfg.exit_rules:
+        from trading.exit_rules import ExitRuleSet
+        try:
+            cfg.exit_rules = ExitRuleSet.parse(cfg.exit_rules).spec()
+        except ValueError as e:
+            print(f"\n[Fehler] {e}\n")
+            return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cfg.wallet_tracker = _make_tracker(tmpdir) if opts["tracker"] else None
+        backtest = ReplayBacktest(events, cfg)
+
+        run_start = time.perf_counter()
+        stats = asyncio.run(backtest.run(quiet=not opts["verbose"]))
+        run_secs = time.perf_counter() - run_start
+
+    span_h = (events[-1]["t"] - events[0]["t"]) / 3600
+
+    print()
+    print("=" * 70)
+    print(" REPLAY BACKTEST")
+    print("=" * 70)
+    print(f"  Dateien:        {len(files)}  ({', '.join(Path(f).name for f in files)})")
+    print(f"  Zeitraum:       {datetime.fromtimestamp(events[0]['t']):%Y-%m-%d %H:%M:%S} -> "
+          f"{datetime.fromtimestamp(events[-1]['t']):%Y-%m-%d %H:%M:%S}  ({span_h:.1f} h)")
+    print(f"  Events:         {backtest.trade_events} Trades | {backtest.price_events} Preise")
+    print(f"  Laufzeit:       {run_secs:.2f}s (+ {load_secs:.2f}s laden)")
+    print(f"  Parameter:      window={cfg.time_window}s min_wallets={cfg.min_wallets} "
+          f"min_conf={cfg.min_confidence:.2f} SL={cfg.stop_loss:.0f}% TP=+{cfg.take_profit:.0f}% "
+          f"seed={cfg.seed}{' tracker' if cfg.wallet_tracker else ''}"
+          + (f" exit={cfg.exit_rules}" if cfg.exit_rules else ""))
+    print(f"  Signale:        {backtest.total_signals} | Buys: {backtest.total_buys}")
+    print("=" * 70)
+
+    backtest.portfolio.print_summary({})
+
+    if opts["save"]:
+        filepath = f"data/replay_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        backtest.portfolio.save_to_file(filepath)
+        print(f" Portfolio saved to: {filepath}\n")
+
+    return stats
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
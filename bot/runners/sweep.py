@@ -0,0 +1,290 @@
+"""
+sweep.py - Parameter-Sweep fuer RedundancyEngine + SL/TP auf Aufzeichnungen
+
+paper_mainnet fragt time_window, min_wallets, min_confidence, SL und TP
+interaktiv ab – hier werden sie datenbasiert gewaehlt: jede Kombination laeuft
+als deterministischer Replay (trading/replay.py) ueber alle aufgezeichneten
+Sessions, verteilt per ProcessPoolExecutor auf alle Kerne.
+
+Ergebnis: Ranking-Tabelle mit PnL, EV und Max-Drawdown pro Parametersatz.
+
+Aufruf:
+  python main.py sweep                                  # Grid ueber data/recordings/*.jsonl.gz
+  python main.py sweep a.jsonl.gz b.jsonl.gz            # bestimmte Sessions
+  python main.py sweep --random 200                     # 200 Zufalls-Kombinationen statt Grid
+  python main.py sweep --sort pnl --top 20              # sortieren nach ev | pnl | dd
+  python main.py sweep --workers 4 --seed 7             # Prozesse / Simulations-Seed
+  python main.py sweep --save                           # Ergebnisse nach data/sweep_*.json
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from trading.replay import ReplayBacktest, ReplayConfig, load_events
+
+RECORDINGS_DIR = Path("data/recordings")
+
+# Parameter-Raster
+TIME_WINDOW_VALUES    = [15, 30, 60]            # Sekunden
+MIN_WALLETS_VALUES    = [2, 3]
+MIN_CONFIDENCE_VALUES = [0.4, 0.5, 0.6]
+STOP_LOSS_VALUES      = [-20.0, -30.0, -50.0]   # Prozent
+TAKE_PROFIT_VALUES    = [50.0, 100.0, 200.0]    # Prozent
+
+# Bereiche fuer --random (min, max)
+RANDOM_RANGES = {
+    "time_window":    (10, 90),
+    "min_wallets":    (2, 4),
+    "min_confidence": (0.3, 0.8),
+    "stop_loss":      (-70.0, -10.0),
+    "take_profit":    (30.0, 300.0),
+}
+
+# Aktuelle paper_mainnet Defaults – zum Vergleich in der Ausgabe
+DEFAULT_PARAMS = {"time_window": 30, "min_wallets": 2, "min_confidence": 0.5,
+                  "stop_loss": -50.0, "take_profit": 100.0}
+
+SORT_KEYS = {
+    "ev":  lambda r: r["ev"],
+    "pnl": lambda r: r["pnl"],
+    "dd":  lambda r: -r["max_dd_pct"],
+}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Parameter
+# ──────────────────────────────────────────────────────────────────────────────
+
+def grid_params() -> List[dict]:
+    return [
+        {"time_window": w, "min_wallets": m, "min_confidence": c, "stop_loss": sl, "take_profit": tp}
+        for w, m, c, sl, tp in product(TIME_WINDOW_VALUES, MIN_WALLETS_VALUES, MIN_CONFIDENCE_VALUES,
+                                       STOP_LOSS_VALUES, TAKE_PROFIT_VALUES)
+    ]
+
+
+def random_params(n: int, seed: int) -> List[dict]:
+    rng = random.Random(seed)
+    params = []
+    for _ in range(n):
+        params.append({
+            "time_window":    rng.randint(*RANDOM_RANGES["time_window"]),
+            "min_wallets":    rng.randint(*RANDOM_RANGES["min_wallets"]),
+            "min_confidence": round(rng.uniform(*RANDOM_RANGES["min_confidence"]), 2),
+            "stop_loss":      round(rng.uniform(*RANDOM_RANGES["stop_loss"])),
+            "take_profit":    round(rng.uniform(*RANDOM_RANGES["take_profit"])),
+        })
+    return params
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Worker (laeuft im Subprozess)
+# ──────────────────────────────────────────────────────────────────────────────
+
+_sessions: Dict[str, List[dict]] = {}
+
+
+def _init_worker(paths: List[str]):
+    """Laedt die Sessions einmal pro Prozess statt einmal pro Kombination"""
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger().setLevel(logging.ERROR)
+    for path in paths:
+        _sessions[path] = load_events([path])
+
+
+def evaluate(params: dict, seed: int) -> dict:
+    """Ein Parametersatz ueber alle Sessions – jede Session mit frischem Portfolio"""
+    closed: List[tuple] = []     # (pnl_eur, pnl_pct) in zeitlicher Reihenfolge
+    signals = 0
+    for path, events in _sessions.items():
+        if not events:
+            continue
+        cfg = ReplayConfig(seed=seed, **params)
+        backtest = ReplayBacktest(events, cfg)
+        asyncio.run(backtest.run(quiet=True))
+        signals += backtest.total_signals
+        closed.extend(
+            (t.pnl_eur or 0.0, t.pnl_percent or 0.0)
+            for t in backtest.portfolio.trade_history if t.side == "SELL"
+        )
+    return summarize(params, closed, signals, ReplayConfig.initial_capital)
+
+
+def summarize(params: dict, closed: List[tuple], signals: int, capital: float) -> dict:
+    wins   = [pct for pnl, pct in closed if pnl > 0]
+    losses = [pct for pnl, pct in closed if pnl <= 0]
+    n = len(closed)
+    win_rate = len(wins) / n if n else 0.0
+    avg_win  = sum(wins) / len(wins) if wins else 0.0
+    avg_loss = sum(losses) / len(losses) if losses else 0.0
+
+    # Max-Drawdown auf der realisierten Equity-Kurve
+    equity = peak = capital
+    max_dd = max_dd_pct = 0.0
+    for pnl, _ in closed:
+        equity += pnl
+        peak = max(peak, equity)
+        if peak - equity > max_dd:
+            max_dd = peak - equity
+            max_dd_pct = max_dd / peak * 100
+
+    return {
+        "params":     params,
+        "signals":    signals,
+        "n":          n,
+        "wr":         win_rate,
+        "pnl":        sum(pnl for pnl, _ in closed),
+        "avg_win":    avg_win,
+        "avg_loss":   avg_loss,
+        "ev":         win_rate * avg_win + (1 - win_rate) * avg_loss,
+        "max_dd":     max_dd,
+        "max_dd_pct": max_dd_pct,
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Ausgabe
+# ──────────────────────────────────────────────────────────────────────────────
+
+def print_results(results: List[dict], sort_key: str, top_n: int):
+    ranked = sorted(results, key=SORT_KEYS[sort_key], reverse=True)
+
+    print()
+    print("=" * 90)
+    print(" PARAMETER SWEEP - ERGEBNISSE")
+    print(f" {len(results)} Kombinationen getestet | sortiert nach {sort_key.upper()}")
+    print("=" * 90)
+    print()
+    print(f"  {'Win':>4} {'MinW':>4} {'Conf':>5} {'SL':>5} {'TP':>5}  {'T':>4}  {'WR':>5}  "
+          f"{'EV':>7}  {'PnL EUR':>9}  {'MaxDD':>8}")
+    print("  " + "-" * 76)
+
+    for i, r in enumerate(ranked[:top_n]):
+        p = r["params"]
+        marker = " *" if i == 0 else "  "
+        print(
+            f"{marker} {p['time_window']:>3}s {p['min_wallets']:>4} {p['min_confidence']:>5.2f}"
+            f" {p['stop_loss']:>+5.0f} {p['take_profit']:>+5.0f}"
+            f"  {r['n']:>4}  {r['wr']*100:>4.0f}%  {r['ev']:>+6.1f}%  {r['pnl']:>+9.2f}"
+            f"  {-r['max_dd_pct']:>+7.1f}%"
+        )
+
+    best = ranked[0]
+    current = next((r for r in results if r["params"] == DEFAULT_PARAMS), None)
+    bp = best["params"]
+
+    print()
+    print("=" * 90)
+    print(f"  BESTE Kombination: window={bp['time_window']}s min_wallets={bp['min_wallets']} "
+          f"min_conf={bp['min_confidence']:.2f} SL={bp['stop_loss']:.0f}% TP=+{bp['take_profit']:.0f}%")
+    print(f"    -> EV={best['ev']:+.1f}%  WR={best['wr']*100:.0f}%  PnL={best['pnl']:+.2f} EUR  "
+          f"MaxDD={best['max_dd_pct']:.1f}%  ({best['n']} Trades)")
+    if current:
+        print()
+        print("  AKTUELLE Defaults (30s / 2 / 0.50 / -50% / +100%):")
+        print(f"    -> EV={current['ev']:+.1f}%  WR={current['wr']*100:.0f}%  PnL={current['pnl']:+.2f} EUR  "
+              f"MaxDD={current['max_dd_pct']:.1f}%")
+    print("=" * 90)
+    print()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Entry Point
+# ──────────────────────────────────────────────────────────────────────────────
+
+def run(args: list = None):
+    args = args or []
+
+    files: List[str] = []
+    top_n = 10
+    sort_key = "ev"
+    random_n: Optional[int] = None
+    workers = os.cpu_count() or 1
+    seed = 42
+    save = False
+
+    i = 0
+    while i < len(args):
+        if args[i] == "--top" and i + 1 < len(args):
+            try: top_n = int(args[i+1])
+            except ValueError: pass
+            i += 2
+        elif args[i] == "--random" and i + 1 < len(args):
+            try: random_n = int(args[i+1])
+            except ValueError: pass
+            i += 2
+        elif args[i] == "--workers" and i + 1 < len(args):
+            try: workers = max(1, int(args[i+1]))
+            except ValueError: pass
+            i += 2
+        elif args[i] == "--seed" and i + 1 < len(args):
+            try: seed = int(args[i+1])
+            except ValueError: pass
+            i += 2
+        elif args[i] == "--sort" and i + 1 < len(args):
+            if args[i+1] in SORT_KEYS:
+                sort_key = args[i+1]
+            i += 2
+        elif args[i] == "--save":
+            save = True
+            i += 1
+        else:
+            files.append(args[i])
+            i += 1
+
+    if not files:
+        files = sorted(str(p) for p in RECORDINGS_DIR.glob("*.jsonl*"))
+    if not files:
+        print(f"\n[Fehler] Keine Aufzeichnungen gefunden ({RECORDINGS_DIR}/).")
+        print("  Tipp: paper_mainnet oder wallet_analysis mit Aufzeichnung laufen lassen.\n")
+        return
+    missing = [f for f in files if not Path(f).exists()]
+    if missing:
+        print(f"\n[Fehler] Datei(en) nicht gefunden: {', '.join(missing)}\n")
+        return
+
+    param_sets = random_params(random_n, seed) if random_n else grid_params()
+    workers = min(workers, len(param_sets))
+
+    print(f"\n  {len(files)} Session(s): {', '.join(Path(f).name for f in files)}")
+    print(f"  Teste {len(param_sets)} Kombinationen ({'Zufall' if random_n else 'Grid'}) "
+          f"auf {workers} Prozess(en), Seed {seed}...")
+
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(files,)) as pool:
+        futures = [pool.submit(evaluate, params, seed) for params in param_sets]
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"\n  [Warnung] Kombination fehlgeschlagen: {e}")
+            print(f"\r  Fortschritt: {done}/{len(futures)}", end="", flush=True)
+    print(f"\r  Fertig: {len(results)} Kombinationen in {time.perf_counter() - started:.1f}s")
+
+    if not results:
+        return
+
+    print_results(results, sort_key=sort_key, top_n=top_n)
+
+    if save:
+        filepath = f"data/sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(filepath, "w") as f:
+            json.dump({"files": files, "seed": seed, "results": results}, f, indent=2)
+        print(f" Ergebnisse gespeichert: {filepath}\n")
+
+    return results
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
@@ -1,24 +1,39 @@
 """
 tune_observer.py - Hyperparameter-Simulator fuer den Observer-Modus
 
-Simuliert alle Kombinationen von Stagnation-Timeout und Max-Hold-Timeout
-auf den bereits vorhandenen Observer-Daten und findet die optimale Konfiguration.
+Simuliert Kombinationen von Stop-Loss, Take-Profit, Trailing Stop,
+Stagnation-Timeout und Max-Hold-Timeout auf den vorhandenen Observer-Daten
+und findet die optimale Konfiguration.
 
 Wie es funktioniert:
   - Laedt alle Trades aus observer_performance.db
-  - Rekonstruiert den Preisverlauf jeder Position aus den gespeicherten Daten
-  - Simuliert fuer jede Parameter-Kombination wann eine Position geschlossen
-    worden waere und berechnet den resultierenden PnL
+  - Holt den echten Preisverlauf jeder Position aus der Tabelle
+    position_prices (trading/position_prices.py), sonst aus der
+    Session-Aufzeichnung (data/recordings/<session_id>.jsonl.gz)
+  - Spielt alle Exit-Regeln Tick fuer Tick auf diesen Verlaeufen ab –
+    vektorisiert mit NumPy (trading/price_paths.py), tausende Kombinationen
+    in Sekunden
   - Gibt eine Ranking-Tabelle aller Kombinationen aus
 
+Positionen ohne Verlauf werden uebersprungen. Gibt es gar keine
+Verlaeufe, faellt der Tuner auf die alte Schaetzung zurueck (lineare
+Skalierung des End-PnL, nur Stagnation x MaxHold).
+
+Hinweis: Ein Verlauf endet mit dem echten Exit. Laengere Timeouts als live
+aktiv waren, koennen daher nur bis zu diesem Exit bewertet werden.
+
 Aufruf:
   python main.py tune_observer
   python main.py tune_observer --sessions 3     # nur letzte 3 Sessions
   python main.py tune_observer --top 5          # zeige Top 5 Kombinationen
+  python main.py tune_observer --legacy         # alte lineare Schaetzung erzwingen
+  python main.py tune_observer --rules "trail=20@30,ladder=50:0.5,decay=-50:0:60"
+                                                # Exit-Regel-Kette (wie Engine/Observer) bewerten
 """
 
 import sqlite3
 import sys
+import time
 from pathlib import Path
 from itertools import product
 from collections import defaultdict
@@ -26,9 +41,15 @@ from datetime import datetime
 
 DB_PATH = Path("data/observer_performance.db")
 
-# Parameter-Raster
-STAGNATION_VALUES = [5, 10, 15, 20, 30]   # Minuten
-MAX_HOLD_VALUES   = [20, 40, 60, 90, 120]  # Minuten
+# Parameter-Raster (None = Regel aus)
+STOP_LOSS_VALUES   = [None, -10, -20, -30, -50, -70]   # Prozent
+TAKE_PROFIT_VALUES = [None, 20, 50, 100, 200, 400]     # Prozent
+TRAILING_VALUES    = [None, 10, 20, 30, 50]            # Prozent vom bisherigen Hoch
+STAGNATION_VALUES  = [5, 10, 15, 20, 30]               # Minuten
+MAX_HOLD_VALUES    = [20, 40, 60, 90, 120]             # Minuten
+
+# Aktuelle Observer-Konfiguration (wallet_analysis) – zum Vergleich
+CURRENT_CONFIG = {"sl": None, "tp": None, "trail": None, "stag": 15, "hold": 60}
 
 EXCLUDED_REASONS  = ("SESSION_ENDED", "CRASH_RECOVERY")
 
@@ -65,7 +86,9 @@ def load_positions(conn, session_filter: list = None) -> list:
             s.reason      as exit_reason,
             s.max_price_pct as max_price_pct,
             s.min_price_pct as min_price_pct,
-            s.price_missing as price_missing
+            s.price_missing as price_missing,
+            b.value_eur   as cost_eur,
+            b.id          as buy_id
         FROM wallet_trades b
         JOIN wallet_trades s
             ON b.wallet = s.wallet
@@ -102,6 +125,8 @@ def load_positions(conn, session_filter: list = None) -> list:
             "max_price_pct": r[10],
             "min_price_pct": r[11],
             "hold_min":      hold_min,
+            "cost_eur":      r[13],
+            "buy_id":        r[14],
         })
 
     return positions
@@ -191,6 +216,98 @@ def run_simulation(positions: list) -> dict:
     return results
 
 
+def run_path_simulation(positions: list, paths: dict) -> tuple:
+    """
+    Vektorisierte Simulation auf echten Preisverlaeufen.
+    Gibt (Ergebnisliste, PathMatrix) zurueck.
+    """
+    from trading.price_paths import PathMatrix, evaluate_grid
+
+    indices = sorted(paths)
+    matrix = PathMatrix([paths[i] for i in indices], [positions[i]["cost_eur"] for i in indices])
+    grid = {
+        "SL":         STOP_LOSS_VALUES,
+        "TP":         TAKE_PROFIT_VALUES,
+        "TRAIL":      TRAILING_VALUES,
+        "STAGNATION": STAGNATION_VALUES,
+        "MAX_HOLD":   MAX_HOLD_VALUES,
+    }
+    return evaluate_grid(matrix, grid), matrix
+
+
+def _fmt_rule(value) -> str:
+    return "  aus" if value is None else f"{value:>+4.0f}%"
+
+
+def print_path_results(results: list, matrix, top_n: int = 10):
+    """Ranking + Heatmap fuer die pfadbasierte Simulation"""
+    from trading.price_paths import exit_reasons
+
+    sorted_results = sorted(results, key=lambda x: x["ev"], reverse=True)
+
+    print()
+    print("=" * 90)
+    print(" EXIT-TUNER (echte Preisverlaeufe) - ERGEBNISSE")
+    print(f" {len(results)} Kombinationen x {len(matrix)} Positionen | sortiert nach EV (Expected Value)")
+    print("=" * 90)
+    print()
+    print(f"  {'SL':>5} {'TP':>5} {'Trail':>5} {'Stag':>5} {'Hold':>5}  {'T':>5}  {'WR':>6}  "
+          f"{'AvgWin':>8}  {'AvgLoss':>9}  {'EV':>7}  {'PnL EUR':>10}")
+    print("  " + "-" * 86)
+
+    for i, r in enumerate(sorted_results[:top_n]):
+        marker = " *" if i == 0 else "  "
+        print(
+            f"{marker} {_fmt_rule(r['sl'])} {_fmt_rule(r['tp'])} {_fmt_rule(r['trail'])}"
+            f" {r['stag']:>4}m {r['hold']:>4}m"
+            f"  {r['n']:>5}"
+            f"  {r['wr']*100:>5.0f}%"
+            f"  {r['avg_win']:>+7.0f}%"
+            f"  {r['avg_loss']:>+8.0f}%"
+            f"  {r['ev']:>+6.0f}%"
+            f"  {r['pnl']:>+9.0f}"
+        )
+
+    best = sorted_results[0]
+    current = next((r for r in results if all(r[k] == v for k, v in CURRENT_CONFIG.items())), None)
+    reasons = exit_reasons(matrix, {"SL": best["sl"], "TP": best["tp"], "TRAIL": best["trail"],
+                                    "STAGNATION": best["stag"], "MAX_HOLD": best["hold"]})
+
+    print()
+    print("=" * 90)
+    print(f"  BESTE  Kombination: SL={_fmt_rule(best['sl']).strip()}  TP={_fmt_rule(best['tp']).strip()}  "
+          f"Trailing={_fmt_rule(best['trail']).strip()}  Stagnation={best['stag']}min  MaxHold={best['hold']}min")
+    print(f"    -> EV={best['ev']:+.0f}%  WR={best['wr']*100:.0f}%  PnL={best['pnl']:+.0f} EUR")
+    print("    -> Exits: " + "  ".join(f"{k}={v}" for k, v in sorted(reasons.items(), key=lambda x: -x[1])))
+    if current:
+        print()
+        print("  AKTUELLE Konfiguration (kein SL/TP, 15min / 60min):")
+        print(f"    -> EV={current['ev']:+.0f}%  WR={current['wr']*100:.0f}%  PnL={current['pnl']:+.0f} EUR")
+        print(f"  VERBESSERUNG durch Optimierung: {best['pnl'] - current['pnl']:+.0f} EUR  "
+              f"({best['ev'] - current['ev']:+.0f}% EV)")
+    print("=" * 90)
+
+    # Heatmap EV fuer Stagnation x MaxHold bei bestem SL/TP/Trailing
+    by_cell = {
+        (r["stag"], r["hold"]): r for r in results
+        if r["sl"] == best["sl"] and r["tp"] == best["tp"] and r["trail"] == best["trail"]
+    }
+    print()
+    print("  EV HEATMAP (Zeilen=Stagnation, Spalten=MaxHold) bei bestem SL/TP/Trailing:")
+    print()
+    header = f"  {'Stag/Hold':>9}  " + "  ".join(f"{h:>5}m" for h in MAX_HOLD_VALUES)
+    print(header)
+    print("  " + "-" * (len(header) - 2))
+    for stag in STAGNATION_VALUES:
+        row = f"  {stag:>8}m  "
+        for hold in MAX_HOLD_VALUES:
+            r = by_cell.get((stag, hold))
+            marker = "*" if (stag == best["stag"] and hold == best["hold"]) else " "
+            row += f" {r['ev']:>+5.0f}%{marker} " if r else "   n/a   "
+        print(row)
+    print()
+
+
 def print_results(results: dict, top_n: int = 10):
     """Gibt die Ergebnisse sortiert nach EV aus."""
 
@@ -221,7 +338,6 @@ def print_results(results: dict, top_n: int = 10):
 
     print()
     best = sorted_results[0]
-    worst = sorted_results[-1]
     current = results.get((15, 60))
 
     print("=" * 90)
@@ -229,7 +345,7 @@ def print_results(results: dict, top_n: int = 10):
     print(f"    -> EV={best['ev']:+.0f}%  WR={best['wr']*100:.0f}%  PnL={best['pnl']:+.0f} EUR")
     if current:
         print()
-        print(f"  AKTUELLE Konfiguration (15min / 60min):")
+        print("  AKTUELLE Konfiguration (15min / 60min):")
         print(f"    -> EV={current['ev']:+.0f}%  WR={current['wr']*100:.0f}%  PnL={current['pnl']:+.0f} EUR")
         diff_pnl = best['pnl'] - current['pnl']
         diff_ev  = best['ev']  - current['ev']
@@ -253,22 +369,61 @@ def print_results(results: dict, top_n: int = 10):
                 marker = "*" if (stag == best['stag'] and hold == best['hold']) else " "
                 row += f" {ev:>+5.0f}%{marker} "
             else:
-                row += f"   n/a   "
+                row += "   n/a   "
         print(row)
     print()
 
 
+def print_rule_results(spec: str, positions: list, paths: dict):
+    """Bewertet EINE Exit-Regel-Kette (trading/exit_rules.py) Tick fuer Tick auf allen Verlaeufen"""
+    from trading.exit_rules import ExitRuleSet, simulate_path
+
+    rules = ExitRuleSet.parse(spec)
+    actual, simulated, reasons = [], [], defaultdict(int)
+    pnl_actual = pnl_rules = 0.0
+    for i, path in paths.items():
+        pos = positions[i]
+        pct, reason = simulate_path(rules, path.times, path.prices)
+        real = (pos["exit_price"] / pos["entry_price"] - 1) * 100
+        actual.append(real)
+        simulated.append(pct)
+        reasons[reason] += 1
+        cost = pos["cost_eur"] or 0.0
+        pnl_actual += real / 100 * cost
+        pnl_rules += pct / 100 * cost
+
+    def _ev(values):
+        return sum(values) / len(values) if values else 0.0
+
+    def _wr(values):
+        return sum(1 for v in values if v > 0) / len(values) * 100 if values else 0.0
+
+    print()
+    print("=" * 90)
+    print(f" EXIT-REGELN: {rules.spec() or '(keine)'}")
+    print("=" * 90)
+    print(f"  {'':<14} {'EV':>8}  {'WR':>6}  {'PnL EUR':>10}")
+    print(f"  {'Echt':<14} {_ev(actual):>+7.1f}%  {_wr(actual):>5.0f}%  {pnl_actual:>+10.2f}")
+    print(f"  {'Mit Regeln':<14} {_ev(simulated):>+7.1f}%  {_wr(simulated):>5.0f}%  {pnl_rules:>+10.2f}")
+    print()
+    print("  Finaler Exit: " + " | ".join(f"{k} {v}" for k, v in sorted(reasons.items(), key=lambda kv: -kv[1])))
+    print("=" * 90)
+    print()
+
+
 def run(args: list = None):
     args = args or []
 
     if not DB_PATH.exists():
-        print(f"\n[Fehler] observer_performance.db nicht gefunden.")
+        print("\n[Fehler] observer_performance.db nicht gefunden.")
         print("  Tipp: Zuerst Observer-Mode ausfuehren.\n")
         return
 
     # Optionen parsen
     top_n = 10
     session_limit = None
+    legacy = False
+    rules_spec = None
 
     i = 0
     while i < len(args):
@@ -280,6 +435,12 @@ def run(args: list = None):
             try: session_limit = int(args[i+1])
             except ValueError: pass
             i += 2
+        elif args[i] == "--legacy":
+            legacy = True
+            i += 1
+        elif args[i] == "--rules" and i + 1 < len(args):
+            rules_spec = args[i+1]
+            i += 2
         else:
             i += 1
 
@@ -300,13 +461,44 @@ def run(args: list = None):
 
     # Positionen laden
     positions = load_positions(conn, session_filter=selected_sessions)
-    conn.close()
 
     if not positions:
+        conn.close()
         print("  Keine Positionen fuer Simulation gefunden.")
         return
 
     print(f"  {len(positions)} Positionen geladen.")
+
+    # Echte Preisverlaeufe: position_prices Tabelle, Rest aus den Aufzeichnungen
+    paths = {}
+    if not legacy:
+        from trading.price_paths import load_paths
+        started = time.perf_counter()
+        paths, from_db = load_paths(conn, positions)
+        print(f"  {len(paths)} Preisverlaeufe geladen ({from_db} aus DB, {len(paths) - from_db} aus "
+              f"Aufzeichnungen, {len(positions) - len(paths)} Positionen ohne Verlauf uebersprungen) "
+              f"in {time.perf_counter() - started:.1f}s")
+    conn.close()
+
+    if paths and rules_spec is not None:
+        try:
+            print_rule_results(rules_spec, positions, paths)
+        except ValueError as e:
+            print(f"\n[Fehler] {e}\n")
+        return
+
+    if paths:
+        n_combos = (len(STOP_LOSS_VALUES) * len(TAKE_PROFIT_VALUES) * len(TRAILING_VALUES)
+                    * len(STAGNATION_VALUES) * len(MAX_HOLD_VALUES))
+        print(f"  Teste {n_combos} Kombinationen auf echten Preisverlaeufen...")
+        started = time.perf_counter()
+        results, matrix = run_path_simulation(positions, paths)
+        print(f"  Fertig in {time.perf_counter() - started:.2f}s")
+        print_path_results(results, matrix, top_n=top_n)
+        return
+
+    if not legacy:
+        print("  Keine Aufzeichnungen gefunden -> alte Schaetzung (lineare Skalierung)")
     print(f"  Teste {len(STAGNATION_VALUES) * len(MAX_HOLD_VALUES)} Kombinationen...")
     print()
 
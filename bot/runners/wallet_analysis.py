@@ -36,7 +36,7 @@ import sys
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Set
 from dataclasses import dataclass, field
 
 from config.network import (
@@ -48,6 +48,14 @@ from observation.sources.solana_ws_source import SolanaWebSocketSource
 from observation.sources.solana_parallel_source import SolanaParallelSource
 from observation.models import TradeEvent
 from trading.price_oracle import PriceOracle
+from trading.token_registry import TokenRegistry
+from trading.position_prices import PositionPriceStore
+from trading.recorder import SessionRecorder
+from trading.oracle_metrics import METRICS_PORT
+from trading.price_bus import PriceTick
+from trading.clock import get_clock
+from trading.position_state import PositionState, PositionTable
+from trading.exit_rules import ExitDecision, ExitRuleSet
 from trading.wallet_tracker import WalletTracker
 from trading.connection_monitor import ConnectionHealthMonitor
 
@@ -59,7 +67,7 @@ POSITION_SIZE_PERCENT  = 0.20
 MAX_PRICE_FAILURES     = 5
 
 
-@dataclass
+@dataclass(slots=True)
 class WalletPosition:
     wallet:          str
     token:           str
@@ -67,6 +75,8 @@ class WalletPosition:
     amount:          float
     cost_eur:        float
     entry_time:      datetime
+    sold_amount:     float = 0.0      # Teil-Exits (Exit-Regeln): verkaufte Menge
+    sold_value_eur:  float = 0.0      # ... und Erloes
 
 
 @dataclass
@@ -122,18 +132,38 @@ class WalletAccount:
         })
         return pos
 
+    def reduce_position(self, token: str, fraction: float, price_eur: float) -> Optional[WalletPosition]:
+        """Teil-Exit: verkauft fraction der aktuellen Menge, Rest bleibt offen"""
+        pos = self.positions.get(token)
+        if pos is None or not 0 < fraction < 1 or price_eur <= 0:
+            return None
+        amount = pos.amount * fraction
+        pos.amount         -= amount
+        pos.sold_amount    += amount
+        pos.sold_value_eur += amount * price_eur
+        self.cash          += amount * price_eur
+        return pos
+
     def close_position(self, token: str, price_eur: float, price_missing: bool = False) -> Optional[dict]:
+        """
+        Schliesst die Position. Nach Teil-Exits wird EIN SELL mit der gesamten
+        Menge zum mengengewichteten Durchschnittspreis gebucht – BUY/SELL Paare
+        in der DB bleiben 1:1.
+        """
         pos = self.positions.pop(token, None)
         if pos is None:
             return None
         sell_value = pos.amount * price_eur
-        pnl_eur    = (price_eur - pos.entry_price_eur) * pos.amount
-        pnl_pct    = ((price_eur - pos.entry_price_eur) / pos.entry_price_eur * 100) if pos.entry_price_eur > 0 else 0
         self.cash += sell_value
+        amount     = pos.amount + pos.sold_amount
+        value      = sell_value + pos.sold_value_eur
+        exit_price = value / amount if amount > 0 else price_eur
+        pnl_eur    = (exit_price - pos.entry_price_eur) * amount
+        pnl_pct    = ((exit_price - pos.entry_price_eur) / pos.entry_price_eur * 100) if pos.entry_price_eur > 0 else 0
         record = {
             'side': 'SELL', 'token': token,
-            'price_eur': price_eur, 'amount': pos.amount,
-            'value_eur': sell_value, 'pnl_eur': pnl_eur,
+            'price_eur': exit_price, 'amount': amount,
+            'value_eur': value, 'pnl_eur': pnl_eur,
             'pnl_percent': pnl_pct, 'entry_price_eur': pos.entry_price_eur,
             'price_missing': price_missing,
             'timestamp': datetime.now().isoformat()
@@ -162,20 +192,26 @@ class WalletAnalysisRunner:
         self.num_parallel_keys: int = 2
         self.source = None
         self.oracle:             Optional[PriceOracle]            = None
+        self.registry:           Optional[TokenRegistry]          = None
+        self.recorder:           Optional[SessionRecorder]        = None
         self.tracker:            Optional[WalletTracker]          = None
+        self.price_store:        Optional[PositionPriceStore]     = None
         self.connection_monitor: Optional[ConnectionHealthMonitor] = None
 
         self.accounts: Dict[str, WalletAccount] = {}
 
         self.max_positions: int = 1
         self.open_positions:    Dict[tuple, tuple] = {}
-        self.price_fail_counts: Dict[tuple, int]   = {}
-        self.inactivity_tracker: Dict[tuple, tuple] = {}
-        self.price_extremes: Dict[tuple, tuple] = {}
-        self.observer_last_price_time: Dict[tuple, float] = {}
-        self.observer_entry_time: Dict[tuple, float] = {}
-        self.observer_stagnation_tracker: Dict[tuple, tuple] = {}
+        # (token, wallet) -> PositionState: SL/TP Trigger, Preis-Ausfaelle,
+        # Inaktivitaet/Stagnation, Entry-Zeit, High/Low
+        self.positions_state = PositionTable()
+        # (token, wallet) -> wallet_trades.id des BUY (Schluessel in position_prices)
+        self.buy_ids: Dict[tuple, int] = {}
+        # Positionen mit laufendem WALLET_SOLD Exit (Preis wird geholt) – Ticks pruefen sie nicht
+        self.closing: Set[tuple] = set()
         self.observer_max_hold_minutes: int = self.OBSERVER_MAX_HOLD_MINUTES_DEFAULT
+        # Exit-Regeln (Trailing / Ladder / Time-Decay) – dieselben wie PaperTradingEngine
+        self.exit_rules = ExitRuleSet()
 
         self.active_token:   Optional[str]           = None
         self.active_account: Optional[WalletAccount] = None
@@ -195,7 +231,10 @@ class WalletAnalysisRunner:
 
     async def run(self):
         # Config zuerst abfragen – sync_wallets braucht die Key-Anzahl
-        self.oracle = PriceOracle()
+        self.registry = TokenRegistry()
+        self.registry.start()
+        self.oracle = PriceOracle(registry=self.registry)
+        self.oracle.price_bus.subscribe(self._on_price_tick)
 
         print()
         print("="*70)
@@ -205,6 +244,15 @@ class WalletAnalysisRunner:
 
         self._get_config_from_user()
 
+        if self.config['metrics']:
+            self.oracle.metrics.serve()
+
+        # Rohdaten-Aufzeichnung: TradeEvents + Oracle-Preise (python main.py replay ...)
+        if self.config['record']:
+            self.recorder = SessionRecorder(path=f"data/recordings/{self.session_id}.jsonl.gz")
+            self.recorder.attach(self.oracle)
+            self.recorder.start()
+
         # Wallets laden – Candidates nach Key-Anzahl gewichtet
         num_keys = self.num_parallel_keys if self.use_parallel else 1
         active_wallets = sync_wallets(num_parallel_keys=num_keys)
@@ -223,6 +271,9 @@ class WalletAnalysisRunner:
             observer_mode=self.observer_mode,
             observer_db_path=obs_path,
         )
+        # Preisverlauf jeder Position (Tuning / Exit-Analyse ohne OHLCV-Refetch)
+        self.price_store = PositionPriceStore(db_path)
+        self.price_store.start()
 
         for w in wallet_addresses:
             self.accounts[w] = WalletAccount(wallet=w)
@@ -403,6 +454,14 @@ class WalletAnalysisRunner:
                 except ValueError:
                     print("    Bitte eine ganze Zahl eingeben!")
 
+            while True:
+                inp = input(" Exit-Regeln (z.B. trail=20@30,ladder=50:0.5,decay=-50:0:60) [keine]: ").strip()
+                try:
+                    self.exit_rules = ExitRuleSet.parse(inp)
+                    break
+                except ValueError as e:
+                    print(f"    {e}")
+
         while True:
             inp = input("  Connection Timeout (Sekunden) [30]: ").strip()
             if not inp:
@@ -418,6 +477,12 @@ class WalletAnalysisRunner:
             except ValueError:
                 print("    Bitte eine ganze Zahl eingeben!")
 
+        inp = input(f" Oracle-Metrics Endpoint (http://127.0.0.1:{METRICS_PORT}) (j/n) [n]: ").strip().lower()
+        self.config['metrics'] = inp in ("j", "ja", "y", "yes")
+
+        inp = input(" Session aufzeichnen (j/n) [j]: ").strip().lower()
+        self.config['record'] = inp not in ("n", "nein", "no")
+
         print()
         print("="*70)
         if self.observer_mode:
@@ -427,6 +492,8 @@ class WalletAnalysisRunner:
             print(f"   Max. Positionen:     {self.max_positions}")
             print(f"   Stagnation-Timeout:  {self.OBSERVER_STAGNATION_MINUTES} Min kein Preischange -> schliessen")
             print(f"   Max-Haltedauer:      {self.observer_max_hold_minutes} Min -> schliessen")
+            if self.exit_rules:
+                print(f"   Exit-Regeln:         {self.exit_rules.spec()}")
             print(f"   Anti-Softlock:       Totalverlust nach {self.OBSERVER_MAX_PRICE_FAILURES}x kein Preis")
             print(f"   Anti-Softlock:       Totalverlust nach {self.OBSERVER_MAX_NO_PRICE_MINUTES} Min ohne Preis")
             print(f"   Session-ID Prefix:   observer_")
@@ -445,6 +512,8 @@ class WalletAnalysisRunner:
             print(f"   Trade-Source:       Multi-Key Rotation -> Top 20 Candidates")
         else:
             print(f"   Trade-Source:       Polling (einzelner Key) -> Top 20 Candidates")
+        print(f"   Aufzeichnung:       {'an (data/recordings/)' if self.config['record'] else 'aus'}")
+        print(f"   Oracle-Metrics:     {f'http://127.0.0.1:{METRICS_PORT}/metrics' if self.config['metrics'] else 'aus'}")
         print("="*70)
         print()
 
@@ -526,7 +595,7 @@ class WalletAnalysisRunner:
                                 trade_event = self.source.extract_trade(tx, wallet, sig)
                                 if trade_event and trade_event.token == token and trade_event.side == "SELL":
                                     missed += 1
-                                    price = await self.oracle.get_price_eur(token)
+                                    price = await self.oracle.get_price_eur(token, caller="reconcile")
                                     exit_price    = price if price else 0.0
                                     price_missing = price is None
                                     if price_missing:
@@ -558,6 +627,10 @@ class WalletAnalysisRunner:
         if account is None:
             return
 
+        if self.recorder:
+            self.recorder.record_trade(trade)
+        self.registry.observe_trade(trade)
+
         in_fast_mode = (
             self.source and
             hasattr(self.source, 'is_fast_polling') and
@@ -582,7 +655,7 @@ class WalletAnalysisRunner:
         if key in self.open_positions:
             return
 
-        price_eur = await self.oracle.get_price_eur(token)
+        price_eur = await self.oracle.get_price_eur(token, caller="buy")
         if not price_eur:
             mode_tag = "[observer]" if self.observer_mode else "[analysis]"
             logger.warning(f"{mode_tag}   BUY skipped  no price for {token[:8]}...")
@@ -592,32 +665,32 @@ class WalletAnalysisRunner:
         if not pos:
             return
 
-        import time
         key = (token, account.wallet)
-        self.open_positions[key]    = (account, price_eur)
-        self.price_fail_counts[key] = 0
+        self.open_positions[key] = (account, price_eur)
         self.total_buys += 1
         self.oracle.set_rate_limit_from_positions(len(self.open_positions))
-        self.price_extremes[key] = (0.0, 0.0)
 
-        if self.observer_mode:
-            self.observer_last_price_time[key]   = time.monotonic()
-            self.observer_entry_time[key]         = time.monotonic()
-            self.observer_stagnation_tracker[key] = (price_eur, time.monotonic())
-        else:
-            self.inactivity_tracker[key] = (price_eur, time.monotonic())
+        # Observer: kein eigener SL/TP -> keine Trigger im Index
+        self.positions_state.add(
+            PositionState(key=key, token=token, entry_price_eur=price_eur, max_pct=0.0, min_pct=0.0),
+            sl_pct=None if self.observer_mode else self.STOP_LOSS_PERCENT,
+            tp_pct=None if self.observer_mode else self.TAKE_PROFIT_PERCENT,
+        )
 
         self.active_token   = token
         self.active_account = account
         self.last_price     = price_eur
 
-        self.tracker.record_buy(
+        buy_id = self.tracker.record_buy(
             session_id=self.session_id,
             wallet=account.wallet,
             token=token,
             amount=pos.amount,
             price_eur=price_eur
         )
+        if buy_id is not None:
+            self.buy_ids[key] = buy_id
+            self.price_store.open(buy_id, price_eur)
 
         mode_tag  = "OBSERVER" if self.observer_mode else "ANALYSIS"
         slots_str = f"{len(self.open_positions)}/{self.max_positions}"
@@ -644,22 +717,26 @@ class WalletAnalysisRunner:
 
     async def _handle_sell(self, account: WalletAccount, token: str):
         key = (token, account.wallet)
-        if self.open_positions.get(key) is None:
+        if self.open_positions.get(key) is None or key in self.closing:
             return
 
-        price_eur     = await self.oracle.get_price_eur(token, skip_cache=True)
-        price_missing = price_eur is None
-        if price_missing:
-            logger.warning(f"[analysis]   SELL  no price for {token[:8]}..., assuming total loss (0 EUR)")
-            price_eur = 0.0
-
-        await self._close_position(
-            token=token, account=account,
-            price_eur=price_eur,
-            reason="WALLET_SOLD",
-            trigger_label=f"{account.wallet[:8]}... sold",
-            price_missing=price_missing
-        )
+        self.closing.add(key)
+        try:
+            price_eur     = await self.oracle.get_price_eur(token, skip_cache=True, caller="sell")
+            price_missing = price_eur is None
+            if price_missing:
+                logger.warning(f"[analysis]   SELL  no price for {token[:8]}..., assuming total loss (0 EUR)")
+                price_eur = 0.0
+
+            await self._close_position(
+                token=token, account=account,
+                price_eur=price_eur,
+                reason="WALLET_SOLD",
+                trigger_label=f"{account.wallet[:8]}... sold",
+                price_missing=price_missing
+            )
+        finally:
+            self.closing.discard(key)
 
     # ──────────────────────────────────────────────────────────────────
     # POSITION SCHLIESSEN
@@ -680,12 +757,11 @@ class WalletAnalysisRunner:
 
         key = (token, account.wallet)
         self.open_positions.pop(key, None)
-        self.price_fail_counts.pop(key, None)
-        self.inactivity_tracker.pop(key, None)
-        self.observer_last_price_time.pop(key, None)
-        self.observer_entry_time.pop(key, None)
-        self.observer_stagnation_tracker.pop(key, None)
-        max_pct, min_pct = self.price_extremes.pop(key, (None, None))
+        state = self.positions_state.remove(key)
+        max_pct, min_pct = (state.max_pct, state.min_pct) if state else (None, None)
+        buy_id = self.buy_ids.pop(key, None)
+        if buy_id is not None:
+            self.price_store.close(buy_id, None if price_missing else price_eur)
         self.total_sells += 1
         self.oracle.set_rate_limit_from_positions(len(self.open_positions))
 
@@ -729,7 +805,7 @@ class WalletAnalysisRunner:
             wallet=account.wallet,
             token=token,
             amount=record['amount'],
-            price_eur=price_eur,
+            price_eur=record['price_eur'],
             entry_price_eur=record['entry_price_eur'],
             price_missing=price_missing,
             max_price_pct=max_pct,
@@ -859,8 +935,160 @@ class WalletAnalysisRunner:
         else:
             await self._price_update_loop_analysis()
 
+    def _current_interval(self) -> int:
+        return (
+            self.PRICE_UPDATE_INTERVAL_FAST
+            if self.source and getattr(self.source, 'is_fast_polling', False)
+            else self.PRICE_UPDATE_INTERVAL_NORMAL
+        )
+
+    async def _fetch_open_tokens(self) -> Dict[str, Optional[float]]:
+        """
+        Holt frische Preise fuer alle Tokens mit offener Position (parallel, je Token 1x).
+        Jeder erfolgreiche Preis laeuft als PriceTick ueber den Bus -> _on_price_tick.
+        """
+        tokens  = list(dict.fromkeys(key[0] for key in self.open_positions))
+        results = await asyncio.gather(
+            *(self.oracle.get_price_eur(token, skip_cache=True, caller="price_loop") for token in tokens),
+            return_exceptions=True,
+        )
+        prices = {}
+        for token, result in zip(tokens, results):
+            if isinstance(result, Exception):
+                logger.error(f"[PriceMonitor] Error updating {token[:8]}: {result}")
+                result = None
+            prices[token] = result
+        return prices
+
+    async def _on_price_tick(self, tick: PriceTick):
+        """
+        Frischer Preis -> sofortige Pruefung aller Positionen in diesem Token.
+        SL/TP ueber den Trigger-Index (bisect), Timer pro betroffener Position.
+        """
+        token = tick.token
+        keys  = self.positions_state.keys_for_token(token)
+        if not keys:
+            return
+
+        sl_hits, tp_hits = self.positions_state.crossed(token, tick.price_eur)
+        sl_hits, tp_hits = set(sl_hits), set(tp_hits)
+
+        for key in keys:
+            entry = self.open_positions.get(key)
+            if entry is None or key in self.closing:
+                continue
+            account = entry[0]
+            try:
+                if self.observer_mode:
+                    await self._evaluate_observer(key, account, tick.price_eur, tick.source)
+                else:
+                    await self._evaluate_analysis(
+                        key, account, tick.price_eur, tick.source,
+                        sl_hit=key in sl_hits, tp_hit=key in tp_hits,
+                    )
+            except Exception as e:
+                logger.error(f"[PriceMonitor] Error evaluating {token[:8]}: {e}")
+
+    async def _evaluate_observer(self, key: tuple, account: WalletAccount, current_price: float, source: str):
+        token = key[0]
+        pos   = account.positions.get(token)
+        state = self.positions_state.get(key)
+        if pos is None or state is None:
+            return
+
+        now        = get_clock().monotonic()
+        change_pct = state.observe(current_price, now)
+        if key in self.buy_ids:
+            self.price_store.add(self.buy_ids[key], current_price)
+        pnl_eur    = (current_price - pos.entry_price_eur) * pos.amount
+        pnl_pct    = state.pnl_pct(current_price)
+        self.open_positions[key] = (account, current_price)
+
+        stagnation_mins = state.unchanged_seconds(now) / 60
+        hold_mins       = state.held_seconds(now) / 60
+
+        emoji = "" if pnl_eur > 0 else "" if pnl_eur < 0 else ""
+        timeout_hint = ""
+        if stagnation_mins > 5:
+            timeout_hint += f" | Stagnation: {stagnation_mins:.0f}/{self.OBSERVER_STAGNATION_MINUTES} Min"
+        if hold_mins > 10:
+            timeout_hint += f" | Haltedauer: {hold_mins:.0f}/{self.observer_max_hold_minutes} Min"
+        print(f"{emoji} [Observer] {token[:8]}... @ {current_price:.8f} EUR | P&L: {pnl_eur:+.2f} EUR ({pnl_pct:+.2f}%) | Change: {change_pct:+.2f}% [{source}]" + timeout_hint)
+
+        if stagnation_mins >= self.OBSERVER_STAGNATION_MINUTES:
+            logger.warning(f"[Observer/Stagnation]  {token[:8]}... kein Preischange seit {stagnation_mins:.0f} Min -> schliessen")
+            await self._close_position(token=token, account=account, price_eur=current_price, reason="OBSERVER_STAGNATION", trigger_label=f"Kein Preischange seit {stagnation_mins:.0f} Min")
+            return
+
+        if hold_mins >= self.observer_max_hold_minutes:
+            logger.warning(f"[Observer/MaxHold]  {token[:8]}... seit {hold_mins:.0f} Min offen -> schliessen")
+            await self._close_position(token=token, account=account, price_eur=current_price, reason="OBSERVER_MAX_HOLD", trigger_label=f"Max-Haltedauer {hold_mins:.0f} Min erreicht")
+            return
+
+        if self.exit_rules:
+            decision = self.exit_rules.evaluate(state, current_price, now)
+            if decision is not None:
+                await self._apply_exit(key, account, current_price, decision)
+
+    async def _apply_exit(self, key: tuple, account: WalletAccount, price_eur: float, decision: ExitDecision):
+        """Exit-Regel im Observer: voller Exit schliesst, Teil-Exit reduziert die Position"""
+        token = key[0]
+        logger.info(f"[Observer/ExitRules]  {token[:8]}... {decision.label}")
+        if decision.is_full:
+            await self._close_position(token=token, account=account, price_eur=price_eur, reason=decision.reason, trigger_label=decision.label)
+            return
+        if account.reduce_position(token, decision.fraction, price_eur):
+            ExitRuleSet.apply(self.positions_state.get(key), decision)
+            print(f" [Observer] PARTIAL {token[:8]}... {decision.fraction*100:.0f}% @ {price_eur:.8f} EUR | {decision.label}")
+
+    async def _evaluate_analysis(self, key: tuple, account: WalletAccount, current_price: float, source: str,
+                                 sl_hit: bool = False, tp_hit: bool = False):
+        token = key[0]
+        pos   = account.positions.get(token)
+        state = self.positions_state.get(key)
+        if pos is None or state is None:
+            return
+
+        now        = get_clock().monotonic()
+        change_pct = state.observe(current_price, now)
+        if key in self.buy_ids:
+            self.price_store.add(self.buy_ids[key], current_price)
+        pnl_eur    = (current_price - pos.entry_price_eur) * pos.amount
+        pnl_pct    = state.pnl_pct(current_price)
+        self.open_positions[key] = (account, current_price)
+
+        inactive_secs = state.unchanged_seconds(now)
+        timeout       = self.tracker.get_inactivity_timeout([account.wallet]) if inactive_secs > 0 else None
+
+        emoji = "" if pnl_eur > 0 else "" if pnl_eur < 0 else ""
+        print(
+            f"{emoji} [PriceMonitor] {token[:8]}... @ {current_price:.8f} EUR "
+            f"| P&L: {pnl_eur:+.2f} EUR ({pnl_pct:+.2f}%) "
+            f"| Change: {change_pct:+.2f}% [{source}]"
+            + (f" | Inaktiv: {inactive_secs/60:.1f}/{timeout//60} Min" if timeout and inactive_secs > 30 else "")
+        )
+
+        if timeout is not None and inactive_secs >= timeout:
+            logger.warning(f"[Inactivity]  {token[:8]}... no price change for {inactive_secs/60:.1f} min -> closing")
+            tags = self.tracker.add_inactivity_tag(account.wallet)
+            logger.info(f"[Inactivity] Tag {account.wallet[:8]}...  {tags}/3")
+            await self._close_position(token=token, account=account, price_eur=current_price, reason="INACTIVITY", trigger_label=f"Inaktiv {inactive_secs/60:.1f} min (limit {timeout//60} min)")
+            return
+
+        if sl_hit:
+            logger.warning(f"[StopLoss]  {token[:8]}... hit stop-loss ({pnl_pct:.1f}% <= {self.STOP_LOSS_PERCENT:.0f}%)")
+            await self._close_position(token=token, account=account, price_eur=current_price, reason="STOP_LOSS", trigger_label=f"Stop-Loss @ {pnl_pct:.1f}%")
+            return
+
+        if tp_hit:
+            logger.info(f"[TakeProfit]  {token[:8]}... hit take-profit ({pnl_pct:.1f}% >= +{self.TAKE_PROFIT_PERCENT:.0f}%)")
+            await self._close_position(token=token, account=account, price_eur=current_price, reason="TAKE_PROFIT", trigger_label=f"Take-Profit @ +{pnl_pct:.1f}%")
+
     async def _price_update_loop_observer(self):
-        import time
+        """
+        Price-Poller (Observer): holt Preise, Pruefung laeuft im Tick-Handler.
+        Hier bleibt nur die Anti-Softlock Logik fuer fehlende Preise.
+        """
         logger.info(
             f"[Observer/PriceMonitor] Started "
             f"(normal: {self.PRICE_UPDATE_INTERVAL_NORMAL}s | fast: {self.PRICE_UPDATE_INTERVAL_FAST}s | "
@@ -869,84 +1097,38 @@ class WalletAnalysisRunner:
         )
         try:
             while True:
-                interval = (
-                    self.PRICE_UPDATE_INTERVAL_FAST
-                    if self.source and getattr(self.source, 'is_fast_polling', False)
-                    else self.PRICE_UPDATE_INTERVAL_NORMAL
-                )
-                await asyncio.sleep(interval)
+                await get_clock().sleep(self._current_interval())
 
                 if not self.open_positions:
                     break
 
-                for key, (account, _) in list(self.open_positions.items()):
-                    token = key[0]
-                    pos = account.positions.get(token)
-                    if pos is None:
-                        continue
+                prices = await self._fetch_open_tokens()
 
-                    current_price = await self.oracle.get_price_eur(token, skip_cache=True)
+                for token, current_price in prices.items():
+                    if current_price is not None:
+                        continue
 
-                    if current_price is None:
-                        fails = self.price_fail_counts.get(key, 0) + 1
-                        self.price_fail_counts[key] = fails
+                    for key in self.positions_state.keys_for_token(token):
+                        entry = self.open_positions.get(key)
+                        if entry is None or key in self.closing:
+                            continue
+                        account = entry[0]
+                        state   = self.positions_state.get(key)
+                        state.price_fail_count += 1
+                        fails = state.price_fail_count
 
                         if fails >= self.OBSERVER_MAX_PRICE_FAILURES:
                             logger.warning(f"[Observer/PriceMonitor]  {token[:8]}... {self.OBSERVER_MAX_PRICE_FAILURES}x kein Preis -> Totalverlust")
                             await self._close_position(token=token, account=account, price_eur=0.0, reason="PRICE_UNAVAILABLE", trigger_label=f"{self.OBSERVER_MAX_PRICE_FAILURES}x kein Preis abrufbar", price_missing=True)
                             continue
 
-                        last_ok = self.observer_last_price_time.get(key, time.monotonic())
-                        no_price_mins = (time.monotonic() - last_ok) / 60
+                        no_price_mins = state.no_price_seconds() / 60
                         if no_price_mins >= self.OBSERVER_MAX_NO_PRICE_MINUTES:
                             logger.warning(f"[Observer/PriceMonitor]  {token[:8]}... {no_price_mins:.1f} Min kein Preis -> Totalverlust")
                             await self._close_position(token=token, account=account, price_eur=0.0, reason="PRICE_UNAVAILABLE", trigger_label=f"{no_price_mins:.0f} Min kein Preis abrufbar", price_missing=True)
                             continue
 
                         logger.warning(f"[Observer/PriceMonitor]   No price for {token[:8]}... ({fails}/{self.OBSERVER_MAX_PRICE_FAILURES} failures, {no_price_mins:.1f}/{self.OBSERVER_MAX_NO_PRICE_MINUTES} Min)")
-                        continue
-
-                    self.price_fail_counts[key] = 0
-                    self.observer_last_price_time[key] = time.monotonic()
-
-                    entry_price = pos.entry_price_eur
-                    pnl_eur     = (current_price - entry_price) * pos.amount
-                    pnl_pct     = ((current_price - entry_price) / entry_price) * 100
-                    last_price  = self.open_positions[key][1]
-                    change_pct  = ((current_price - last_price) / last_price * 100) if last_price > 0 else 0
-                    self.open_positions[key] = (account, current_price)
-
-                    if entry_price > 0:
-                        current_pct = ((current_price - entry_price) / entry_price) * 100
-                        prev_max, prev_min = self.price_extremes.get(key, (current_pct, current_pct))
-                        self.price_extremes[key] = (max(prev_max, current_pct), min(prev_min, current_pct))
-
-                    stag_price, stag_time = self.observer_stagnation_tracker.get(key, (current_price, time.monotonic()))
-                    if current_price != stag_price:
-                        self.observer_stagnation_tracker[key] = (current_price, time.monotonic())
-                        stag_time = time.monotonic()
-                    stagnation_mins = (time.monotonic() - stag_time) / 60
-
-                    entry_t   = self.observer_entry_time.get(key, time.monotonic())
-                    hold_mins = (time.monotonic() - entry_t) / 60
-
-                    emoji = "" if pnl_eur > 0 else "" if pnl_eur < 0 else ""
-                    timeout_hint = ""
-                    if stagnation_mins > 5:
-                        timeout_hint += f" | Stagnation: {stagnation_mins:.0f}/{self.OBSERVER_STAGNATION_MINUTES} Min"
-                    if hold_mins > 10:
-                        timeout_hint += f" | Haltedauer: {hold_mins:.0f}/{self.observer_max_hold_minutes} Min"
-                    print(f"{emoji} [Observer] {token[:8]}... @ {current_price:.8f} EUR | P&L: {pnl_eur:+.2f} EUR ({pnl_pct:+.2f}%) | Last {interval}s: {change_pct:+.2f}%" + timeout_hint)
-
-                    if stagnation_mins >= self.OBSERVER_STAGNATION_MINUTES:
-                        logger.warning(f"[Observer/Stagnation]  {token[:8]}... kein Preischange seit {stagnation_mins:.0f} Min -> schliessen")
-                        await self._close_position(token=token, account=account, price_eur=current_price, reason="OBSERVER_STAGNATION", trigger_label=f"Kein Preischange seit {stagnation_mins:.0f} Min")
-                        continue
-
-                    if hold_mins >= self.observer_max_hold_minutes:
-                        logger.warning(f"[Observer/MaxHold]  {token[:8]}... seit {hold_mins:.0f} Min offen -> schliessen")
-                        await self._close_position(token=token, account=account, price_eur=current_price, reason="OBSERVER_MAX_HOLD", trigger_label=f"Max-Haltedauer {hold_mins:.0f} Min erreicht")
-                        continue
 
         except asyncio.CancelledError:
             logger.info("[Observer/PriceMonitor] Stopped")
@@ -954,7 +1136,10 @@ class WalletAnalysisRunner:
             logger.error(f"[Observer/PriceMonitor] Crashed: {e}")
 
     async def _price_update_loop_analysis(self):
-        import time
+        """
+        Price-Poller (Analysis): holt Preise, SL/TP/Inaktivitaet laeuft im Tick-Handler.
+        Hier bleibt nur der Totalverlust nach MAX_PRICE_FAILURES fehlenden Preisen.
+        """
         logger.info(
             f"[PriceMonitor] Started "
             f"(normal: {self.PRICE_UPDATE_INTERVAL_NORMAL}s | fast: {self.PRICE_UPDATE_INTERVAL_FAST}s | "
@@ -963,78 +1148,29 @@ class WalletAnalysisRunner:
         )
         try:
             while True:
-                interval = (
-                    self.PRICE_UPDATE_INTERVAL_FAST
-                    if self.source and getattr(self.source, 'is_fast_polling', False)
-                    else self.PRICE_UPDATE_INTERVAL_NORMAL
-                )
-                await asyncio.sleep(interval)
+                await get_clock().sleep(self._current_interval())
 
                 if not self.open_positions:
                     break
 
-                for key, (account, _) in list(self.open_positions.items()):
-                    token = key[0]
-                    pos = account.positions.get(token)
-                    if pos is None:
-                        continue
+                prices = await self._fetch_open_tokens()
 
-                    current_price = await self.oracle.get_price_eur(token, skip_cache=True)
+                for token, current_price in prices.items():
+                    if current_price is not None:
+                        continue
 
-                    if current_price is None:
-                        self.price_fail_counts[key] = self.price_fail_counts.get(key, 0) + 1
-                        fails = self.price_fail_counts[key]
+                    for key in self.positions_state.keys_for_token(token):
+                        entry = self.open_positions.get(key)
+                        if entry is None or key in self.closing:
+                            continue
+                        account = entry[0]
+                        state   = self.positions_state.get(key)
+                        state.price_fail_count += 1
+                        fails = state.price_fail_count
                         logger.warning(f"[PriceMonitor]   No price for {token[:8]}... ({fails}/{MAX_PRICE_FAILURES} failures)")
                         if fails >= MAX_PRICE_FAILURES:
                             logger.warning(f"[PriceMonitor]  {token[:8]}...  {MAX_PRICE_FAILURES}x no price. Assuming total loss (0 EUR).")
                             await self._close_position(token=token, account=account, price_eur=0.0, reason="PRICE_UNAVAILABLE", trigger_label=f"{MAX_PRICE_FAILURES}x kein Preis abrufbar", price_missing=True)
-                        continue
-
-                    self.price_fail_counts[key] = 0
-
-                    entry_price = pos.entry_price_eur
-                    pnl_eur     = (current_price - entry_price) * pos.amount
-                    pnl_pct     = ((current_price - entry_price) / entry_price) * 100
-                    last_price  = self.open_positions[key][1]
-                    change_pct  = ((current_price - last_price) / last_price * 100) if last_price > 0 else 0
-                    self.open_positions[key] = (account, current_price)
-
-                    if pos.entry_price_eur > 0:
-                        current_pct = ((current_price - pos.entry_price_eur) / pos.entry_price_eur) * 100
-                        prev_max, prev_min = self.price_extremes.get(key, (current_pct, current_pct))
-                        self.price_extremes[key] = (max(prev_max, current_pct), min(prev_min, current_pct))
-
-                    last_changed_price, last_changed_time = self.inactivity_tracker.get(key, (current_price, time.monotonic()))
-                    if current_price != last_changed_price:
-                        self.inactivity_tracker[key] = (current_price, time.monotonic())
-                        last_changed_time = time.monotonic()
-
-                    timeout       = self.tracker.get_inactivity_timeout([account.wallet])
-                    inactive_secs = time.monotonic() - last_changed_time
-
-                    emoji = "" if pnl_eur > 0 else "" if pnl_eur < 0 else ""
-                    print(
-                        f"{emoji} [PriceMonitor] {token[:8]}... @ {current_price:.8f} EUR "
-                        f"| P&L: {pnl_eur:+.2f} EUR ({pnl_pct:+.2f}%) "
-                        f"| Last {interval}s: {change_pct:+.2f}%"
-                        + (f" | Inaktiv: {inactive_secs/60:.1f}/{timeout//60} Min" if inactive_secs > 30 else "")
-                    )
-
-                    if inactive_secs >= timeout:
-                        logger.warning(f"[Inactivity]  {token[:8]}... no price change for {inactive_secs/60:.1f} min -> closing")
-                        tags = self.tracker.add_inactivity_tag(account.wallet)
-                        logger.info(f"[Inactivity] Tag {account.wallet[:8]}...  {tags}/3")
-                        await self._close_position(token=token, account=account, price_eur=current_price, reason="INACTIVITY", trigger_label=f"Inaktiv {inactive_secs/60:.1f} min (limit {timeout//60} min)")
-                        continue
-
-                    if pnl_pct <= self.STOP_LOSS_PERCENT:
-                        logger.warning(f"[StopLoss]  {token[:8]}... hit stop-loss ({pnl_pct:.1f}% <= {self.STOP_LOSS_PERCENT:.0f}%)")
-                        await self._close_position(token=token, account=account, price_eur=current_price, reason="STOP_LOSS", trigger_label=f"Stop-Loss @ {pnl_pct:.1f}%")
-                        continue
-
-                    if pnl_pct >= self.TAKE_PROFIT_PERCENT:
-                        logger.info(f"[TakeProfit]  {token[:8]}... hit take-profit ({pnl_pct:.1f}% >= +{self.TAKE_PROFIT_PERCENT:.0f}%)")
-                        await self._close_position(token=token, account=account, price_eur=current_price, reason="TAKE_PROFIT", trigger_label=f"Take-Profit @ +{pnl_pct:.1f}%")
 
         except asyncio.CancelledError:
             logger.info("[PriceMonitor] Stopped")
@@ -1096,7 +1232,7 @@ class WalletAnalysisRunner:
             print(f"\n Closing {len(self.open_positions)} open position(s) at current market price...")
             for key, (account, _) in list(self.open_positions.items()):
                 token = key[0]
-                price = await self.oracle.get_price_eur(token, skip_cache=True)
+                price = await self.oracle.get_price_eur(token, skip_cache=True, caller="shutdown")
                 price_missing = price is None
                 if price_missing:
                     price = 0.0
@@ -1194,6 +1330,17 @@ class WalletAnalysisRunner:
         if self.oracle:
             await self.oracle.close()
 
+        if self.registry:
+            await self.registry.close()
+
+        if self.price_store:
+            await self.price_store.stop()
+            logger.info(f"[PositionPrices] {self.price_store.summary()}")
+
+        if self.recorder:
+            await self.recorder.close()
+            print(f" Session recorded: {self.recorder.summary()}")
+
 
 async def main():
     runner = WalletAnalysisRunner()
@@ -0,0 +1,272 @@
+"""
+Token Balance Watch - Exit-Trigger ueber die Token-Accounts der kopierten Wallets
+
+Der Exit einer Position haengt am SELL des Trigger-Wallets. Bisher erkennt
+ihn nur das Polling: getSignaturesForAddress alle 0.5s, danach getTransaction
+und Parsing – Sekunden Verzoegerung auf dem latenzkritischsten Pfad.
+
+Optional (paper_mainnet: "Balance-Watch"): fuer jede offene Position
+  - getTokenAccountsByOwner(wallet, mint) pro Trigger-Wallet -> Token-Account
+    und aktueller Bestand
+  - accountSubscribe (WebSocket, jsonParsed) auf diese Token-Accounts
+  - sinkt der Bestand um mehr als min_drop_percent (oder wird der Account
+    geschlossen), ruft der Watcher on_drop(wallet, token, menge) auf – die
+    Engine schliesst sofort (PaperTradingEngine.on_balance_drop)
+
+Der Exit laeuft ueber dieselbe SELL-Order-ID wie der spaeter geparste
+Trade ("SELL:token:n") – erkennt das Polling den Verkauf danach, ist das
+ein Duplikat und wird nicht erneut ausgefuehrt. Auch ein Transfer senkt den
+Bestand; das gilt hier bewusst als Exit-Signal (die Wallet haelt den Token
+nicht mehr).
+"""
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Set
+
+import aiohttp
+import websockets
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _WatchedAccount:
+    account: str
+    wallet: str
+    token: str
+    balance: float
+    sub_id: Optional[int] = None
+    request_id: Optional[int] = None    # laufender accountSubscribe (Antwort steht noch aus)
+
+
+def _ui_amount(value: Optional[dict]) -> float:
+    """uiAmount aus einem jsonParsed Token-Account (geschlossener Account -> 0)"""
+    try:
+        amount = value["data"]["parsed"]["info"]["tokenAmount"]
+        return float(amount.get("uiAmountString") or amount.get("uiAmount") or 0)
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+class TokenBalanceWatcher:
+    """
+    Haelt eine WebSocket-Verbindung mit accountSubscribe pro Token-Account
+    der Trigger-Wallets offener Positionen.
+
+    on_drop: Callable(wallet, token, amount) – sync oder async.
+    """
+
+    def __init__(self, ws_url: str, http_url: str, on_drop: Callable,
+                 min_drop_percent: float = 1.0, reconnect_delay: float = 3.0):
+        self.ws_url = ws_url
+        self.http_url = http_url
+        self.on_drop = on_drop
+        self.min_drop_percent = min_drop_percent
+        self.reconnect_delay = reconnect_delay
+
+        self._wanted: Dict[str, Set[str]] = {}             # token -> Trigger-Wallets
+        self._accounts: Dict[str, _WatchedAccount] = {}    # Token-Account -> Zustand
+        self._subs: Dict[int, str] = {}                    # sub_id -> Token-Account
+        self._requests: Dict[int, str] = {}                # Request-ID -> Token-Account
+        self._next_id = 0
+        self._commands: asyncio.Queue = asyncio.Queue()
+        self._ws = None
+        self._task: Optional[asyncio.Task] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        self.drops = 0
+        self.notifications = 0
+
+    # ------------------------------------------------------------------
+    # Steuerung (Engine)
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Startet die WebSocket-Verbindung (benoetigt laufenden Event Loop)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    def watch(self, token: str, wallets: Set[str]):
+        """Beobachtet die Token-Accounts der Wallets fuer token (Position eroeffnet)"""
+        self._wanted[token] = set(wallets)
+        self._commands.put_nowait(("watch", token))
+
+    def unwatch(self, token: str):
+        """Position geschlossen -> Subscriptions fuer token beenden"""
+        if self._wanted.pop(token, None) is not None:
+            self._commands.put_nowait(("unwatch", token))
+
+    def watched_accounts(self) -> int:
+        return len(self._accounts)
+
+    # ------------------------------------------------------------------
+    # Verbindung
+    # ------------------------------------------------------------------
+
+    async def _run(self):
+        while True:
+            try:
+                async with websockets.connect(self.ws_url, ping_interval=20,
+                                              open_timeout=10, close_timeout=5) as ws:
+                    self._ws = ws
+                    logger.info(f"[BalanceWatch] Connected ({len(self._wanted)} token(s))")
+                    # Nach (Re)Connect: alle Subscriptions neu, Bestaende frisch
+                    self._accounts.clear()
+                    self._subs.clear()
+                    self._requests.clear()
+                    while not self._commands.empty():
+                        self._commands.get_nowait()
+                    for token in list(self._wanted):
+                        await self._subscribe_token(token)
+                    commands = asyncio.create_task(self._command_loop())
+                    try:
+                        async for message in ws:
+                            await self._handle_message(message)
+                    finally:
+                        commands.cancel()
+                        await asyncio.gather(commands, return_exceptions=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[BalanceWatch] Connection error: {e} - reconnect in {self.reconnect_delay:.0f}s")
+            finally:
+                self._ws = None
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _command_loop(self):
+        while True:
+            action, token = await self._commands.get()
+            try:
+                if action == "watch":
+                    await self._subscribe_token(token)
+                else:
+                    await self._unsubscribe_token(token)
+            except Exception as e:
+                logger.error(f"[BalanceWatch] {action} {token[:8]}... failed: {e}")
+
+    async def _send(self, method: str, params: list, account: Optional[str] = None) -> int:
+        self._next_id += 1
+        request_id = self._next_id
+        if account is not None:
+            self._requests[request_id] = account
+        await self._ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id,
+                                        "method": method, "params": params}))
+        return request_id
+
+    async def _subscribe_token(self, token: str):
+        wallets = self._wanted.get(token)
+        if not wallets or self._ws is None:
+            return
+        known = {(a.wallet, a.token) for a in self._accounts.values()}
+        found = await asyncio.gather(
+            *(self._token_accounts(wallet, token) for wallet in wallets if (wallet, token) not in known),
+            return_exceptions=True,
+        )
+        for result in found:
+            if isinstance(result, Exception):
+                logger.debug(f"[BalanceWatch] getTokenAccountsByOwner failed: {result}")
+                continue
+            for watched in result:
+                if watched.account in self._accounts or token not in self._wanted:
+                    continue
+                self._accounts[watched.account] = watched
+                watched.request_id = await self._send(
+                    "accountSubscribe",
+                    [watched.account, {"encoding": "jsonParsed", "commitment": "processed"}],
+                    account=watched.account,
+                )
+        logger.info(f"[BalanceWatch] {token[:8]}... watching "
+                    f"{sum(1 for a in self._accounts.values() if a.token == token)} token account(s)")
+
+    async def _unsubscribe_token(self, token: str):
+        # Noch unbeantwortete accountSubscribe bleiben in _requests – kommt die
+        # Antwort spaeter, beendet _handle_message die Subscription dort
+        for account, watched in list(self._accounts.items()):
+            if watched.token != token:
+                continue
+            del self._accounts[account]
+            if watched.sub_id is not None:
+                self._subs.pop(watched.sub_id, None)
+                if self._ws is not None:
+                    await self._send("accountUnsubscribe", [watched.sub_id])
+
+    async def _token_accounts(self, wallet: str, token: str) -> list:
+        """Token-Accounts (SPL + Token-2022) einer Wallet fuer einen Mint samt Bestand"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        payload = {
+            "jsonrpc": "2.0", "id": 1,
+            "method": "getTokenAccountsByOwner",
+            "params": [wallet, {"mint": token}, {"encoding": "jsonParsed", "commitment": "processed"}],
+        }
+        async with self._session.post(self.http_url, json=payload,
+                                      timeout=aiohttp.ClientTimeout(total=5)) as response:
+            data = await response.json()
+        if "error" in data:
+            raise RuntimeError(data["error"])
+        return [
+            _WatchedAccount(account=entry["pubkey"], wallet=wallet, token=token,
+                            balance=_ui_amount(entry.get("account")))
+            for entry in (data.get("result") or {}).get("value", [])
+        ]
+
+    # ------------------------------------------------------------------
+    # Nachrichten
+    # ------------------------------------------------------------------
+
+    async def _handle_message(self, message: str):
+        data = json.loads(message)
+
+        # Antwort auf accountSubscribe: sub_id zuordnen
+        if "id" in data:
+            account = self._requests.pop(data["id"], None)
+            if account is None:
+                return
+            watched = self._accounts.get(account)
+            if "result" in data:
+                if watched is not None and watched.request_id == data["id"]:
+                    watched.sub_id = data["result"]
+                    watched.request_id = None
+                    self._subs[watched.sub_id] = account
+                elif self._ws is not None:
+                    # Inzwischen unwatch (oder neu abonniert): verspaetete Subscription beenden
+                    await self._send("accountUnsubscribe", [data["result"]])
+            elif "error" in data:
+                logger.warning(f"[BalanceWatch] Subscribe {account[:8]}... failed: {data['error']}")
+            return
+
+        if data.get("method") != "accountNotification":
+            return
+        params = data.get("params", {})
+        account = self._subs.get(params.get("subscription"))
+        watched = self._accounts.get(account) if account else None
+        if watched is None:
+            return
+
+        self.notifications += 1
+        balance = _ui_amount((params.get("result") or {}).get("value"))
+        previous = watched.balance
+        watched.balance = balance
+        if previous <= 0 or balance >= previous * (1 - self.min_drop_percent / 100):
+            return
+
+        self.drops += 1
+        amount = previous - balance
+        logger.info(f"[BalanceWatch] {watched.wallet[:8]}... {watched.token[:8]}... "
+                    f"balance {previous:,.0f} -> {balance:,.0f}")
+        result = self.on_drop(watched.wallet, watched.token, amount)
+        if asyncio.iscoroutine(result):
+            await result
@@ -0,0 +1,186 @@
+"""
+Clock - Zeitquelle fuer Engine, Simulation, Connection Monitor und Redundancy Engine
+
+Live laeuft alles auf der WallClock (time.time / asyncio.sleep).
+Fuer Replays, Backtests und den Offline-Runner gibt es die VirtualClock:
+sleep() registriert nur einen Timer, die Zeit springt direkt zum naechsten
+faelligen Timer, sobald alle Tasks warten. Eine Ausfuehrungsverzoegerung von
+3s kostet so keine Wall-Clock Zeit – ihr Effekt bleibt aber erhalten: waehrend
+der Verzoegerung laufen andere Tasks (Preis-Ticks, Trades) in virtueller Zeit
+weiter, Drift und Fill-Preis sehen dieselbe Zeitspanne wie live.
+
+Injektion: Komponenten nehmen optional clock=..., sonst gilt die
+Prozess-Uhr (get_clock / set_clock).
+
+Zeitwerte sind Unix-Sekunden (float). monotonic() ist live time.monotonic(),
+virtuell identisch mit time() – Differenzen bleiben in beiden Faellen korrekt.
+"""
+import asyncio
+import heapq
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+
+class WallClock:
+    """Echte Zeit"""
+
+    virtual = False
+
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    async def sleep_until(self, timestamp: float):
+        await asyncio.sleep(max(0.0, timestamp - time.time()))
+
+
+class VirtualClock:
+    """
+    Simulierte Zeit mit Timer-Queue.
+
+    Die Zeit bewegt sich nur durch run() (springt zum naechsten Timer, wenn
+    nichts anderes mehr laufen kann) oder advance_to(). Beide wecken die
+    Schlaefer streng in Zeitreihenfolge – bei gleichem Startzustand laeuft
+    jeder Durchlauf identisch ab.
+    """
+
+    virtual = True
+
+    # Obergrenze der Event-Loop Durchlaeufe pro Settle (Schutz gegen Tasks,
+    # die sich mit sleep(0) endlos selbst wieder einplanen)
+    MAX_SETTLE_YIELDS = 10_000
+
+    def __init__(self, start: Optional[float] = None):
+        self._now = float(start) if start is not None else time.time()
+        self._timers: List[Tuple[float, int, asyncio.Future]] = []
+        self._seq = 0
+
+    def time(self) -> float:
+        return self._now
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self._now)
+
+    def pending(self) -> int:
+        return sum(1 for _, _, fut in self._timers if not fut.done())
+
+    async def sleep(self, seconds: float):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._seq += 1
+        heapq.heappush(self._timers, (self._now + seconds, self._seq, fut))
+        await fut
+
+    async def sleep_until(self, timestamp: float):
+        await self.sleep(timestamp - self._now)
+
+    # ── Zeit vorruecken ────────────────────────────────────────────────
+
+    async def _settle(self):
+        """
+        Laesst den Loop laufen, bis nichts mehr lauffaehig ist – erst dann
+        haben alle geweckten Tasks ihren naechsten sleep() registriert, egal
+        wie viele Hops (Bus -> Handler -> Order-Lane -> Lock -> sleep) dazwischen
+        liegen. asyncio-Loop: Ready-Queue leer. Andere Loops (uvloop) haben
+        keine sichtbare Ready-Queue: dort muss jeder Task zwei Runden in Folge
+        auf einen offenen Future warten.
+        """
+        ready = getattr(asyncio.get_running_loop(), "_ready", None)
+        idle_rounds = 0
+        for _ in range(self.MAX_SETTLE_YIELDS):
+            await asyncio.sleep(0)
+            if ready is not None:
+                if not ready:
+                    return
+            elif self._all_waiting():
+                idle_rounds += 1
+                if idle_rounds >= 2:
+                    return
+            else:
+                idle_rounds = 0
+
+    @staticmethod
+    def _all_waiting() -> bool:
+        """Jeder andere Task wartet auf einen noch offenen Future (Timer, Lock, I/O)"""
+        current = asyncio.current_task()
+        for task in asyncio.all_tasks():
+            if task is current or task.done():
+                continue
+            waiter = getattr(task, "_fut_waiter", None)
+            if waiter is None or waiter.done():
+                return False
+        return True
+
+    def _fire_next(self) -> bool:
+        """Weckt den naechsten (nicht abgebrochenen) Timer, springt auf dessen Zeit"""
+        while self._timers:
+            when, _, fut = heapq.heappop(self._timers)
+            if fut.done():
+                continue
+            if when > self._now:
+                self._now = when
+            fut.set_result(None)
+            return True
+        return False
+
+    async def advance_to(self, timestamp: float):
+        """Weckt alle Timer bis timestamp (in Reihenfolge), danach Zeit = timestamp"""
+        while self._timers and self._timers[0][0] <= timestamp:
+            if self._fire_next():
+                await self._settle()
+        if timestamp > self._now:
+            self._now = float(timestamp)
+        await self._settle()
+
+    def jump_to(self, timestamp: float):
+        """Setzt die Zeit ohne Timer zu wecken (synchron, z.B. Benchmarks ohne wartende Tasks)"""
+        if timestamp > self._now:
+            self._now = float(timestamp)
+
+    async def run(self, coro, idle_wait: float = 0.01):
+        """
+        Fuehrt coro in virtueller Zeit aus: sobald alle Tasks warten, springt
+        die Uhr zum naechsten Timer. Ohne Timer (Warten auf echtes I/O) wird
+        kurz real gewartet.
+        """
+        task = asyncio.ensure_future(coro)
+        try:
+            while not task.done():
+                await self._settle()
+                if task.done():
+                    break
+                if not self._fire_next():
+                    await asyncio.sleep(idle_wait)
+            return task.result()
+        finally:
+            if not task.done():
+                task.cancel()
+
+
+_clock = WallClock()
+
+
+def get_clock():
+    """Aktive Prozess-Uhr (default: WallClock)"""
+    return _clock
+
+
+def set_clock(clock) -> object:
+    """Setzt die Prozess-Uhr, gibt die vorherige zurueck (zum Wiederherstellen)"""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
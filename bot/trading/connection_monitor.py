@@ -7,6 +7,8 @@ import logging
 from datetime import datetime, timedelta
 from typing import Optional, Callable
 
+from trading.clock import get_clock
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,11 +24,13 @@ class ConnectionHealthMonitor:
         failure_threshold_seconds: int = 30,  # Nach 30s kontinuierlichen Errors  Emergency
         check_interval: float = 5.0,  # Alle 5s Status prüfen
         reconnect_callback: Optional[Callable] = None,  #  NEU: Callback bei Reconnect
+        clock=None,  # Default: Prozess-Uhr (VirtualClock in Tests/Replay)
     ):
         self.emergency_callback = emergency_callback
         self.reconnect_callback = reconnect_callback  #  NEU
         self.failure_threshold = timedelta(seconds=failure_threshold_seconds)
         self.check_interval = check_interval
+        self.clock = clock or get_clock()
         
         # Status Tracking
         self.last_success: Optional[datetime] = None
@@ -48,7 +52,7 @@ class ConnectionHealthMonitor:
     
     def record_success(self):
         """Erfolgreiches RPC Request  Reset Fehler-Counter"""
-        now = datetime.now()
+        now = self.clock.now()
         
         # War vorher disconnected?
         if not self.is_connected:
@@ -75,7 +79,7 @@ class ConnectionHealthMonitor:
     
     def record_failure(self):
         """Fehlgeschlagenes RPC Request  Zähle Fehler"""
-        now = datetime.now()
+        now = self.clock.now()
         self.last_failure = now
         self.consecutive_failures += 1
         
@@ -98,7 +102,7 @@ class ConnectionHealthMonitor:
         
         try:
             while self.running:
-                await asyncio.sleep(self.check_interval)
+                await self.clock.sleep(self.check_interval)
                 
                 # Prüfe ob wir bereits Emergency getriggert haben
                 if self.emergency_triggered:
@@ -113,7 +117,7 @@ class ConnectionHealthMonitor:
                     # Noch nie connected? Warte noch...
                     continue
                 
-                offline_duration = datetime.now() - self.last_success
+                offline_duration = self.clock.now() - self.last_success
                 
                 # Threshold überschritten?
                 if offline_duration > self.failure_threshold:
@@ -161,7 +165,7 @@ class ConnectionHealthMonitor:
     
     def get_status(self) -> dict:
         """Gibt aktuellen Status zurück"""
-        now = datetime.now()
+        now = self.clock.now()
         
         offline_time = None
         if not self.is_connected and self.last_success:
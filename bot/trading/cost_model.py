@@ -0,0 +1,134 @@
+"""
+Cost Model - Vektorisierte Monte-Carlo Ausfuehrungskosten fuer geschlossene Positionen
+
+simulate_buy / simulate_sell ziehen pro Aufruf EINEN Delay, EINE Drift und
+EINEN Failure-Wurf – der Paper-PnL einer Session ist damit eine einzelne
+verrauschte Stichprobe. Hier werden fuer eine Menge geschlossener Positionen
+N Szenarien auf einmal gezogen (NumPy, [Szenarien x Positionen]):
+
+  - Delay      gleichverteilt DELAY_MIN_SEC .. DELAY_MAX_SEC (pro Versuch)
+  - Failure    TX_FAILURE_RATE pro Versuch
+                 BUY:  fehlgeschlagen -> keine Position, nur Netzwerk-Fee
+                 SELL: wird wiederholt, jeder Fehlversuch kostet Fee + Delay
+  - Impact     x*y=k wie buy_impact_pct / sell_impact_pct (Quote-Reserve
+               = Liquiditaet / 2)
+  - Drift      Normalverteilt, Sigma waechst mit dem Delay
+  - Fees       Swap-Fee beidseitig + Netzwerk-Fee
+
+Parameter und Formeln sind dieselben wie in trading/simulation.py – der
+Erwartungswert entspricht einem Paper-Trade, die Verteilung zeigt, wie stark
+das Ergebnis vom Ausfuehrungsrauschen abhaengt.
+
+Auswertung: summarize() gruppiert (Session, Wallet, ...) und liefert pro
+Gruppe Mittelwert, p5 und p95 der Gruppen-Summe ueber alle Szenarien.
+"""
+from typing import Dict, Hashable, Optional, Sequence
+
+import numpy as np
+
+from trading.simulation import (
+    DEFAULT_LIQUIDITY_EUR,
+    DELAY_MAX_SEC,
+    DELAY_MIN_SEC,
+    DRIFT_SIGMA_PCT,
+    NETWORK_FEE_EUR,
+    SWAP_FEE_PCT,
+    TX_FAILURE_RATE,
+)
+
+BUY_DRIFT_MEAN_PCT  = 0.3      # wie simulate_buy (FOMO-Kaeufer)
+SELL_DRIFT_MEAN_PCT = -0.2     # wie simulate_sell (Panik-Verkaeufe)
+MAX_SELL_ATTEMPTS   = 5        # Obergrenze fuer Wiederholungen im Modell
+
+
+def _buy_impact_pct(trade_eur: np.ndarray, quote_eur: np.ndarray) -> np.ndarray:
+    """Vektorisierte Variante von simulation.buy_impact_pct (ohne Vorlauf)"""
+    return trade_eur / quote_eur * 100
+
+
+def _sell_impact_pct(value_eur: np.ndarray, quote_eur: np.ndarray) -> np.ndarray:
+    """Vektorisierte Variante von simulation.sell_impact_pct (ohne Vorlauf)"""
+    return value_eur / (quote_eur + value_eur) * 100
+
+
+def simulate_pnl(
+    entry_prices: Sequence[float],
+    exit_prices: Sequence[float],
+    cost_eur: Sequence[float],
+    liquidity_eur: Optional[Sequence[Optional[float]]] = None,
+    n_scenarios: int = 1000,
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """
+    PnL in EUR je Szenario und Position -> Array [n_scenarios x P].
+
+    entry_prices / exit_prices: Quote-Preise (ohne Kosten), cost_eur: Einsatz
+    je Position, liquidity_eur: Pool-Liquiditaet (None -> DEFAULT_LIQUIDITY_EUR).
+    """
+    rng = np.random.default_rng(seed)
+    entry = np.asarray(entry_prices, dtype=float)
+    exit_ = np.asarray(exit_prices, dtype=float)
+    cost = np.asarray(cost_eur, dtype=float)
+    p = len(entry)
+    if liquidity_eur is None:
+        liq = np.full(p, float(DEFAULT_LIQUIDITY_EUR))
+    else:
+        liq = np.array([l or DEFAULT_LIQUIDITY_EUR for l in liquidity_eur], dtype=float)
+    quote = liq / 2
+    shape = (n_scenarios, p)
+
+    # ── BUY ────────────────────────────────────────────────────────────
+    buy_delay = rng.uniform(DELAY_MIN_SEC, DELAY_MAX_SEC, shape)
+    buy_ok = rng.random(shape) >= TX_FAILURE_RATE
+    buy_drift = rng.normal(BUY_DRIFT_MEAN_PCT, DRIFT_SIGMA_PCT * (buy_delay / 2))
+    buy_slip = _buy_impact_pct(cost, quote) + buy_drift
+    buy_fill = entry * (1 + buy_slip / 100)
+    amount = np.divide(cost, buy_fill, out=np.zeros(shape), where=buy_fill > 0)
+    buy_fees = cost * (SWAP_FEE_PCT / 100) + NETWORK_FEE_EUR
+
+    # ── SELL ───────────────────────────────────────────────────────────
+    # Fehlversuche bis zum ersten Erfolg (geometrisch), je Versuch Delay + Fee
+    failed = np.minimum(rng.geometric(1 - TX_FAILURE_RATE, shape) - 1, MAX_SELL_ATTEMPTS - 1)
+    sell_delay = rng.uniform(DELAY_MIN_SEC, DELAY_MAX_SEC, shape) * (failed + 1)
+    sell_drift = rng.normal(SELL_DRIFT_MEAN_PCT, DRIFT_SIGMA_PCT * (sell_delay / 2))
+    sell_value = amount * exit_
+    sell_slip = -(_sell_impact_pct(sell_value, quote) + np.abs(sell_drift))
+    proceeds = sell_value * (1 + sell_slip / 100)
+    sell_fees = sell_value * (SWAP_FEE_PCT / 100) + NETWORK_FEE_EUR * (failed + 1)
+
+    pnl = proceeds - cost - buy_fees - sell_fees
+    return np.where(buy_ok, pnl, -NETWORK_FEE_EUR)
+
+
+def summarize(pnl: np.ndarray, groups: Sequence[Hashable],
+              actual: Optional[Sequence[float]] = None) -> Dict[Hashable, dict]:
+    """
+    Verteilung der Gruppen-Summe ueber alle Szenarien.
+    groups: Gruppen-Schluessel je Position (Spalte von pnl).
+    actual: optional der realisierte (Paper-)PnL je Position zum Vergleich.
+    """
+    keys = list(dict.fromkeys(groups))
+    index = {k: i for i, k in enumerate(keys)}
+    cols = np.array([index[g] for g in groups])
+
+    # [Szenarien x Gruppen] Summen per Scatter-Add
+    totals = np.zeros((pnl.shape[0], len(keys)))
+    np.add.at(totals.T, cols, pnl.T)
+    p5, p95 = np.percentile(totals, [5, 95], axis=0)
+    mean = totals.mean(axis=0)
+    p_loss = (totals < 0).mean(axis=0)
+    counts = np.bincount(cols, minlength=len(keys))
+    real = np.bincount(cols, weights=np.asarray(actual, dtype=float), minlength=len(keys)) \
+        if actual is not None else None
+
+    return {
+        key: {
+            "n":      int(counts[i]),
+            "mean":   float(mean[i]),
+            "p5":     float(p5[i]),
+            "p95":    float(p95[i]),
+            "p_loss": float(p_loss[i]),
+            "actual": float(real[i]) if real is not None else None,
+        }
+        for i, key in enumerate(keys)
+    }
@@ -11,10 +11,18 @@ from pattern.redundancy import TradeSignal
 from observation.models import TradeEvent
 from trading.portfolio import PaperPortfolio
 from trading.price_oracle import PriceOracle
+from trading.price_bus import PriceTick
+from trading.order_queue import Order, OrderQueue
+from trading.position_state import PositionState, PositionTable
+from trading.position_lifecycle import PositionLifecycle
+from trading.exit_rules import ExitDecision, ExitRuleSet
 from trading.simulation import simulate_buy, simulate_sell
+from trading.clock import get_clock
 
 logger = logging.getLogger(__name__)
 
+ORDER_DRAIN_TIMEOUT = 15.0     # Session-Ende: so lange duerfen laufende Orders noch fertig werden
+
 
 class PaperTradingEngine:
     """Automatischer Paper Trading Bot"""
@@ -28,6 +36,13 @@ class PaperTradingEngine:
         stop_loss_percent: float = -50.0,
         take_profit_percent: float = 100.0,
         wallet_tracker=None,   # Optional: für strategie-basierte SL/TP
+        poll_prices: bool = True,  # False im Replay: Preise kommen als aufgezeichnete Ticks
+        clock=None,                # Default: Prozess-Uhr (VirtualClock im Replay)
+        max_concurrent_orders: int = 8,
+        max_positions: Optional[int] = None,    # None = unbegrenzt (paper_mainnet: 1 = Single-Position)
+        max_exposure_percent: float = 100.0,    # max. Anteil der Equity in offenen Positionen
+        exit_rules=None,                        # ExitRuleSet oder Spec ("trail=20@30,ladder=50:0.5")
+        balance_watch=None,                     # TokenBalanceWatcher: Exit bei sinkendem Wallet-Bestand
     ):
         self.portfolio = portfolio
         self.oracle = price_oracle
@@ -36,28 +51,43 @@ class PaperTradingEngine:
         self.stop_loss_percent = stop_loss_percent    # globaler Fallback
         self.take_profit_percent = take_profit_percent  # globaler Fallback
         self.wallet_tracker = wallet_tracker
+        self.poll_prices = poll_prices
+        self.clock = clock or get_clock()
+        self.max_positions = max_positions
+        self.max_exposure_percent = max_exposure_percent
+        # Zusaetzliche Exit-Regeln (Trailing, Teil-Exits, Time-Decay) zu SL/TP
+        self.exit_rules = ExitRuleSet.parse(exit_rules) if isinstance(exit_rules, str) else exit_rules
+        self.balance_watch = balance_watch
 
-        # Tracking welche Wallets zu welchen Positionen gehören
-        self.position_trigger_wallets: Dict[str, Set[str]] = {}
+        # Zustand pro offener Position: Trigger-Wallets, SL/TP Trigger-Preise,
+        # letzter Preis, Inaktivitäts-Timer, High/Low  eine Tabelle statt
+        # paralleler Dicts (O(1) pro Token, auch bei vielen Positionen)
+        self.positions_state = PositionTable()
 
-        # Strategie-basierte SL/TP pro Token
-        # token  (stop_loss_pct, take_profit_pct)
-        self.position_sl_tp: Dict[str, tuple] = {}
+        # OPEN -> CLOSING -> CLOSED pro Position: jeder Close-Pfad (Order,
+        # Missed-Sell, Emergency, Session-Ende) laeuft unter dem Lock der Position
+        self.lifecycle = PositionLifecycle()
 
-        # Inaktivitäts-Tracking pro Token
-        # token  letzter Preis bei dem eine Änderung festgestellt wurde
-        self.position_last_changed_price: Dict[str, float] = {}
-        # token  Zeitpunkt der letzten Preisänderung
-        self.position_last_changed_time: Dict[str, float] = {}
+        # Kapital laufender BUYs (zwischen Allokation und open_position)
+        self._reserved_eur: Dict[str, float] = {}
 
         # Price Update Loop
         self.price_update_task = None
-        self.last_prices: Dict[str, float] = {}
+
+        # BUY/SELL laufen in eigenen Executor-Tasks (pro Token geordnet) –
+        # Trade Events und Ticks warten nicht auf den Simulations-Delay.
+        # Order-ID = Seite:Token:Positions-Nr. -> Tick-Handler und Trade Event
+        # fuer dieselbe Position ergeben genau einen SELL
+        self.orders = OrderQueue(self._execute_order, max_concurrent=max_concurrent_orders, clock=self.clock)
+        self._position_seq: Dict[str, int] = {}
+
+        # Jeder frische Preis (Oracle bzw. Replay)  sofortige SL/TP Prüfung
+        self.oracle.price_bus.subscribe(self._on_price_tick)
 
         logger.info("[PaperTradingEngine] Initialized")
     
-    async def on_buy_signal(self, signal: TradeSignal):
-        """Reagiert auf BUY Signal  öffnet Position"""
+    async def on_buy_signal(self, signal: TradeSignal) -> Optional[Order]:
+        """Reagiert auf BUY Signal  reicht BUY Order ein (Ausfuehrung im Hintergrund)"""
         token = signal.token
         
         logger.info(
@@ -67,26 +97,64 @@ class PaperTradingEngine:
         
         if self.portfolio.has_position(token):
             logger.info(f"[TradingEngine]   Position already exists for {token[:8]}...")
-            return
-        
-        price_eur = await self.oracle.get_price_eur(token)
+            return None
+
+        if not self.has_capacity():
+            logger.info(
+                f"[TradingEngine]   Portfolio full ({len(self.portfolio.positions)} positions, "
+                f"exposure {self.portfolio.get_exposure():.2f} EUR)  skipping {token[:8]}..."
+            )
+            return None
+
+        return self.orders.submit(Order(
+            order_id=self._order_id("BUY", token),
+            side="BUY",
+            token=token,
+            signal=signal,
+        ))
+
+    async def _execute_buy(self, order: Order):
+        """Executor: Preis holen, BUY simulieren, Position eroeffnen"""
+        signal = order.signal
+        token = order.token
+
+        if self.portfolio.has_position(token):
+            return None
+
+        # Kapital reservieren bevor awaits kommen – parallele BUYs anderer
+        # Tokens sehen die Reservierung in _allocate_capital
+        investment_eur = self._allocate_capital()
+        self._reserved_eur[token] = investment_eur
+        try:
+            return await self._open_position(token, signal, investment_eur)
+        finally:
+            self._reserved_eur.pop(token, None)
+
+    async def _open_position(self, token: str, signal: TradeSignal, investment_eur: float):
+        price_eur = await self.oracle.get_price_eur(token, caller="buy")
         if price_eur is None:
             logger.warning(f"[TradingEngine]  No price available for {token[:8]}...")
-            return
+            return None
         
-        if not self.portfolio.can_open_position(token, price_eur):
+        if not self.portfolio.can_open_position(token, price_eur, investment_eur):
             logger.warning(f"[TradingEngine]  Not enough capital for {token[:8]}...")
-            return
+            return None
 
-        investment_eur = self.portfolio.cash_eur * self.portfolio.position_size_percent
         liquidity_eur = self.oracle.get_cached_liquidity_eur(token)
+        reserves = self.oracle.get_cached_reserves(token)
 
-        sim = await simulate_buy(price_eur, investment_eur, liquidity_eur)
+        # Kaeufe der kopierten Wallets im selben Block fuellen vor uns – sofern der
+        # Quote sie nicht schon enthaelt
+        flow_ahead_eur = signal.same_block_amount * price_eur \
+            if self._quote_predates(token, signal.block_time) else 0.0
+        sim = await simulate_buy(price_eur, investment_eur, liquidity_eur, clock=self.clock,
+                                 reserves=reserves, flow_ahead_eur=flow_ahead_eur,
+                                 price_after_delay=self._path_price(token))
         if not sim.success:
             logger.warning(
                 f"[TradingEngine]  BUY simulation failed for {token[:8]}...: {sim.failure_reason}"
             )
-            return
+            return None
 
         position = self.portfolio.open_position(
             token=token,
@@ -95,44 +163,72 @@ class PaperTradingEngine:
             executed_price_eur=sim.executed_price_eur,
             fees_eur=sim.fee_eur,
             slippage_pct=sim.slippage_pct,
+            investment_eur=investment_eur,
         )
 
         if position:
-            self.position_trigger_wallets[token] = set(signal.wallets)
-            self.last_prices[token] = price_eur
             self.oracle.set_rate_limit_from_positions(len(self.portfolio.positions))
 
-            # SL/TP aus Wallet-Strategie ableiten
-            if self.wallet_tracker:
-                sl, tp = self.wallet_tracker.get_sl_tp_for_wallets(signal.wallets)
-                logger.info(
-                    f"[TradingEngine] Strategy SL/TP for {token[:8]}...: "
-                    f"SL={sl:.0f}% TP=+{tp:.0f}% "
-                    f"(wallets: {[w[:8] for w in signal.wallets]})"
-                )
-            else:
-                sl, tp = self.stop_loss_percent, self.take_profit_percent
-            self.position_sl_tp[token] = (sl, tp)
-
-            # Inaktivitäts-Timer starten
-            import time
-            self.position_last_changed_price[token] = price_eur
-            self.position_last_changed_time[token]  = time.monotonic()
-            
-            if self.price_update_task is None or self.price_update_task.done():
-                self.price_update_task = asyncio.create_task(self._price_update_loop())
-            
-            if self.polling_source:
-                if hasattr(self.polling_source, 'start_watching_wallets'):
-                    self.polling_source.start_watching_wallets(signal.wallets)
-                if hasattr(self.polling_source, 'pause_fake_trades'):
-                    self.polling_source.pause_fake_trades()
+            self._track_position(token, position.entry_price_eur, price_eur, signal.wallets)
             
             logger.info(
                 f"[TradingEngine]  Opened position for {token[:8]}... "
                 f"@ {price_eur:.6f} EUR"
             )
+        return position
     
+    def _track_position(self, token: str, entry_price_eur: float, price_eur: float, wallets):
+        """Laufzeit-Tracking einer (neuen oder wiederhergestellten) Position: SL/TP, Lifecycle, Watches"""
+        # SL/TP aus Wallet-Strategie ableiten
+        if self.wallet_tracker:
+            sl, tp = self.wallet_tracker.get_sl_tp_for_wallets(wallets)
+            logger.info(
+                f"[TradingEngine] Strategy SL/TP for {token[:8]}...: "
+                f"SL={sl:.0f}% TP=+{tp:.0f}% "
+                f"(wallets: {[w[:8] for w in wallets]})"
+            )
+        else:
+            sl, tp = self.stop_loss_percent, self.take_profit_percent
+
+        # Trigger-Preise vorberechnen + Inaktivitäts-Timer starten
+        self.positions_state.add(
+            PositionState(
+                key=token,
+                token=token,
+                entry_price_eur=entry_price_eur,
+                last_price=price_eur,
+                last_changed_price=price_eur,
+                trigger_wallets=set(wallets),
+            ),
+            sl_pct=sl,
+            tp_pct=tp,
+        )
+        self.lifecycle.open(token)
+        if self.balance_watch:
+            self.balance_watch.watch(token, self.trigger_wallets(token))
+
+        if self.poll_prices and (self.price_update_task is None or self.price_update_task.done()):
+            self.price_update_task = asyncio.create_task(self._price_update_loop())
+
+        if self.polling_source:
+            if hasattr(self.polling_source, 'start_watching_wallets'):
+                self.polling_source.start_watching_wallets(self._watched_wallets())
+            if hasattr(self.polling_source, 'pause_fake_trades'):
+                self.polling_source.pause_fake_trades()
+
+    def restore_positions(self) -> int:
+        """
+        Nach Neustart aus dem Session-Journal (trading/session_journal.py):
+        offene Positionen des Portfolios wieder ueberwachen. Preis = Entry bis
+        zum ersten Tick; Ladder-Stufen beginnen neu (auf der Restmenge).
+        """
+        for token, position in self.portfolio.positions.items():
+            if not self.lifecycle.is_open(token):
+                self._track_position(token, position.entry_price_eur, position.entry_price_eur,
+                                     position.trigger_wallets)
+        self.oracle.set_rate_limit_from_positions(len(self.portfolio.positions))
+        return len(self.portfolio.positions)
+
     async def on_trade_event(self, trade: TradeEvent):
         """
         Reagiert auf einzelne Trade Events.
@@ -148,42 +244,237 @@ class PaperTradingEngine:
         if not self.portfolio.has_position(token):
             return
         
-        trigger_wallets = self.position_trigger_wallets.get(token, set())
-        if wallet not in trigger_wallets:
+        if wallet not in self.trigger_wallets(token):
             logger.debug(
                 f"[TradingEngine] Wallet {wallet[:8]}... sold {token[:8]}... "
                 f"but is not a trigger wallet  ignoring"
             )
             return
         
-        price_eur = await self.oracle.get_price_eur(token, skip_cache=True)
-        if price_eur is None:
-            logger.warning(f"[TradingEngine]  No price for exit on {token[:8]}...")
-            return
-        
-        await self._close_position(
+        # Preis holt der Executor; der Verkauf des Trigger-Wallets landet vor unserem SELL
+        self._close_position(
             token=token,
-            price_eur=price_eur,
+            price_eur=None,
             reason=f"WALLET_SOLD",
-            trigger_label=f"{wallet[:8]}... sold"
+            trigger_label=f"{wallet[:8]}... sold",
+            flow_ahead_amount=trade.amount,
+            block_time=trade.block_time,
         )
     
-    async def _close_position(self, token: str, price_eur: float, reason: str, trigger_label: str):
-        """Zentraler Ort zum Schließen einer Position mit SELL-Box."""
-        position = self.portfolio.positions.get(token)
+    def on_balance_drop(self, wallet: str, token: str, amount: float) -> Optional[Order]:
+        """
+        Balance-Watch: Token-Bestand eines Trigger-Wallets ist gesunken.
+        Exit wie bei WALLET_SOLD, ohne auf Polling + Parsing zu warten –
+        gleiche Order-ID, der spaeter geparste SELL ist ein Duplikat.
+        """
+        if not self.portfolio.has_position(token) or wallet not in self.trigger_wallets(token):
+            return None
+        return self._close_position(
+            token=token,
+            price_eur=None,
+            reason="WALLET_SOLD",
+            trigger_label=f"{wallet[:8]}... balance -{amount:,.0f}",
+            flow_ahead_amount=amount,
+            block_time=self.clock.time(),     # processed-Notification: kommt mit dem Block
+        )
+
+    def _quote_predates(self, token: str, block_time: Optional[float]) -> bool:
+        """
+        Liegt der Quote (Preis + Reserven) vor dem Block der kopierten Trades?
+        Nur dann landet deren Volumen noch vor unserem Fill – ein nach dem Block
+        geholter Quote enthaelt es schon (Price Impact sonst doppelt).
+        Ohne Block-Zeit oder Quote-Zeit: kein Flow-Ahead.
+        """
+        if block_time is None:
+            return False
+        quoted = self.oracle.get_quote_time(token)
+        return quoted is not None and quoted < block_time
+
+    def _path_price(self, token: str):
+        """
+        Replay: Fill zum aufgezeichneten Preis nach dem Delay (echte Latenz statt
+        zufaelliger Drift). Die virtuelle Uhr steht beim Signal auf der
+        Erkennungszeit des letzten Trades (block_time + Erkennungs-Latenz), der
+        Fill liegt also bei block_time + Erkennung + Delay auf dem Verlauf.
+        Live hat der Oracle keinen Verlauf -> None.
+        """
+        price_at = getattr(self.oracle, "price_at", None)
+        if price_at is None:
+            return None
+        return lambda: price_at(token, self.clock.time())
+
+    def trigger_wallets(self, token: str) -> Set[str]:
+        """Wallets deren SELL die Position auf token schliesst"""
+        state = self.positions_state.get(token)
+        return state.trigger_wallets if state else set()
+
+    def _watched_wallets(self) -> list:
+        """Trigger-Wallets aller offenen Positionen (Fast-Polling)"""
+        wallets: Set[str] = set()
+        for token in self.positions_state.tokens():
+            wallets |= self.trigger_wallets(token)
+        return list(wallets)
+
+    def _allocate_capital(self) -> float:
+        """
+        Kapital fuer eine neue Position: position_size_percent der Equity
+        (Cash + Einstand offener Positionen), begrenzt durch den Spielraum
+        bis max_exposure_percent und das freie Cash. Ohne offene Positionen
+        entspricht das dem bisherigen Anteil am Cash.
+        """
+        reserved = sum(self._reserved_eur.values())
+        equity = self.portfolio.get_equity()
+        headroom = equity * self.max_exposure_percent / 100 - self.portfolio.get_exposure() - reserved
+        target = equity * self.portfolio.position_size_percent
+        return max(min(target, headroom, self.portfolio.cash_eur - reserved), 0.0)
+
+    def has_capacity(self) -> bool:
+        """Platz fuer eine weitere Position (Anzahl inkl. laufender BUYs + Exposure)?"""
+        if self.max_positions is not None:
+            in_flight = len(self.portfolio.positions) + self.orders.count_pending(side="BUY")
+            if in_flight >= self.max_positions:
+                return False
+        return self._allocate_capital() >= 1.0
+
+    def _order_id(self, side: str, token: str) -> str:
+        """Idempotente Order-ID: gleiche Seite + Token + Position -> gleiche ID"""
+        return f"{side}:{token}:{self._position_seq.get(token, 0)}"
+
+    async def _execute_order(self, order: Order):
+        """Executor der OrderQueue – Ergebnis None = nicht ausgefuehrt"""
+        if order.side == "BUY":
+            return await self._execute_buy(order)
+        if order.fraction < 1:
+            return await self.lifecycle.modify(order.token, lambda: self._execute_partial(order))
+        return await self.lifecycle.close(order.token, lambda: self._execute_sell(order), order.reason)
+
+    async def _execute_sell(self, order: Order):
+        """SELL einer Order – laeuft unter dem Lifecycle-Lock der Position"""
+        position = self.portfolio.positions.get(order.token)
         if not position:
-            return
+            return None
+        price_eur = order.price_eur
+        if price_eur is None:
+            price_eur = await self.oracle.get_price_eur(order.token, skip_cache=True, caller="sell")
+            if price_eur is None:
+                logger.warning(f"[TradingEngine]  No price for exit on {order.token[:8]}...")
+                return None
+        flow_ahead_eur = order.flow_ahead_amount * price_eur \
+            if self._quote_predates(order.token, order.block_time) else 0.0
+        return await self._execute_close(order.token, position, price_eur, order.reason,
+                                         order.trigger_label, flow_ahead_eur)
+
+    async def close_now(self, token: str, price_eur: float, reason: str, trigger_label: str = "",
+                        simulate: bool = True):
+        """
+        Schliesst sofort, ohne Order-Queue (Missed-Sell, Emergency, Session-Ende).
+        Geht wie jeder SELL durch den Lifecycle – laeuft parallel ein Close,
+        wird nichts doppelt gebucht. simulate=False: Buchung zum uebergebenen
+        Preis ohne SELL-Simulation und ohne Inaktivitaets-Tag-Abbau.
+        """
+        async def action():
+            position = self.portfolio.positions.get(token)
+            if not position:
+                return None
+            if simulate:
+                return await self._execute_close(token, position, price_eur, reason, trigger_label or reason)
+            trade_result = self.portfolio.close_position(
+                token=token,
+                price_eur=price_eur,
+                reason=f"({trigger_label or reason})",
+            )
+            if trade_result:
+                self._on_closed(token, reason, update_tags=False)
+            return trade_result
+
+        return await self.lifecycle.close(token, action, reason)
+
+    def _exit(self, token: str, price_eur: float, decision: ExitDecision) -> Optional[Order]:
+        """Exit-Regel: voller Exit wie SL/TP, Teil-Exit als eigene SELL Order (ID je Ladder-Stufe)"""
+        if decision.is_full:
+            return self._close_position(token, price_eur, decision.reason, decision.label)
+        if not self.lifecycle.is_open(token):
+            return None
+        return self.orders.submit(Order(
+            order_id=self._order_id(f"PARTIAL{decision.step}", token),
+            side="SELL",
+            token=token,
+            reason=decision.reason,
+            trigger_label=decision.label,
+            price_eur=price_eur,
+            fraction=decision.fraction,
+            step=decision.step,
+        ))
+
+    async def _execute_partial(self, order: Order):
+        """Teil-Exit – laeuft unter dem Lifecycle-Lock, Position bleibt OPEN"""
+        token = order.token
+        position = self.portfolio.positions.get(token)
+        state = self.positions_state.get(token)
+        if not position or state is None:
+            return None
 
         liquidity_eur = self.oracle.get_cached_liquidity_eur(token)
+        reserves = self.oracle.get_cached_reserves(token)
+        sim = await simulate_sell(order.price_eur, position.amount * order.fraction * order.price_eur,
+                                  liquidity_eur, clock=self.clock, reserves=reserves,
+                                  price_after_delay=self._path_price(token))
+        if not sim.success:
+            logger.warning(f"[TradingEngine]  Partial SELL failed for {token[:8]}...: {sim.failure_reason}")
+            return None
+
+        trade = self.portfolio.reduce_position(
+            token=token,
+            fraction=order.fraction,
+            price_eur=order.price_eur,
+            reason=f"({order.trigger_label})",
+            executed_price_eur=sim.executed_price_eur,
+            fees_eur=sim.fee_eur,
+            slippage_pct=sim.slippage_pct,
+        )
+        if trade:
+            ExitRuleSet.apply(state, ExitDecision(order.reason, order.fraction, order.trigger_label, order.step))
+            print(
+                f" PARTIAL SELL [{order.reason}] {token[:8]}... {order.fraction*100:.0f}% "
+                f"@ {sim.executed_price_eur:.8f} EUR | P&L: {trade.pnl_eur:+.2f} EUR ({trade.pnl_percent:+.2f}%) "
+                f"| {order.trigger_label}"
+            )
+        return trade
+
+    def _close_position(self, token: str, price_eur: Optional[float], reason: str, trigger_label: str,
+                        flow_ahead_amount: float = 0.0, block_time: Optional[float] = None) -> Optional[Order]:
+        """Zentraler Ort zum Schließen einer Position: reicht SELL Order ein (SELL-Box im Executor)."""
+        if not self.lifecycle.is_open(token):
+            return None
+        return self.orders.submit(Order(
+            order_id=self._order_id("SELL", token),
+            side="SELL",
+            token=token,
+            reason=reason,
+            trigger_label=trigger_label,
+            price_eur=price_eur,
+            flow_ahead_amount=flow_ahead_amount,
+            block_time=block_time,
+        ))
+
+    async def _execute_close(self, token: str, position, price_eur: float, reason: str, trigger_label: str,
+                             flow_ahead_eur: float = 0.0):
+        """Simuliert den SELL, zeigt die SELL-Box und räumt das Tracking auf."""
+        liquidity_eur = self.oracle.get_cached_liquidity_eur(token)
+        reserves = self.oracle.get_cached_reserves(token)
         position_value_eur = position.amount * price_eur
 
-        sim = await simulate_sell(price_eur, position_value_eur, liquidity_eur)
+        sim = await simulate_sell(price_eur, position_value_eur, liquidity_eur, clock=self.clock,
+                                  reserves=reserves, flow_ahead_eur=flow_ahead_eur,
+                                  price_after_delay=self._path_price(token))
         if not sim.success:
             logger.warning(f"[TradingEngine]  SELL failed ({sim.failure_reason}) — retrying once")
-            sim = await simulate_sell(price_eur, position_value_eur, liquidity_eur)
+            sim = await simulate_sell(price_eur, position_value_eur, liquidity_eur, clock=self.clock,
+                                      reserves=reserves, flow_ahead_eur=flow_ahead_eur,
+                                      price_after_delay=self._path_price(token))
             if not sim.success:
                 logger.error(f"[TradingEngine]  SELL failed twice for {token[:8]}... — position stays open")
-                return
+                return None
 
         fill_price = sim.executed_price_eur
         entry_price = position.entry_price_eur
@@ -217,43 +508,150 @@ class PaperTradingEngine:
         )
         
         if trade_result:
-            # Tag-Abbau: nur wenn Close NICHT durch Inaktivität ausgelöst wurde
-            if reason != "INACTIVITY" and self.wallet_tracker:
-                trigger_wallets = list(self.position_trigger_wallets.get(token, set()))
-                for w in trigger_wallets:
-                    current_tags = self.wallet_tracker.get_inactivity_tags(w)
-                    if current_tags > 0:
-                        self.wallet_tracker.remove_inactivity_tag(w)
-
-            if token in self.position_trigger_wallets:
-                del self.position_trigger_wallets[token]
-            if token in self.last_prices:
-                del self.last_prices[token]
-            if token in self.position_sl_tp:
-                del self.position_sl_tp[token]
-            if token in self.position_last_changed_price:
-                del self.position_last_changed_price[token]
-            if token in self.position_last_changed_time:
-                del self.position_last_changed_time[token]
-            self.oracle.set_rate_limit_from_positions(len(self.portfolio.positions))
-            
-            if not self.portfolio.positions:
-                if self.polling_source:
-                    if hasattr(self.polling_source, 'stop_watching_wallets'):
-                        self.polling_source.stop_watching_wallets()
-                    if hasattr(self.polling_source, 'resume_fake_trades'):
-                        self.polling_source.resume_fake_trades()
-            
+            self._on_closed(token, reason)
             logger.info(
                 f"[TradingEngine]  Closed {token[:8]}... @ {price_eur:.8f} EUR "
                 f"| P&L: {pnl_eur:+.2f} EUR ({pnl_pct:+.2f}%)"
             )
+        return trade_result
+
+    def _on_closed(self, token: str, reason: str, update_tags: bool = True):
+        """Räumt das Tracking nach einem gebuchten Close auf"""
+        self._position_seq[token] = self._position_seq.get(token, 0) + 1
+
+        # Tag-Abbau: nur wenn Close NICHT durch Inaktivität ausgelöst wurde
+        if update_tags and reason != "INACTIVITY" and self.wallet_tracker:
+            for w in self.trigger_wallets(token):
+                current_tags = self.wallet_tracker.get_inactivity_tags(w)
+                if current_tags > 0:
+                    self.wallet_tracker.remove_inactivity_tag(w)
+
+        self.positions_state.remove(token)
+        if self.balance_watch:
+            self.balance_watch.unwatch(token)
+        self.oracle.set_rate_limit_from_positions(len(self.portfolio.positions))
+        
+        if self.portfolio.positions:
+            # Fast-Polling nur noch fuer die Wallets der verbleibenden Positionen
+            if self.polling_source and hasattr(self.polling_source, 'start_watching_wallets'):
+                self.polling_source.start_watching_wallets(self._watched_wallets())
+        else:
+            if self.polling_source:
+                if hasattr(self.polling_source, 'stop_watching_wallets'):
+                    self.polling_source.stop_watching_wallets()
+                if hasattr(self.polling_source, 'resume_fake_trades'):
+                    self.polling_source.resume_fake_trades()
     
+    async def _on_price_tick(self, tick: PriceTick):
+        """
+        PRICE TICK HANDLER
+        Wird bei jedem frischen Preis aufgerufen (Oracle bzw. Replay).
+        Prüft Inaktivität, Stop-Loss und Take-Profit nur für diesen Token.
+        """
+        token = tick.token
+        # Voller SELL unterwegs -> nichts mehr pruefen (Teil-Exits blockieren SL/TP nicht)
+        if not self.lifecycle.is_open(token) or self.orders.is_pending(self._order_id("SELL", token)):
+            return
+
+        try:
+            await self._evaluate_position(token, tick.price_eur, tick.source)
+        except Exception as e:
+            logger.error(f"[PriceMonitor] Error evaluating {token[:8]}: {e}")
+
+    async def _evaluate_position(self, token: str, current_price: float, source: str):
+        """
+        SL/TP/Inaktivitäts-Prüfung für eine Position bei neuem Preis.
+        SL/TP über den vorberechneten Trigger-Index (bisect), nicht über pnl_pct.
+        """
+        state = self.positions_state.get(token)
+        position = self.portfolio.positions.get(token)
+        if state is None or position is None:
+            return
+
+        now = self.clock.monotonic()
+        price_change_pct = state.observe(current_price, now)
+        pnl_pct = state.pnl_pct(current_price)
+        pnl_eur = (current_price - state.entry_price_eur) * position.amount
+
+        emoji = "" if pnl_eur > 0 else "" if pnl_eur < 0 else ""
+
+        print(
+            f"{emoji} [PriceMonitor] {token[:8]}... @ {current_price:.8f} EUR "
+            f"| P&L: {pnl_eur:+.2f} EUR ({pnl_pct:+.2f}%) "
+            f"| Change: {price_change_pct:+.2f}% [{source}]"
+        )
+
+        #  INAKTIVITÄT 
+        inactive_secs = state.unchanged_seconds(now)
+        if inactive_secs > 0:
+            trigger_wallets = list(state.trigger_wallets)
+            timeout = (
+                self.wallet_tracker.get_inactivity_timeout(trigger_wallets)
+                if self.wallet_tracker else 600
+            )
+            if inactive_secs >= timeout:
+                logger.warning(
+                    f"[Inactivity]  {token[:8]}... no price change for "
+                    f"{inactive_secs/60:.1f} min (limit {timeout//60} min)  closing"
+                )
+                # Tags auf alle Trigger-Wallets
+                if self.wallet_tracker:
+                    for w in trigger_wallets:
+                        tags = self.wallet_tracker.add_inactivity_tag(w)
+                        logger.info(f"[Inactivity] Tag {w[:8]}...  {tags} tag(s)")
+                self._close_position(
+                    token=token,
+                    price_eur=current_price,
+                    reason="INACTIVITY",
+                    trigger_label=f"Inactivity {inactive_secs/60:.1f} min (limit {timeout//60} min)"
+                )
+                return
+
+        sl_hits, tp_hits = self.positions_state.crossed(token, current_price)
+        sl, tp = state.sl_pct, state.tp_pct
+
+        #  STOP-LOSS 
+        if token in sl_hits:
+            logger.warning(
+                f"[StopLoss]  {token[:8]}... hit stop-loss "
+                f"({pnl_pct:.1f}% <= {sl:.0f}%)"
+            )
+            self._close_position(
+                token=token,
+                price_eur=current_price,
+                reason="STOP_LOSS",
+                trigger_label=f"Stop-Loss @ {pnl_pct:.1f}% (limit {sl:.0f}%)"
+            )
+            return
+
+        #  TAKE-PROFIT 
+        if token in tp_hits:
+            logger.info(
+                f"[TakeProfit]  {token[:8]}... hit take-profit "
+                f"({pnl_pct:.1f}% >= +{tp:.0f}%)"
+            )
+            self._close_position(
+                token=token,
+                price_eur=current_price,
+                reason="TAKE_PROFIT",
+                trigger_label=f"Take-Profit @ +{pnl_pct:.1f}% (limit +{tp:.0f}%)"
+            )
+            return
+
+        #  EXIT-REGELN (Trailing / Ladder / Time-Decay) 
+        if self.exit_rules:
+            decision = self.exit_rules.evaluate(state, current_price, now)
+            if decision is not None:
+                logger.info(f"[ExitRules]  {token[:8]}... {decision.label}")
+                self._exit(token, current_price, decision)
+
     async def _price_update_loop(self):
         """
-         PRICE UPDATE LOOP
-        - Zeigt alle N Sekunden Price Updates
-        - Prüft Stop-Loss und Take-Profit
+         PRICE POLLER
+        - Holt alle N Sekunden frische Preise für alle offenen Positionen (parallel)
+        - Jeder Preis geht als PriceTick über den Bus  _on_price_tick prüft SL/TP
+        - Ticks aus anderen Quellen (Trade Events, Pools) werden sofort geprüft,
+          unabhängig vom Loop-Intervall
         """
         logger.info(
             f"[PriceMonitor] Started "
@@ -268,106 +666,20 @@ class PaperTradingEngine:
                     if self.polling_source and getattr(self.polling_source, 'is_fast_polling', False)
                     else self.price_update_interval
                 )
-                await asyncio.sleep(interval)
+                await self.clock.sleep(interval)
                 
                 if not self.portfolio.positions:
                     logger.info("[PriceMonitor] No open positions - stopping")
                     break
-                
-                for token in list(self.portfolio.positions.keys()):
-                    try:
-                        current_price = await self.oracle.get_price_eur(token, skip_cache=True)
-                        if current_price is None:
-                            continue
-                        
-                        position = self.portfolio.positions[token]
-                        entry_price = position.entry_price_eur
-                        
-                        pnl_pct = ((current_price - entry_price) / entry_price) * 100
-                        pnl_eur = (current_price - entry_price) * position.amount
-                        
-                        last_price = self.last_prices.get(token, entry_price)
-                        price_change_pct = ((current_price - last_price) / last_price) * 100 if last_price > 0 else 0
-                        
-                        emoji = "" if pnl_eur > 0 else "" if pnl_eur < 0 else ""
-                        
-                        print(
-                            f"{emoji} [PriceMonitor] {token[:8]}... @ {current_price:.8f} EUR "
-                            f"| P&L: {pnl_eur:+.2f} EUR ({pnl_pct:+.2f}%) "
-                            f"| Last {interval}s: {price_change_pct:+.2f}%"
-                        )
-                        
-                        self.last_prices[token] = current_price
-
-                        import time
-
-                        #  INAKTIVITÄT 
-                        if current_price == self.position_last_changed_price.get(token):
-                            trigger_wallets = list(self.position_trigger_wallets.get(token, set()))
-                            timeout = (
-                                self.wallet_tracker.get_inactivity_timeout(trigger_wallets)
-                                if self.wallet_tracker else 600
-                            )
-                            inactive_secs = time.monotonic() - self.position_last_changed_time.get(token, time.monotonic())
-                            if inactive_secs >= timeout:
-                                logger.warning(
-                                    f"[Inactivity]  {token[:8]}... no price change for "
-                                    f"{inactive_secs/60:.1f} min (limit {timeout//60} min)  closing"
-                                )
-                                # Tags auf alle Trigger-Wallets
-                                if self.wallet_tracker:
-                                    for w in trigger_wallets:
-                                        tags = self.wallet_tracker.add_inactivity_tag(w)
-                                        logger.info(f"[Inactivity] Tag {w[:8]}...  {tags} tag(s)")
-                                await self._close_position(
-                                    token=token,
-                                    price_eur=current_price,
-                                    reason="INACTIVITY",
-                                    trigger_label=f"Inactivity {inactive_secs/60:.1f} min (limit {timeout//60} min)"
-                                )
-                                continue
-                        else:
-                            # Preis hat sich geändert  Timer zurücksetzen
-                            self.position_last_changed_price[token] = current_price
-                            self.position_last_changed_time[token]  = time.monotonic()
-
-                        # SL/TP: positions-spezifisch oder globaler Fallback
-                        sl, tp = self.position_sl_tp.get(
-                            token,
-                            (self.stop_loss_percent, self.take_profit_percent)
-                        )
-
-                        #  STOP-LOSS 
-                        if pnl_pct <= sl:
-                            logger.warning(
-                                f"[StopLoss]  {token[:8]}... hit stop-loss "
-                                f"({pnl_pct:.1f}% <= {sl:.0f}%)"
-                            )
-                            await self._close_position(
-                                token=token,
-                                price_eur=current_price,
-                                reason="STOP_LOSS",
-                                trigger_label=f"Stop-Loss @ {pnl_pct:.1f}% (limit {sl:.0f}%)"
-                            )
-                            continue
-
-                        #  TAKE-PROFIT 
-                        if pnl_pct >= tp:
-                            logger.info(
-                                f"[TakeProfit]  {token[:8]}... hit take-profit "
-                                f"({pnl_pct:.1f}% >= +{tp:.0f}%)"
-                            )
-                            await self._close_position(
-                                token=token,
-                                price_eur=current_price,
-                                reason="TAKE_PROFIT",
-                                trigger_label=f"Take-Profit @ +{pnl_pct:.1f}% (limit +{tp:.0f}%)"
-                            )
-                            continue
-                    
-                    except Exception as e:
-                        logger.error(f"[PriceMonitor] Error updating {token[:8]}: {e}")
-                        continue
+
+                tokens = list(self.portfolio.positions.keys())
+                results = await asyncio.gather(
+                    *(self.oracle.get_price_eur(token, skip_cache=True, caller="price_loop") for token in tokens),
+                    return_exceptions=True,
+                )
+                for token, result in zip(tokens, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"[PriceMonitor] Error updating {token[:8]}: {result}")
         
         except asyncio.CancelledError:
             logger.info("[PriceMonitor] Stopped (cancelled)")
@@ -381,7 +693,7 @@ class PaperTradingEngine:
         
         for token in list(self.portfolio.positions.keys()):
             position = self.portfolio.positions[token]
-            current_price = await self.oracle.get_price_eur(token)
+            current_price = await self.oracle.get_price_eur(token, caller="check")
             if current_price is None:
                 continue
             
@@ -395,6 +707,11 @@ class PaperTradingEngine:
                     f"P&L: {pnl:+.2f} EUR ({pnl_pct:+.2f}%)"
                 )
     
+    def last_price(self, token: str, default: float = 0.0) -> float:
+        """Letzter bekannter Preis einer offenen Position"""
+        state = self.positions_state.get(token)
+        return state.last_price if state else default
+
     def get_portfolio_summary(self) -> dict:
         token_prices = {
             token: pos.entry_price_eur
@@ -405,12 +722,27 @@ class PaperTradingEngine:
     async def print_summary(self):
         token_prices = {}
         for token in self.portfolio.positions.keys():
-            price = await self.oracle.get_price_eur(token)
+            price = await self.oracle.get_price_eur(token, caller="summary")
             token_prices[token] = price if price else self.portfolio.positions[token].entry_price_eur
         self.portfolio.print_summary(token_prices)
     
-    async def stop(self):
-        """Stoppt alle Background Tasks"""
+    async def drain_orders(self):
+        """Wartet bis alle eingereichten Orders ausgefuehrt sind"""
+        await self.orders.drain()
+
+    async def stop(self, drain_timeout: Optional[float] = None):
+        """
+        Stoppt alle Background Tasks. drain_timeout: laufende Orders erst bis zu
+        so vielen Sekunden fertig ausfuehren lassen (Session-Ende), danach abbrechen.
+        """
+        self.oracle.price_bus.unsubscribe(self._on_price_tick)
+        if drain_timeout:
+            try:
+                await asyncio.wait_for(self.orders.drain(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"[TradingEngine] {self.orders.count_pending()} order(s) still running "
+                               f"after {drain_timeout:.0f}s - cancelled")
+        await self.orders.stop()
         if self.price_update_task and not self.price_update_task.done():
             self.price_update_task.cancel()
             try:
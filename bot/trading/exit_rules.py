@@ -0,0 +1,248 @@
+"""
+Exit Rules - Steckbare Exit-Regeln fuer Copy-Engine und Observer
+
+Bisher kannte die Engine nur feste SL/TP Prozente, wallet_analysis fuehrt
+High/Low (PositionState.max_pct/min_pct), nutzt sie aber nicht. Hier:
+
+  sl=-30            Stop-Loss bei -30%
+  tp=100            Take-Profit bei +100%
+  trail=20          Trailing Stop: 20% unter dem bisherigen Hoch
+  trail=20@30       ... erst aktiv, nachdem das Hoch +30% erreicht hat
+  ladder=50:0.5/100:0.25
+                    Gestaffelte Teil-Exits: bei +50% die Haelfte der
+                    urspruenglichen Menge, bei +100% ein weiteres Viertel
+  decay=-50:0:60    Time-Decay Stop: Stop-Linie steigt linear von -50% auf
+                    0% innerhalb von 60 Minuten (danach bleibt sie bei 0%)
+
+Eine Regel-Kette ist ein String ("trail=20@30,ladder=50:0.5,decay=-50:0:60"),
+derselbe fuer PaperTradingEngine, den Observer (wallet_analysis) und
+tune_observer --rules (Simulation auf gespeicherten Preisverlaeufen).
+
+Kosten pro Tick: jede Regel ist O(1) auf dem PositionState der Position
+(High aus max_pct, Haltedauer aus entry_time, naechste Ladder-Stufe aus
+exit_step) – kein Verlauf, keine Schleife ueber alle Positionen.
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from trading.position_state import PositionState
+
+
+@dataclass
+class ExitDecision:
+    """Ergebnis einer Regel: Anteil der RESTLICHEN Menge verkaufen (1.0 = alles)"""
+    rule: str
+    fraction: float
+    label: str
+    step: int = 0                 # Ladder-Stufe (fuer idempotente Order-IDs)
+
+    @property
+    def is_full(self) -> bool:
+        return self.fraction >= 0.999
+
+    @property
+    def reason(self) -> str:
+        return {"SL": "STOP_LOSS", "TP": "TAKE_PROFIT"}.get(self.rule, f"EXIT_{self.rule}")
+
+
+class ExitRule(ABC):
+    """
+    Eine Exit-Regel. Jede Regel muss dieses Interface implementieren.
+    """
+    name = ""
+
+    @abstractmethod
+    def check(self, state: PositionState, pnl_pct: float, now: float) -> Optional[ExitDecision]:
+        """
+        Exit-Entscheidung fuer den aktuellen Tick oder None.
+        """
+        pass
+
+    @abstractmethod
+    def spec(self) -> str:
+        """
+        Regel als Spec-String (Umkehrung des Parsers, z.B. "trail=20@30").
+        """
+        pass
+
+
+class StopLoss(ExitRule):
+    name = "SL"
+
+    def __init__(self, pct: float):
+        self.pct = -abs(pct)
+
+    def check(self, state, pnl_pct, now):
+        if pnl_pct <= self.pct:
+            return ExitDecision(self.name, 1.0, f"Stop-Loss @ {pnl_pct:.1f}% (limit {self.pct:.0f}%)")
+        return None
+
+    def spec(self) -> str:
+        return f"sl={self.pct:g}"
+
+
+class TakeProfit(ExitRule):
+    name = "TP"
+
+    def __init__(self, pct: float):
+        self.pct = pct
+
+    def check(self, state, pnl_pct, now):
+        if pnl_pct >= self.pct:
+            return ExitDecision(self.name, 1.0, f"Take-Profit @ +{pnl_pct:.1f}% (limit +{self.pct:.0f}%)")
+        return None
+
+    def spec(self) -> str:
+        return f"tp={self.pct:g}"
+
+
+class TrailingStop(ExitRule):
+    """Exit wenn der Preis pct% unter das bisherige Hoch faellt (optional erst ab activate_pct)"""
+    name = "TRAIL"
+
+    def __init__(self, pct: float, activate_pct: Optional[float] = None):
+        self.pct = abs(pct)
+        self.activate_pct = activate_pct
+
+    def check(self, state, pnl_pct, now):
+        peak_pct = state.max_pct if state.max_pct is not None else pnl_pct
+        if self.activate_pct is not None and peak_pct < self.activate_pct:
+            return None
+        # Drawdown vom Hoch, relativ zum Hoch-Preis (wie PathMatrix.dd_pct)
+        drawdown = ((100 + pnl_pct) / (100 + peak_pct) - 1) * 100 if peak_pct > -100 else 0.0
+        if drawdown <= -self.pct:
+            return ExitDecision(self.name, 1.0, f"Trailing Stop {drawdown:.1f}% vom Hoch (+{peak_pct:.1f}%)")
+        return None
+
+    def spec(self) -> str:
+        return f"trail={self.pct:g}" + (f"@{self.activate_pct:g}" if self.activate_pct is not None else "")
+
+
+class LadderExit(ExitRule):
+    """Teil-Exits: steps = [(pnl_pct, Anteil der urspruenglichen Menge), ...] aufsteigend"""
+    name = "LADDER"
+
+    def __init__(self, steps: Sequence[Tuple[float, float]]):
+        self.steps = sorted((float(p), min(max(float(f), 0.0), 1.0)) for p, f in steps)
+
+    def check(self, state, pnl_pct, now):
+        if state.exit_step >= len(self.steps):
+            return None
+        level, part = self.steps[state.exit_step]
+        if pnl_pct < level or state.remaining <= 0:
+            return None
+        fraction = min(part / state.remaining, 1.0)
+        return ExitDecision(self.name, fraction,
+                            f"Ladder {state.exit_step + 1}/{len(self.steps)} @ +{pnl_pct:.1f}% "
+                            f"({part*100:.0f}% der Position)", step=state.exit_step + 1)
+
+    def spec(self) -> str:
+        return "ladder=" + "/".join(f"{p:g}:{f:g}" for p, f in self.steps)
+
+
+class TimeDecayStop(ExitRule):
+    """Stop-Linie steigt linear von start_pct auf end_pct innerhalb von minutes"""
+    name = "DECAY"
+
+    def __init__(self, start_pct: float, end_pct: float, minutes: float):
+        self.start_pct = start_pct
+        self.end_pct = end_pct
+        self.seconds = max(minutes * 60, 1.0)
+
+    def level(self, held_seconds: float) -> float:
+        frac = min(held_seconds / self.seconds, 1.0)
+        return self.start_pct + (self.end_pct - self.start_pct) * frac
+
+    def check(self, state, pnl_pct, now):
+        level = self.level(state.held_seconds(now))
+        if pnl_pct <= level:
+            return ExitDecision(self.name, 1.0, f"Time-Decay Stop @ {pnl_pct:.1f}% (Linie {level:.1f}%)")
+        return None
+
+    def spec(self) -> str:
+        return f"decay={self.start_pct:g}:{self.end_pct:g}:{self.seconds / 60:g}"
+
+
+class ExitRuleSet:
+    """Geordnete Regel-Kette – die erste feuernde Regel gewinnt (volle Exits vor Teil-Exits)"""
+
+    def __init__(self, rules: Iterable[ExitRule] = ()):
+        rules = list(rules)
+        self.rules: List[ExitRule] = [r for r in rules if not isinstance(r, LadderExit)] + \
+                                     [r for r in rules if isinstance(r, LadderExit)]
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def evaluate(self, state: PositionState, price: float, now: float) -> Optional[ExitDecision]:
+        """Prueft alle Regeln fuer einen neuen Preis (state.observe muss vorher gelaufen sein)"""
+        pnl_pct = state.pnl_pct(price)
+        for rule in self.rules:
+            decision = rule.check(state, pnl_pct, now)
+            if decision is not None:
+                return decision
+        return None
+
+    @staticmethod
+    def apply(state: PositionState, decision: ExitDecision):
+        """Verbucht einen ausgefuehrten Teil-Exit im PositionState"""
+        state.remaining *= (1 - decision.fraction)
+        if decision.step:
+            state.exit_step = decision.step
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> "ExitRuleSet":
+        """"trail=20@30,ladder=50:0.5/100:0.25,decay=-50:0:60" -> ExitRuleSet"""
+        rules: List[ExitRule] = []
+        for part in (spec or "").split(","):
+            part = part.strip()
+            if not part:
+                continue
+            name, _, value = part.partition("=")
+            name = name.strip().lower()
+            try:
+                if name == "sl":
+                    rules.append(StopLoss(float(value)))
+                elif name == "tp":
+                    rules.append(TakeProfit(float(value)))
+                elif name == "trail":
+                    pct, _, activate = value.partition("@")
+                    rules.append(TrailingStop(float(pct), float(activate) if activate else None))
+                elif name == "ladder":
+                    steps = [step.split(":") for step in value.split("/") if step]
+                    rules.append(LadderExit([(float(p), float(f)) for p, f in steps]))
+                elif name == "decay":
+                    start, end, minutes = value.split(":")
+                    rules.append(TimeDecayStop(float(start), float(end), float(minutes)))
+                else:
+                    raise ValueError(f"unbekannte Regel '{name}'")
+            except ValueError as e:
+                raise ValueError(f"Exit-Regel '{part}' ungueltig: {e}") from None
+        return cls(rules)
+
+    def spec(self) -> str:
+        return ",".join(rule.spec() for rule in self.rules)
+
+
+def simulate_path(rules: ExitRuleSet, times: Sequence[float], prices: Sequence[float]) -> Tuple[float, str]:
+    """
+    Spielt die Regel-Kette Tick fuer Tick auf einem Preisverlauf ab (Zeiten in
+    Sekunden seit Entry, erster Punkt = Entry, letzter = echter Exit).
+    Gibt (PnL in % des Einsatzes, Regel des finalen Exits oder "ACTUAL") zurueck.
+    """
+    state = PositionState(key=0, token="", entry_price_eur=prices[0], entry_time=times[0])
+    entry = prices[0]
+    realized = 0.0                    # Erloes in Einheiten des Einsatzes
+    for t, price in zip(times[1:], prices[1:]):
+        state.observe(price, t)
+        decision = rules.evaluate(state, price, t)
+        if decision is None:
+            continue
+        sold = state.remaining * decision.fraction
+        realized += sold * price / entry
+        ExitRuleSet.apply(state, decision)
+        if decision.is_full or state.remaining <= 1e-9:
+            return (realized - 1) * 100, decision.rule
+    realized += state.remaining * prices[-1] / entry
+    return (realized - 1) * 100, "ACTUAL"
@@ -0,0 +1,219 @@
+"""
+FX Service - USD/EUR Wechselkurse (Frankfurter / EZB Referenzkurse)
+
+Ersetzt die feste 0.92 im PriceOracle und die eigene Frankfurter-Logik des
+Trade-Log-Viewers. Beide nutzen dieselbe Kurs-Historie
+(data/fx_usd_eur.json), dadurch sind EUR-Werte ueber Monate gespeicherter
+Sessions konsistent.
+
+  - rate()         aktueller Kurs, reiner Speicherzugriff (Hot Path)
+  - rate_on(day)   historischer Kurs (letzter Handelstag <= day)
+  - ensure_range() laedt fehlende Historie einmalig nach
+  - start()        periodischer Refresh im Bot (Thread, blockiert nie den Loop)
+
+Nur Standardbibliothek – der Viewer laedt dieses Modul per Dateipfad.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+import urllib.parse
+import urllib.request
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+FRANKFURTER_ROOT = "https://api.frankfurter.app"
+CACHE_PATH = Path(__file__).resolve().parent.parent / "data" / "fx_usd_eur.json"
+
+# Fallback solange noch kein Kurs geladen werden konnte (alter Festwert)
+DEFAULT_USD_TO_EUR = 0.92
+
+DayLike = Union[date, datetime, str]
+
+
+def _day_key(day: DayLike) -> str:
+    if isinstance(day, datetime):
+        return day.date().isoformat()
+    if isinstance(day, date):
+        return day.isoformat()
+    return str(day)[:10]
+
+
+class FxService:
+    """
+    USD -> EUR Kurse mit persistentem Cache.
+
+    Historische EZB-Kurse aendern sich nicht mehr – einmal geladen werden
+    sie nie wieder abgefragt. Nur der aktuelle Kurs wird periodisch erneuert.
+    """
+
+    REFRESH_SECONDS = 3600    # EZB publiziert 1x taeglich, stuendlich reicht
+
+    def __init__(self, cache_path: Union[str, Path] = CACHE_PATH,
+                 fallback_rate: float = DEFAULT_USD_TO_EUR):
+        self.cache_path = Path(cache_path)
+        self.fallback_rate = fallback_rate
+        self.rates: Dict[str, float] = {}          # "YYYY-MM-DD" -> USD->EUR
+        self.ranges: List[List[str]] = []          # bereits vollstaendig geladene Zeitraeume
+        self.last_refresh: float = 0.0             # Unix-Zeit des letzten /latest Abrufs
+        self._days: List[str] = []                 # sortierte Keys fuer bisect
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._load()
+
+    # ── Cache ──────────────────────────────────────────────────────────
+
+    def _load(self):
+        try:
+            payload = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        self.rates = {day: float(rate) for day, rate in (payload.get("rates") or {}).items()}
+        self.ranges = payload.get("ranges") or []
+        self.last_refresh = float(payload.get("last_refresh") or 0.0)
+        self._days = sorted(self.rates)
+
+    def _save(self):
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({
+                "rates": self.rates,
+                "ranges": self.ranges,
+                "last_refresh": self.last_refresh,
+            }), encoding="utf-8")
+            tmp.replace(self.cache_path)
+        except OSError as e:
+            logger.warning(f"[FX] Cache write failed: {e}")
+
+    def _merge(self, rates: Dict[str, float]):
+        self.rates.update(rates)
+        self._days = sorted(self.rates)
+
+    # ── Lookup ─────────────────────────────────────────────────────────
+
+    def has_rates(self) -> bool:
+        return bool(self.rates)
+
+    def rate(self) -> float:
+        """Aktuellster bekannter USD->EUR Kurs (kein I/O)"""
+        return self.rates[self._days[-1]] if self._days else self.fallback_rate
+
+    def rate_on(self, day: DayLike) -> float:
+        """
+        USD->EUR Kurs fuer einen Tag. Wochenende/Feiertag -> letzter
+        Handelstag davor, vor Beginn der Historie -> erster bekannter Kurs.
+        """
+        if not self._days:
+            return self.fallback_rate
+        key = _day_key(day)
+        rate = self.rates.get(key)
+        if rate is not None:
+            return rate
+        idx = bisect_right(self._days, key)
+        return self.rates[self._days[idx - 1]] if idx > 0 else self.rates[self._days[0]]
+
+    def usd_to_eur(self, usd_value: float, day: Optional[DayLike] = None) -> float:
+        return usd_value * (self.rate() if day is None else self.rate_on(day))
+
+    def eur_to_usd(self, eur_value: float, day: Optional[DayLike] = None) -> float:
+        rate = self.rate() if day is None else self.rate_on(day)
+        return eur_value / rate if rate else eur_value
+
+    # ── Laden ──────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _get_json(url: str) -> dict:
+        request = urllib.request.Request(url, headers={
+            "accept": "application/json",
+            "user-agent": "Mozilla/5.0 (compatible; copybot-fx/1.0)",
+        })
+        with urllib.request.urlopen(request, timeout=15) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    def refresh(self) -> float:
+        """Holt den aktuellen Kurs (blockierend). Bei Fehler bleibt der letzte Kurs."""
+        query = urllib.parse.urlencode({"from": "USD", "to": "EUR"})
+        try:
+            payload = self._get_json(f"{FRANKFURTER_ROOT}/latest?{query}")
+            rate = float(payload["rates"]["EUR"])
+            day = payload.get("date") or date.today().isoformat()
+        except Exception as e:
+            logger.warning(f"[FX] Refresh failed ({type(e).__name__}: {e}) – keeping {self.rate():.4f}")
+            return self.rate()
+
+        with self._lock:
+            self._merge({day: rate})
+            self.last_refresh = time.time()
+            self._save()
+        logger.info(f"[FX] USD/EUR = {rate:.4f} ({day})")
+        return rate
+
+    def _covered(self, start: str, end: str) -> bool:
+        return any(lo <= start and end <= hi for lo, hi in self.ranges)
+
+    def ensure_range(self, start: DayLike, end: DayLike) -> None:
+        """Stellt sicher, dass Kurse fuer [start, end] vorliegen (ein Request pro Luecke)"""
+        start_key, end_key = _day_key(start), _day_key(end)
+        # Vorlauf fuer Wochenenden/Feiertage am Anfang des Zeitraums
+        fetch_start = (date.fromisoformat(start_key) - timedelta(days=7)).isoformat()
+        if self._covered(start_key, end_key):
+            return
+
+        query = urllib.parse.urlencode({"from": "USD", "to": "EUR"})
+        url = f"{FRANKFURTER_ROOT}/{fetch_start}..{end_key}?{query}"
+        payload = self._get_json(url)
+        rates = {day: float(values["EUR"]) for day, values in (payload.get("rates") or {}).items() if "EUR" in values}
+        if not rates:
+            return
+
+        with self._lock:
+            self._merge(rates)
+            # Heute kann noch nachkommen -> nur bis gestern als vollstaendig merken
+            complete_until = min(end_key, (date.today() - timedelta(days=1)).isoformat())
+            if fetch_start <= complete_until:
+                self.ranges.append([fetch_start, complete_until])
+            self._save()
+
+    # ── Hintergrund-Refresh (Bot) ──────────────────────────────────────
+
+    async def _refresh_loop(self):
+        try:
+            while True:
+                age = time.time() - self.last_refresh
+                if age >= self.REFRESH_SECONDS:
+                    await asyncio.to_thread(self.refresh)
+                    age = 0
+                await asyncio.sleep(max(1.0, self.REFRESH_SECONDS - age))
+        except asyncio.CancelledError:
+            pass
+
+    def start(self):
+        """Startet den periodischen Refresh (idempotent, benoetigt laufenden Loop)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+_default: Optional[FxService] = None
+
+
+def get_fx_service() -> FxService:
+    """Prozessweite FX Instanz (geteilt von Oracle, Registry, Auswertungen)"""
+    global _default
+    if _default is None:
+        _default = FxService()
+    return _default
@@ -0,0 +1,109 @@
+"""
+Latency - Was kostet jede Sekunde Pipeline-Latenz?
+
+Zwischen dem Kauf eines kopierten Wallets (Block-Zeit) und unserem Entry
+liegen Polling-Lag, getTransaction, Signal-Fenster und Preis-Abfrage. Die
+Ausfuehrung selbst modelliert simulation.py (Delay, im Replay zum
+aufgezeichneten Preis); hier geht es um den Teil davor:
+
+  - measured_latencies(): gemessene Latenz je Position aus den Aufzeichnungen
+      detection = Erkennungszeit des TradeEvents - block_time
+      pipeline  = Entry-Zeit - block_time
+    (block_time hat Sekunden-Aufloesung)
+  - latency_curve(): Entry d Sekunden spaeter auf dem gespeicherten
+    Preisverlauf (trading/price_paths.py), Exit unveraendert. Positionen,
+    deren Exit vor dem verspaeteten Entry liegt, werden verpasst (PnL 0).
+  - cost_per_second(): Steigung der PnL-Kurve (lineare Regression) – die
+    Zahl, nach der Performance-Arbeit priorisiert wird.
+
+Frueher als gemessen kann nicht bewertet werden (der Verlauf beginnt beim
+Entry) – die Steigung gilt fuer die Sekunden, die wir heute zu spaet sind.
+"""
+import logging
+from bisect import bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from trading.price_paths import RECORDINGS_DIR, PricePath, price_at
+from trading.replay import load_events
+
+logger = logging.getLogger(__name__)
+
+MAX_MATCH_SECONDS = 300     # BUY-Event hoechstens so lange vor dem Entry
+
+
+def measured_latencies(positions: List[dict],
+                       recordings_dir: Path = RECORDINGS_DIR) -> Dict[int, Tuple[float, float]]:
+    """
+    {index in positions: (detection_s, pipeline_s)} aus den Session-Aufzeichnungen.
+    Zuordnung: letztes BUY-Event desselben Wallets/Tokens vor dem Entry.
+    """
+    by_session: Dict[str, List[int]] = {}
+    for i, pos in enumerate(positions):
+        by_session.setdefault(pos["session_id"], []).append(i)
+
+    latencies: Dict[int, Tuple[float, float]] = {}
+    for session_id, indices in by_session.items():
+        files = sorted(recordings_dir.glob(f"{session_id}.jsonl*"))
+        if not files:
+            continue
+
+        buys: Dict[tuple, List[Tuple[float, float]]] = {}
+        for event in load_events(files):
+            if event["type"] == "trade" and event.get("side") == "BUY" and event.get("block_time"):
+                buys.setdefault((event["wallet"], event["token"]), []).append(
+                    (event["t"], float(event["block_time"]))
+                )
+
+        for i in indices:
+            pos = positions[i]
+            events = buys.get((pos["wallet"], pos["token"]))
+            if not events:
+                continue
+            entry_ts = datetime.fromisoformat(pos["entry_time"]).timestamp()
+            idx = bisect_right(events, (entry_ts, float("inf"))) - 1
+            if idx < 0:
+                continue
+            t, block_time = events[idx]
+            if entry_ts - t > MAX_MATCH_SECONDS:
+                continue
+            latencies[i] = (max(t - block_time, 0.0), max(entry_ts - block_time, 0.0))
+    return latencies
+
+
+def latency_curve(paths: Dict[int, PricePath], positions: List[dict],
+                  offsets: Sequence[float]) -> List[dict]:
+    """PnL aller Positionen mit Verlauf, Entry jeweils offset Sekunden spaeter"""
+    rows = sorted(paths)
+    exit_prices = np.array([positions[i]["exit_price"] for i in rows], dtype=float)
+    costs = np.array([positions[i]["cost_eur"] or 0.0 for i in rows], dtype=float)
+    durations = np.array([paths[i].times[-1] for i in rows], dtype=float)
+
+    curve = []
+    for offset in offsets:
+        entry = np.array([price_at(paths[i], offset) for i in rows], dtype=float)
+        taken = durations > offset if offset > 0 else np.ones(len(rows), dtype=bool)
+        pct = np.where(taken, (exit_prices / entry - 1) * 100, 0.0)
+        n = int(taken.sum())
+        curve.append({
+            "offset": float(offset),
+            "n":      n,
+            "missed": len(rows) - n,
+            "pnl":    float((pct / 100 * costs).sum()),
+            "ev":     float(pct[taken].mean()) if n else 0.0,
+            "wr":     float((pct[taken] > 0).mean()) if n else 0.0,
+        })
+    return curve
+
+
+def cost_per_second(curve: List[dict]) -> Tuple[float, float]:
+    """(EUR pro Sekunde, EV-Prozentpunkte pro Sekunde) – negativ = Latenz kostet"""
+    if len(curve) < 2:
+        return 0.0, 0.0
+    offsets = [c["offset"] for c in curve]
+    eur = np.polyfit(offsets, [c["pnl"] for c in curve], 1)[0]
+    ev = np.polyfit(offsets, [c["ev"] for c in curve], 1)[0]
+    return float(eur), float(ev)
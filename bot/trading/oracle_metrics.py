@@ -0,0 +1,294 @@
+"""
+Oracle Metrics - Live-Kennzahlen des PriceOracle
+
+print_all_stats() zeigte nur Fetch/Hit/Miss beim Shutdown. Hier wird
+waehrend des Laufs gesammelt:
+
+  - Latenz-Histogramm pro Quelle (DexScreener / Birdeye / CoinGecko)
+  - Fehlerklassen pro Quelle (HTTP 5xx, Timeout, ClientError, ...)
+  - Rate-Limit Treffer (HTTP 429)
+  - Cache-Hit-Ratio pro Aufrufer (price_loop, buy, sell, ...)
+  - Tokens mit wiederholten Fehlschlaegen
+
+Ausgabe:
+  - periodische Log-Zeile (alle LOG_INTERVAL Sekunden, start() – PriceOracle)
+  - HTTP Endpoint (JSON) nur auf Anfrage des Runners (serve(), paper_mainnet /
+    wallet_analysis), nur 127.0.0.1, Port METRICS_PORT:
+      GET /metrics   - Vollstaendiger Snapshot
+      GET /summary   - Die Log-Zeile
+
+Alle Zaehler leben auf dem Event-Loop-Thread. Der Endpoint liest sie nie
+direkt: der Loop rendert alle PUBLISH_INTERVAL Sekunden einen fertigen
+JSON-Snapshot, der Handler-Thread liefert nur diese Bytes aus.
+
+So sieht man eine DexScreener-Degradierung, bevor sie einen Stop-Loss kostet.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 8091
+LOG_INTERVAL = 60                  # Sekunden zwischen Log-Zeilen
+PUBLISH_INTERVAL = 2               # Sekunden zwischen Endpoint-Snapshots
+REPEATED_FAILURE_THRESHOLD = 3     # ab so vielen Fehlschlaegen in Folge melden
+
+# Obere Bucket-Grenzen in ms (letzter Bucket = alles darueber)
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2000, 4000, 8000)
+
+
+class LatencyHistogram:
+    """Fest-Bucket Histogramm (ms) – O(Buckets) pro Messung, kein Sample-Speicher"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        for i, bound in enumerate(self.buckets):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Obere Bucket-Grenze, unter der pct% der Messungen liegen"""
+        if not self.count:
+            return None
+        target = self.count * pct / 100
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return float(self.buckets[i]) if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        labels = [f"<={b}" for b in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class SourceStats:
+    """Kennzahlen einer Preisquelle"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.ok = 0
+        self.empty = 0                 # Antwort ohne Preis (kein Pair, Preis 0, ...)
+        self.errors: Counter = Counter()
+        self.rate_limited = 0
+        self.last_error: Optional[str] = None
+        self.last_error_time: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        total = self.ok + self.empty + sum(self.errors.values())
+        return {
+            "requests": total,
+            "ok": self.ok,
+            "empty": self.empty,
+            "error_rate": round(sum(self.errors.values()) / total, 3) if total else 0.0,
+            "errors": dict(self.errors),
+            "rate_limited": self.rate_limited,
+            "last_error": self.last_error,
+            "last_error_age_s": round(time.time() - self.last_error_time, 1) if self.last_error_time else None,
+            "latency": self.latency.to_dict(),
+        }
+
+
+class OracleMetrics:
+    """Sammelt Oracle-Kennzahlen (nur vom Event-Loop-Thread aus aufrufen)"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.sources: Dict[str, SourceStats] = {}
+        self.cache_by_caller: Dict[str, List[int]] = {}     # caller -> [hits, misses]
+        self.token_failures: Dict[str, int] = {}            # token -> Fehlschlaege in Folge
+        self._log_task: Optional[asyncio.Task] = None
+        self._publish_task: Optional[asyncio.Task] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._published: Dict[str, bytes] = {}              # Pfad -> fertige Antwort (Handler-Thread)
+
+    # ── Erfassung ──────────────────────────────────────────────────────
+
+    def _source(self, name: str) -> SourceStats:
+        stats = self.sources.get(name)
+        if stats is None:
+            stats = self.sources[name] = SourceStats()
+        return stats
+
+    def record_request(self, source: str, latency_ms: float, got_price: bool):
+        stats = self._source(source)
+        stats.latency.observe(latency_ms)
+        if got_price:
+            stats.ok += 1
+
+    def error_count(self, source: str) -> int:
+        stats = self.sources.get(source)
+        return sum(stats.errors.values()) if stats else 0
+
+    def record_empty(self, source: str):
+        self._source(source).empty += 1
+
+    def record_error(self, source: str, error_class: str):
+        stats = self._source(source)
+        stats.errors[error_class] += 1
+        stats.last_error = error_class
+        stats.last_error_time = time.time()
+        if error_class == "HTTP 429":
+            stats.rate_limited += 1
+
+    def record_cache(self, caller: str, hit: bool):
+        counts = self.cache_by_caller.setdefault(caller, [0, 0])
+        counts[0 if hit else 1] += 1
+
+    def record_token(self, token: str, ok: bool):
+        if ok:
+            self.token_failures.pop(token, None)
+        else:
+            self.token_failures[token] = self.token_failures.get(token, 0) + 1
+
+    # ── Auswertung ─────────────────────────────────────────────────────
+
+    def repeated_failures(self) -> Dict[str, int]:
+        return {t: n for t, n in self.token_failures.items() if n >= REPEATED_FAILURE_THRESHOLD}
+
+    def snapshot(self) -> dict:
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "sources": {name: s.to_dict() for name, s in self.sources.items()},
+            "cache_by_caller": {
+                caller: {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+                }
+                for caller, (hits, misses) in self.cache_by_caller.items()
+            },
+            "repeated_failures": self.repeated_failures(),
+        }
+
+    def summary_line(self) -> str:
+        parts = []
+        for name, s in self.sources.items():
+            p95 = s.latency.percentile(95)
+            line = f"{name} ok={s.ok} empty={s.empty} err={sum(s.errors.values())} 429={s.rate_limited}"
+            if p95 is not None:
+                line += f" p95<={p95:.0f}ms"
+            parts.append(line)
+        hits = sum(h for h, _ in self.cache_by_caller.values())
+        total = sum(h + m for h, m in self.cache_by_caller.values())
+        parts.append(f"cache={hits / total * 100:.0f}%" if total else "cache=-")
+        failing = self.repeated_failures()
+        if failing:
+            parts.append(f"failing_tokens={len(failing)}")
+        return " | ".join(parts)
+
+    # ── Ausgabe ────────────────────────────────────────────────────────
+
+    async def _log_loop(self, interval: float):
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                if self.sources or self.cache_by_caller:
+                    logger.info(f"[OracleMetrics] {self.summary_line()}")
+        except asyncio.CancelledError:
+            pass
+
+    def start(self, log_interval: float = LOG_INTERVAL):
+        """Startet die periodische Log-Zeile (idempotent, benoetigt laufenden Loop)"""
+        if self._log_task is None or self._log_task.done():
+            self._log_task = asyncio.get_running_loop().create_task(self._log_loop(log_interval))
+
+    @property
+    def serving(self) -> bool:
+        return self._server is not None
+
+    def serve(self, port: int = METRICS_PORT, host: str = METRICS_HOST) -> bool:
+        """
+        Startet den HTTP Endpoint (opt-in durch den Runner, benoetigt laufenden Loop).
+        Rueckgabe: False, wenn der Port belegt ist.
+        """
+        if self._server is not None:
+            return True
+        self._publish()
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                path = "/metrics" if self.path == "/" else self.path
+                data = metrics._published.get(path)
+                status = 200
+                if data is None:
+                    status = 404
+                    data = json.dumps({"error": f"Unbekannter Endpoint: {self.path}",
+                                       "endpoints": ["/metrics", "/summary"]}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as e:
+            logger.warning(f"[OracleMetrics] Endpoint not started on {host}:{port}: {e}")
+            return False
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self._publish_task = asyncio.get_running_loop().create_task(self._publish_loop())
+        logger.info(f"[OracleMetrics] Endpoint: http://{host}:{port}/metrics")
+        return True
+
+    def _publish(self):
+        """Rendert die Endpoint-Antworten (Loop-Thread) – der Handler tauscht nur die Referenz"""
+        self._published = {
+            "/metrics": json.dumps(self.snapshot(), indent=2).encode("utf-8"),
+            "/summary": json.dumps({"summary": self.summary_line()}).encode("utf-8"),
+        }
+
+    async def _publish_loop(self, interval: float = PUBLISH_INTERVAL):
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                self._publish()
+        except asyncio.CancelledError:
+            pass
+
+    async def stop(self):
+        for task in (self._log_task, self._publish_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._log_task = None
+        self._publish_task = None
+        if self._server is not None:
+            # shutdown() wartet bis zum naechsten Poll von serve_forever (bis 0.5s) – nicht im Loop
+            server, self._server = self._server, None
+            await asyncio.to_thread(server.shutdown)
+            server.server_close()
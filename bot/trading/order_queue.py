@@ -0,0 +1,200 @@
+"""
+Order Queue - Nicht-blockierende Ausfuehrung von BUY/SELL Orders
+
+simulate_buy / simulate_sell warten 1-4.5s (Delay, ggf. Retry). Bisher lief
+das inline im Source-Callback (on_trade_event) bzw. im Price-Bus-Handler –
+ein langsamer SELL hielt die Verarbeitung aller folgenden Trade Events auf.
+
+Jetzt:
+  - submit() legt eine Order ab und kehrt sofort zurueck
+  - pro Token eine Lane (FIFO) mit eigenem Executor-Task: Orders desselben
+    Tokens laufen strikt nacheinander (BUY vor SELL), verschiedene Tokens
+    parallel, begrenzt durch max_concurrent
+  - Order-IDs sind idempotent: eine ID, die ansteht, laeuft oder bereits
+    erfolgreich ausgefuehrt wurde, wird nicht erneut angenommen – submit()
+    gibt die bestehende Order zurueck. Doppelte Trigger (Tick-Handler und
+    Trade Event fuer dieselbe Position) werden so zu einer Order.
+    Fehlgeschlagene Orders (Executor liefert None / Exception) geben ihre ID
+    wieder frei, damit ein spaeterer Trigger es erneut versuchen kann.
+
+Der Beobachtungs-Durchsatz haengt damit nicht mehr von der Ausfuehrungszeit ab.
+"""
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from trading.clock import get_clock
+
+logger = logging.getLogger(__name__)
+
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+DONE    = "DONE"
+FAILED  = "FAILED"
+
+
+@dataclass
+class Order:
+    """Eine BUY/SELL Order fuer einen Token"""
+    order_id: str
+    side: str                               # BUY / SELL
+    token: str
+    reason: str = ""
+    trigger_label: str = ""
+    price_eur: Optional[float] = None       # None -> Executor holt frischen Preis
+    flow_ahead_amount: float = 0.0          # Token-Menge, die vor uns im Pool landet
+    block_time: Optional[float] = None      # Block dieses Flows (zaehlt nur bei aelterem Quote)
+    signal: Any = None                      # TradeSignal (BUY)
+    fraction: float = 1.0                   # SELL: Anteil der Menge (< 1 = Teil-Exit)
+    step: int = 0                           # Ladder-Stufe des Teil-Exits
+    status: str = PENDING
+    submitted_at: float = 0.0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    result: Any = None
+    error: Optional[str] = None
+
+    @property
+    def queue_wait(self) -> float:
+        return max(self.started_at - self.submitted_at, 0.0) if self.started_at else 0.0
+
+
+class OrderQueue:
+    """
+    Order-Warteschlange mit einer Lane (Executor-Task) pro Token.
+
+    executor: async Callable(Order) -> Ergebnis; None = nicht ausgefuehrt.
+    """
+
+    def __init__(self, executor: Callable[[Order], Awaitable[Any]], max_concurrent: int = 8,
+                 history: int = 1000, clock=None):
+        self.executor = executor
+        self.clock = clock or get_clock()
+        self.history = history
+
+        self._lanes: Dict[str, Deque[Order]] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._active: Dict[str, Order] = {}                     # order_id -> PENDING/RUNNING
+        self._done: "OrderedDict[str, Order]" = OrderedDict()   # order_id -> erfolgreich
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._stopped = False
+
+        self.submitted = 0
+        self.executed = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.max_queue_wait = 0.0
+
+    def submit(self, order: Order) -> Order:
+        """Legt Order ab (kehrt sofort zurueck). Bekannte ID -> bestehende Order."""
+        if self._stopped:
+            # Session-Ende: keine neuen Lanes mehr (Journal wird gleich geschlossen)
+            order.status = FAILED
+            order.error = "queue stopped"
+            return order
+
+        existing = self._active.get(order.order_id) or self._done.get(order.order_id)
+        if existing is not None:
+            self.duplicates += 1
+            logger.debug(f"[OrderQueue] Duplicate {order.order_id[:24]}... ({existing.status})")
+            return existing
+
+        order.status = PENDING
+        order.submitted_at = self.clock.monotonic()
+        self._active[order.order_id] = order
+        self._lanes.setdefault(order.token, deque()).append(order)
+        self.submitted += 1
+
+        worker = self._workers.get(order.token)
+        if worker is None or worker.done():
+            self._workers[order.token] = asyncio.create_task(self._run_lane(order.token))
+        self._idle.clear()
+        return order
+
+    def count_pending(self, token: Optional[str] = None, side: Optional[str] = None) -> int:
+        """Offene (PENDING/RUNNING) Orders, optional gefiltert nach Token / Seite"""
+        return sum(
+            1 for o in self._active.values()
+            if (token is None or o.token == token) and (side is None or o.side == side)
+        )
+
+    def has_pending(self, token: Optional[str] = None, side: Optional[str] = None) -> bool:
+        return self.count_pending(token, side) > 0
+
+    def is_pending(self, order_id: str) -> bool:
+        return order_id in self._active
+
+    def get(self, order_id: str) -> Optional[Order]:
+        return self._active.get(order_id) or self._done.get(order_id)
+
+    async def _run_lane(self, token: str):
+        lane = self._lanes[token]
+        try:
+            while lane:
+                order = lane[0]
+                async with self._slots:
+                    await self._execute(order)
+                lane.popleft()
+        finally:
+            if not lane:
+                self._lanes.pop(token, None)
+            if self._workers.get(token) is asyncio.current_task():
+                del self._workers[token]
+            if not self._workers:
+                self._idle.set()
+
+    async def _execute(self, order: Order):
+        order.status = RUNNING
+        order.started_at = self.clock.monotonic()
+        self.max_queue_wait = max(self.max_queue_wait, order.queue_wait)
+        try:
+            order.result = await self.executor(order)
+        except asyncio.CancelledError:
+            order.status = FAILED
+            order.error = "cancelled"
+            self._active.pop(order.order_id, None)
+            raise
+        except Exception as e:
+            order.error = str(e)
+            logger.error(f"[OrderQueue] {order.side} {order.token[:8]}... crashed: {e}")
+        order.finished_at = self.clock.monotonic()
+        self._active.pop(order.order_id, None)
+
+        if order.result is None:
+            # ID wieder frei: ein spaeterer Trigger darf es erneut versuchen
+            order.status = FAILED
+            self.failed += 1
+            return
+
+        order.status = DONE
+        self.executed += 1
+        self._done[order.order_id] = order
+        while len(self._done) > self.history:
+            self._done.popitem(last=False)
+
+    async def drain(self):
+        """Wartet bis alle Orders (auch waehrenddessen eingereichte) abgearbeitet sind"""
+        while self._workers:
+            await self._idle.wait()
+
+    async def stop(self):
+        """Bricht laufende Lanes ab (offene Orders verfallen), danach nimmt submit() nichts mehr an"""
+        self._stopped = True
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._lanes.clear()
+        self._workers.clear()
+        self._active.clear()
+        self._idle.set()
+
+    def summary(self) -> str:
+        return (
+            f"{self.submitted} orders | {self.executed} executed | {self.failed} failed | "
+            f"{self.duplicates} duplicates | max wait {self.max_queue_wait:.2f}s"
+        )
@@ -2,18 +2,22 @@
 Paper Trading Portfolio - Virtuelles Kapital Management
 1 Unit = 1 EUR
 """
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime
 import json
 import logging
 
+from trading.clock import get_clock
+from trading.session_journal import SessionJournal
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
-    """Eine offene Position"""
+    """Eine offene Position (slots: kein Instanz-Dict, Teil-Exits aendern amount/cost)"""
     token: str
     entry_price_eur: float
     amount: float
@@ -38,9 +42,9 @@ class Position:
         return ((current_price - self.entry_price_eur) / self.entry_price_eur) * 100
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Trade:
-    """Ein abgeschlossener Trade"""
+    """Ein abgeschlossener Trade (unveraenderlich, slots)"""
     token: str
     side: str  # BUY / SELL
     price_eur: float
@@ -53,18 +57,101 @@ class Trade:
     fees_eur: float = 0.0      # fees paid for this leg
     slippage_pct: float = 0.0  # total slippage (impact + drift)
 
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["timestamp"] = self.timestamp.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Trade":
+        data = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+        return cls(**data)
+
+
+@dataclass
+class PortfolioStats:
+    """Laufende Aggregate ueber alle Trades – O(1) pro Trade statt Scan ueber trade_history"""
+    trades: int = 0
+    completed: int = 0          # SELLs (inkl. Teil-Exits)
+    wins: int = 0
+    losses: int = 0
+    win_sum: float = 0.0
+    loss_sum: float = 0.0
+    realized_pnl: float = 0.0
+    fees: float = 0.0
+    best: Optional[float] = None
+    worst: Optional[float] = None
+
+    def add(self, trade: Trade):
+        self.trades += 1
+        self.fees += trade.fees_eur
+        if trade.side != "SELL":
+            return
+        pnl = trade.pnl_eur or 0.0
+        self.completed += 1
+        self.realized_pnl += pnl
+        if pnl > 0:
+            self.wins += 1
+            self.win_sum += pnl
+        elif pnl < 0:
+            self.losses += 1
+            self.loss_sum += pnl
+        self.best = pnl if self.best is None else max(self.best, pnl)
+        self.worst = pnl if self.worst is None else min(self.worst, pnl)
+
 
 class PaperPortfolio:
-    """Virtuelles Trading Portfolio"""
+    """Virtuelles Trading Portfolio
+
+    journal_path: Session-Journal (trading/session_journal.py, Pfad ohne Endung) –
+    Zustand crash-sicher + voller Trade-Verlauf auf der Platte; trade_history
+    haelt dann nur die letzten recent_trades im Speicher.
+    Ohne Journal (Replay, Sweep) bleibt der volle Verlauf in trade_history.
+    """
+
+    RECENT_TRADES = 100
     
-    def __init__(self, initial_capital_eur: float = 1000.0):
+    def __init__(self, initial_capital_eur: float = 1000.0, journal_path: Optional[str] = None,
+                 recent_trades: int = RECENT_TRADES):
         self.initial_capital = initial_capital_eur
         self.cash_eur = initial_capital_eur
         self.positions: Dict[str, Position] = {}
-        self.trade_history: List[Trade] = []
+        self.recent_trades = recent_trades
+        self.journal: Optional[SessionJournal] = None
+        self.trade_history = []
+        self.stats = PortfolioStats()
+        if journal_path:
+            self.attach_journal(SessionJournal(journal_path))
         self.position_size_percent = 0.20  # 20% des Kapitals pro Trade
         
         logger.info(f"[PaperPortfolio] Initialized with {initial_capital_eur:.2f} EUR")
+
+    def attach_journal(self, journal: SessionJournal):
+        """Ab jetzt jeden Trade ins Session-Journal (Verlauf im Speicher begrenzt)"""
+        self.journal = journal
+        self.trade_history = deque(self.trade_history, maxlen=self.recent_trades)
+
+    def _record_trade(self, trade: Trade, action: str):
+        """Bucht einen Trade (action: open/reduce/close): Aggregate, Journal, Verlauf im Speicher"""
+        self.stats.add(trade)
+        self.trade_history.append(trade)
+        if self.journal:
+            self.journal.record(self, action, trade)
+
+    def iter_trades(self) -> Iterator[Trade]:
+        """Voller Trade-Verlauf (mit Journal von der Platte gestreamt)"""
+        if self.journal:
+            for record in self.journal.trades.records("trade"):
+                yield Trade.from_dict(record)
+        else:
+            yield from self.trade_history
+
+    def end_session(self):
+        """Sauberes Ende: Journal kompaktieren, End-Marker, Dateien schliessen"""
+        if self.journal:
+            self.journal.end(self)
+            self.journal.close()
     
     def get_total_value(self, token_prices: Dict[str, float]) -> float:
         """Gesamtwert: Cash + Positionen"""
@@ -78,14 +165,25 @@ class PaperPortfolio:
         """Verfügbares Kapital für neue Trades"""
         return self.cash_eur
     
-    def can_open_position(self, token: str, price_eur: float) -> bool:
+    def get_exposure(self) -> float:
+        """Eingesetztes Kapital aller offenen Positionen (Einstand, ohne Fees)"""
+        return sum(pos.cost_eur for pos in self.positions.values())
+
+    def get_equity(self) -> float:
+        """Cash + Einstand offener Positionen (ohne Marktbewertung)"""
+        return self.cash_eur + self.get_exposure()
+
+    def can_open_position(self, token: str, price_eur: float,
+                          investment_eur: Optional[float] = None) -> bool:
         """Prüft ob Position eröffnet werden kann"""
         if token in self.positions:
             logger.debug(f"[PaperPortfolio] Position für {token} existiert bereits")
             return False
         
-        required_capital = self.cash_eur * self.position_size_percent
-        if required_capital < 1.0:  # Mindestens 1 EUR
+        required_capital = (
+            investment_eur if investment_eur is not None else self.cash_eur * self.position_size_percent
+        )
+        if required_capital < 1.0 or required_capital > self.cash_eur:  # Mindestens 1 EUR
             logger.debug(f"[PaperPortfolio] Nicht genug Kapital: {self.cash_eur:.2f} EUR")
             return False
         
@@ -99,19 +197,22 @@ class PaperPortfolio:
         executed_price_eur: Optional[float] = None,
         fees_eur: float = 0.0,
         slippage_pct: float = 0.0,
+        investment_eur: Optional[float] = None,
     ) -> Optional[Position]:
         """Eröffnet eine neue Position.
 
         executed_price_eur: actual fill price after slippage (defaults to price_eur).
         fees_eur: swap + network fees paid on entry.
+        investment_eur: capital for this position (defaults to position_size_percent of cash).
         """
-        if not self.can_open_position(token, price_eur):
+        if not self.can_open_position(token, price_eur, investment_eur):
             return None
 
         fill_price = executed_price_eur if executed_price_eur is not None else price_eur
 
-        # 20% des Cash für diesen Trade (vor Fees)
-        investment_eur = self.cash_eur * self.position_size_percent
+        # Default: 20% des Cash für diesen Trade (vor Fees)
+        if investment_eur is None:
+            investment_eur = self.cash_eur * self.position_size_percent
         amount = investment_eur / fill_price
         total_cost = investment_eur + fees_eur
 
@@ -119,7 +220,7 @@ class PaperPortfolio:
             token=token,
             entry_price_eur=fill_price,
             amount=amount,
-            entry_time=datetime.now(),
+            entry_time=get_clock().now(),
             cost_eur=investment_eur,
             trigger_wallets=trigger_wallets,
             entry_fees_eur=fees_eur,
@@ -134,12 +235,12 @@ class PaperPortfolio:
             price_eur=fill_price,
             amount=amount,
             value_eur=investment_eur,
-            timestamp=datetime.now(),
+            timestamp=get_clock().now(),
             trigger_wallets=trigger_wallets,
             fees_eur=fees_eur,
             slippage_pct=slippage_pct,
         )
-        self.trade_history.append(trade)
+        self._record_trade(trade, "open")
 
         logger.info(
             f"[PaperPortfolio]  BOUGHT {amount:.4f} {token[:8]}... "
@@ -185,16 +286,15 @@ class PaperPortfolio:
             price_eur=fill_price,
             amount=position.amount,
             value_eur=sell_value_eur,
-            timestamp=datetime.now(),
+            timestamp=get_clock().now(),
             trigger_wallets=position.trigger_wallets,
             pnl_eur=pnl_eur,
             pnl_percent=pnl_percent,
             fees_eur=fees_eur,
             slippage_pct=slippage_pct,
         )
-        self.trade_history.append(trade)
-
         del self.positions[token]
+        self._record_trade(trade, "close")
 
         emoji = "" if pnl_eur >= 0 else ""
         logger.info(
@@ -207,6 +307,59 @@ class PaperPortfolio:
         logger.info(f"[PaperPortfolio] Cash: {self.cash_eur:.2f} EUR")
 
         return trade
+
+    def reduce_position(
+        self,
+        token: str,
+        fraction: float,
+        price_eur: float,
+        reason: str = "",
+        executed_price_eur: Optional[float] = None,
+        fees_eur: float = 0.0,
+        slippage_pct: float = 0.0,
+    ) -> Optional[Trade]:
+        """Teil-Verkauf: fraction (0..1) der aktuellen Menge, Einstand + Entry-Fees anteilig.
+
+        Der Rest bleibt als Position offen; volle Exits laufen über close_position.
+        """
+        position = self.positions.get(token)
+        if position is None or not 0 < fraction < 1:
+            return None
+
+        fill_price = executed_price_eur if executed_price_eur is not None else price_eur
+        amount = position.amount * fraction
+        cost_eur = position.cost_eur * fraction
+        entry_fees = position.entry_fees_eur * fraction
+
+        sell_value_eur = amount * fill_price
+        pnl_eur = sell_value_eur - cost_eur - entry_fees - fees_eur
+        pnl_percent = (pnl_eur / cost_eur) * 100 if cost_eur else 0.0
+
+        position.amount -= amount
+        position.cost_eur -= cost_eur
+        position.entry_fees_eur -= entry_fees
+        self.cash_eur += sell_value_eur - fees_eur
+
+        trade = Trade(
+            token=token,
+            side="SELL",
+            price_eur=fill_price,
+            amount=amount,
+            value_eur=sell_value_eur,
+            timestamp=get_clock().now(),
+            trigger_wallets=position.trigger_wallets,
+            pnl_eur=pnl_eur,
+            pnl_percent=pnl_percent,
+            fees_eur=fees_eur,
+            slippage_pct=slippage_pct,
+        )
+        self._record_trade(trade, "reduce")
+
+        logger.info(
+            f"[PaperPortfolio] PARTIAL SOLD {fraction*100:.0f}% = {amount:.4f} {token[:8]}... "
+            f"@ {fill_price:.4f} EUR | P&L: {pnl_eur:+.2f} EUR ({pnl_percent:+.2f}%) {reason}"
+        )
+        return trade
     
     def has_position(self, token: str) -> bool:
         """Prüft ob Position existiert"""
@@ -222,17 +375,11 @@ class PaperPortfolio:
         total_pnl = total_value - self.initial_capital
         total_pnl_percent = (total_pnl / self.initial_capital) * 100
         
-        # Trade Stats
-        completed_trades = [t for t in self.trade_history if t.side == "SELL"]
-        winning_trades = [t for t in completed_trades if t.pnl_eur and t.pnl_eur > 0]
-        losing_trades = [t for t in completed_trades if t.pnl_eur and t.pnl_eur < 0]
-        
-        win_rate = (len(winning_trades) / len(completed_trades) * 100) if completed_trades else 0
-
-        avg_win = sum(t.pnl_eur for t in winning_trades) / len(winning_trades) if winning_trades else 0
-        avg_loss = sum(t.pnl_eur for t in losing_trades) / len(losing_trades) if losing_trades else 0
-
-        total_fees = sum(t.fees_eur for t in self.trade_history)
+        # Trade Stats (laufende Aggregate)
+        s = self.stats
+        win_rate = (s.wins / s.completed * 100) if s.completed else 0
+        avg_win = s.win_sum / s.wins if s.wins else 0
+        avg_loss = s.loss_sum / s.losses if s.losses else 0
 
         return {
             "initial_capital": self.initial_capital,
@@ -241,13 +388,16 @@ class PaperPortfolio:
             "total_value": total_value,
             "total_pnl": total_pnl,
             "total_pnl_percent": total_pnl_percent,
-            "trades_completed": len(completed_trades),
-            "trades_winning": len(winning_trades),
-            "trades_losing": len(losing_trades),
+            "trades_completed": s.completed,
+            "trades_winning": s.wins,
+            "trades_losing": s.losses,
             "win_rate": win_rate,
             "avg_win": avg_win,
             "avg_loss": avg_loss,
-            "total_fees": total_fees,
+            "best_trade": s.best or 0.0,
+            "worst_trade": s.worst or 0.0,
+            "realized_pnl": s.realized_pnl,
+            "total_fees": s.fees,
         }
     
     def print_summary(self, token_prices: Dict[str, float]):
@@ -269,6 +419,7 @@ class PaperPortfolio:
         print(f"Win Rate:            {stats['win_rate']:>12.1f}%")
         print(f"Avg Win:             {stats['avg_win']:>+12.2f} EUR")
         print(f"Avg Loss:            {stats['avg_loss']:>+12.2f} EUR")
+        print(f"Best / Worst Trade:  {stats['best_trade']:>+12.2f} / {stats['worst_trade']:+.2f} EUR")
         print(f"Total Fees Paid:     {stats['total_fees']:>12.4f} EUR")
         print("="*70)
         
@@ -300,22 +451,7 @@ class PaperPortfolio:
                 }
                 for p in self.positions.values()
             ],
-            "trade_history": [
-                {
-                    "token": t.token,
-                    "side": t.side,
-                    "price_eur": t.price_eur,
-                    "amount": t.amount,
-                    "value_eur": t.value_eur,
-                    "timestamp": t.timestamp.isoformat(),
-                    "trigger_wallets": t.trigger_wallets,
-                    "pnl_eur": t.pnl_eur,
-                    "pnl_percent": t.pnl_percent,
-                    "fees_eur": t.fees_eur,
-                    "slippage_pct": t.slippage_pct,
-                }
-                for t in self.trade_history
-            ]
+            "trade_history": [t.to_dict() for t in self.iter_trades()]
         }
         
         with open(filepath, 'w') as f:
@@ -0,0 +1,107 @@
+"""
+Position Lifecycle - Atomare Zustandsuebergaenge OPEN -> CLOSING -> CLOSED
+
+Eine Position kann aus mehreren Pfaden geschlossen werden: Price-Loop /
+Tick-Handler (SL/TP/Inaktivitaet), on_trade_event (Wallet verkauft),
+Missed-Sell-Abgleich nach Reconnect und Emergency-Exit. Zwischen Pruefung
+("Position offen?") und Buchung liegen awaits (Preis, Simulations-Delay) –
+ohne Koordination verkaufen zwei Pfade dieselbe Position oder der zweite
+ueberschreibt den PnL des ersten.
+
+Alle Close-Pfade gehen durch close():
+  - pro Position ein asyncio.Lock – ein Close nach dem anderen
+  - unter dem Lock: nur OPEN -> CLOSING, danach CLOSED (Erfolg) oder
+    zurueck auf OPEN (SELL fehlgeschlagen, ein spaeterer Trigger darf erneut)
+  - wer auf den Lock wartet, sieht danach CLOSED und tut nichts
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+OPEN    = "OPEN"
+CLOSING = "CLOSING"
+CLOSED  = "CLOSED"
+
+
+@dataclass
+class _Lifecycle:
+    status: str = OPEN
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    closed_by: Optional[str] = None
+
+
+class PositionLifecycle:
+    """Status + Lock pro Position (key = Token in der Engine)"""
+
+    def __init__(self):
+        self._entries: Dict[Hashable, _Lifecycle] = {}
+        self.closed = 0
+        self.rejected = 0      # Close-Versuche auf bereits geschlossene Positionen
+
+    def open(self, key: Hashable):
+        """Position ist eroeffnet -> OPEN (neuer Lock, alte Eintraege verfallen)"""
+        self._entries[key] = _Lifecycle()
+
+    def status(self, key: Hashable) -> str:
+        entry = self._entries.get(key)
+        return entry.status if entry else CLOSED
+
+    def is_open(self, key: Hashable) -> bool:
+        return self.status(key) == OPEN
+
+    def lock(self, key: Hashable) -> Optional[asyncio.Lock]:
+        """Lock der Position – fuer andere Aenderungen, die nicht mit einem Close kollidieren duerfen"""
+        entry = self._entries.get(key)
+        return entry.lock if entry else None
+
+    async def close(self, key: Hashable, action: Callable[[], Awaitable[Any]], reason: str = "") -> Any:
+        """
+        Fuehrt action() als einzigen Close der Position aus.
+        action liefert das Ergebnis (z.B. Trade) oder None (nicht geschlossen).
+        Rueckgabe: Ergebnis von action, None wenn die Position nicht (mehr) offen war.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.rejected += 1
+            return None
+
+        async with entry.lock:
+            if entry.status != OPEN:
+                self.rejected += 1
+                logger.debug(f"[Lifecycle] {str(key)[:8]}... already {entry.status} ({entry.closed_by}) "
+                             f"- ignoring {reason}")
+                return None
+
+            entry.status = CLOSING
+            try:
+                result = await action()
+            except BaseException:
+                entry.status = OPEN
+                raise
+
+            if result is None:
+                entry.status = OPEN
+                return None
+
+            entry.status = CLOSED
+            entry.closed_by = reason
+            self.closed += 1
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            return result
+
+    async def modify(self, key: Hashable, action: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Aenderung einer offenen Position (z.B. Teil-Exit) unter ihrem Lock.
+        Status bleibt OPEN; None wenn die Position nicht (mehr) offen ist.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        async with entry.lock:
+            if entry.status != OPEN:
+                return None
+            return await action()
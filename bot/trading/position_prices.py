@@ -0,0 +1,259 @@
+"""
+Position Prices - Kompakter Preisverlauf pro Position (Zeitreihen-Tabelle)
+
+Bisher ueberlebten einen Position-Close nur max_price_pct / min_price_pct –
+jeder Preis-Tick der Loops wurde ausgegeben und verworfen. Der Store haelt
+die Ticks jeder offenen Position im Speicher und schreibt sie gebuendelt in
+die Tabelle position_prices derselben DB wie wallet_trades:
+
+  buy_id   wallet_trades.id des BUY (Schluessel der Position)
+  chunk    laufende Nummer (0, 1, 2, ...) – ein Flush = ein Chunk pro Position
+  t0, p0   Entry-Zeit (Unix-Sekunden) und Entry-Preis EUR
+  n        Anzahl Samples im Chunk
+  data     Delta-kodierte Samples (siehe unten)
+
+Kodierung: pro Sample (dt, dq) als ZigZag-Varints, mit
+  t_ms = Millisekunden seit t0
+  q    = round(ln(price / p0) * 1e6)      (relative Aufloesung ~1e-6)
+Deltas jeweils zum vorherigen Sample, der erste Sample eines Chunks zum
+Entry (0, 0) – jeder Chunk ist fuer sich dekodierbar. Ein unveraenderter
+Preis alle 10s kostet so 3 Bytes.
+
+Leser: load_series() / load_all() – u.a. tune_observer (trading/price_paths.py).
+deploy.py merge_db kopiert die Tabelle beim Sync mit und schreibt buy_id auf
+die lokalen wallet_trades.id der importierten Sessions um.
+"""
+import asyncio
+import logging
+import math
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from trading.clock import get_clock
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 30.0      # Sekunden
+FLUSH_SAMPLES  = 2000      # ab so vielen gepufferten Samples sofort schreiben
+
+PRICE_SCALE = 1_000_000    # Schritte pro ln-Einheit
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Kodierung
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _put_varint(out: bytearray, value: int):
+    value = (value << 1) ^ (value >> 63)           # ZigZag: kleine |Werte| -> wenige Bytes
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varints(data: bytes) -> List[int]:
+    values, value, shift = [], 0, 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append((value >> 1) ^ -(value & 1))
+        value, shift = 0, 0
+    return values
+
+
+def encode_samples(samples: Iterable[Tuple[float, float]], t0: float, p0: float) -> bytes:
+    """[(unix_t, price_eur), ...] -> Delta-Varint Bytes (Preise <= 0 werden uebersprungen)"""
+    out = bytearray()
+    prev_t = prev_q = 0
+    for t, price in samples:
+        if price <= 0:
+            continue
+        t_ms = int(round((t - t0) * 1000))
+        q = int(round(math.log(price / p0) * PRICE_SCALE))
+        _put_varint(out, t_ms - prev_t)
+        _put_varint(out, q - prev_q)
+        prev_t, prev_q = t_ms, q
+    return bytes(out)
+
+
+def decode_samples(data: bytes, t0: float, p0: float) -> List[Tuple[float, float]]:
+    """Umkehrung von encode_samples -> [(unix_t, price_eur), ...]"""
+    values = _get_varints(data)
+    samples = []
+    t_ms = q = 0
+    for i in range(0, len(values) - 1, 2):
+        t_ms += values[i]
+        q += values[i + 1]
+        samples.append((t0 + t_ms / 1000, p0 * math.exp(q / PRICE_SCALE)))
+    return samples
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Store
+# ──────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class _Series:
+    t0: float
+    p0: float
+    chunk: int = 0
+    pending: List[Tuple[float, float]] = field(default_factory=list)
+
+
+class PositionPriceStore:
+    """
+    Puffert Preis-Ticks offener Positionen und schreibt sie gebuendelt.
+
+    open() / add() / close() sind reine Speicher-Operationen (kein I/O im
+    Hot Path). flush() schreibt alle Puffer mit einem executemany –
+    periodisch (start()), ab FLUSH_SAMPLES Samples und beim Beenden.
+    """
+
+    def __init__(self, db_path: str, flush_interval: float = FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self._series: Dict[int, _Series] = {}
+        self._closed: Set[int] = set()
+        self._buffered = 0
+        self._flush_task: Optional[asyncio.Task] = None
+        self.samples_written = 0
+        self.bytes_written = 0
+
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def _init_db(self):
+        conn = self._connect()
+        init_table(conn)
+        conn.commit()
+        conn.close()
+
+    # ── Erfassung ──────────────────────────────────────────────────────
+
+    def open(self, buy_id: int, price_eur: float, t: Optional[float] = None):
+        """Neue Position – Entry ist der Bezugspunkt (t0, p0) aller Samples"""
+        if buy_id is None or price_eur <= 0:
+            return
+        self._series[buy_id] = _Series(t0=t if t is not None else get_clock().time(), p0=price_eur)
+
+    def add(self, buy_id: int, price_eur: float, t: Optional[float] = None):
+        series = self._series.get(buy_id)
+        if series is None or price_eur <= 0:
+            return
+        series.pending.append((t if t is not None else get_clock().time(), price_eur))
+        self._buffered += 1
+        if self._buffered >= FLUSH_SAMPLES:
+            self.flush()
+
+    def close(self, buy_id: int, price_eur: Optional[float] = None, t: Optional[float] = None):
+        """Exit-Preis als letzter Sample; die Serie wird beim naechsten Flush entfernt"""
+        if buy_id not in self._series:
+            return
+        if price_eur:
+            self.add(buy_id, price_eur, t)
+        self._closed.add(buy_id)
+
+    # ── Schreiben ──────────────────────────────────────────────────────
+
+    def flush(self):
+        """Ein Chunk pro Position mit neuen Samples, alles in einer Transaktion"""
+        rows = []
+        for buy_id, series in self._series.items():
+            if not series.pending:
+                continue
+            rows.append((buy_id, series.chunk, series.t0, series.p0, len(series.pending),
+                         encode_samples(series.pending, series.t0, series.p0)))
+        if rows:
+            try:
+                conn = self._connect()
+                conn.executemany("""
+                    INSERT OR REPLACE INTO position_prices (buy_id, chunk, t0, p0, n, data)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, rows)
+                conn.commit()
+                conn.close()
+            except sqlite3.Error as e:
+                logger.error(f"[PositionPrices] Flush failed ({len(rows)} chunks kept in memory): {e}")
+                return
+            for buy_id, chunk, _, _, n, data in rows:
+                series = self._series[buy_id]
+                series.chunk += 1
+                series.pending.clear()
+                self.samples_written += n
+                self.bytes_written += len(data)
+
+        for buy_id in self._closed:
+            self._series.pop(buy_id, None)
+        self._closed.clear()
+        self._buffered = 0
+
+    async def _flush_loop(self):
+        try:
+            while True:
+                await get_clock().sleep(self.flush_interval)
+                self.flush()
+        except asyncio.CancelledError:
+            pass
+
+    def start(self):
+        """Startet den periodischen Flush (benoetigt laufenden Event Loop)"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self.flush()
+
+    def summary(self) -> str:
+        return f"{self.samples_written} Samples in {self.bytes_written / 1024:.1f} KB"
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Lesen
+# ──────────────────────────────────────────────────────────────────────────────
+
+def init_table(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS position_prices (
+            buy_id  INTEGER NOT NULL,
+            chunk   INTEGER NOT NULL,
+            t0      REAL    NOT NULL,
+            p0      REAL    NOT NULL,
+            n       INTEGER NOT NULL,
+            data    BLOB    NOT NULL,
+            PRIMARY KEY (buy_id, chunk)
+        ) WITHOUT ROWID
+    """)
+
+
+def load_series(conn: sqlite3.Connection, buy_id: int) -> List[Tuple[float, float]]:
+    """Alle Samples einer Position in Zeitreihenfolge"""
+    return load_all(conn, [buy_id]).get(buy_id, [])
+
+
+def load_all(conn: sqlite3.Connection,
+             buy_ids: Optional[Iterable[int]] = None) -> Dict[int, List[Tuple[float, float]]]:
+    """{buy_id: [(unix_t, price_eur), ...]} – ohne buy_ids alle gespeicherten Positionen"""
+    try:
+        rows = conn.execute(
+            "SELECT buy_id, t0, p0, data FROM position_prices ORDER BY buy_id, chunk"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return {}                                   # DB von vor der Tabelle
+    wanted = set(buy_ids) if buy_ids is not None else None
+    series: Dict[int, List[Tuple[float, float]]] = {}
+    for buy_id, t0, p0, data in rows:
+        if wanted is not None and buy_id not in wanted:
+            continue
+        series.setdefault(buy_id, []).extend(decode_samples(data, t0, p0))
+    return series
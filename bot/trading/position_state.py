@@ -0,0 +1,216 @@
+"""
+Position State Table - Kompakter Zustand aller offenen Positionen
+
+Ersetzt die parallelen Dicts (SL/TP, letzter Preis, Inaktivitaet,
+Stagnation, Preis-Ausfaelle, High/Low, Trigger-Wallets) durch EINEN
+Eintrag pro Position.
+
+SL/TP werden beim Oeffnen als absolute Trigger-Preise vorberechnet
+(sl_price, tp_price) und pro Token sortiert indiziert. Ein neuer Preis
+loest alle gekreuzten Trigger per bisect auf – kein Scan ueber alle
+Positionen, kein pnl_pct pro Position und Tick.
+"""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+from trading.clock import get_clock
+
+
+def _monotonic() -> float:
+    return get_clock().monotonic()
+
+
+@dataclass
+class PositionState:
+    """Laufzeit-Zustand einer offenen Position"""
+    key: Hashable                  # token (Engine) oder (token, wallet) (Analysis/Observer)
+    token: str
+    entry_price_eur: float
+    entry_time: float = field(default_factory=_monotonic)
+    sl_price: Optional[float] = None     # absoluter Stop-Loss Preis (EUR)
+    tp_price: Optional[float] = None     # absoluter Take-Profit Preis (EUR)
+    sl_pct: Optional[float] = None       # nur fuer Logs
+    tp_pct: Optional[float] = None
+    last_price: float = 0.0
+    last_price_time: float = 0.0         # letzter erfolgreicher Preis
+    last_changed_price: float = 0.0      # Inaktivitaet / Stagnation
+    last_changed_time: float = 0.0
+    price_fail_count: int = 0
+    max_pct: Optional[float] = None      # High/Low seit Entry in %
+    min_pct: Optional[float] = None
+    trigger_wallets: Set[str] = field(default_factory=set)   # Engine: Wallets deren SELL schliesst
+    remaining: float = 1.0               # Anteil der urspruenglichen Menge (Teil-Exits)
+    exit_step: int = 0                   # naechste Ladder-Stufe (trading/exit_rules.py)
+
+    def __post_init__(self):
+        self.last_price         = self.last_price or self.entry_price_eur
+        self.last_price_time    = self.last_price_time or self.entry_time
+        self.last_changed_price = self.last_changed_price or self.entry_price_eur
+        self.last_changed_time  = self.last_changed_time or self.entry_time
+
+    def pnl_pct(self, price: float) -> float:
+        if self.entry_price_eur <= 0:
+            return 0.0
+        return (price - self.entry_price_eur) / self.entry_price_eur * 100
+
+    def observe(self, price: float, now: Optional[float] = None) -> float:
+        """
+        Verbucht einen neuen Preis. Gibt die Aenderung zum letzten Preis in % zurueck.
+        Setzt Fehlerzaehler zurueck, aktualisiert High/Low und Inaktivitaets-Timer.
+        """
+        now = _monotonic() if now is None else now
+        prev = self.last_price
+        change_pct = ((price - prev) / prev * 100) if prev > 0 else 0.0
+
+        self.last_price       = price
+        self.last_price_time  = now
+        self.price_fail_count = 0
+
+        if self.entry_price_eur > 0:
+            pct = self.pnl_pct(price)
+            self.max_pct = pct if self.max_pct is None else max(self.max_pct, pct)
+            self.min_pct = pct if self.min_pct is None else min(self.min_pct, pct)
+
+        if price != self.last_changed_price:
+            self.last_changed_price = price
+            self.last_changed_time  = now
+
+        return change_pct
+
+    def unchanged_seconds(self, now: Optional[float] = None) -> float:
+        now = _monotonic() if now is None else now
+        return now - self.last_changed_time
+
+    def held_seconds(self, now: Optional[float] = None) -> float:
+        now = _monotonic() if now is None else now
+        return now - self.entry_time
+
+    def no_price_seconds(self, now: Optional[float] = None) -> float:
+        now = _monotonic() if now is None else now
+        return now - self.last_price_time
+
+
+class PositionTable:
+    """
+    Tabelle aller offenen Positionen + sortierter Trigger-Index pro Token.
+
+    Index pro Token (parallele, aufsteigend sortierte Listen):
+      _sl_prices / _sl_keys  -> SL ausgeloest wenn price <= sl_price
+      _tp_prices / _tp_keys  -> TP ausgeloest wenn price >= tp_price
+    """
+
+    def __init__(self):
+        self.states: Dict[Hashable, PositionState] = {}
+        self._by_token: Dict[str, Set[Hashable]] = {}
+        self._sl_prices: Dict[str, List[float]] = {}
+        self._sl_keys:   Dict[str, List[Hashable]] = {}
+        self._tp_prices: Dict[str, List[float]] = {}
+        self._tp_keys:   Dict[str, List[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def __contains__(self, key) -> bool:
+        return key in self.states
+
+    def get(self, key) -> Optional[PositionState]:
+        return self.states.get(key)
+
+    def keys_for_token(self, token: str) -> List[Hashable]:
+        return list(self._by_token.get(token, ()))
+
+    def tokens(self) -> List[str]:
+        return list(self._by_token.keys())
+
+    # ── Pflege ─────────────────────────────────────────────────────────
+
+    def add(self, state: PositionState, sl_pct: Optional[float] = None,
+            tp_pct: Optional[float] = None) -> PositionState:
+        """Fuegt Position hinzu und berechnet absolute SL/TP Trigger-Preise"""
+        if state.key in self.states:
+            self.remove(state.key)
+        self.states[state.key] = state
+        self._by_token.setdefault(state.token, set()).add(state.key)
+        self.set_triggers(state.key, sl_pct, tp_pct)
+        return state
+
+    def remove(self, key) -> Optional[PositionState]:
+        state = self.states.pop(key, None)
+        if state is None:
+            return None
+        self._unindex(state)
+        keys = self._by_token.get(state.token)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_token[state.token]
+        return state
+
+    def set_triggers(self, key, sl_pct: Optional[float], tp_pct: Optional[float]):
+        """(Neu-)Berechnet sl_price/tp_price aus Prozentwerten relativ zum Entry"""
+        state = self.states[key]
+        self._unindex(state)
+        entry = state.entry_price_eur
+        state.sl_pct   = sl_pct
+        state.tp_pct   = tp_pct
+        state.sl_price = entry * (1 + sl_pct / 100) if sl_pct is not None and entry > 0 else None
+        state.tp_price = entry * (1 + tp_pct / 100) if tp_pct is not None and entry > 0 else None
+        if state.sl_price is not None:
+            self._insort(self._sl_prices, self._sl_keys, state.token, state.sl_price, key)
+        if state.tp_price is not None:
+            self._insort(self._tp_prices, self._tp_keys, state.token, state.tp_price, key)
+
+    # ── Trigger-Aufloesung ─────────────────────────────────────────────
+
+    def crossed(self, token: str, price: float) -> Tuple[List[Hashable], List[Hashable]]:
+        """
+        Gibt (sl_hits, tp_hits) fuer einen neuen Preis zurueck.
+        O(log n + Treffer) pro Token statt Scan ueber alle Positionen.
+        """
+        sl_hits: List[Hashable] = []
+        tp_hits: List[Hashable] = []
+
+        sl_prices = self._sl_prices.get(token)
+        if sl_prices:
+            idx = bisect_left(sl_prices, price)
+            sl_hits = self._sl_keys[token][idx:]
+
+        tp_prices = self._tp_prices.get(token)
+        if tp_prices:
+            idx = bisect_right(tp_prices, price)
+            tp_hits = self._tp_keys[token][:idx]
+
+        return sl_hits, tp_hits
+
+    # ── Intern ─────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _insort(prices: Dict[str, List[float]], keys: Dict[str, List[Hashable]],
+                token: str, price: float, key):
+        p = prices.setdefault(token, [])
+        k = keys.setdefault(token, [])
+        idx = bisect_right(p, price)
+        p.insert(idx, price)
+        k.insert(idx, key)
+
+    @staticmethod
+    def _discard(prices: Dict[str, List[float]], keys: Dict[str, List[Hashable]],
+                 token: str, price: Optional[float], key):
+        if price is None or token not in prices:
+            return
+        p, k = prices[token], keys[token]
+        lo = bisect_left(p, price)
+        hi = bisect_right(p, price)
+        for i in range(lo, hi):
+            if k[i] == key:
+                del p[i]
+                del k[i]
+                break
+        if not p:
+            del prices[token]
+            del keys[token]
+
+    def _unindex(self, state: PositionState):
+        self._discard(self._sl_prices, self._sl_keys, state.token, state.sl_price, state.key)
+        self._discard(self._tp_prices, self._tp_keys, state.token, state.tp_price, state.key)
@@ -0,0 +1,95 @@
+"""
+Price Tick Bus - Verteilt frische Preise an alle Abonnenten
+
+Jeder neue Preis wird als PriceTick publiziert. Quellen: PriceOracle (jeder
+erfolgreiche Fetch, ueber publish_nowait) und der Replay (aufgezeichnete
+Preise, publish). Abonnenten (TradingEngine, WalletAnalysisRunner) pruefen
+SL/TP/Inaktivitaet/Stagnation sofort fuer genau diesen Token, statt auf den
+naechsten Durchlauf des Price-Loops zu warten.
+
+Exit-Latenz = Zeit bis der Preis ankommt, nicht die Loop-Periode.
+"""
+import asyncio
+import inspect
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PriceTick:
+    """Ein frischer Preis fuer einen Token"""
+    token: str
+    price_eur: float
+    source: str = "oracle"     # oracle / replay (bzw. Quelle der Aufzeichnung)
+    timestamp: float = field(default_factory=time.monotonic)
+
+
+class PriceTickBus:
+    """
+    Einfacher In-Process Event Bus fuer Preis-Ticks.
+
+    publish() wartet auf alle async Abonnenten – die Reihenfolge der Ticks
+    pro Token bleibt dadurch erhalten. publish_nowait() reiht ein und kehrt
+    sofort zurueck; ein Dispatcher-Task verteilt in derselben Reihenfolge.
+    Fehler eines Abonnenten werden geloggt und stoppen die anderen nicht.
+    """
+
+    def __init__(self):
+        self._subscribers: List[Callable] = []
+        self.last_ticks: Dict[str, PriceTick] = {}
+        self.published = 0
+        self._pending: deque = deque()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def subscribe(self, callback: Callable):
+        """Registriert Callback (sync oder async), bekommt jeden PriceTick"""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def last_price(self, token: str) -> Optional[float]:
+        """Letzter publizierter Preis fuer Token (oder None)"""
+        tick = self.last_ticks.get(token)
+        return tick.price_eur if tick else None
+
+    async def publish(self, tick: PriceTick):
+        """Verteilt Tick an alle Abonnenten und wartet auf deren Pruefung"""
+        self.last_ticks[tick.token] = tick
+        self.published += 1
+
+        for callback in list(self._subscribers):
+            try:
+                if inspect.iscoroutinefunction(callback):
+                    await callback(tick)
+                else:
+                    callback(tick)
+            except Exception as e:
+                logger.error(f"[PriceBus] Subscriber error for {tick.token[:8]}...: {e}")
+
+    def publish_nowait(self, tick: PriceTick):
+        """
+        Reiht den Tick ein, ohne auf die Abonnenten zu warten. PriceOracle nutzt
+        das: wer einen Preis holt (z.B. fuer einen WALLET_SOLD Exit), bekommt ihn,
+        bevor SL/TP-Pruefungen auf demselben Tick laufen.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.debug(f"[PriceBus] No running loop - tick for {tick.token[:8]}... dropped")
+            return
+        self.last_ticks[tick.token] = tick
+        self._pending.append(tick)
+        if self._dispatcher is None or self._dispatcher.done() or self._dispatcher.get_loop() is not loop:
+            self._dispatcher = loop.create_task(self._dispatch())
+
+    async def _dispatch(self):
+        while self._pending:
+            await self.publish(self._pending.popleft())
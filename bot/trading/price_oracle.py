@@ -7,6 +7,14 @@ import aiohttp
 import logging
 from typing import Dict, Optional
 
+from config import fastpath
+from trading.price_bus import PriceTickBus, PriceTick
+from trading.token_registry import TokenRegistry
+from trading.request_budget import RequestBudget
+from trading.fx import FxService, get_fx_service
+from trading.oracle_metrics import OracleMetrics
+from trading.simulation import BONDING_CURVE_DEXES, BONDING_CURVE_VIRTUAL_SOL, PoolReserves
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,9 +28,12 @@ class PriceOracle:
         "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB": "tether",  # USDT
     }
     
-    def __init__(self):
+    def __init__(self, price_bus: Optional[PriceTickBus] = None,
+                 registry: Optional[TokenRegistry] = None,
+                 fx: Optional[FxService] = None):
         self.cache: Dict[str, float] = {}
         self.cache_time: Dict[str, float] = {}   # token → timestamp des letzten Fetches
+        self.quote_time: Dict[str, float] = {}   # token → Unix-Zeit des letzten Fetches (Quote-Alter)
         self.liquidity_cache: Dict[str, float] = {}  # token → pool liquidity in EUR
         self.session: Optional[aiohttp.ClientSession] = None
         self.fetch_count = 0
@@ -35,23 +46,44 @@ class PriceOracle:
 
         # Limit für DexScreener (Requests/Min)
         self._api_rate_limit: int = 280  # knapp unter 300 als Puffer
+        # Gemeinsames DexScreener-Budget: Live-Preise + Registry-Refresh
+        self.dexscreener_budget = RequestBudget(self._api_rate_limit)
+
+        # Jeder frisch geholte Preis wird als PriceTick publiziert
+        self.price_bus: PriceTickBus = price_bus or PriceTickBus()
+
+        # Persistente Token-Metadaten (Pool, DEX, Liquiditaet) – optional
+        self.registry: Optional[TokenRegistry] = registry
+        if registry is not None:
+            registry.request_budget = self.dexscreener_budget
+
+        # USD -> EUR Kurs (gecacht, stuendlicher Refresh im Hintergrund)
+        self.fx: FxService = fx or get_fx_service()
+
+        # Live-Kennzahlen: Latenz/Fehler pro Quelle, Cache pro Aufrufer
+        self.metrics = OracleMetrics()
     
     async def _get_session(self) -> aiohttp.ClientSession:
         """Gibt aktive Session zurück oder erstellt neue"""
         if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            self.session = fastpath.client_session()
+            self.fx.start()
+            self.metrics.start()
         return self.session
 
-    async def get_price_eur(self, token_address: str, skip_cache: bool = False) -> Optional[float]:
+    async def get_price_eur(self, token_address: str, skip_cache: bool = False,
+                            caller: str = "other") -> Optional[float]:
         """
         Holt Preis in EUR für Token.
         Gibt None zurück wenn kein echter Preis gefunden wurde  kein Mock-Fallback.
+        caller: nur für Metriken (Cache-Hit-Ratio pro Aufrufer)
         """
         import time
 
         # Normaler Cache
         if not skip_cache and token_address in self.cache:
             self.hit_count += 1
+            self.metrics.record_cache(caller, hit=True)
             return self.cache[token_address]
 
         # Minimaler Cache auch bei skip_cache – verhindert API-Spam
@@ -59,9 +91,11 @@ class PriceOracle:
             age = time.monotonic() - self.cache_time[token_address]
             if age < self.min_cache_seconds:
                 self.hit_count += 1
+                self.metrics.record_cache(caller, hit=True)
                 return self.cache[token_address]
         
         self.fetch_count += 1
+        self.metrics.record_cache(caller, hit=False)
 
         sources = [
             ("DexScreener", self._fetch_from_dexscreener),
@@ -70,15 +104,27 @@ class PriceOracle:
         ]
 
         for name, fetch_fn in sources:
-            price = await fetch_fn(token_address)
+            if name == "CoinGecko" and token_address not in self.KNOWN_TOKENS:
+                price = None   # kein Request, keine Latenz-Messung
+            else:
+                errors_before = self.metrics.error_count(name)
+                started = time.perf_counter()
+                price = await fetch_fn(token_address)
+                self.metrics.record_request(name, (time.perf_counter() - started) * 1000, price is not None)
+                if price is None and self.metrics.error_count(name) == errors_before:
+                    self.metrics.record_empty(name)
             if price is not None:
                 self.cache[token_address] = price
                 self.cache_time[token_address] = time.monotonic()
+                self.quote_time[token_address] = time.time()
+                self.metrics.record_token(token_address, ok=True)
+                self.price_bus.publish_nowait(PriceTick(token_address, price, source="oracle"))
                 return price
             logger.warning(f"[PriceOracle]  {name}  no price for {token_address[:8]}...")
 
         logger.warning(f"[PriceOracle]   All sources failed for {token_address[:8]}...  skipping (no mock)")
         self.miss_count += 1
+        self.metrics.record_token(token_address, ok=False)
         return None
 
     async def _fetch_from_dexscreener(self, token_address: str) -> Optional[float]:
@@ -86,13 +132,15 @@ class PriceOracle:
         try:
             session = await self._get_session()
             url = f"https://api.dexscreener.com/latest/dex/tokens/{token_address}"
+            self.dexscreener_budget.take()
             
             async with session.get(url, timeout=aiohttp.ClientTimeout(total=8)) as response:
                 if response.status != 200:
                     logger.warning(f"[PriceOracle] DexScreener HTTP {response.status}")
+                    self.metrics.record_error("DexScreener", f"HTTP {response.status}")
                     return None
                 
-                data = await response.json()
+                data = await fastpath.read_json(response)
                 pairs = data.get("pairs")
                 
                 if not pairs or len(pairs) == 0:
@@ -114,17 +162,20 @@ class PriceOracle:
                 if price_usd == 0:
                     return None
 
-                price_eur = price_usd * 0.92
+                price_eur = price_usd * self.fx.rate()
 
                 liquidity_usd = float(best_pair.get("liquidity", {}).get("usd") or 0)
                 if liquidity_usd > 0:
-                    self.liquidity_cache[token_address] = liquidity_usd * 0.92
+                    self.liquidity_cache[token_address] = liquidity_usd * self.fx.rate()
+                if self.registry is not None:
+                    self.registry.record_pair(token_address, best_pair)
 
                 logger.info(f"[PriceOracle]  DexScreener: {token_address[:8]}... = {price_eur:.8f} EUR (${price_usd:.8f})")
                 return price_eur
                 
         except Exception as e:
             logger.warning(f"[PriceOracle] DexScreener exception: {type(e).__name__}: {e}")
+            self.metrics.record_error("DexScreener", type(e).__name__)
             return None
 
     async def _fetch_from_birdeye(self, token_address: str) -> Optional[float]:
@@ -140,9 +191,10 @@ class PriceOracle:
             ) as response:
                 if response.status != 200:
                     logger.warning(f"[PriceOracle] Birdeye HTTP {response.status}")
+                    self.metrics.record_error("Birdeye", f"HTTP {response.status}")
                     return None
                 
-                data = await response.json()
+                data = await fastpath.read_json(response)
                 
                 if not data.get("success"):
                     return None
@@ -155,12 +207,13 @@ class PriceOracle:
                 if price_usd == 0:
                     return None
 
-                price_eur = price_usd * 0.92
+                price_eur = price_usd * self.fx.rate()
                 logger.info(f"[PriceOracle]  Birdeye: {token_address[:8]}... = {price_eur:.8f} EUR")
                 return price_eur
                 
         except Exception as e:
             logger.warning(f"[PriceOracle] Birdeye exception: {type(e).__name__}: {e}")
+            self.metrics.record_error("Birdeye", type(e).__name__)
             return None
     
     async def _fetch_from_coingecko(self, token_address: str) -> Optional[float]:
@@ -175,9 +228,10 @@ class PriceOracle:
             
             async with session.get(url, timeout=aiohttp.ClientTimeout(total=8)) as response:
                 if response.status != 200:
+                    self.metrics.record_error("CoinGecko", f"HTTP {response.status}")
                     return None
                 
-                data = await response.json()
+                data = await fastpath.read_json(response)
                 
                 if coin_id not in data or "eur" not in data[coin_id]:
                     return None
@@ -188,11 +242,43 @@ class PriceOracle:
                 
         except Exception as e:
             logger.warning(f"[PriceOracle] CoinGecko exception: {type(e).__name__}: {e}")
+            self.metrics.record_error("CoinGecko", type(e).__name__)
             return None
     
+    def get_quote_time(self, token_address: str) -> Optional[float]:
+        """Unix-Zeit, zu der der aktuell gecachte Preis (samt Liquiditaet) geholt wurde"""
+        return self.quote_time.get(token_address)
+
     def get_cached_liquidity_eur(self, token_address: str) -> Optional[float]:
-        """Returns cached pool liquidity in EUR from last DexScreener fetch, or None."""
-        return self.liquidity_cache.get(token_address)
+        """
+        Returns cached pool liquidity in EUR from last DexScreener fetch, or None.
+        Falls back to the persistent TokenRegistry (background refresh / earlier runs).
+        """
+        liquidity = self.liquidity_cache.get(token_address)
+        if liquidity is None and self.registry is not None:
+            liquidity_usd = self.registry.get_liquidity_usd(token_address)
+            if liquidity_usd:
+                liquidity = liquidity_usd * self.fx.rate()
+        return liquidity
+
+    def get_cached_reserves(self, token_address: str) -> Optional[PoolReserves]:
+        """
+        x*y=k Reserven fuer die Slippage-Simulation (kein I/O).
+        Quote-Reserve aus der TokenRegistry, bei Bonding Curves plus virtuelle
+        SOL-Reserve. Ohne Reserven: aus der Liquiditaet (Quote = Haelfte).
+        """
+        info = self.registry.get(token_address) if self.registry is not None else None
+        if info is not None and info.reserve_quote_usd:
+            rate = self.fx.rate()
+            if info.dex in BONDING_CURVE_DEXES and info.reserve_quote:
+                quote_unit_usd = info.reserve_quote_usd / info.reserve_quote
+                return PoolReserves(
+                    quote_eur=(info.reserve_quote + BONDING_CURVE_VIRTUAL_SOL) * quote_unit_usd * rate,
+                    curve="bonding",
+                )
+            return PoolReserves(quote_eur=info.reserve_quote_usd * rate)
+        liquidity = self.get_cached_liquidity_eur(token_address)
+        return PoolReserves.from_liquidity(liquidity) if liquidity else None
 
     def set_rate_limit_from_positions(self, open_positions: int):
         """
@@ -218,7 +304,7 @@ class PriceOracle:
         """Holt mehrere Preise gleichzeitig"""
         prices = {}
         for token in token_addresses:
-            price = await self.get_price_eur(token)
+            price = await self.get_price_eur(token, caller="multi")
             if price:
                 prices[token] = price
         return prices
@@ -228,6 +314,8 @@ class PriceOracle:
         if self.session and not self.session.closed:
             await self.session.close()
             self.session = None
+        await self.fx.stop()
+        await self.metrics.stop()
     
     def clear_cache(self):
         """Löscht Preis Cache"""
@@ -242,6 +330,8 @@ class PriceOracle:
         print(f"   API Misses:       {self.miss_count}")
         if self.fetch_count > 0:
             print(f"   Success Rate:     {((self.fetch_count - self.miss_count) / self.fetch_count * 100):.1f}%")
+        if self.metrics.sources:
+            print(f"   Sources:          {self.metrics.summary_line()}")
 
 
 class MockPriceOracle(PriceOracle):
@@ -251,7 +341,8 @@ class MockPriceOracle(PriceOracle):
         super().__init__()
         self.mock_prices = mock_prices or {}
     
-    async def get_price_eur(self, token_address: str, skip_cache: bool = False) -> Optional[float]:
+    async def get_price_eur(self, token_address: str, skip_cache: bool = False,
+                            caller: str = "other") -> Optional[float]:
         """Gibt Mock-Preis zurück mit Variation"""
         import random
         if token_address in self.mock_prices:
@@ -264,6 +355,7 @@ class MockPriceOracle(PriceOracle):
         final_price = price * variation
         
         logger.debug(f"[MockPriceOracle] {token_address[:8]}... = {final_price:.6f} EUR")
+        self.price_bus.publish_nowait(PriceTick(token_address, final_price, source="oracle"))
         return final_price
     
     def set_price(self, token_address: str, price_eur: float):
@@ -0,0 +1,276 @@
+"""
+Price Paths - Preisverlaeufe geschlossener Positionen + vektorisierte Exit-Simulation
+
+tune_observer hat Stagnation/Max-Hold bisher per linearer Skalierung des
+End-PnL geschaetzt (frac = cutoff / haltedauer). Hier laufen die Exit-Regeln
+stattdessen auf dem tatsaechlichen Preisverlauf jeder Position:
+
+  - Quelle: Tabelle position_prices (trading/position_prices.py) oder
+    Session-Aufzeichnungen (data/recordings/<session_id>.jsonl.gz)
+  - Ein Verlauf = alle Preis-Ticks des Tokens zwischen Entry und Exit,
+    plus Entry- und Exit-Preis als erster/letzter Punkt
+  - Alle Verlaeufe als Matrix [Positionen x Ticks] (gepaddet)
+
+Die Regeln (SL, TP, Stagnation, Max-Hold, Trailing Stop) werden pro Wert
+EINMAL als "erster Tick, an dem die Regel feuert" berechnet. Eine Kombination
+ist dann nur noch das Minimum dieser Indizes – tausende Kombinationen ueber
+alle Positionen in wenigen NumPy-Operationen. Geprueft wird wie live an
+jedem Tick (Exit zum Tick-Preis, nicht zum Schwellwert).
+
+Feuert keine Regel, bleibt es beim echten Ausgang der Position.
+"""
+import logging
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from trading.position_prices import load_all
+from trading.replay import load_events
+
+logger = logging.getLogger(__name__)
+
+RECORDINGS_DIR = Path("data/recordings")
+
+# Reihenfolge = Prioritaet bei gleichem Tick (wie live: SL/TP vor Timeouts)
+RULES = ("SL", "TP", "TRAIL", "STAGNATION", "MAX_HOLD")
+NATURAL = "ACTUAL"
+
+
+@dataclass
+class PricePath:
+    """Preisverlauf einer Position, Zeiten in Sekunden seit Entry"""
+    times: np.ndarray
+    prices: np.ndarray
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Laden
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _ts(iso: str) -> float:
+    return datetime.fromisoformat(iso).timestamp()
+
+
+def _build_path(pos: dict, times: List[float], prices: List[float]) -> PricePath:
+    """Ticks strikt zwischen Entry und Exit, Entry-/Exit-Preis als Randpunkte"""
+    entry_ts, exit_ts = _ts(pos["entry_time"]), _ts(pos["exit_time"])
+    lo, hi = bisect_right(times, entry_ts), bisect_left(times, exit_ts)
+    return PricePath(
+        times=np.array([0.0] + [t - entry_ts for t in times[lo:hi]] + [exit_ts - entry_ts]),
+        prices=np.array([pos["entry_price"]] + prices[lo:hi] + [pos["exit_price"]]),
+    )
+
+
+def load_paths_from_db(conn, positions: List[dict]) -> Dict[int, PricePath]:
+    """
+    Verlaeufe aus position_prices (gleiche DB wie wallet_trades).
+    positions brauchen zusaetzlich buy_id; Positionen ohne Samples fehlen.
+    """
+    ids = {pos["buy_id"]: i for i, pos in enumerate(positions) if pos.get("buy_id") is not None}
+    paths: Dict[int, PricePath] = {}
+    for buy_id, samples in load_all(conn, ids).items():
+        if not samples:
+            continue
+        times = [t for t, _ in samples]
+        prices = [p for _, p in samples]
+        paths[ids[buy_id]] = _build_path(positions[ids[buy_id]], times, prices)
+    return paths
+
+
+def load_paths_from_recordings(positions: List[dict],
+                               recordings_dir: Path = RECORDINGS_DIR) -> Dict[int, PricePath]:
+    """
+    Baut Verlaeufe aus den Session-Aufzeichnungen.
+    positions: Dicts mit session_id, token, entry_time, exit_time (ISO), entry_price, exit_price.
+    Gibt {index in positions: PricePath} zurueck – Positionen ohne Aufzeichnung fehlen.
+    """
+    by_session: Dict[str, List[int]] = {}
+    for i, pos in enumerate(positions):
+        by_session.setdefault(pos["session_id"], []).append(i)
+
+    paths: Dict[int, PricePath] = {}
+    for session_id, indices in by_session.items():
+        files = sorted(recordings_dir.glob(f"{session_id}.jsonl*"))
+        if not files:
+            continue
+
+        ticks: Dict[str, tuple] = {}
+        for event in load_events(files):
+            if event["type"] == "price" and float(event.get("price_eur") or 0) > 0:
+                times, prices = ticks.setdefault(event["token"], ([], []))
+                times.append(event["t"])
+                prices.append(float(event["price_eur"]))
+
+        for i in indices:
+            pos = positions[i]
+            token_ticks = ticks.get(pos["token"])
+            if not token_ticks:
+                continue
+            paths[i] = _build_path(pos, *token_ticks)
+    return paths
+
+
+def load_paths(conn, positions: List[dict],
+               recordings_dir: Path = RECORDINGS_DIR) -> Tuple[Dict[int, PricePath], int]:
+    """
+    position_prices zuerst, Rest aus den Aufzeichnungen.
+    Gibt (paths, Anzahl aus der DB) zurueck.
+    """
+    paths = load_paths_from_db(conn, positions)
+    from_db = len(paths)
+    rest = [i for i in range(len(positions)) if i not in paths]
+    if rest:
+        recorded = load_paths_from_recordings([positions[i] for i in rest], recordings_dir)
+        paths.update({rest[j]: path for j, path in recorded.items()})
+    return paths, from_db
+
+
+def price_at(path: PricePath, offset: float) -> float:
+    """Letzter Preis bis offset Sekunden nach Entry (Treppenfunktion)"""
+    idx = np.searchsorted(path.times, offset, side="right") - 1
+    return float(path.prices[max(idx, 0)])
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Matrix
+# ──────────────────────────────────────────────────────────────────────────────
+
+class PathMatrix:
+    """
+    Alle Verlaeufe als gepaddete Matrizen [P x T].
+    Padding: Zeit = inf (Regeln feuern dort nie), Preis = letzter Preis.
+    """
+
+    def __init__(self, paths: Sequence[PricePath], costs: Sequence[float]):
+        n = len(paths)
+        width = max(len(p.times) for p in paths)
+        self.times = np.full((n, width), np.inf)
+        self.prices = np.empty((n, width))
+        self.length = np.empty(n, dtype=np.int64)
+        for row, path in enumerate(paths):
+            k = len(path.times)
+            self.times[row, :k] = path.times
+            self.prices[row, :k] = path.prices
+            self.prices[row, k:] = path.prices[-1]
+            self.length[row] = k
+
+        self.costs = np.asarray(costs, dtype=float)
+        self.rows = np.arange(n)
+        self.end_idx = self.length - 1              # natuerlicher Ausgang
+        self.never = width                          # Sentinel: Regel feuert nie
+
+        entry = self.prices[:, :1]
+        self.ret_pct = (self.prices / entry - 1.0) * 100
+        self.valid = np.isfinite(self.times)
+
+        # Drawdown vom bisherigen Hoch (Trailing Stop)
+        peak = np.maximum.accumulate(self.prices, axis=1)
+        self.dd_pct = (self.prices / peak - 1.0) * 100
+
+        # Zeit seit letzter Preisaenderung (Stagnation, wie PositionState.observe)
+        changed = np.ones_like(self.prices, dtype=bool)
+        changed[:, 1:] = self.prices[:, 1:] != self.prices[:, :-1]
+        last_change = np.maximum.accumulate(np.where(changed, self.times, -np.inf), axis=1)
+        self.unchanged_s = self.times - last_change
+
+    def __len__(self) -> int:
+        return len(self.costs)
+
+    def _first(self, mask: np.ndarray) -> np.ndarray:
+        """Erster gueltiger Tick mit mask, sonst Sentinel"""
+        mask = mask & self.valid
+        mask[:, 0] = False                          # Entry-Tick selbst loest nichts aus
+        idx = mask.argmax(axis=1)
+        return np.where(mask.any(axis=1), idx, self.never)
+
+    def first_hits(self, rule: str, values: Sequence[Optional[float]]) -> np.ndarray:
+        """[len(values) x P] erster Tick je Regelwert (None = Regel aus)"""
+        out = np.full((len(values), len(self)), self.never, dtype=np.int64)
+        for i, v in enumerate(values):
+            if v is None:
+                continue
+            if rule == "SL":
+                out[i] = self._first(self.ret_pct <= v)
+            elif rule == "TP":
+                out[i] = self._first(self.ret_pct >= v)
+            elif rule == "TRAIL":
+                out[i] = self._first(self.dd_pct <= -abs(v))
+            elif rule == "STAGNATION":
+                out[i] = self._first(self.unchanged_s >= v * 60)
+            elif rule == "MAX_HOLD":
+                out[i] = self._first(self.times >= v * 60)
+            else:
+                raise ValueError(f"Unbekannte Regel: {rule}")
+        return out
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Grid-Auswertung
+# ──────────────────────────────────────────────────────────────────────────────
+
+def evaluate_grid(matrix: PathMatrix, grid: Dict[str, Sequence[Optional[float]]]) -> List[dict]:
+    """
+    Wertet alle Kombinationen aus grid (Regel -> Werte) aus.
+    Vektorisiert ueber alle Regeln ausser SL (Schleife haelt den Speicher klein).
+    """
+    hits = {rule: matrix.first_hits(rule, grid[rule]) for rule in RULES}
+    rest = RULES[1:]
+    # [n_TP, n_TRAIL, n_STAG, n_HOLD, P] per Broadcasting
+    shaped = [
+        hits[rule].reshape([-1 if j == k else 1 for j in range(len(rest))] + [len(matrix)])
+        for k, rule in enumerate(rest)
+    ]
+    rest_idx = np.minimum.reduce(np.broadcast_arrays(*shaped))
+    rest_idx = np.minimum(rest_idx, matrix.end_idx)
+
+    results = []
+    for s, sl in enumerate(grid["SL"]):
+        idx = np.minimum(rest_idx, hits["SL"][s])
+        pct = matrix.ret_pct[matrix.rows, idx]
+        pnl = pct / 100 * matrix.costs
+
+        wins = pct > 0
+        n_win = wins.sum(axis=-1)
+        n_loss = len(matrix) - n_win
+        sum_win = np.where(wins, pct, 0.0).sum(axis=-1)
+        sum_loss = np.where(wins, 0.0, pct).sum(axis=-1)
+        wr = n_win / len(matrix)
+        avg_win = np.divide(sum_win, n_win, out=np.zeros_like(sum_win), where=n_win > 0)
+        avg_loss = np.divide(sum_loss, n_loss, out=np.zeros_like(sum_loss), where=n_loss > 0)
+        ev = wr * avg_win + (1 - wr) * avg_loss
+        total = pnl.sum(axis=-1)
+
+        for combo in product(*(range(len(grid[r])) for r in rest)):
+            results.append({
+                "sl":       sl,
+                "tp":       grid["TP"][combo[0]],
+                "trail":    grid["TRAIL"][combo[1]],
+                "stag":     grid["STAGNATION"][combo[2]],
+                "hold":     grid["MAX_HOLD"][combo[3]],
+                "n":        len(matrix),
+                "wins":     int(n_win[combo]),
+                "losses":   int(n_loss[combo]),
+                "wr":       float(wr[combo]),
+                "pnl":      float(total[combo]),
+                "avg_win":  float(avg_win[combo]),
+                "avg_loss": float(avg_loss[combo]),
+                "ev":       float(ev[combo]),
+            })
+    return results
+
+
+def exit_reasons(matrix: PathMatrix, params: Dict[str, Optional[float]]) -> Dict[str, int]:
+    """Exit-Grund Verteilung fuer EINE Kombination (Regel -> Wert)"""
+    stacked = np.vstack([matrix.first_hits(rule, [params.get(rule)])[0] for rule in RULES]
+                        + [matrix.end_idx])
+    winner = stacked.argmin(axis=0)                 # bei Gleichstand: fruehere Regel
+    labels = list(RULES) + [NATURAL]
+    counts: Dict[str, int] = {}
+    for w in winner:
+        counts[labels[w]] = counts.get(labels[w], 0) + 1
+    return counts
@@ -0,0 +1,169 @@
+"""
+Missed-Sell Reconciler - Abgleich verpasster SELLs nach einem Reconnect
+
+Bisher: pro Token und Trigger-Wallet eine neue aiohttp.ClientSession, die
+letzten 10 Signaturen und davon 5 Transaktionen nacheinander – nach einem
+langen Ausfall dauerte das zig Sekunden, waehrend die Positionen offen lagen.
+
+Jetzt:
+  - eine Session (die gepoolte des SolanaPollingSource, sonst EINE fuer den
+    ganzen Abgleich)
+  - alle Trigger-Wallets parallel, jede Wallet nur einmal (auch wenn sie
+    mehrere offene Token ausgeloest hat)
+  - pro Wallet nur Signaturen seit dem Cursor (signature_gaps / signature_cursor
+    der Quelle): was das Polling schon gesehen hat, wird nicht erneut geholt,
+    fehlgeschlagene Transaktionen und alles vor dem Entry fallen weg
+  - Transaktionen parallel (begrenzt), der erste SELL eines gehaltenen Tokens
+    schliesst sofort – die restlichen Fetches der Wallet werden abgebrochen,
+    sobald keiner ihrer Token mehr offen ist
+
+Doppelte Funde (zwei Wallets verkaufen denselben Token) sind harmlos:
+engine.close_now geht durch den PositionLifecycle und bucht nur einmal.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Set
+
+import aiohttp
+
+from config import fastpath
+
+logger = logging.getLogger(__name__)
+
+# Ohne Cursor (Wallet nie erfolgreich gepollt): nur die letzten Signaturen
+FALLBACK_LIMIT = 10
+
+
+class MissedSellReconciler:
+    """Prueft die Trigger-Wallets aller offenen Positionen auf verpasste SELLs"""
+
+    def __init__(self, source, engine, oracle, max_concurrent: int = 8,
+                 reason: str = "MISSED_SELL_DETECTED_ON_RECONNECT"):
+        self.source = source
+        self.engine = engine
+        self.oracle = oracle
+        self.reason = reason
+        self._slots = asyncio.Semaphore(max_concurrent)
+
+        self.wallets_checked = 0
+        self.transactions_fetched = 0
+        self.closed = 0
+
+    async def run(self) -> int:
+        """Ein Abgleich ueber alle offenen Positionen. Rueckgabe: geschlossene Positionen"""
+        wallet_tokens: Dict[str, Set[str]] = {}
+        for token in list(self.engine.portfolio.positions.keys()):
+            trigger_wallets = self.engine.trigger_wallets(token)
+            if not trigger_wallets:
+                logger.warning(f"[MissedSells] No trigger wallets found for {token[:8]}...")
+                continue
+            for wallet in trigger_wallets:
+                wallet_tokens.setdefault(wallet, set()).add(token)
+
+        if not wallet_tokens:
+            return 0
+
+        started = time.monotonic()
+        session = getattr(self.source, "session", None)
+        own_session = None
+        if session is None or session.closed:
+            own_session = session = fastpath.client_session()
+
+        try:
+            results = await asyncio.gather(
+                *(self._check_wallet(session, wallet, tokens) for wallet, tokens in wallet_tokens.items()),
+                return_exceptions=True,
+            )
+        finally:
+            if own_session:
+                await own_session.close()
+
+        for wallet, result in zip(wallet_tokens, results):
+            if isinstance(result, Exception):
+                logger.error(f"[MissedSells] Error checking wallet {wallet[:8]}: {result}")
+
+        logger.info(
+            f"[MissedSells] {len(wallet_tokens)} wallets | {self.transactions_fetched} txs | "
+            f"{self.closed} closed in {time.monotonic() - started:.2f}s"
+        )
+        return self.closed
+
+    def _entry_timestamp(self, tokens: Set[str]) -> Optional[float]:
+        """Fruehester Entry der Token (Unix-Zeit) – aeltere Transaktionen koennen kein Exit sein"""
+        positions = self.engine.portfolio.positions
+        times = [positions[t].entry_time.timestamp() for t in tokens if t in positions]
+        return min(times) if times else None
+
+    async def _check_wallet(self, session: aiohttp.ClientSession, wallet: str, tokens: Set[str]):
+        self.wallets_checked += 1
+        gap = self.source.signature_gaps.pop(wallet, None)
+        since = gap or self.source.signature_cursor.get(wallet)
+        try:
+            infos = await self.source.fetch_signatures(
+                wallet, until=since, limit=1000 if since else FALLBACK_LIMIT, session=session
+            )
+        except Exception:
+            if gap:
+                self.source.signature_gaps.setdefault(wallet, gap)
+            raise
+
+        entry_ts = self._entry_timestamp(tokens)
+        seen = self.source.seen_signatures
+        signatures = [
+            info["signature"] for info in infos
+            if info.get("signature")
+            and info.get("err") is None
+            and info["signature"] not in seen                       # laeuft ueber das Polling
+            and not (entry_ts and info.get("blockTime") and info["blockTime"] < entry_ts)
+        ]
+        if not signatures:
+            return
+
+        logger.info(f"[MissedSells] {wallet[:8]}... {len(signatures)} txs since cursor "
+                    f"({len(tokens)} open token(s))")
+
+        remaining = set(tokens)
+        tasks = [asyncio.create_task(self._fetch(session, sig)) for sig in signatures]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                sig, tx = await next_done
+                if not tx:
+                    continue
+                trade_event = self.source.extract_trade(tx, wallet, sig)
+                if not trade_event or trade_event.side != "SELL" or trade_event.token not in remaining:
+                    continue
+                remaining.discard(trade_event.token)
+                await self._close(trade_event.token, wallet)
+                if not remaining:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _fetch(self, session: aiohttp.ClientSession, signature: str):
+        async with self._slots:
+            self.transactions_fetched += 1
+            try:
+                return signature, await self.source.fetch_transaction(signature, session=session)
+            except (asyncio.TimeoutError, aiohttp.ClientError, OSError) as e:
+                logger.debug(f"[MissedSells] Could not fetch tx {signature[:8]}...: {e}")
+                return signature, None
+
+    async def _close(self, token: str, wallet: str):
+        if token not in self.engine.portfolio.positions:
+            return
+        current_price = await self.oracle.get_price_eur(token, caller="reconcile")
+        if not current_price:
+            logger.warning(f"[MissedSells] SELL by {wallet[:8]}... on {token[:8]}... but no price - not closed")
+            return
+        result = await self.engine.close_now(
+            token=token,
+            price_eur=current_price,
+            reason=self.reason,
+            simulate=False,
+        )
+        if result:
+            self.closed += 1
+            logger.info(f"[MissedSells] {token[:8]}... closed (SELL by {wallet[:8]}... while offline)")
@@ -0,0 +1,146 @@
+"""
+Session Recorder - Rohdaten einer Live-Session fuer spaetere Replays
+
+Bisher landeten nur die Ergebnisse (wallet_trades, paper_*.json) auf Platte.
+Der Recorder schreibt zusaetzlich den kompletten Input einer Session mit:
+
+  - jedes TradeEvent (Signatur, Slot, Block-Zeit, Erkennungszeit)
+  - jede Oracle-Preisantwort (PriceTick vom Price Bus + Pool-Liquiditaet)
+
+Format: siehe trading/replay.py – JSONL, gzip, append-only.
+Geschrieben wird gebuendelt: alle FLUSH_INTERVAL Sekunden (oder ab
+FLUSH_EVENTS gepufferten Events) wird ein eigenes gzip-Member an die Datei
+angehaengt. Ein Crash verliert hoechstens den letzten Puffer, alle bereits
+geschriebenen Member bleiben lesbar.
+
+Abspielen: python main.py replay data/recordings/<datei>.jsonl.gz
+"""
+import asyncio
+import gzip
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from observation.models import TradeEvent
+from trading.clock import get_clock
+from trading.price_bus import PriceTick
+
+logger = logging.getLogger(__name__)
+
+RECORDINGS_DIR = "data/recordings"
+FLUSH_INTERVAL = 5.0     # Sekunden
+FLUSH_EVENTS = 500       # ab so vielen gepufferten Events sofort schreiben
+
+
+class SessionRecorder:
+    """
+    Tee fuer TradeEvents + Preis-Ticks einer Session.
+
+    record_trade() / on_price_tick() sind reine Puffer-Operationen (kein I/O
+    im Hot Path). attach(oracle) abonniert dessen Price Bus.
+    """
+
+    def __init__(self, prefix: str = "session", path: Optional[str] = None,
+                 flush_interval: float = FLUSH_INTERVAL):
+        if path is None:
+            path = f"{RECORDINGS_DIR}/{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl.gz"
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self._buffer: List[str] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._oracle = None
+        self.trades = 0
+        self.prices = 0
+
+    # ── Erfassung ──────────────────────────────────────────────────────
+
+    def record_trade(self, trade: TradeEvent):
+        event = {
+            "type": "trade",
+            "t": round(trade.timestamp, 3),
+            "wallet": trade.wallet,
+            "token": trade.token,
+            "side": trade.side,
+            "amount": trade.amount,
+            "source": trade.source,
+        }
+        for key in ("signature", "slot", "block_time"):
+            value = getattr(trade, key)
+            if value is not None:
+                event[key] = value
+        self._append(event)
+        self.trades += 1
+
+    def record_price(self, token: str, price_eur: float, source: str = "oracle",
+                     liquidity_eur: Optional[float] = None, t: Optional[float] = None):
+        event = {
+            "type": "price",
+            "t": round(t if t is not None else get_clock().time(), 3),
+            "token": token,
+            "price_eur": price_eur,
+            "source": source,
+        }
+        if liquidity_eur:
+            event["liquidity_eur"] = round(liquidity_eur, 2)
+        self._append(event)
+        self.prices += 1
+
+    def on_price_tick(self, tick: PriceTick):
+        """Price Bus Abonnent (sync – nur puffern)"""
+        liquidity = self._oracle.liquidity_cache.get(tick.token) if self._oracle else None
+        self.record_price(tick.token, tick.price_eur, source=tick.source, liquidity_eur=liquidity)
+
+    def attach(self, oracle):
+        """Zeichnet alle Preise auf, die der Oracle publiziert"""
+        self._oracle = oracle
+        oracle.price_bus.subscribe(self.on_price_tick)
+
+    def _append(self, event: dict):
+        self._buffer.append(json.dumps(event, separators=(",", ":")))
+        if len(self._buffer) >= FLUSH_EVENTS:
+            self.flush()
+
+    # ── Schreiben ──────────────────────────────────────────────────────
+
+    def flush(self):
+        """Haengt den Puffer als eigenes gzip-Member an"""
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logger.error(f"[Recorder] Write failed ({len(lines)} events lost): {e}")
+
+    async def _flush_loop(self):
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                self.flush()
+        except asyncio.CancelledError:
+            pass
+
+    def start(self):
+        """Startet den periodischen Flush (benoetigt laufenden Event Loop)"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"[Recorder] Recording session to {self.path}")
+
+    async def close(self):
+        if self._oracle is not None:
+            self._oracle.price_bus.unsubscribe(self.on_price_tick)
+            self._oracle = None
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self.flush()
+
+    def summary(self) -> str:
+        return f"{self.trades} Trades | {self.prices} Preise -> {self.path}"
@@ -0,0 +1,293 @@
+"""
+Replay Backtest - Aufgezeichnete Sessions deterministisch nachspielen
+
+Speist aufgezeichnete TradeEvents und Preis-Ticks durch die ECHTE
+RedundancyEngine + PaperTradingEngine:
+  - VirtualClock: Zeit springt von Event zu Event, keine Wall-Clock Sleeps.
+    Ausfuehrungsverzoegerungen laufen wie live parallel weiter – Ticks
+    waehrend eines laufenden BUY/SELL kommen in derselben Reihenfolge an
+  - simulate_buy/simulate_sell mit festem Seed -> reproduzierbare Fills
+  - Preise kommen ausschliesslich aus der Aufzeichnung (kein Netzwerk)
+
+Event-Format (JSONL, optional .gz – eine Zeile pro Event, nach Zeit sortiert):
+  {"type": "trade", "t": 1760000000.12, "wallet": "...", "token": "...",
+   "side": "BUY", "amount": 1234.5, "source": "mainnet_real",
+   "signature": "...", "slot": 312345678, "block_time": 1760000000}
+  {"type": "price", "t": 1760000001.50, "token": "...", "price_eur": 0.0000123,
+   "source": "oracle", "liquidity_eur": 18000.0}
+
+"t" ist Unix-Zeit in Sekunden (Erkennungszeit beim Trade, Antwortzeit beim Preis).
+Felder ausser type/t/token sind je nach Typ optional.
+"""
+import gzip
+import asyncio
+import io
+import json
+import logging
+import zlib
+from bisect import bisect_right
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Union
+
+from observation.models import TradeEvent
+from pattern.redundancy import RedundancyEngine, TradeSignal
+from trading import simulation
+from trading.clock import VirtualClock, get_clock, set_clock
+from trading.engine import PaperTradingEngine
+from trading.portfolio import PaperPortfolio
+from trading.price_bus import PriceTick
+from trading.price_oracle import PriceOracle
+
+logger = logging.getLogger(__name__)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Event-Dateien
+# ──────────────────────────────────────────────────────────────────────────────
+
+def open_event_file(path: Union[str, Path], mode: str = "rt"):
+    """Oeffnet eine Event-Datei, .gz transparent"""
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_events(path: Union[str, Path]) -> Iterator[dict]:
+    """Liest Events zeilenweise. Kaputte/abgeschnittene Zeilen (Crash) werden uebersprungen."""
+    with open_event_file(path) as f:
+        try:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    logger.warning(f"[Replay] Skipping unreadable line in {Path(path).name}")
+                    continue
+                if event.get("type") in ("trade", "price") and "t" in event:
+                    yield event
+        except (EOFError, OSError, zlib.error) as e:
+            # Recorder-Crash mitten im letzten gzip-Member: alles davor ist gueltig
+            logger.warning(f"[Replay] {Path(path).name} truncated ({e}) - using events up to here")
+
+
+def load_events(paths: Iterable[Union[str, Path]]) -> List[dict]:
+    """Laedt eine oder mehrere Event-Dateien, stabil nach Zeit sortiert"""
+    events: List[dict] = []
+    for path in paths:
+        events.extend(read_events(path))
+    events.sort(key=lambda e: e["t"])
+    return events
+
+
+def trade_from_event(event: dict) -> TradeEvent:
+    return TradeEvent(
+        wallet=event["wallet"],
+        token=event["token"],
+        side=event["side"],
+        amount=float(event.get("amount") or 0.0),
+        source=event.get("source") or "replay",
+        timestamp=float(event["t"]),
+        signature=event.get("signature"),
+        slot=event.get("slot"),
+        block_time=event.get("block_time"),
+    )
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Oracle ohne Netzwerk
+# ──────────────────────────────────────────────────────────────────────────────
+
+class ReplayPriceOracle(PriceOracle):
+    """
+    Oracle fuer Replays: liefert den zur virtuellen Zeit gueltigen
+    aufgezeichneten Preis.
+
+    Gibt es vor "jetzt" noch keinen Preis (erster Fetch beim BUY), wird die
+    naechste Aufzeichnung innerhalb LOOKAHEAD_SECONDS genommen – das ist die
+    Antwort auf genau diesen Fetch, die live erst nach der Latenz ankam.
+
+    Publiziert selbst KEINE Ticks – die aufgezeichneten Oracle-Antworten
+    werden vom Replay als Preis-Events auf den Bus gegeben.
+    """
+
+    LOOKAHEAD_SECONDS = 10.0
+
+    def __init__(self, events: List[dict], clock=None):
+        super().__init__()
+        self.clock = clock or get_clock()
+        self._times: Dict[str, List[float]] = {}
+        self._prices: Dict[str, List[float]] = {}
+        for event in events:
+            if event["type"] == "price" and float(event.get("price_eur") or 0) > 0:
+                self._times.setdefault(event["token"], []).append(event["t"])
+                self._prices.setdefault(event["token"], []).append(float(event["price_eur"]))
+                if event.get("liquidity_eur"):
+                    # Pool-Liquiditaet aendert sich langsam – letzter Wert pro Token reicht
+                    self.liquidity_cache[event["token"]] = float(event["liquidity_eur"])
+
+    def _index_at(self, token_address: str, t: float) -> Optional[int]:
+        times = self._times.get(token_address)
+        if not times:
+            return None
+        idx = bisect_right(times, t)
+        if idx > 0:
+            return idx - 1
+        if times[0] - t <= self.LOOKAHEAD_SECONDS:
+            return 0
+        return None
+
+    def price_at(self, token_address: str, t: float) -> Optional[float]:
+        idx = self._index_at(token_address, t)
+        return self._prices[token_address][idx] if idx is not None else None
+
+    def get_quote_time(self, token_address: str) -> Optional[float]:
+        """Aufzeichnungszeit der Antwort, die get_price_eur jetzt liefert"""
+        idx = self._index_at(token_address, self.clock.time())
+        return self._times[token_address][idx] if idx is not None else None
+
+    async def get_price_eur(self, token_address: str, skip_cache: bool = False,
+                            caller: str = "other") -> Optional[float]:
+        price = self.price_at(token_address, self.clock.time())
+        self.metrics.record_cache(caller, hit=price is not None)
+        if price is None:
+            self.miss_count += 1
+        else:
+            self.hit_count += 1
+        return price
+
+    async def close(self):
+        pass
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Backtest
+# ──────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class ReplayConfig:
+    """Parameter eines Replay-Laufs (Defaults wie paper_mainnet)"""
+    time_window: int = 30
+    min_wallets: int = 2
+    min_confidence: float = 0.5
+    stop_loss: float = -50.0
+    take_profit: float = 100.0
+    initial_capital: float = 1000.0
+    position_size: float = 0.2
+    seed: Optional[int] = 42
+    single_position: bool = True     # wie paper_mainnet: BUY nur wenn keine Position offen
+    wallet_tracker: object = None    # Optional: WalletTracker (Confidence + Strategie SL/TP)
+    exit_rules: Optional[str] = None # Exit-Regeln (trading/exit_rules.py), z.B. "trail=20@30"
+
+
+class ReplayBacktest:
+    """Ein deterministischer Replay-Lauf ueber eine Event-Liste"""
+
+    def __init__(self, events: List[dict], config: Optional[ReplayConfig] = None):
+        self.events = events
+        self.config = config or ReplayConfig()
+        self.portfolio: Optional[PaperPortfolio] = None
+        self.engine: Optional[PaperTradingEngine] = None
+        self.oracle: Optional[ReplayPriceOracle] = None
+        self.total_signals = 0
+        self.total_buys = 0              # ausgefuehrte BUYs (Fills), nicht eingereichte Orders
+        self.trade_events = 0
+        self.price_events = 0
+        self._signal_tasks: Set[asyncio.Task] = set()
+
+    async def run(self, quiet: bool = True) -> dict:
+        """Spielt alle Events ab und gibt die Portfolio-Statistik zurueck"""
+        cfg = self.config
+        clock = VirtualClock(self.events[0]["t"] if self.events else 0.0)
+        previous_clock = set_clock(clock)
+        simulation.seed(cfg.seed)
+
+        try:
+            self.portfolio = PaperPortfolio(initial_capital_eur=cfg.initial_capital)
+            self.portfolio.position_size_percent = cfg.position_size
+            self.oracle = ReplayPriceOracle(self.events, clock=clock)
+            redundancy = RedundancyEngine(
+                time_window_seconds=cfg.time_window,
+                min_wallets=cfg.min_wallets,
+                min_confidence=cfg.min_confidence,
+                wallet_tracker=cfg.wallet_tracker,
+                clock=clock,
+            )
+            self.engine = PaperTradingEngine(
+                portfolio=self.portfolio,
+                price_oracle=self.oracle,
+                stop_loss_percent=cfg.stop_loss,
+                take_profit_percent=cfg.take_profit,
+                wallet_tracker=cfg.wallet_tracker,
+                poll_prices=False,
+                clock=clock,
+                max_positions=1 if cfg.single_position else None,
+                exit_rules=cfg.exit_rules,
+            )
+
+            sink = io.StringIO() if quiet else None
+            if sink is not None:
+                with redirect_stdout(sink):
+                    await clock.run(self._play(clock, redundancy))
+            else:
+                await clock.run(self._play(clock, redundancy))
+
+            await self._close_remaining()
+            await self.engine.stop()
+            return self.portfolio.get_statistics({})
+        finally:
+            set_clock(previous_clock)
+            simulation.seed(None)
+
+    async def _play(self, clock: VirtualClock, redundancy: RedundancyEngine):
+        bus = self.oracle.price_bus
+        for event in self.events:
+            await clock.sleep_until(event["t"])
+
+            if event["type"] == "price":
+                self.price_events += 1
+                price = float(event["price_eur"])
+                if price <= 0:
+                    continue
+                await bus.publish(PriceTick(event["token"], price, source=event.get("source") or "replay",
+                                            timestamp=clock.monotonic()))
+                continue
+
+            self.trade_events += 1
+            trade = trade_from_event(event)
+            signal = redundancy.process_trade(trade)
+            if signal is not None:
+                # Wie live (RedundancyEngine.on_signal -> create_task): der BUY
+                # laeuft neben dem Event-Strom, waehrend seiner Verzoegerung
+                # kommen weitere Ticks/Trades an
+                task = asyncio.create_task(self._handle_signal(signal))
+                self._signal_tasks.add(task)
+                task.add_done_callback(self._signal_tasks.discard)
+            await self.engine.on_trade_event(trade)
+
+        if self._signal_tasks:
+            await asyncio.gather(*self._signal_tasks)
+        # BUY/SELL Orders laufen in den Executor-Tasks der Engine weiter
+        await self.engine.drain_orders()
+        # on_buy_signal liefert nur die eingereihte Order – gezaehlt wird, was gefuellt wurde
+        self.total_buys = sum(1 for trade in self.portfolio.iter_trades() if trade.side == "BUY")
+
+    async def _handle_signal(self, signal: TradeSignal):
+        self.total_signals += 1
+        if signal.side != "BUY":
+            return
+        # single_position: Engine mit max_positions=1 (offene Position oder laufender BUY)
+        await self.engine.on_buy_signal(signal)
+
+    async def _close_remaining(self):
+        """Session-Ende: offene Positionen zum letzten aufgezeichneten Preis schliessen"""
+        now = get_clock().time()
+        for token in list(self.portfolio.positions.keys()):
+            price = self.oracle.price_at(token, now)
+            if price:
+                await self.engine.close_now(token, price, reason="SESSION_ENDED",
+                                            trigger_label="Session ended", simulate=False)
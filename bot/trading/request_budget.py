@@ -0,0 +1,49 @@
+"""
+Request Budget - Gemeinsames Requests/Minute-Budget einer externen API
+
+DexScreener erlaubt ~300 Requests/Min pro IP. Zwei Verbraucher teilen sich
+das Kontingent: die Preis-Abfragen des PriceOracle (Live-Pfad, SL/TP) und
+der Hintergrund-Refresh der TokenRegistry (Batches). Ohne gemeinsame
+Buchfuehrung konnten die Batches das Kontingent aufbrauchen – die folgenden
+429 trafen dann die Live-Preise.
+
+  - take():             Live-Request buchen (wird nie verzoegert)
+  - try_take(reserve):  Hintergrund-Request nur, wenn danach noch reserve
+                        Requests im laufenden Fenster frei bleiben
+"""
+import time
+from collections import deque
+from typing import Deque
+
+WINDOW_SECONDS = 60.0
+
+
+class RequestBudget:
+    """Gleitendes 60s-Fenster ueber die Requests einer API"""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._sent: Deque[float] = deque()
+        self.denied = 0
+
+    def _trim(self, now: float):
+        while self._sent and now - self._sent[0] >= WINDOW_SECONDS:
+            self._sent.popleft()
+
+    def used(self) -> int:
+        self._trim(time.monotonic())
+        return len(self._sent)
+
+    def take(self):
+        now = time.monotonic()
+        self._trim(now)
+        self._sent.append(now)
+
+    def try_take(self, reserve: int = 0) -> bool:
+        now = time.monotonic()
+        self._trim(now)
+        if len(self._sent) + reserve >= self.per_minute:
+            self.denied += 1
+            return False
+        self._sent.append(now)
+        return True
@@ -0,0 +1,252 @@
+"""
+Session Journal - Crash-sicherer Zustand einer Paper-Session
+
+Bisher schrieb paper_mainnet / paper_trading die Session erst in _shutdown
+als data/<session>.json – ein Absturz verlor alles, und data/ sammelte
+vollstaendige Snapshot-Dateien. Jetzt pro Session:
+
+  data/<session>.journal.jsonl   Zustand (Append-only, fsync pro Eintrag)
+      {"type": "header",   initial_capital, position_size_percent, started}
+      {"type": "snapshot", cash_eur, positions, stats, time}     (nach Kompaktierung)
+      {"type": "open" | "reduce" | "close", trade, position, cash_eur}
+      {"type": "end"}                                            (sauberes Ende)
+  data/<session>.trades.jsonl    voller Trade-Verlauf (trading/trade_journal.py)
+
+Jedes Event traegt Cash und Position NACH dem Trade – der Loader setzt den
+Zustand, statt Trades nachzurechnen. Alle compact_every Events wird das
+Journal atomar (tmp + fsync + os.replace) auf header + snapshot gekuerzt:
+Neustart liest hoechstens einen Snapshot plus compact_every Events, egal wie
+lange die Session lief. Eine abgerissene letzte Zeile (Absturz beim
+Schreiben) wird beim Laden uebersprungen.
+
+  load_portfolio(base)   -> PaperPortfolio mit Cash, Positionen, Statistik
+  list_sessions(data_dir) -> Journale fuer den Viewer (python main.py paper_logs)
+  find_unfinished(prefix) -> Sessions ohne End-Marker (paper_mainnet: fortsetzen)
+  mark_ended(base)       -> End-Marker anhaengen (abgelehnte Session, ohne Portfolio)
+"""
+import json
+import logging
+import os
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from trading.clock import get_clock
+from trading.trade_journal import TradeJournal, repair_tail
+
+logger = logging.getLogger(__name__)
+
+STATE_SUFFIX = ".journal.jsonl"
+TRADES_SUFFIX = ".trades.jsonl"
+COMPACT_EVERY = 200
+
+
+def position_to_dict(position) -> dict:
+    data = asdict(position)
+    data["entry_time"] = position.entry_time.isoformat()
+    return data
+
+
+def position_from_dict(data: dict):
+    from trading.portfolio import Position
+    data = {k: v for k, v in data.items() if k in Position.__dataclass_fields__}
+    data["entry_time"] = datetime.fromisoformat(data["entry_time"])
+    return Position(**data)
+
+
+def _read_lines(path: Path) -> Iterator[dict]:
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"[SessionJournal] Skipping broken line in {path.name}")
+
+
+class SessionJournal:
+    """Zustands-Journal + Trade-Archiv einer Session (base = Pfad ohne Endung)"""
+
+    def __init__(self, base_path, compact_every: int = COMPACT_EVERY):
+        base = str(base_path)
+        for suffix in (STATE_SUFFIX, TRADES_SUFFIX):
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        self.base = Path(base)
+        self.base.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path = Path(base + STATE_SUFFIX)
+        self.trades = TradeJournal(base + TRADES_SUFFIX)
+        self.compact_every = compact_every
+        self.events_since_compact = 0
+        repair_tail(self.state_path)
+        self._file = open(self.state_path, "a", encoding="utf-8")
+
+    @property
+    def name(self) -> str:
+        return self.base.name
+
+    def _append(self, record: dict):
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def start(self, portfolio):
+        """Header schreiben, falls das Journal noch leer ist (neue Session)"""
+        if self.state_path.stat().st_size == 0:
+            self._append(self._header(portfolio))
+
+    def _header(self, portfolio) -> dict:
+        return {
+            "type": "header",
+            "initial_capital": portfolio.initial_capital,
+            "position_size_percent": portfolio.position_size_percent,
+            "started": get_clock().now().isoformat(),
+        }
+
+    def record(self, portfolio, action: str, trade):
+        """Ein gebuchter Trade: Archiv + Zustands-Event, ggf. Kompaktierung"""
+        self.start(portfolio)
+        self.trades.append_trade(trade)
+        position = portfolio.positions.get(trade.token)
+        self._append({
+            "type": action,
+            "trade": trade.to_dict(),
+            "position": position_to_dict(position) if position else None,
+            "cash_eur": portfolio.cash_eur,
+        })
+        self.events_since_compact += 1
+        if self.events_since_compact >= self.compact_every:
+            self.compact(portfolio)
+
+    def compact(self, portfolio):
+        """Schreibt header + snapshot atomar als neues Journal"""
+        header = next((r for r in _read_lines(self.state_path) if r.get("type") == "header"), None)
+        snapshot = {
+            "type": "snapshot",
+            "cash_eur": portfolio.cash_eur,
+            "position_size_percent": portfolio.position_size_percent,
+            "positions": [position_to_dict(p) for p in portfolio.positions.values()],
+            "stats": asdict(portfolio.stats),
+            "time": get_clock().now().isoformat(),
+        }
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for record in (header or self._header(portfolio), snapshot):
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._file.close()
+        os.replace(tmp, self.state_path)
+        self._file = open(self.state_path, "a", encoding="utf-8")
+        self.events_since_compact = 0
+        logger.debug(f"[SessionJournal] Compacted {self.state_path.name}")
+
+    def end(self, portfolio):
+        """Sauberes Session-Ende: kompaktieren + End-Marker"""
+        self.compact(portfolio)
+        self._append({"type": "end", "time": get_clock().now().isoformat()})
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        self.trades.close()
+
+
+def _state_path(base_path) -> Path:
+    base = str(base_path)
+    return Path(base) if base.endswith(STATE_SUFFIX) else Path(base + STATE_SUFFIX)
+
+
+def read_state(base_path) -> Optional[dict]:
+    """
+    Zustand aus dem Journal: letzter Snapshot + folgende Events.
+    Rueckgabe: {"header", "cash_eur", "positions" (token -> dict), "stats",
+    "trades" (Trade-Dicts seit Snapshot), "ended", "events"} oder None.
+    """
+    journal_path = _state_path(base_path)
+    state = None
+    for record in _read_lines(journal_path):
+        kind = record.get("type")
+        if kind == "header":
+            state = {"header": record, "cash_eur": record["initial_capital"], "positions": {},
+                     "stats": None, "trades": [], "ended": False, "events": 0}
+        elif state is None:
+            continue
+        elif kind == "snapshot":
+            state["cash_eur"] = record["cash_eur"]
+            state["positions"] = {p["token"]: p for p in record["positions"]}
+            state["stats"] = record.get("stats")
+            state["trades"] = []
+        elif kind in ("open", "reduce", "close"):
+            trade = record["trade"]
+            state["cash_eur"] = record["cash_eur"]
+            if record.get("position"):
+                state["positions"][trade["token"]] = record["position"]
+            else:
+                state["positions"].pop(trade["token"], None)
+            state["trades"].append(trade)
+            state["events"] += 1
+            state["ended"] = False
+        elif kind == "end":
+            state["ended"] = True
+    return state
+
+
+def mark_ended(base_path):
+    """End-Marker anhaengen, ohne Portfolio/Journal aufzubauen (Session wird nicht fortgesetzt)"""
+    path = _state_path(base_path)
+    repair_tail(path)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"type": "end", "time": get_clock().now().isoformat()}, separators=(",", ":")) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def load_portfolio(base_path, resume: bool = True):
+    """
+    Baut PaperPortfolio aus dem Journal wieder auf (Cash, offene Positionen,
+    Statistik). resume=True: das Portfolio schreibt danach ins selbe Journal weiter.
+    """
+    from trading.portfolio import PaperPortfolio, PortfolioStats, Trade
+
+    state = read_state(base_path)
+    if state is None:
+        return None
+    header = state["header"]
+    portfolio = PaperPortfolio(initial_capital_eur=header["initial_capital"])
+    portfolio.position_size_percent = header.get("position_size_percent", portfolio.position_size_percent)
+    portfolio.cash_eur = state["cash_eur"]
+    portfolio.positions = {token: position_from_dict(p) for token, p in state["positions"].items()}
+    if state["stats"]:
+        portfolio.stats = PortfolioStats(**state["stats"])
+    for trade in state["trades"]:
+        portfolio.stats.add(Trade.from_dict(trade))
+    if resume:
+        portfolio.attach_journal(SessionJournal(base_path))
+    return portfolio
+
+
+def read_trades(base_path) -> Iterator[dict]:
+    """Voller Trade-Verlauf aus dem Archiv (nur lesen, fuer Viewer/Export)"""
+    for record in _read_lines(Path(str(base_path) + TRADES_SUFFIX)):
+        if record.get("type") == "trade":
+            yield record
+
+
+def list_sessions(data_dir="data") -> List[dict]:
+    """Alle Session-Journale (neueste zuerst) mit Kurz-Zustand"""
+    sessions = []
+    for path in sorted(Path(data_dir).glob("*" + STATE_SUFFIX), reverse=True):
+        base = str(path)[:-len(STATE_SUFFIX)]
+        state = read_state(base)
+        if state is None:
+            continue
+        sessions.append({"base": base, "name": Path(base).name, **state})
+    return sessions
+
+
+def find_unfinished(prefix: str, data_dir="data") -> List[dict]:
+    """Sessions ohne End-Marker (Absturz / Kill) – Kandidaten zum Fortsetzen"""
+    return [s for s in list_sessions(data_dir) if not s["ended"] and s["name"].startswith(prefix)]
@@ -4,7 +4,8 @@ Realistic Paper Trading Simulation
 Models:
   - Solana transaction fees (base + priority)
   - DEX swap fees (Raydium/Orca/Jupiter)
-  - Price impact from low liquidity (x*y=k AMM model)
+  - Price impact on the pool's x*y=k curve (real reserves, bonding curves
+    with their virtual reserves, other copiers' flow in the same block)
   - Market drift during execution delay
   - Transaction failure rate
 
@@ -15,14 +16,23 @@ Typical meme coin scenario:
   → Swap fee:     0.25%
   → Total cost:   0.3%–8.3% per side
 """
-import asyncio
 import random
 import logging
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Optional
+
+from trading.clock import get_clock
 
 logger = logging.getLogger(__name__)
 
+# Eigener Zufallsgenerator – im Replay per seed() reproduzierbar
+_rng = random.Random()
+
+
+def seed(value: Optional[int]):
+    """Setzt den Seed fuer Delay/Failure/Drift (None = zufaellig)"""
+    _rng.seed(value)
+
 # ── Fees ──────────────────────────────────────────────────────────────────────
 # Raydium CLMM / Orca Whirlpool standard fee tier
 SWAP_FEE_PCT = 0.25          # 0.25% per swap (both buy and sell)
@@ -42,12 +52,19 @@ DELAY_MAX_SEC = 4.5
 TX_FAILURE_RATE = 0.03       # 3% — realistic for busy periods
 
 # ── Price Impact (AMM model) ──────────────────────────────────────────────────
-# Simplified constant-product AMM: price_impact = trade_size / (liquidity/2)
+# Constant-product curve on the quote side (SOL/USDC) of the pool.
+# Only total liquidity known -> both sides assumed equal (quote = liquidity/2)
 # Conservative fallback when liquidity data is unavailable
 DEFAULT_LIQUIDITY_EUR = 15_000   # $15K — small meme coin pool
 
-# Cap slippage at realistic max (AMM formula breaks at extreme sizes)
-MAX_PRICE_IMPACT_PCT = 25.0
+# pump.fun bonding curve: x*y=k on virtual reserves, the SOL side starts
+# with 30 virtual SOL on top of the real reserve
+BONDING_CURVE_DEXES = ("pumpfun",)
+BONDING_CURVE_VIRTUAL_SOL = 30.0
+
+# Copied wallets' trades this close together count as "same block" when
+# no slot is known (Solana block time ~400ms)
+SAME_BLOCK_SECONDS = 0.4
 
 # Market drift 1-sigma during execution delay (meme coins move FAST)
 DRIFT_SIGMA_PCT = 0.8        # ±0.8% per second of delay, damped
@@ -64,37 +81,68 @@ class ExecutionResult:
     failure_reason: str = ""
 
 
-def _calc_price_impact(trade_eur: float, liquidity_eur: float) -> float:
+@dataclass
+class PoolReserves:
+    """
+    Quote-side reserve of a pool in EUR – fixes the x*y=k curve.
+    For bonding curves this includes the virtual reserve.
+    """
+    quote_eur: float
+    curve: str = "cpmm"         # cpmm | bonding
+
+    @classmethod
+    def from_liquidity(cls, liquidity_eur: Optional[float]) -> "PoolReserves":
+        return cls(quote_eur=(liquidity_eur or DEFAULT_LIQUIDITY_EUR) / 2)
+
+
+def buy_impact_pct(trade_eur: float, reserves: PoolReserves, flow_ahead_eur: float = 0.0) -> float:
     """
-    Simplified constant-product AMM price impact.
-    Formula: impact = trade_size / (liquidity / 2) * 100
-    Capped at MAX_PRICE_IMPACT_PCT.
+    Average fill vs. spot for a BUY of trade_eur on x*y=k.
+    flow_ahead_eur: other buys landing before ours (same block) – they move
+    the curve first.  avg / spot = (Q + f)(Q + f + x) / Q^2
     """
-    if liquidity_eur <= 0:
-        return MAX_PRICE_IMPACT_PCT
-    impact = (trade_eur / (liquidity_eur / 2)) * 100
-    return min(impact, MAX_PRICE_IMPACT_PCT)
+    q = reserves.quote_eur
+    f = max(flow_ahead_eur, 0.0)
+    return ((q + f) * (q + f + trade_eur) / (q * q) - 1) * 100
+
+
+def sell_impact_pct(value_eur: float, reserves: PoolReserves, flow_ahead_eur: float = 0.0) -> float:
+    """
+    Proceeds shortfall vs. spot value for a SELL worth value_eur at spot.
+    flow_ahead_eur: other sells landing before ours.
+    proceeds / value = Q^2 / ((Q + f)(Q + f + v))
+    """
+    q = reserves.quote_eur
+    f = max(flow_ahead_eur, 0.0)
+    return (1 - q * q / ((q + f) * (q + f + value_eur))) * 100
 
 
 async def simulate_buy(
     quote_price_eur: float,
     investment_eur: float,
     pool_liquidity_eur: Optional[float] = None,
+    clock=None,
+    reserves: Optional[PoolReserves] = None,
+    flow_ahead_eur: float = 0.0,
+    price_after_delay: Optional[Callable[[], Optional[float]]] = None,
 ) -> ExecutionResult:
     """
     Simulate a DEX BUY order on Solana.
 
     Costs vs quoted price:
-      + Price impact (push market up)
-      + Random market drift during tx delay (usually against us)
+      + Price impact (push market up) – on reserves if known, otherwise
+        derived from pool_liquidity_eur; flow_ahead_eur = copied wallets'
+        buys in the same block that fill before ours
+      + Market drift during tx delay (usually against us) – the real move
+        from price_after_delay() if given (stored price path), else random
       + Swap fee (0.25%)
       + Network fee (fixed EUR)
     """
-    delay = random.uniform(DELAY_MIN_SEC, DELAY_MAX_SEC)
-    await asyncio.sleep(delay)
+    delay = _rng.uniform(DELAY_MIN_SEC, DELAY_MAX_SEC)
+    await (clock or get_clock()).sleep(delay)
 
     # Transaction failure
-    if random.random() < TX_FAILURE_RATE:
+    if _rng.random() < TX_FAILURE_RATE:
         logger.warning("[Simulation] BUY tx failed (congestion/stale blockhash)")
         return ExecutionResult(
             success=False,
@@ -106,12 +154,16 @@ async def simulate_buy(
             failure_reason="Transaction dropped (Solana congestion)",
         )
 
-    liquidity = pool_liquidity_eur or DEFAULT_LIQUIDITY_EUR
-    impact_pct = _calc_price_impact(investment_eur, liquidity)
+    pool = reserves or PoolReserves.from_liquidity(pool_liquidity_eur)
+    impact_pct = buy_impact_pct(investment_eur, pool, flow_ahead_eur)
 
     # Market drift: typically adverse (price runs away from us)
     # Skewed slightly positive (FOMO buyers) but could go either way
-    drift_pct = random.gauss(0.3, DRIFT_SIGMA_PCT * (delay / 2))
+    observed = price_after_delay() if price_after_delay else None
+    if observed:
+        drift_pct = (observed / quote_price_eur - 1) * 100
+    else:
+        drift_pct = _rng.gauss(0.3, DRIFT_SIGMA_PCT * (delay / 2))
 
     total_slippage_pct = impact_pct + drift_pct
     executed_price = quote_price_eur * (1 + total_slippage_pct / 100)
@@ -141,6 +193,10 @@ async def simulate_sell(
     quote_price_eur: float,
     position_value_eur: float,
     pool_liquidity_eur: Optional[float] = None,
+    clock=None,
+    reserves: Optional[PoolReserves] = None,
+    flow_ahead_eur: float = 0.0,
+    price_after_delay: Optional[Callable[[], Optional[float]]] = None,
 ) -> ExecutionResult:
     """
     Simulate a DEX SELL order on Solana.
@@ -150,11 +206,16 @@ async def simulate_sell(
       - Random market drift (can go either way)
       - Swap fee (0.25%)
       - Network fee (fixed EUR)
+
+    clock: Zeitquelle fuer die Verzoegerung (Default: Prozess-Uhr). Mit einer
+    VirtualClock kostet der Delay keine Wall-Clock Zeit.
+    price_after_delay: liefert den Preis nach dem Delay (Replay: gespeicherter
+    Preisverlauf) – dann zaehlt die echte Bewegung statt zufaelliger Drift.
     """
-    delay = random.uniform(DELAY_MIN_SEC, DELAY_MAX_SEC)
-    await asyncio.sleep(delay)
+    delay = _rng.uniform(DELAY_MIN_SEC, DELAY_MAX_SEC)
+    await (clock or get_clock()).sleep(delay)
 
-    if random.random() < TX_FAILURE_RATE:
+    if _rng.random() < TX_FAILURE_RATE:
         logger.warning("[Simulation] SELL tx failed")
         return ExecutionResult(
             success=False,
@@ -166,14 +227,19 @@ async def simulate_sell(
             failure_reason="Transaction dropped",
         )
 
-    liquidity = pool_liquidity_eur or DEFAULT_LIQUIDITY_EUR
-    impact_pct = _calc_price_impact(position_value_eur, liquidity)
-
-    # Sell-side drift: slightly negative on average (panic selling / front-running)
-    drift_pct = random.gauss(-0.2, DRIFT_SIGMA_PCT * (delay / 2))
-
-    # Total slippage for a sell: both impact and drift work against us
-    total_slippage_pct = -(impact_pct + abs(drift_pct))
+    pool = reserves or PoolReserves.from_liquidity(pool_liquidity_eur)
+    impact_pct = sell_impact_pct(position_value_eur, pool, flow_ahead_eur)
+
+    observed = price_after_delay() if price_after_delay else None
+    if observed:
+        # Real move during the delay (can help or hurt)
+        drift_pct = (observed / quote_price_eur - 1) * 100
+        total_slippage_pct = drift_pct - impact_pct
+    else:
+        # Sell-side drift: slightly negative on average (panic selling / front-running)
+        drift_pct = _rng.gauss(-0.2, DRIFT_SIGMA_PCT * (delay / 2))
+        # Total slippage for a sell: both impact and drift work against us
+        total_slippage_pct = -(impact_pct + abs(drift_pct))
     executed_price = quote_price_eur * (1 + total_slippage_pct / 100)
 
     swap_fee_eur = position_value_eur * (SWAP_FEE_PCT / 100)
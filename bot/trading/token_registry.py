@@ -0,0 +1,329 @@
+"""
+Token Registry - Persistente Token-Metadaten (Decimals, Pool, DEX, Liquiditaet)
+
+Bisher lebte die Pool-Liquiditaet nur im Speicher des PriceOracle und wurde
+nur als Nebeneffekt von DexScreener Preis-Abfragen gefuellt. Beim ersten
+BUY eines Tokens fiel simulate_buy() deshalb fast immer auf
+DEFAULT_LIQUIDITY_EUR zurueck.
+
+Die Registry:
+  - liegt in data/token_registry.db und wird ueber Runs hinweg geteilt
+  - lernt Decimals + First-Seen direkt aus beobachteten Trade Events
+  - aktualisiert Pool/DEX/Liquiditaet/Reserven im Hintergrund (DexScreener Batch,
+    bis zu 30 Tokens pro Request) fuer alle kuerzlich gesehenen Tokens
+  - schreibt gebuendelt (dirty set) statt bei jedem Preis-Fetch
+  - nimmt DexScreener-Requests aus dem Budget des PriceOracle
+    (request_budget, trading/request_budget.py) und laesst dabei
+    LIVE_RESERVE Requests/Min fuer Live-Preise frei
+
+Bis ein BUY Signal durch die Redundancy Engine kommt, ist die Liquiditaet
+meist schon da – ohne zusaetzlichen blockierenden Fetch beim Entry.
+"""
+import asyncio
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+import aiohttp
+
+from config import fastpath
+from trading.request_budget import RequestBudget
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "data/token_registry.db"
+
+DEXSCREENER_TOKENS_URL = "https://api.dexscreener.com/latest/dex/tokens/"
+DEXSCREENER_BATCH_SIZE = 30      # max. Adressen pro Request
+
+
+@dataclass
+class TokenInfo:
+    """Metadaten eines Tokens"""
+    token: str
+    decimals: Optional[int] = None
+    pool_address: Optional[str] = None
+    dex: Optional[str] = None
+    liquidity_usd: Optional[float] = None
+    liquidity_updated: float = 0.0       # Unix-Zeit des letzten Liquiditaets-Updates
+    first_seen: Optional[str] = None     # ISO Timestamp
+    reserve_quote: Optional[float] = None       # Quote-Reserve (SOL/USDC Einheiten)
+    reserve_quote_usd: Optional[float] = None   # Quote-Reserve in USD (x*y=k Kurve)
+
+    def liquidity_age(self) -> Optional[float]:
+        if not self.liquidity_updated:
+            return None
+        return time.time() - self.liquidity_updated
+
+
+class TokenRegistry:
+    """
+    Persistente Token-Registry mit In-Memory Cache und Hintergrund-Refresh.
+
+    Lesen (get_liquidity_usd, get) ist reiner Dict-Zugriff – niemals I/O im
+    Hot Path. SQLite wird beim Start einmal geladen und danach nur noch
+    gebuendelt beschrieben (flush).
+    """
+
+    REFRESH_INTERVAL  = 30      # Sekunden zwischen Hintergrund-Durchlaeufen
+    STALE_SECONDS     = 120     # Liquiditaet aelter als das -> neu holen
+    WATCH_SECONDS     = 600     # so lange nach dem letzten Trade beobachten
+    LIVE_RESERVE      = 40      # Requests/Min im Budget, die der Refresh den Live-Preisen laesst
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self.tokens: Dict[str, TokenInfo] = {}
+        self._dirty: Set[str] = set()
+        self._watch: Dict[str, float] = {}    # token -> monotonic des letzten Trades
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.refresh_count = 0
+        # DexScreener-Budget, geteilt mit dem PriceOracle (setzt es im Konstruktor)
+        self.request_budget: Optional[RequestBudget] = None
+
+        self._init_db()
+        self._load()
+        logger.info(f"[TokenRegistry] Initialized ({db_path}) – {len(self.tokens)} known tokens")
+
+    # ── Datenbank ──────────────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tokens (
+                token               TEXT PRIMARY KEY,
+                decimals            INTEGER,
+                pool_address        TEXT,
+                dex                 TEXT,
+                liquidity_usd       REAL,
+                liquidity_updated   REAL DEFAULT 0,
+                first_seen          TEXT NOT NULL,
+                reserve_quote       REAL,
+                reserve_quote_usd   REAL
+            )
+        """)
+        existing = {row['name'] for row in conn.execute("PRAGMA table_info(tokens)")}
+        for col in ("reserve_quote", "reserve_quote_usd"):
+            if col not in existing:
+                conn.execute(f"ALTER TABLE tokens ADD COLUMN {col} REAL")
+        conn.commit()
+        conn.close()
+
+    def _load(self):
+        conn = self._connect()
+        for row in conn.execute("SELECT * FROM tokens"):
+            self.tokens[row['token']] = TokenInfo(
+                token=row['token'],
+                decimals=row['decimals'],
+                pool_address=row['pool_address'],
+                dex=row['dex'],
+                liquidity_usd=row['liquidity_usd'],
+                liquidity_updated=row['liquidity_updated'] or 0.0,
+                first_seen=row['first_seen'],
+                reserve_quote=row['reserve_quote'],
+                reserve_quote_usd=row['reserve_quote_usd'],
+            )
+        conn.close()
+
+    def flush(self):
+        """Schreibt alle geaenderten Tokens in einem Rutsch"""
+        if not self._dirty:
+            return
+        rows = [
+            (i.token, i.decimals, i.pool_address, i.dex, i.liquidity_usd,
+             i.liquidity_updated, i.first_seen, i.reserve_quote, i.reserve_quote_usd)
+            for i in (self.tokens[t] for t in self._dirty if t in self.tokens)
+        ]
+        try:
+            conn = self._connect()
+            conn.executemany("""
+                INSERT INTO tokens (token, decimals, pool_address, dex, liquidity_usd,
+                                    liquidity_updated, first_seen, reserve_quote, reserve_quote_usd)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(token) DO UPDATE SET
+                    decimals          = COALESCE(excluded.decimals, tokens.decimals),
+                    pool_address      = COALESCE(excluded.pool_address, tokens.pool_address),
+                    dex               = COALESCE(excluded.dex, tokens.dex),
+                    liquidity_usd     = COALESCE(excluded.liquidity_usd, tokens.liquidity_usd),
+                    liquidity_updated = MAX(excluded.liquidity_updated, tokens.liquidity_updated),
+                    reserve_quote     = COALESCE(excluded.reserve_quote, tokens.reserve_quote),
+                    reserve_quote_usd = COALESCE(excluded.reserve_quote_usd, tokens.reserve_quote_usd)
+            """, rows)
+            conn.commit()
+            conn.close()
+            self._dirty.clear()
+        except sqlite3.Error as e:
+            logger.error(f"[TokenRegistry] Flush failed: {e}")
+
+    # ── Lesen ──────────────────────────────────────────────────────────
+
+    def get(self, token: str) -> Optional[TokenInfo]:
+        return self.tokens.get(token)
+
+    def get_liquidity_usd(self, token: str, max_age_seconds: Optional[float] = None) -> Optional[float]:
+        """Letzte bekannte Pool-Liquiditaet in USD (oder None)"""
+        info = self.tokens.get(token)
+        if info is None or not info.liquidity_usd:
+            return None
+        if max_age_seconds is not None:
+            age = info.liquidity_age()
+            if age is None or age > max_age_seconds:
+                return None
+        return info.liquidity_usd
+
+    # ── Schreiben ──────────────────────────────────────────────────────
+
+    def _entry(self, token: str) -> TokenInfo:
+        info = self.tokens.get(token)
+        if info is None:
+            info = TokenInfo(token=token, first_seen=datetime.now().isoformat())
+            self.tokens[token] = info
+            self._dirty.add(token)
+        return info
+
+    def observe_trade(self, trade) -> None:
+        """
+        Beobachteter Trade: First-Seen setzen, Decimals uebernehmen (beim Parsen aus der Tx-Meta gelesen)
+        und Token fuer den Hintergrund-Refresh vormerken.
+        """
+        info = self._entry(trade.token)
+        self._watch[trade.token] = time.monotonic()
+
+        if info.decimals is None and trade.decimals is not None:
+            info.decimals = trade.decimals
+            self._dirty.add(trade.token)
+
+    def record_pair(self, token: str, pair: dict) -> None:
+        """Uebernimmt Pool/DEX/Liquiditaet/Reserven aus einem DexScreener Pair"""
+        info = self._entry(token)
+        liquidity = pair.get("liquidity") or {}
+        liquidity_usd = float(liquidity.get("usd") or 0)
+        if pair.get("pairAddress"):
+            info.pool_address = pair["pairAddress"]
+        if pair.get("dexId"):
+            info.dex = pair["dexId"]
+        if liquidity_usd > 0:
+            info.liquidity_usd = liquidity_usd
+            info.liquidity_updated = time.time()
+
+            # Quote-Seite = Gesamt minus Token-Seite (base * priceUsd)
+            base = float(liquidity.get("base") or 0)
+            quote = float(liquidity.get("quote") or 0)
+            price_usd = float(pair.get("priceUsd") or 0)
+            quote_usd = liquidity_usd - base * price_usd
+            if quote > 0 and 0 < quote_usd < liquidity_usd:
+                info.reserve_quote = quote
+                info.reserve_quote_usd = quote_usd
+        self._dirty.add(token)
+
+    # ── Hintergrund-Refresh ────────────────────────────────────────────
+
+    @staticmethod
+    def best_pair(pairs: List[dict]) -> Optional[dict]:
+        """Solana Pair mit der hoechsten Liquiditaet (gleiche Wahl wie PriceOracle)"""
+        if not pairs:
+            return None
+        sol_pairs = [p for p in pairs if p.get("chainId") == "solana"] or pairs
+        return max(sol_pairs, key=lambda p: float((p.get("liquidity") or {}).get("usd") or 0))
+
+    def _stale_watched(self) -> List[str]:
+        now = time.monotonic()
+        for token, seen in list(self._watch.items()):
+            if now - seen > self.WATCH_SECONDS:
+                del self._watch[token]
+        stale = []
+        for token in self._watch:
+            age = self.tokens[token].liquidity_age() if token in self.tokens else None
+            if age is None or age > self.STALE_SECONDS:
+                stale.append(token)
+        return stale
+
+    async def refresh(self, tokens: List[str]) -> int:
+        """Holt Pool-Daten fuer Tokens in DexScreener Batches. Gibt Anzahl Updates zurueck."""
+        if not tokens:
+            return 0
+        if self._session is None or self._session.closed:
+            self._session = fastpath.client_session()
+
+        updated = 0
+        for i in range(0, len(tokens), DEXSCREENER_BATCH_SIZE):
+            batch = tokens[i:i + DEXSCREENER_BATCH_SIZE]
+            if self.request_budget is not None and not self.request_budget.try_take(self.LIVE_RESERVE):
+                # Budget gehoert den Live-Preisen – Rest im naechsten Durchlauf
+                logger.debug(f"[TokenRegistry] Request budget exhausted, "
+                             f"{len(tokens) - i} token(s) deferred")
+                break
+            try:
+                async with self._session.get(
+                    DEXSCREENER_TOKENS_URL + ",".join(batch),
+                    timeout=aiohttp.ClientTimeout(total=10),
+                ) as response:
+                    if response.status != 200:
+                        logger.warning(f"[TokenRegistry] DexScreener HTTP {response.status}")
+                        continue
+                    data = await fastpath.read_json(response)
+            except Exception as e:
+                logger.warning(f"[TokenRegistry] Refresh exception: {type(e).__name__}: {e}")
+                continue
+            if not isinstance(data, dict):
+                logger.warning(f"[TokenRegistry] Unexpected DexScreener body: {type(data).__name__}")
+                continue
+
+            by_token: Dict[str, List[dict]] = {}
+            for pair in data.get("pairs") or []:
+                address = (pair.get("baseToken") or {}).get("address")
+                if address in batch:
+                    by_token.setdefault(address, []).append(pair)
+
+            for token, pairs in by_token.items():
+                best = self.best_pair(pairs)
+                if best:
+                    self.record_pair(token, best)
+                    updated += 1
+
+        self.refresh_count += 1
+        self.flush()
+        return updated
+
+    async def _refresh_loop(self):
+        logger.info(f"[TokenRegistry] Background refresh started (every {self.REFRESH_INTERVAL}s)")
+        try:
+            while True:
+                try:
+                    stale = self._stale_watched()
+                    if stale:
+                        updated = await self.refresh(stale)
+                        logger.debug(f"[TokenRegistry] Refreshed {updated}/{len(stale)} tokens")
+                    else:
+                        self.flush()
+                except Exception as e:
+                    # Ein kaputter Durchlauf (Antwort, SQLite) darf den Refresh nicht beenden
+                    logger.error(f"[TokenRegistry] Refresh failed: {type(e).__name__}: {e}")
+                await asyncio.sleep(self.REFRESH_INTERVAL)
+        except asyncio.CancelledError:
+            logger.info("[TokenRegistry] Background refresh stopped")
+
+    def start(self):
+        """Startet den Hintergrund-Refresh (benoetigt laufenden Event Loop)"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+        self.flush()
+        if self._session and not self._session.closed:
+            await self._session.close()
+            self._session = None
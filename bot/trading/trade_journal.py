@@ -0,0 +1,83 @@
+"""
+Trade Journal - Trades einer Session als JSON Lines auf der Platte
+
+PaperPortfolio hielt jeden Trade fuer immer in trade_history, get_statistics
+und print_summary scannten die ganze Liste, save_to_file serialisierte sie
+am Ende komplett. Mit Journal:
+  - jeder Trade wird beim Buchen als eine Zeile angehaengt (flush pro Trade)
+  - im Speicher bleiben nur die letzten Trades (PaperPortfolio.trade_history)
+  - Statistiken laufen inkrementell (PortfolioStats), der volle Verlauf wird
+    nur fuer Export/Anzeige von der Platte gestreamt
+
+Format pro Zeile: {"type": "trade", ...Trade.to_dict()}
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def repair_tail(path: Path):
+    """Schneidet eine abgerissene letzte Zeile (Absturz beim Schreiben) ab, bevor angehaengt wird"""
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with open(path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) == b"\n":
+            return
+        size = f.seek(0, os.SEEK_END)
+        keep = 0
+        step = 4096
+        pos = size
+        while pos > 0:
+            pos = max(0, pos - step)
+            f.seek(pos)
+            chunk = f.read(min(step, size - pos))
+            idx = chunk.rfind(b"\n")
+            if idx >= 0:
+                keep = pos + idx + 1
+                break
+        f.truncate(keep)
+    logger.warning(f"[Journal] Truncated torn last line in {path.name}")
+
+
+class TradeJournal:
+    """Append-only JSON Lines Datei"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        repair_tail(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self.written = 0
+
+    def append(self, record: dict):
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self.written += 1
+
+    def append_trade(self, trade):
+        self.append({"type": "trade", **trade.to_dict()})
+
+    def records(self, record_type: Optional[str] = None) -> Iterator[dict]:
+        """Liest das Journal (optional nur einen Typ); unvollstaendige letzte Zeile wird uebersprungen"""
+        if not self._file.closed:
+            self._file.flush()
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"[TradeJournal] Skipping broken line in {self.path.name}")
+                    continue
+                if record_type is None or record.get("type") == record_type:
+                    yield record
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
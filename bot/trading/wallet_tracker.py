@@ -15,7 +15,7 @@ logger = logging.getLogger(__name__)
 DB_PATH = "data/wallet_performance.db"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WalletTrade:
     """Ein Trade eines einzelnen Wallets"""
     wallet: str
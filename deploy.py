@@ -489,7 +489,9 @@ def sync_dbs_from_device(user: str, host: str, label: str):
 def merge_db(local_db: Path, remote_db: Path):
     """
     Merged Sessions aus remote_db in local_db.
-    Importiert nur Sessions die lokal noch nicht vorhanden sind.
+    Importiert nur Sessions die lokal noch nicht vorhanden sind – samt ihrer
+    Preisverlaeufe (position_prices, Schluessel buy_id auf die neuen lokalen
+    wallet_trades.id umgeschrieben).
     """
     import sqlite3
 
@@ -533,17 +535,43 @@ def merge_db(local_db: Path, remote_db: Path):
     new_sessions    = [s for s in remote_sessions if s not in existing]
 
     imported = 0
+    id_map = {}     # remote wallet_trades.id -> lokale id
     for session_id in new_sessions:
         cur_remote.execute("SELECT * FROM wallet_trades WHERE session_id = ?", (session_id,))
         rows = cur_remote.fetchall()
         for row in rows:
             row_dict = dict(zip([d[0] for d in cur_remote.description], row))
-            row_dict.pop("id", None)
+            remote_id = row_dict.pop("id", None)
             cols = ", ".join(row_dict.keys())
             vals = ", ".join(["?" for _ in row_dict])
             cur_local.execute(f"INSERT INTO wallet_trades ({cols}) VALUES ({vals})", list(row_dict.values()))
+            if remote_id is not None:
+                id_map[remote_id] = cur_local.lastrowid
         imported += len(rows)
 
+    # Preisverlaeufe der importierten Positionen (trading/position_prices.py)
+    cur_remote.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='position_prices'")
+    if id_map and cur_remote.fetchone():
+        cur_local.execute("""
+            CREATE TABLE IF NOT EXISTS position_prices (
+                buy_id  INTEGER NOT NULL,
+                chunk   INTEGER NOT NULL,
+                t0      REAL    NOT NULL,
+                p0      REAL    NOT NULL,
+                n       INTEGER NOT NULL,
+                data    BLOB    NOT NULL,
+                PRIMARY KEY (buy_id, chunk)
+            ) WITHOUT ROWID
+        """)
+        cur_remote.execute("SELECT buy_id, chunk, t0, p0, n, data FROM position_prices")
+        paths = [(id_map[r[0]],) + tuple(r[1:]) for r in cur_remote.fetchall() if r[0] in id_map]
+        cur_local.executemany("""
+            INSERT OR REPLACE INTO position_prices (buy_id, chunk, t0, p0, n, data)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, paths)
+        if paths:
+            print(f"    {len({p[0] for p in paths})} Preisverlaeufe uebernommen")
+
     # wallet_stats neu berechnen fuer neue Sessions (vereinfacht: einfach aus wallet_trades)
     cur_local.execute("""
         CREATE TABLE IF NOT EXISTS wallet_stats (
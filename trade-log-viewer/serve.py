@@ -2,7 +2,8 @@
 """
 Local dashboard server for past Copybot trades.
 
-Scans JSON files from the copybot data directory and renders charts on demand.
+Scans the copybot data directory (session journals *.journal.jsonl + *.trades.jsonl
+and legacy paper_*.json files) and renders charts on demand.
 """
 
 from __future__ import annotations
@@ -364,7 +365,7 @@ def make_handler(source_dir: Path, default_currency: str):
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Local dashboard for past Copybot trades.")
-    parser.add_argument("--source-dir", default=str(DEFAULT_COPYBOT_DATA_DIR), help="Directory with paper_mainnet_*.json / paper_trading_*.json")
+    parser.add_argument("--source-dir", default=str(DEFAULT_COPYBOT_DATA_DIR), help="Directory with session journals (*.journal.jsonl) and legacy paper_*.json files")
     parser.add_argument("--host", default="127.0.0.1")
     parser.add_argument("--port", type=int, default=8765)
     parser.add_argument("--display-currency", choices=["EUR", "USD"], default="EUR")
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Standalone trade log viewer for Copybot JSON sessions.
+Standalone trade log viewer for Copybot sessions (session journals and legacy JSON).
 
 This tool intentionally lives outside the copybot project.
 """
@@ -9,8 +9,10 @@ from __future__ import annotations
 
 import argparse
 import hashlib
+import importlib.util
 import json
 import subprocess
+import sys
 import time
 import urllib.error
 import urllib.parse
@@ -23,7 +25,6 @@ from typing import Iterable
 
 
 GECKO_ROOT = "https://api.geckoterminal.com/api/v2"
-FRANKFURTER_ROOT = "https://api.frankfurter.app"
 NETWORK = "solana"
 PLOTLY_CDN = "https://cdn.plot.ly/plotly-2.35.2.min.js"
 LOCAL_TZ = datetime.now().astimezone().tzinfo or UTC
@@ -32,11 +33,40 @@ DEFAULT_COPYBOT_DATA_DIR = (Path(__file__).resolve().parent.parent / "bot" / "da
 CACHE_DIR = (Path(__file__).resolve().parent / ".cache").resolve()
 GECKO_HISTORY_TTL_SECONDS = 365 * 24 * 3600
 GECKO_POOL_TTL_SECONDS = 12 * 3600
-FX_HISTORY_TTL_SECONDS = 365 * 24 * 3600
+FX_MODULE_PATH = (Path(__file__).resolve().parent.parent / "bot" / "trading" / "fx.py").resolve()
+BOT_DIR = (Path(__file__).resolve().parent.parent / "bot").resolve()
+JOURNAL_MODULE_PATH = BOT_DIR / "trading" / "session_journal.py"
 
 _LAST_REQUEST_AT = 0.0
 
 
+def _load_fx_module():
+    # Shared with the bot (same USD/EUR history), loaded by path so the viewer
+    # stays independent of the bot's package layout and dependencies.
+    spec = importlib.util.spec_from_file_location("copybot_fx", FX_MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _load_journal_module():
+    # Session journals (data/<session>.journal.jsonl + .trades.jsonl) are read with the
+    # bot's own loader. It only pulls in trading.clock / trading.trade_journal
+    # (stdlib-only), so the bot directory on sys.path is enough.
+    if str(BOT_DIR) not in sys.path:
+        sys.path.append(str(BOT_DIR))
+    spec = importlib.util.spec_from_file_location("copybot_session_journal", JOURNAL_MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_fx = _load_fx_module()
+FxService = _fx.FxService
+_journal = _load_journal_module()
+_FX_SERVICE: FxService | None = None
+
+
 @dataclass
 class TradeRecord:
     token: str
@@ -151,8 +181,6 @@ def get_cache_file(url: str) -> Path:
 
 
 def get_cache_ttl_seconds(url: str) -> int:
-    if url.startswith(FRANKFURTER_ROOT):
-        return FX_HISTORY_TTL_SECONDS
     if "/ohlcv/" in url:
         return GECKO_HISTORY_TTL_SECONDS
     return GECKO_POOL_TTL_SECONDS
@@ -201,14 +229,26 @@ def parse_trade(item: dict) -> TradeRecord:
     )
 
 
+def journal_base(path: Path) -> str | None:
+    """Session base path for a journal file (<session>.journal.jsonl / .trades.jsonl), else None"""
+    for suffix in (_journal.STATE_SUFFIX, _journal.TRADES_SUFFIX):
+        if path.name.endswith(suffix):
+            return str(path)[: -len(suffix)]
+    return None
+
+
 def load_session(path: Path) -> dict:
+    base = journal_base(path)
+    if base is not None:
+        return {"trade_history": list(_journal.read_trades(base))}
     with path.open("r", encoding="utf-8") as handle:
         return json.load(handle)
 
 
 def find_session_files(source_dir: Path) -> list[Path]:
     session_files = list(source_dir.glob("paper_mainnet_*.json")) + list(source_dir.glob("paper_trading_*.json"))
-    return sorted(session_files, reverse=True)
+    session_files += [Path(session["base"] + _journal.STATE_SUFFIX) for session in _journal.list_sessions(source_dir)]
+    return sorted(session_files, key=lambda path: path.name, reverse=True)
 
 
 def group_trades_by_token(trade_history: Iterable[dict]) -> dict[str, list[TradeRecord]]:
@@ -357,53 +397,43 @@ def fetch_best_pool_and_ohlcv(identifier: str, start: datetime, end: datetime) -
     raise ChartUnavailableError(f"Could not load historical candles for {identifier}.\n{details}")
 
 
-def fetch_fx_rates(start_date: date, end_date: date, display_currency: str) -> dict[str, float]:
+def get_fx_service() -> FxService:
+    global _FX_SERVICE
+    if _FX_SERVICE is None:
+        _FX_SERVICE = FxService()
+    return _FX_SERVICE
+
+
+def fetch_fx_rates(start_date: date, end_date: date, display_currency: str) -> FxService:
+    fx = get_fx_service()
     if display_currency == "USD":
-        return {}
+        return fx
     if display_currency != "EUR":
         raise RuntimeError(f"Unsupported display currency: {display_currency}")
 
-    query = urllib.parse.urlencode({"from": "USD", "to": "EUR"})
-    url = f"{FRANKFURTER_ROOT}/{start_date.isoformat()}..{end_date.isoformat()}?{query}"
-    payload = rate_limited_get_json(url)
-    rates = payload.get("rates") or {}
-    result = {day: float(values["EUR"]) for day, values in rates.items() if "EUR" in values}
-    if not result:
+    fx.ensure_range(start_date, end_date)
+    if not fx.has_rates():
         raise RuntimeError("No FX rates returned from Frankfurter")
-    return result
+    return fx
 
 
-def convert_usd_to_display(usd_value: float, day_key: str, display_currency: str, fx_rates: dict[str, float]) -> float:
+def convert_usd_to_display(usd_value: float, day_key: str, display_currency: str, fx_rates: FxService) -> float:
     if display_currency == "USD":
         return usd_value
-    rate = fx_rates.get(day_key)
-    if rate is None:
-        previous_days = sorted(key for key in fx_rates if key <= day_key)
-        if not previous_days:
-            next_days = sorted(key for key in fx_rates if key >= day_key)
-            if not next_days:
-                raise RuntimeError(f"No FX rate available for {day_key}")
-            rate = fx_rates[next_days[0]]
-        else:
-            rate = fx_rates[previous_days[-1]]
-    return usd_value * rate
-
-
-def convert_eur_to_display(eur_value: float, day_key: str, display_currency: str, fx_rates: dict[str, float]) -> float:
+    return fx_rates.usd_to_eur(usd_value, day_key)
+
+
+def convert_eur_to_display(eur_value: float, day_key: str, display_currency: str, fx_rates: FxService) -> float:
     if display_currency == "EUR":
         return eur_value
     if display_currency == "USD":
-        rate = fx_rates.get(day_key)
-        if rate is None or rate == 0:
-            previous_days = sorted(key for key in fx_rates if key <= day_key)
-            if not previous_days:
-                raise RuntimeError(f"No FX rate available for {day_key}")
-            rate = fx_rates[previous_days[-1]]
-        return eur_value / rate
+        if not fx_rates.has_rates():
+            raise RuntimeError(f"No FX rate available for {day_key}")
+        return fx_rates.eur_to_usd(eur_value, day_key)
     raise RuntimeError(f"Unsupported display currency: {display_currency}")
 
 
-def normalize_candles(candles: list[dict], display_currency: str, fx_rates: dict[str, float]) -> list[dict]:
+def normalize_candles(candles: list[dict], display_currency: str, fx_rates: FxService) -> list[dict]:
     normalized = []
     for candle in candles:
         day_key = candle["datetime"][:10]
@@ -468,7 +498,7 @@ def build_plot_trades(
     trades: list[TradeRecord],
     normalized_candles: list[dict],
     display_currency: str,
-    fx_rates: dict[str, float],
+    fx_rates: FxService,
 ) -> list[PlotTrade]:
     plot_trades: list[PlotTrade] = []
     for trade in trades:
@@ -958,8 +988,9 @@ def maybe_open(path: Path, should_open: bool) -> None:
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Standalone chart viewer for Copybot JSON logs.")
-    parser.add_argument("session_json", help="Path to paper_trading / paper_mainnet JSON")
+    parser = argparse.ArgumentParser(description="Standalone chart viewer for Copybot session logs.")
+    parser.add_argument("session_json",
+                        help="Path to a paper_trading / paper_mainnet JSON or session journal (*.journal.jsonl / *.trades.jsonl)")
     parser.add_argument("--token", help="Specific token address to visualize")
     parser.add_argument("--all-tokens", action="store_true", help="Generate one chart per token")
     parser.add_argument("--display-currency", choices=["EUR", "USD"], default="EUR")
@@ -970,12 +1001,12 @@ def main() -> None:
     base_dir = Path(__file__).resolve().parent
     session_path = Path(args.session_json).expanduser().resolve()
     if not session_path.exists():
-        raise SystemExit(f"Session JSON not found: {session_path}")
+        raise SystemExit(f"Session file not found: {session_path}")
 
     session = load_session(session_path)
     grouped = group_trades_by_token(session.get("trade_history") or [])
     if not grouped:
-        raise SystemExit("No trade_history found in the session JSON")
+        raise SystemExit("No trades found in the session file")
 
     selected_tokens = select_tokens(grouped, args)
     generated_files: list[Path] = []